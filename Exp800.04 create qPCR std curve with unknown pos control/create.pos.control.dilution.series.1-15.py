@@ -1,5 +1,8 @@
 # imports
 from opentrons import protocol_api
+from ottools.platemap import well_index
+from ottools.registry import use_custom_labware
+from ottools.heights import tip_heights
 
 # metadata
 metadata = {
@@ -10,34 +13,8 @@ metadata = {
 }
 ##########################
 # functions
-# calculates ideal tip height for entering liquid
-def tip_heights(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    p0=0.029502064
-    p1=0.084625954
-    p2=-0.000174864
-    p3=2.18373E-07
-    p4=-1.30599E-10
-    p5=2.97839E-14
-    if init_vol > 1499:
-        offset = 14 # model out of range; see sheet
-    else:
-        offset = 7 #mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 8: # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 1        
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
-
 def run(protocol: protocol_api.ProtocolContext):
+    use_custom_labware(protocol)
 
     # LABWARE
     fuge_rack = protocol.load_labware('vwr_24_tuberack_1500ul', '4')
@@ -45,6 +22,7 @@ def run(protocol: protocol_api.ProtocolContext):
     tiprack20 = protocol.load_labware('opentrons_96_filtertiprack_20ul', '9')
     tempdeck = protocol.load_module('tempdeck', '10')
     stds_plate = tempdeck.load_labware('abi_96_wellplate_250ul')
+    stds_index = well_index(stds_plate)
     
     # PIPETTES
     p300 = protocol.load_instrument(
@@ -132,15 +110,9 @@ def run(protocol: protocol_api.ProtocolContext):
         for x in range(1,5): # need int 1, 2, 3 and 4.
             p20.aspirate(20, stds_plate[probe_wells[i]].bottom(2), rate=0.75) # asp from 54ul, dispense to neighbor well
             protocol.delay(seconds=2) #equilibrate
-            # find digits in well, A1 and A10 and puts into list
-            findNums = [int(i) for i in probe_wells[i].split()[0] if i.isdigit()]
-            # joins nums from list [1, 0] -> 10 type = string
-            colNum = ''.join(map(str, findNums))
-            # this finds row
-            row = probe_wells[i].split()[0][0]
-            # put it all together into a destination well
-            dest = row+str(int(colNum)+x) # row + neighbor well i.e. 1, 2
-            p20.dispense(20, stds_plate[dest].bottom(2), rate=0.75)
+            # same row, x columns over (G1 -> G2, G3)
+            dest = stds_index.neighbour(probe_wells[i], 0, x)
+            p20.dispense(20, dest.bottom(2), rate=0.75)
             p20.touch_tip()
         p300.drop_tip()
         p20.drop_tip()
\ No newline at end of file
@@ -1,5 +1,7 @@
 # imports
 from opentrons import protocol_api
+from ottools.dilution import serial_dilution
+from ottools.registry import use_custom_labware
 
 # metadata
 metadata = {
@@ -10,6 +12,7 @@ metadata = {
 }
 ##########################
 def run(protocol: protocol_api.ProtocolContext):
+    use_custom_labware(protocol)
 
     # LABWARE
     pos_rack = protocol.load_labware('vwr_24_tuberack_1500ul', '1')
@@ -67,25 +70,8 @@ def run(protocol: protocol_api.ProtocolContext):
         touch_tip=False
     )
    
-    # serial dilutions in microfuge tubes, 10% diliutions
-    for i in range(len(std_wells)-1): 
-        h_mix = 20
-        p300.pick_up_tip()
-        p300.mix(2, 200, std_wells[i].bottom(8)) # mix low
-        p300.mix(2, 200, std_wells[i].bottom(14)) # mix mid
-        p300.mix(5, 200, std_wells[i].bottom(h_mix)) #mix hi
-        p300.aspirate(100, std_wells[i].bottom(h_mix), rate=0.8)
-        p300.touch_tip()
-        p300.dispense(100, std_wells[i+1].bottom(14)) # better mixing with mid dispense
-        p300.blow_out(std_wells[i+1].bottom(h_mix))# blow out just below the surface
-        p300.drop_tip()
-        if i==len(std_wells)-2: # last tube
-            p300.pick_up_tip()
-            p300.mix(2, 200, std_wells[i+1].bottom(8)) # mix low
-            p300.mix(2, 200, std_wells[i+1].bottom(14)) # mix mid
-            p300.mix(5, 200, std_wells[i+1].bottom(h_mix)) #mix hi
-            p300.blow_out(std_wells[i+1].bottom(h_mix))# blow out just below the surface
-            p300.drop_tip()
+    # serial dilutions in microfuge tubes, 10% diliutions; each tube mixed 2 low, 2 mid, 5 high
+    serial_dilution(p300, std_wells, 100, 900, profile='low_mid_high', aspirate_rate=0.8)
 
 # move 300ul H2O into tubes; want this done with OT-2 pipette to reduce variability
     p300.pick_up_tip()
@@ -99,34 +85,10 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.touch_tip()
     p300.drop_tip()
     
-    # transfer 300ul from std_11 to std_11_1 to begin dilution series
-    p300.pick_up_tip()
-    for j in range(2):
-        p300.aspirate(150, std_11, rate=0.8)
-        protocol.delay(seconds =2)
-        p300.touch_tip(v_offset = -3)
-        p300.dispense(150, std_11_1)
-        p300.blow_out()
-        p300.touch_tip()
-    p300.drop_tip()
-    
+    # transfer 300ul from std_11 to std_11_1 to begin dilution series; let the
+    # drop settle and touch off 3 mm down
+    serial_dilution(p300, [std_11, std_11_1], 300, 300, profile='low_mid_high', mix_first=False,
+                    aspirate_rate=0.8, v_offset=-3, delay=2, protocol=protocol)
     # dilutions in LOD tubes; want at least 120*2 *1.2 = 288ul
-    for i in range(len(lod_wells)-1):
-        h_mix = 14
-        p300.pick_up_tip()      
-        p300.mix(2, 200, lod_wells[i].bottom(5)) # mix low
-        p300.mix(2, 200, lod_wells[i].bottom(10)) # mix mid
-        p300.mix(5, 200, lod_wells[i].bottom(h_mix)) #mix hi
-        for z in range(2) # 2*150 = 300
-            p300.aspirate(150, lod_wells[i].bottom(h_mix), rate=0.8)
-            p300.touch_tip()
-            p300.dispense(150, lod_wells[i+1].bottom(5)) # better mixing with mid dispense
-            p300.blow_out(lod_wells[i+1].bottom(h_mix))# blow out just below the surface
-        p300.drop_tip()
-        if i==len(lod_wells)-2: # last tube
-            p300.pick_up_tip()
-            p300.mix(2, 200, lod_wells[i+1].bottom(5)) # mix low
-            p300.mix(2, 200, lod_wells[i+1].bottom(10)) # mix mid
-            p300.mix(5, 200, lod_wells[i+1].bottom(h_mix)) #mix hi
-            p300.blow_out(lod_wells[i+1].bottom(h_mix))# blow out just below the surface
-            p300.drop_tip() 
\ No newline at end of file
+    serial_dilution(p300, lod_wells, 300, 300, profile='low_mid_high', mix_first=False,
+                    aspirate_rate=0.8)
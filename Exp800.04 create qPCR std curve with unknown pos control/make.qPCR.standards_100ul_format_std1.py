@@ -1,5 +1,6 @@
 # imports
 from opentrons import protocol_api
+from ottools.registry import use_custom_labware
 
 # metadata
 metadata = {
@@ -10,6 +11,7 @@ metadata = {
 }
 ##########################
 def run(protocol: protocol_api.ProtocolContext):
+    use_custom_labware(protocol)
 
     # LABWARE
     pos_rack = protocol.load_labware('vwr_24_tuberack_1500ul', '1')
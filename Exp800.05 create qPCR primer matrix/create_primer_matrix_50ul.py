@@ -1,5 +1,10 @@
 # imports
 from opentrons import protocol_api
+from ottools.temperature import precondition
+from ottools.recipe import primer_matrix
+from ottools.overage import format_sheet, primer_matrix_overage, split
+from ottools.registry import use_custom_labware
+from ottools.heights import tip_heights, tip_heightsEpp
 
 # metadata
 metadata = {
@@ -8,51 +13,14 @@ metadata = {
     'description': 'Create a fwd, rev primer conc matrix to optimize conc. in 50ul vs 25ul.',
     'apiLevel': '2.11'
 }
+
+# aspiration schedule per tube from a simulated run (python -m ottools recipe --protocol);
+# None: the one built into ottools/overage.py
+SCHEDULE = None
 ##########################
 # functions
-# calculates ideal tip height for entering liquid
-def tip_heights(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    p0=0.029502064
-    p1=0.084625954
-    p2=-0.000174864
-    p3=2.18373E-07
-    p4=-1.30599E-10
-    p5=2.97839E-14
-    if init_vol > 1500:
-        offset = 14 # model out of range; see sheet
-    else:
-        offset = 7 #mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 8: # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 1        
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
-
-# splits aspiration volume into equal parts 
-def split_asp(tot, max_vol):
-    n =1
-    if tot/n > max_vol: # if total greater than max
-       while tot/n > max_vol: # increment n until some tot/n < max_vol
-            n+=1
-            if tot/n == max_vol: # if tot evently divided e.g. 1000
-                subvol = tot/n
-                return [subvol]*n
-            if tot/(n+1) < max_vol: # if tot <> evenly divided e.g. 417.3
-                subvol = tot/(n+1)
-                return [subvol]*(n+1) # return # aspiration steps
-    else: # if total less than max
-        return [tot/n]
-
 def run(protocol: protocol_api.ProtocolContext):
+    use_custom_labware(protocol)
 
     # LABWARE
     fuge_rack = protocol.load_labware('vwr_24_tuberack_1500ul', '1')
@@ -70,6 +38,8 @@ def run(protocol: protocol_api.ProtocolContext):
     p20 = protocol.load_instrument(
         'p20_single_gen2', 'right', tip_racks=[tiprack20]
     )
+    # start chilling the plate now; pipettes wait for 4C only when they first reach it
+    precondition(tempdeck, 4, [p300, p20])
      
     # REAGENTS
     # sds_rack
@@ -151,102 +121,49 @@ def run(protocol: protocol_api.ProtocolContext):
     R_reps = 12 # How many wells will use R primer at particular concentration? (int)
     # F_reps = 12 # How many wells will use F primer at particular concentration? (int)
     F_int_vol = 100 # What is the volume of F intermediate primer in new tube? (in ul)
-    percent_waste =  0.20 # What percentage waste? (decimal)
-    sN_mix_waste_offset = 0.025  # How much percent_waste offset should sN_mix use? This calculated as percent_waste-sN_mix_overage = percent_waste for sN_mix_overage e.g. (20-7=13%) Should not be 0 otherwise offset = percent_waste. (decimal)
-    R_mix_waste_offset = 0.11  # How much percent_waste offset should R_mix use? This calculated as percent_waste-R_mix_overage = percent_waste for R_mix_overage e.g. (20-=13%) If 0, then offset = percent_waste. (decimal)
-    std_NTC_waste_offset = 0.028 # How much percent_waste offset should std_NTC use? (decimal)
-    bpw_waste_offset = 0.032 # How much percent_waste offset should bpw_waste use? (decimal)
+    # mix overages are no longer set by hand (percent_waste less a per-mix offset): ottools/overage.py
+    # sizes every mix from its aspiration schedule and the tube's dead volume
     p300_max_vol = 200
 
 
-    # calcs
-    tot_rxns = tot_stds+tot_NTCs+tot_samp # Calc what is total # rxns. (int)
-    tot_sds_NTC = tot_stds+tot_NTCs # Calc number of standards and nontemplate controls. (int)
-    rxn_vol_no_dna = tot_rxn_vol-dna_per_rxn # Calc what is volume of PCR rxn with no DNA added. (in ul)
-    P_per_rxn = P_conc/1000*tot_rxn_vol/orig_P_conc # Calc this constant probe is needed per pcr reaction. (in ul)
-    max_vol_F_per_rxn = F_800/1000*tot_rxn_vol/orig_F_conc # Calc greatest vol added from starting F primer conc to rxn to satisfy max test F conc? (in ul)
-    max_vol_R_per_rxn = R_800/1000*tot_rxn_vol/orig_R_conc # Calc greatest vol added from starting R primer conc to rxn to satisfy max test R conc? (in ul)
-    water_per_rxn =  rxn_vol_no_dna-rxn_base-P_per_rxn-max_vol_F_per_rxn-max_vol_R_per_rxn # Calc this is water added per rxn such that greatest F, R primer conc can be accommodated in total rxn vol. (in ul)
-    std_vol_F_per_rxn =  std_F_conc/1000*tot_rxn_vol/orig_F_conc# Calc adding this much F primer to each std rxn
-    std_vol_R_per_rxn =  std_R_cond/1000*tot_rxn_vol/orig_R_conc# Calc adding this much F primer to each std rxn
-    BPW_rxn =  rxn_base+P_per_rxn+water_per_rxn# Mix base + probe + water (no DNA, F, R primer). (in ul)
-    std_woff_per_sN_rxn =  max_vol_F_per_rxn-std_vol_F_per_rxn+max_vol_R_per_rxn-std_vol_R_per_rxn# Calc how much water to add to offset diff in max vol F,R primer per reaction. (Max-Std)*2 (in ul)
-    BPW_sN_rxn =  BPW_rxn+std_vol_F_per_rxn+std_vol_R_per_rxn+std_woff_per_sN_rxn# Mix base + probe + water+F,R primer at std conc+water_offset(no DNA). (in ul)
-    BWP_mix_xfer_sN_mix = tot_sds_NTC*(1+percent_waste-sN_mix_waste_offset)*BPW_rxn # Calc how much tot_BPW_mix to move to make new tube for stds and NTC. (in ul)
-    std_woff_add_to_sN_mix = std_woff_per_sN_rxn*tot_sds_NTC*(1+percent_waste-sN_mix_waste_offset) # Calc how much water to add to sdd_NTC mmix with waste
-    F_add_to_sN_mix = tot_sds_NTC*(1+percent_waste-sN_mix_waste_offset)*std_vol_F_per_rxn # Calc how much F primer to add to std_NTC mmix with waste
-    R_add_to_sN_mix =  tot_sds_NTC*(1+percent_waste-sN_mix_waste_offset)*std_vol_R_per_rxn# Calc how much R primer to add to std_NTC mmix with waste
-    sN_mix_xfer_to_stds_mix = BPW_sN_rxn*std_NTC_reps*(1+percent_waste-std_NTC_waste_offset)  # Calc how much sn_mix to aliquot to tube in preparation for std DNA mixing. (in ul)
-    std_DNA_xfer_to_stds_mix =  dna_per_rxn*std_NTC_reps*(1+percent_waste-std_NTC_waste_offset)# Calc how much DNA from each standard adding to stds_mix with waste. (in ul)
-    bpw_mix_xfer_bpwd_mix =  tot_samp*BPW_rxn*(1+percent_waste-bpw_waste_offset)# Calc how much bpw_mix needed in new tube for # total samples
-    std_DNA_xfer_to_bpwd_mix = dna_per_rxn*tot_samp*(1+percent_waste-bpw_waste_offset) # Calc how much DNA to add to bpw_mix for template in PCR rxns.
-    dna_per_rxn_10x = 0.2 # dna_per_rxn_10x =  # 10x concentrated DNA to add to reactions to avoid using too much std sample
-    water_per_rxn_bpwd_mix = 2-dna_per_rxn_10x# water_per_rxn_bpwd_mix =  # Water to add to bpwd mix to offset 2ul to 0.2ul DNA addition.
-    dna_XFR_bpwd_mix = tot_samp*dna_per_rxn_10x*(1+percent_waste-bpw_waste_offset) # dna_XFR_bpwd_mix =  # The amount of DNA to transfer from a std tube to the bpwd_mix
-    water_XFR_bpwd_mix = tot_samp*water_per_rxn_bpwd_mix*(1+percent_waste-bpw_waste_offset) # water_XFR_bpwd_mix =  # The amount of water to transfer to the bpwd_mix to offset lower DNA vol addition
-    bpwd_rxn = BPW_rxn+dna_per_rxn  # Calc vol of bpw reaction + DNA vol
-    bpwd_mix_xfer_R_mix = bpwd_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how muc bpwd_mix to transfer to each tube for specific R conc. Less than 12% to avoid missing vol.
-    R_50_rxn = R_50/1000*tot_rxn_vol/orig_R_conc # Calc how much R primer at lowest concentration to add per reaction? (e.g. 50nM) (in ul)
-    R_50_mix =  R_50_rxn*R_reps*(1+percent_waste-R_mix_waste_offset)# Calc how much R primer to add to R_50 mix. (in ul)
-    R_50_woff_rxn = max_vol_R_per_rxn-R_50_rxn# Calc how much water offset to add to each rxn. (in ul)
-    R_50_woff_mix = R_50_woff_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much water offset to add to R_50 mix. (in ul)
-    R_100_rxn = R_100/1000*tot_rxn_vol/orig_R_conc # Calc how much R primer at concentration to add. (in ul)
-    R_100_mix =  R_100_rxn*R_reps*(1+percent_waste-R_mix_waste_offset)# Calc how much R primer to add to add. (in ul)
-    R_100_woff_rxn = max_vol_R_per_rxn-R_100_rxn # Calc how much water offset to add to each rxn. (in ul)
-    R_100_woff_mix =  R_100_woff_rxn*R_reps*(1+percent_waste-R_mix_waste_offset)# Calc how much water offset to add to mix. (in ul)
-    R_200_rxn = R_200/1000*tot_rxn_vol/orig_R_conc  # Calc how much R primer at concentration to add. (in ul)
-    R_200_mix = R_200_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much R primer to add to add. (in ul)
-    R_200_woff_rxn = max_vol_R_per_rxn-R_200_rxn # Calc how much water offset to add to each rxn. (in ul)
-    R_200_woff_mix =  R_200_woff_rxn*R_reps*(1+percent_waste-R_mix_waste_offset)# Calc how much water offset to add to mix. (in ul)
-    R_400_rxn = R_400/1000*tot_rxn_vol/orig_R_conc # Calc how much R primer at concentration to add. (in ul)
-    R_400_mix = R_400_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much R primer to add to add. (in ul)
-    R_400_woff_rxn = max_vol_R_per_rxn-R_400_rxn # Calc how much water offset to add to each rxn. (in ul)
-    R_400_woff_mix = R_400_woff_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much water offset to add to mix. (in ul)
-    R_600_rxn =  R_600/1000*tot_rxn_vol/orig_R_conc  # Calc how much R primer at concentration to add. (in ul)
-    R_600_mix = R_600_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much R primer to add to add. (in ul)
-    R_600_woff_rxn = max_vol_R_per_rxn-R_600_rxn # Calc how much water offset to add to each rxn. (in ul)
-    R_600_woff_mix =  R_600_woff_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much water offset to add to mix. (in ul)
-    R_800_rxn = R_800/1000*tot_rxn_vol/orig_R_conc  # Calc how much R primer at concentration to add. (in ul)
-    R_800_mix = R_800_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much R primer to add to add. (in ul)
-    R_800_woff_rxn = max_vol_R_per_rxn-R_800_rxn # Calc how much water offset to add to each rxn. (in ul)
-    R_800_woff_mix = R_800_woff_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much water offset to add to mix. (in ul)
-    F_50_int_conc = F_50/1000*tot_rxn_vol/max_vol_F_per_rxn # What intermediate (int) concentration of F primer is needed such that by adding 1.6ul I obtain a final F primer concentration of 50, 100, 200…etc in rxn well? (in uM)
-    F_100_int_conc = F_100/1000*tot_rxn_vol/max_vol_F_per_rxn # What intermediate (int) concentration of F primer is needed such that by adding 1.6ul I obtain a final F primer concentration of 50, 100, 200…etc in rxn well? (in uM)
-    F_200_int_conc =  F_200/1000*tot_rxn_vol/max_vol_F_per_rxn# What intermediate (int) concentration of F primer is needed such that by adding 1.6ul I obtain a final F primer concentration of 50, 100, 200…etc in rxn well? (in uM)
-    F_400_int_conc =  F_400/1000*tot_rxn_vol/max_vol_F_per_rxn# What intermediate (int) concentration of F primer is needed such that by adding 1.6ul I obtain a final F primer concentration of 50, 100, 200…etc in rxn well? (in uM)
-    F_600_int_conc =  F_600/1000*tot_rxn_vol/max_vol_F_per_rxn# What intermediate (int) concentration of F primer is needed such that by adding 1.6ul I obtain a final F primer concentration of 50, 100, 200…etc in rxn well? (in uM)
-    F_800_int_conc =  F_800/1000*tot_rxn_vol/max_vol_F_per_rxn# What intermediate (int) concentration of F primer is needed such that by adding 1.6ul I obtain a final F primer concentration of 50, 100, 200…etc in rxn well? (in uM)
-    F_50_int_primer = F_50_int_conc*F_int_vol/orig_F_conc # What amount of primer should be added to generate int F primer conc? (in ul)
-    F_50_int_water =  F_int_vol-F_50_int_primer# What amount of water should be added to generate int F primer conc? (in ul)
-    F_100_int_primer = F_100_int_conc*F_int_vol/orig_F_conc # What amount of primer should be added to generate int F primer conc? (in ul)
-    F_100_int_water = F_int_vol-F_100_int_primer # What amount of water should be added to generate int F primer conc? (in ul)
-    F_200_int_primer = F_200_int_conc*F_int_vol/orig_F_conc # What amount of primer should be added to generate int F primer conc? (in ul)
-    F_200_int_water = F_int_vol-F_200_int_primer # What amount of water should be added to generate int F primer conc? (in ul)
-    F_400_int_primer = F_400_int_conc*F_int_vol/orig_F_conc # What amount of primer should be added to generate int F primer conc? (in ul)
-    F_400_int_water = F_int_vol-F_400_int_primer # What amount of water should be added to generate int F primer conc? (in ul)
-    F_600_int_primer = F_600_int_conc*F_int_vol/orig_F_conc # What amount of primer should be added to generate int F primer conc? (in ul)
-    F_600_int_water = F_int_vol-F_600_int_primer # What amount of water should be added to generate int F primer conc? (in ul)
-    F_800_int_primer =  F_800_int_conc*F_int_vol/orig_F_conc # What amount of primer should be added to generate int F primer conc? (in ul)
-    F_800_int_water = F_int_vol-F_800_int_primer # What amount of water should be added to generate int F primer conc? (in ul)
-    R_mix_rxn = bpwd_rxn+R_50_rxn+R_50_woff_rxn # What is the rxn vol that should be aliquoted to plate wells after R primer addition? (in ul e.g.18.4)
+    # calcs: every mix, offset and intermediate volume comes from ottools/recipe.py
+    F_concs = [F_50, F_100, F_200, F_400, F_600, F_800]
+    R_concs = [R_50, R_100, R_200, R_400, R_600, R_800]
+    design = dict(
+        orig_F_conc=orig_F_conc, orig_R_conc=orig_R_conc, orig_P_conc=orig_P_conc,
+        std_F_conc=std_F_conc, std_R_conc=std_R_cond, P_conc=P_conc,
+        tot_stds=tot_stds, tot_NTCs=tot_NTCs, tot_samp=tot_samp, rxn_base=rxn_base,
+        tot_rxn_vol=tot_rxn_vol, dna_per_rxn=dna_per_rxn,
+        dna_per_rxn_10x=0.2, # 10x concentrated DNA to add to reactions to avoid using too much std sample
+        std_NTC_reps=std_NTC_reps, R_reps=R_reps, F_int_vol=F_int_vol)
+    overage, fill_sheet = primer_matrix_overage(F_concs, R_concs, p300_max=p300_max_vol,
+                                                schedule=SCHEDULE, **design)
+    recipe = primer_matrix(F_concs, R_concs, overage=overage, **design)
+    BWP_mix_xfer_sN_mix = float(recipe['BPW_mix_xfer_sN_mix']) # BPW_mix to move to make new tube for stds and NTC. (in ul)
+    std_woff_add_to_sN_mix = float(recipe['std_woff_add_to_sN_mix']) # water to add to sdd_NTC mmix with waste
+    F_add_to_sN_mix = float(recipe['F_add_to_sN_mix']) # F primer to add to std_NTC mmix with waste
+    R_add_to_sN_mix = float(recipe['R_add_to_sN_mix']) # R primer to add to std_NTC mmix with waste
+    sN_mix_xfer_to_stds_mix = float(recipe['sN_mix_xfer_to_stds_mix']) # sn_mix to aliquot to tube in preparation for std DNA mixing. (in ul)
+    std_DNA_xfer_to_stds_mix = float(recipe['std_DNA_xfer_to_stds_mix']) # DNA from each standard adding to stds_mix with waste. (in ul)
+    bpw_mix_xfer_bpwd_mix = float(recipe['bpw_mix_xfer_bpwd_mix']) # bpw_mix needed in new tube for # total samples
+    dna_XFR_bpwd_mix = float(recipe['dna_XFR_bpwd_mix']) # DNA to transfer from a std tube to the bpwd_mix
+    water_XFR_bpwd_mix = float(recipe['water_XFR_bpwd_mix']) # water to offset lower DNA vol addition
+    bpwd_rxn = float(recipe['bpwd_rxn']) # vol of bpw reaction + DNA vol
+    bpwd_mix_xfer_R_mix = float(recipe['bpwd_mix_xfer_R_mix']) # bpwd_mix to transfer to each tube for specific R conc.
+    R_mix_rxn = float(recipe['R_mix_rxn']) # rxn vol aliquoted to plate wells after R primer addition (in ul e.g.18.4)
 
     # more lists
-    R_mix_primer=[R_50_mix, R_100_mix, R_200_mix, R_400_mix, R_600_mix, R_800_mix]
-    R_mix_water=[R_50_woff_mix, R_100_woff_mix, R_200_woff_mix, R_400_woff_mix, R_600_woff_mix, R_800_woff_mix]
-    F_mix_primer=[F_50_int_primer, F_100_int_primer, F_200_int_primer, F_400_int_primer, F_600_int_primer, F_800_int_primer]
-    F_mix_water=[F_50_int_water, F_100_int_water, F_200_int_water, F_400_int_water, F_600_int_water, F_800_int_water]
+    R_mix_primer = recipe['R_primer_mix'].tolist()
+    R_mix_water = recipe['R_woff_mix'].tolist()
+    F_mix_primer = recipe['F_int_primer'].tolist()
+    F_mix_water = recipe['F_int_water'].tolist()
 
     # Mixes
-    BPW_mix_tot = BPW_rxn*(1+percent_waste)*tot_rxns  # Mix = base + probe + water (no DNA, F, R primer)*96*waste. (in ul)
-    sN_mix_tot = BWP_mix_xfer_sN_mix+std_woff_add_to_sN_mix+F_add_to_sN_mix+R_add_to_sN_mix # Mix = base + probe + water + F,R primers at std conc + water offset (no DNA) * number stds_NTC * waste
-    bpwd_mix_tot = bpw_mix_xfer_bpwd_mix+std_DNA_xfer_to_bpwd_mix # Mix = base + probe + DNA (no F, R primer) 
-    R_50_mix = bpwd_mix_xfer_R_mix+R_50_mix+R_50_woff_mix # Mix = base + probe + DNA+ R primer (No F primer)
-    R_100_mix = bpwd_mix_xfer_R_mix+R_100_mix+R_100_woff_mix # Mix = base + probe + DNA+ R primer (No F primer)
-    R_200_mix = bpwd_mix_xfer_R_mix+R_200_mix+R_200_woff_mix # Mix = base + probe + DNA+ R primer (No F primer)
-    R_400_mix = bpwd_mix_xfer_R_mix+R_400_mix+R_400_woff_mix # Mix = base + probe + DNA+ R primer (No F primer)
-    R_600_mix = bpwd_mix_xfer_R_mix+R_600_mix+R_600_woff_mix # Mix = base + probe + DNA+ R primer (No F primer)
-    R_800_mix = bpwd_mix_xfer_R_mix+R_800_mix+R_800_woff_mix # Mix = base + probe + DNA+ R primer (No F primer)
+    BPW_mix_tot = float(recipe['BPW_mix_tot']) # Mix = base + probe + water (no DNA, F, R primer)*96*waste. (in ul)
+    sN_mix_tot = float(recipe['sN_mix_tot']) # Mix = base + probe + water + F,R primers at std conc + water offset (no DNA) * number stds_NTC * waste
+    bpwd_mix_tot = float(recipe['bpwd_mix_tot']) # Mix = base + probe + DNA (no F, R primer)
     
+    print (format_sheet(fill_sheet)) # what to put in each tube
     print ("BWP_mix_xfer_sN_mix", BWP_mix_xfer_sN_mix)
     print ("bpw_mix_xfer_bpwd_mix", bpw_mix_xfer_bpwd_mix)
    
@@ -255,12 +172,13 @@ def run(protocol: protocol_api.ProtocolContext):
     # prepare sN_mix
     # add BPW_mix to sN_mix tube
     p300.pick_up_tip()
-    bpw_heights = tip_heights(BPW_mix_tot, len(split_asp(BWP_mix_xfer_sN_mix, p300_max_vol)), split_asp(BWP_mix_xfer_sN_mix, p300_max_vol)[0])
+    # BPW_mix is a 2 mL eppendorf tube in the vwr rack (ottools/recipe.py TUBES)
+    bpw_heights = tip_heightsEpp(BPW_mix_tot, len(split(BWP_mix_xfer_sN_mix, p300_max_vol)), split(BWP_mix_xfer_sN_mix, p300_max_vol)[0])
     p300.mix(3, 200, BPW_mix.bottom(bpw_heights[0]))
     # p300.flow_rate.aspirate = 40 #default
     # p300.flow_rate.dispense = 40 #default
-    for j in range(len(split_asp(BWP_mix_xfer_sN_mix, p300_max_vol))):
-        amt = split_asp(BWP_mix_xfer_sN_mix, p300_max_vol)[j]
+    for j in range(len(split(BWP_mix_xfer_sN_mix, p300_max_vol))):
+        amt = split(BWP_mix_xfer_sN_mix, p300_max_vol)[j]
         p300.aspirate(amt, BPW_mix.bottom(bpw_heights[j]), rate=0.4)
         protocol.delay(seconds=1) #equilibrate
         h = tip_heights(amt+amt*j, 1, 0)[0]
@@ -355,10 +273,10 @@ def run(protocol: protocol_api.ProtocolContext):
     # First, add bpw_mix to a new tube
     p300.pick_up_tip()
     # tip_heights is a function using total_vol, # steps, and aliquot (vol decrement) amt as parameters.
-    bpwd_xfer_h = tip_heights(BPW_mix_tot-BWP_mix_xfer_sN_mix, len(split_asp(bpw_mix_xfer_bpwd_mix, p300_max_vol)), split_asp(bpw_mix_xfer_bpwd_mix, p300_max_vol)[0])
+    bpwd_xfer_h = tip_heightsEpp(BPW_mix_tot-BWP_mix_xfer_sN_mix, len(split(bpw_mix_xfer_bpwd_mix, p300_max_vol)), split(bpw_mix_xfer_bpwd_mix, p300_max_vol)[0])
     p300.mix(3, 200, BPW_mix.bottom(bpwd_xfer_h[0]))
-    for j in range(len(split_asp(bpw_mix_xfer_bpwd_mix, p300_max_vol))): # split_asp is a function that returns equally divided aspirations
-        amt = split_asp(bpw_mix_xfer_bpwd_mix, p300_max_vol)[j]
+    for j in range(len(split(bpw_mix_xfer_bpwd_mix, p300_max_vol))): # split returns equally divided aspirations
+        amt = split(bpw_mix_xfer_bpwd_mix, p300_max_vol)[j]
         p300.aspirate(amt, BPW_mix.bottom(bpwd_xfer_h[j]), rate=0.8)
         protocol.delay(seconds=2)
         h = tip_heights(amt+amt*j, 1, 0)[0] # adjust tip height depending on dispenses
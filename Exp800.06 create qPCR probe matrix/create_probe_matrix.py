@@ -1,5 +1,10 @@
 # imports
 from opentrons import protocol_api
+from ottools.liquids import equilibrate
+from ottools.temperature import precondition
+from ottools.platemap import well_index
+from ottools.registry import use_custom_labware
+from ottools.heights import tip_heights
 
 # metadata
 metadata = {
@@ -10,33 +15,6 @@ metadata = {
 }
 ##########################
 # functions
-# calculates ideal tip height for entering liquid
-def tip_heights(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    p0=0.029502064
-    p1=0.084625954
-    p2=-0.000174864
-    p3=2.18373E-07
-    p4=-1.30599E-10
-    p5=2.97839E-14
-    if init_vol > 1499:
-        offset = 14 # model out of range; see sheet
-    else:
-        offset = 7 #mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 8: # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 1        
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
-
 # splits aspiration volume into equal parts 
 # returns list with equal volumes
 def split_asp(tot, max_vol):
@@ -54,6 +32,7 @@ def split_asp(tot, max_vol):
         return [tot/n]
 
 def run(protocol: protocol_api.ProtocolContext):
+    use_custom_labware(protocol)
 
     # LABWARE
     fuge_rack = protocol.load_labware('vwr_24_tuberack_1500ul', '1')
@@ -63,6 +42,7 @@ def run(protocol: protocol_api.ProtocolContext):
     tempdeck = protocol.load_module('tempdeck', '10')
     # plate = tempdeck.load_labware('amplifyt_96_aluminumblock_300ul')
     plate = tempdeck.load_labware('abi_96_wellplate_250ul')
+    plate_index = well_index(plate)
     # PIPETTES
     p300 = protocol.load_instrument(
         'p300_single_gen2', 'left', tip_racks=[tiprack300]
@@ -70,6 +50,8 @@ def run(protocol: protocol_api.ProtocolContext):
     p20 = protocol.load_instrument(
         'p20_single_gen2', 'right', tip_racks=[tiprack20]
     )
+    # start chilling the plate now; pipettes wait for 4C only when they first reach it
+    precondition(tempdeck, 4, [p300, p20])
      
     # REAGENTS
     # sds_rack
@@ -300,9 +282,9 @@ def run(protocol: protocol_api.ProtocolContext):
     for tube, h in zip(std_mixes, std_mix_heights):
         # p300.well_bottom_clearance.aspirate = h #mm
         p300.aspirate(mix_sn_XFR_to_std_int, sN_mix.bottom(h)) # 18 * 3 * 1.12-0.05= 54 + 6 =60ul
-        protocol.delay(seconds=2) #tip equilibrate
+        equilibrate(protocol, 'mastermix', 'aspirate') #tip equilibrate
         p300.move_to(sN_mix.bottom(35)) # excess tip fluid condense 
-        protocol.delay(seconds=3) #tip droplets slide
+        equilibrate(protocol, 'mastermix', 'withdraw') #tip droplets slide
         p300.touch_tip()
         p300.dispense(mix_sn_XFR_to_std_int, tube)
     p300.drop_tip()
@@ -317,7 +299,7 @@ def run(protocol: protocol_api.ProtocolContext):
         p20.flow_rate.aspirate = 4
         p20.flow_rate.dispense = 4
         p20.aspirate(std_dna_XFR_to_std_int, std) #aspirate from std_1 into std_mix (intermediate tube) e.g. 6.42 ul
-        protocol.delay(seconds=3) #equilibrate
+        equilibrate(protocol, 'template', 'aspirate') #equilibrate
         p20.touch_tip()
         p20.dispense(std_dna_XFR_to_std_int, intTube)
         # p20.move_to(intTube.bottom(3))
@@ -327,7 +309,7 @@ def run(protocol: protocol_api.ProtocolContext):
         p20.blow_out()
         p300.move_to(intTube.bottom(40)) #prevent tip from crashing into tube cap
         p300.mix(7, 50, intTube.bottom(1))
-        protocol.delay(seconds=2)
+        equilibrate(protocol, 'reaction', 'mix')
         # p300.move_to(intTube.bottom(10)) #prevent air bubbles in mmix during blow out
         p300.blow_out(intTube.bottom(10))
         p20.move_to(intTube.bottom(40))
@@ -335,16 +317,11 @@ def run(protocol: protocol_api.ProtocolContext):
         p20.flow_rate.dispense = 4
         for x in range(0,3): # need int 1, 2, and 3
             p20.aspirate(20, intTube) 
-            protocol.delay(seconds=2) #equilibrate
-            # find digits in well, G1 and G10 and puts into list
-            findNums = [int(i) for i in well.split()[0] if i.isdigit()]
-            # joins nums from list [1, 0] -> 10 type = string
-            colNum = ''.join(map(str, findNums))
-            # this finds row
-            row = well.split()[0][0]
-            dest = row+str(int(colNum)+x) # row + neighbor well i.e. 1, 2
-            p20.dispense(20, plate[dest].bottom(1))
-            p20.move_to(plate[dest].bottom(4))
+            equilibrate(protocol, 'reaction', 'aspirate') #equilibrate
+            # same row, x columns over (G1 -> G2, G3)
+            dest = plate_index.neighbour(well, 0, x)
+            p20.dispense(20, dest.bottom(1))
+            p20.move_to(dest.bottom(4))
             p20.blow_out()
             # p20.touch_tip()
         p300.drop_tip()
@@ -377,7 +354,7 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.flow_rate.dispense = 40 #default
             amt = split_asp(mix_bw_XFR_samp_int, p300_max_vol)[j]
             p300.aspirate(amt, MIX_bw.bottom(2))
-            protocol.delay(seconds=2)
+            equilibrate(protocol, 'mastermix', 'aspirate')
             # h = tip_heights(amt+amt*j, 1, 0)[0] # adjust tip height depending on dispenses
             p300.dispense(amt, tube.bottom(3)) # want tip to be just a little above dispense
             p300.blow_out(tube.bottom(20)) # want to be above liquid level
@@ -439,12 +416,12 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.flow_rate.aspirate = 30
             p300.flow_rate.dispense = 40
             p300.aspirate(mix_samp_XFR_to_well, tube.bottom(h[j]))
-            protocol.delay(seconds=2) # tip equilibrate
+            equilibrate(protocol, 'reaction', 'aspirate') # tip equilibrate
             p300.move_to(tube.bottom(25))
-            protocol.delay(seconds=2)
+            equilibrate(protocol, 'reaction', 'withdraw')
             p300.touch_tip() # bpwd_rxn*row reps (12) * waste = 16.8*12*(1+.12-0.05)=
             p300.dispense(mix_samp_XFR_to_well, plate[dest].bottom(1))
-            protocol.delay(seconds=1)
+            equilibrate(protocol, 'reaction', 'dispense')
             p300.blow_out(plate[dest].bottom(10))
             p300.touch_tip()
         p300.drop_tip()
@@ -525,13 +502,13 @@ def run(protocol: protocol_api.ProtocolContext):
                 dest = row+str(j+1)
                 nextWell = row + str(j+5)
                 p20.aspirate(p_int_XFR_to_well*2, tube.bottom(2)) # ~7ul aspirate from P int tube to wells
-                protocol.delay(seconds=2)
+                equilibrate(protocol, 'aqueous', 'aspirate')
                 p20.move_to(tube.bottom(2)) # relieve pressure if tip against tube 
                 p20.dispense(p_int_XFR_to_well, plate[dest].bottom(2))
-                protocol.delay(seconds=1)
+                equilibrate(protocol, 'aqueous', 'dispense')
                 p20.touch_tip()
                 p20.dispense(p_int_XFR_to_well, plate[nextWell].bottom(2))
-                protocol.delay(seconds=2)
+                equilibrate(protocol, 'aqueous', 'dispense')
                 p20.blow_out(plate[nextWell].bottom(6))
                 p20.touch_tip()
                 p20.drop_tip()
@@ -540,10 +517,10 @@ def run(protocol: protocol_api.ProtocolContext):
                 dest = row+str(j+8)
                 p20.aspirate(p_int_XFR_to_well, tube.bottom(1)) # ~7ul aspirate from P int tube to wells
                 p20.move_to(tube.bottom(2)) # relieve pressure if tip against tube 
-                protocol.delay(seconds=2)
+                equilibrate(protocol, 'aqueous', 'withdraw')
                 p20.touch_tip()
                 p20.dispense(p_int_XFR_to_well, plate[dest])
-                protocol.delay(seconds=2)
+                equilibrate(protocol, 'aqueous', 'dispense')
                 p20.blow_out(plate[dest].bottom(6))
                 p20.touch_tip()
         for k in range(3): # need int 0, 1, 2. Looping through bolus in row (3)
@@ -562,9 +539,9 @@ def run(protocol: protocol_api.ProtocolContext):
                 dwell = row+str(4*k+1+m) # loop through dispensing wells
                 p20.move_to(plate[swell].bottom(40))
                 p20.aspirate(20, plate[swell].bottom(1))
-                protocol.delay(seconds=1)
+                equilibrate(protocol, 'reaction', 'aspirate')
                 p20.dispense(20, plate[dwell].bottom(2))
-                protocol.delay(seconds=1)
+                equilibrate(protocol, 'reaction', 'dispense')
                 p20.move_to(plate[dwell].bottom(6))
                 p20.blow_out()
                 p20.touch_tip()
@@ -1,5 +1,8 @@
 # imports
+from functools import partial
 from opentrons import protocol_api
+from ottools.registry import use_custom_labware
+from ottools import heights
 
 # metadata
 metadata = {
@@ -11,57 +14,9 @@ metadata = {
 ##########################
 # functions
 # calculates ideal tip height for entering liquid
-def tip_heights(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    p0=0.029502064
-    p1=0.084625954
-    p2=-0.000174864
-    p3=2.18373E-07
-    p4=-1.30599E-10
-    p5=2.97839E-14
-    if init_vol > 1499:
-        offset = 14 # model out of range; see sheet
-    else:
-        offset = 7 #mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 8: # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 0        
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
+tip_heights = partial(heights.tip_heights, floor=0)
 
-def tip_heightsEpp(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    p0=-0.272820744
-    p1=0.019767959
-    p2=2.00442E-06
-    p3=-8.99691E-09
-    p4=6.72776E-12
-    p5=-1.55428E-15
-    if init_vol > 2000:
-        offset = 12 # model out of range; see sheet
-    else:
-        offset = 11 #mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 8: # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 0        
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
+tip_heightsEpp = partial(heights.tip_heightsEpp, min_height=8, floor=0)
 
 # splits aspiration volume into equal parts 
 # returns list with equal volumes
@@ -80,6 +35,7 @@ def split_asp(tot, max_vol):
         return [tot/n]
 
 def run(protocol: protocol_api.ProtocolContext):
+    use_custom_labware(protocol)
 
     # LABWARE
     fuge_rack = protocol.load_labware('vwr_24_tuberack_1500ul', '1')
@@ -1,5 +1,10 @@
 # imports
+from functools import partial
 from opentrons import protocol_api
+from ottools.platemap import well_index
+from ottools.registry import use_custom_labware
+from ottools import heights
+from ottools.heights import tip_heights
 
 # metadata
 metadata = {
@@ -10,58 +15,7 @@ metadata = {
 }
 ##########################
 # functions
-# calculates ideal tip height for entering liquid
-def tip_heights(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    p0=0.029502064
-    p1=0.084625954
-    p2=-0.000174864
-    p3=2.18373E-07
-    p4=-1.30599E-10
-    p5=2.97839E-14
-    if init_vol > 1499:
-        offset = 14 # model out of range; see sheet
-    else:
-        offset = 7 #mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 8: # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 1        
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
-
-def tip_heightsEpp(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    p0=-0.272820744
-    p1=0.019767959
-    p2=2.00442E-06
-    p3=-8.99691E-09
-    p4=6.72776E-12
-    p5=-1.55428E-15
-    if init_vol > 2000:
-        offset = 12 # model out of range; see sheet
-    else:
-        offset = 11 #mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 8: # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 0        
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
+tip_heightsEpp = partial(heights.tip_heightsEpp, min_height=8, floor=0)
 
 # splits aspiration volume into equal parts 
 # returns list with equal volumes
@@ -80,6 +34,7 @@ def split_asp(tot, max_vol):
         return [tot/n]
 
 def run(protocol: protocol_api.ProtocolContext):
+    use_custom_labware(protocol)
 
     # LABWARE
     fuge_rack = protocol.load_labware('vwr_24_tuberack_1500ul', '1')
@@ -89,6 +44,7 @@ def run(protocol: protocol_api.ProtocolContext):
     tempdeck = protocol.load_module('tempdeck', '10')
     # plate = tempdeck.load_labware('amplifyt_96_aluminumblock_300ul')
     plate = tempdeck.load_labware('abi_96_wellplate_250ul')
+    plate_index = well_index(plate)
 
     # PIPETTES
     p300 = protocol.load_instrument(
@@ -278,22 +234,17 @@ def run(protocol: protocol_api.ProtocolContext):
         p300.blow_out(plate[well].bottom(16))
         p300.touch_tip()
         for x in range(1,12): # need int 1, 2, and 12
-            # find digits in well, G1 and G10 and puts into list
-            findNums = [int(d) for d in well.split()[0] if d.isdigit()]
-            # joins nums from list [1, 0] -> 10 type = string
-            colNum = ''.join(map(str, findNums))
-            # this finds row
-            row = well.split()[0][0]
-            dest = row+str(int(colNum)+x) # row + neighbor well i.e. 1, 2
+            # same row, x columns over (G1 -> G2, G3)
+            dest = plate_index.neighbour(well, 0, x)
             p20.flow_rate.aspirate = 7.56
             p20.flow_rate.dispense = 7.56
             p20.aspirate(20, plate[well])
             p20.move_to(plate[well].bottom(16)) 
             protocol.delay(seconds=2) #equilibrate
             p20.touch_tip()
-            p20.dispense(20, plate[dest].bottom(2))
+            p20.dispense(20, dest.bottom(2))
             protocol.delay(seconds=1)
-            # p20.move_to(plate[dest].bottom(4))
-            p20.blow_out(plate[dest].bottom(6))
+            # p20.move_to(dest.bottom(4))
+            p20.blow_out(dest.bottom(6))
         p20.drop_tip()
         p300.drop_tip()
\ No newline at end of file
@@ -1,5 +1,11 @@
 # imports
+from functools import partial
 from opentrons import protocol_api
+from ottools.liquids import equilibrate
+from ottools.platemap import well_index
+from ottools.registry import use_custom_labware
+from ottools import heights
+from ottools.heights import tip_heights
 
 # metadata
 metadata = {
@@ -10,58 +16,7 @@ metadata = {
 }
 ##########################
 # functions
-# calculates ideal tip height for entering liquid
-def tip_heights(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    p0=0.029502064
-    p1=0.084625954
-    p2=-0.000174864
-    p3=2.18373E-07
-    p4=-1.30599E-10
-    p5=2.97839E-14
-    if init_vol > 1499:
-        offset = 14 # model out of range; see sheet
-    else:
-        offset = 7 #mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 8: # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 1        
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
-
-def tip_heightsEpp(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    p0=-0.272820744
-    p1=0.019767959
-    p2=2.00442E-06
-    p3=-8.99691E-09
-    p4=6.72776E-12
-    p5=-1.55428E-15
-    if init_vol > 2000:
-        offset = 12 # model out of range; see sheet
-    else:
-        offset = 11 #mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 8: # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 0        
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
+tip_heightsEpp = partial(heights.tip_heightsEpp, min_height=8, floor=0)
 
 # splits aspiration volume into equal parts 
 # returns list with equal volumes
@@ -80,6 +35,7 @@ def split_asp(tot, max_vol):
         return [tot/n]
 
 def run(protocol: protocol_api.ProtocolContext):
+    use_custom_labware(protocol)
 
     # LABWARE
     fuge_rack = protocol.load_labware('vwr_24_tuberack_1500ul', '1')
@@ -89,6 +45,7 @@ def run(protocol: protocol_api.ProtocolContext):
     tempdeck = protocol.load_module('tempdeck', '10')
     # plate = tempdeck.load_labware('amplifyt_96_aluminumblock_300ul')
     plate = tempdeck.load_labware('abi_96_wellplate_250ul')
+    plate_index = well_index(plate)
 
     # PIPETTES
     p300 = protocol.load_instrument(
@@ -180,9 +137,9 @@ def run(protocol: protocol_api.ProtocolContext):
     for i, tube in enumerate(std_mixes):
         # p300.well_bottom_clearance.aspirate = h #mm
         p300.aspirate(mmix_XFR_std_mix, MIX_master.bottom(mmix_h[i])) # 18 * 3 * 1.12-0.05= 54 + 6 =60ul
-        protocol.delay(seconds=2) #tip equilibrate
+        equilibrate(protocol, 'mastermix', 'aspirate') #tip equilibrate
         p300.move_to(MIX_master.bottom(35)) # excess tip fluid condense 
-        protocol.delay(seconds=3) #tip droplets slide
+        equilibrate(protocol, 'mastermix', 'withdraw') #tip droplets slide
         p300.touch_tip(v_offset=-2)
         p300.dispense(mmix_XFR_std_mix, tube.bottom(4))
         p300.blow_out(tube.bottom(8))
@@ -197,7 +154,7 @@ def run(protocol: protocol_api.ProtocolContext):
         p20.flow_rate.aspirate = 4
         p20.flow_rate.dispense = 4
         p20.aspirate(std_dna_XFR_to_std_int, std) #aspirate from std_1 into std_mix (intermediate tube) e.g. 6.42 ul
-        protocol.delay(seconds=2) #equilibrate
+        equilibrate(protocol, 'template', 'aspirate') #equilibrate
         p20.touch_tip()
         p20.dispense(std_dna_XFR_to_std_int, intTube)
         # p20.move_to(intTube.bottom(3))
@@ -207,7 +164,7 @@ def run(protocol: protocol_api.ProtocolContext):
         p20.blow_out()
         p300.move_to(intTube.bottom(40)) #prevent tip from crashing into tube cap
         p300.mix(7, 50, intTube.bottom(3))
-        protocol.delay(seconds=2)
+        equilibrate(protocol, 'reaction', 'mix')
         # p300.move_to(intTube.bottom(10)) #prevent air bubbles in mmix during blow out
         p300.blow_out(intTube.bottom(10))
         p20.move_to(intTube.bottom(40))
@@ -215,17 +172,12 @@ def run(protocol: protocol_api.ProtocolContext):
         p20.flow_rate.dispense = 4
         for x in range(0,3): # need int 1, 2, and 3
             p20.aspirate(20, intTube.bottom(2)) 
-            protocol.delay(seconds=2) #equilibrate
-            # find digits in well, G1 and G10 and puts into list
-            findNums = [int(i) for i in well.split()[0] if i.isdigit()]
-            # joins nums from list [1, 0] -> 10 type = string
-            colNum = ''.join(map(str, findNums))
-            # this finds row
-            row = well.split()[0][0]
-            dest = row+str(int(colNum)+x) # row + neighbor well i.e. 1, 2
-            p20.dispense(20, plate[dest].bottom(2))
-            protocol.delay(seconds=2)
-            p20.move_to(plate[dest].bottom(6))
+            equilibrate(protocol, 'reaction', 'aspirate') #equilibrate
+            # same row, x columns over (G1 -> G2, G3)
+            dest = plate_index.neighbour(well, 0, x)
+            p20.dispense(20, dest.bottom(2))
+            equilibrate(protocol, 'reaction', 'dispense')
+            p20.move_to(dest.bottom(6))
             p20.blow_out()
             # p20.touch_tip()
         p300.drop_tip()
@@ -242,9 +194,9 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.flow_rate.aspirate = 40 #default
             p300.flow_rate.dispense = 40 #default
             p300.aspirate(vol, MIX_master.bottom(samp_h[i]))
-            protocol.delay(seconds=2)
+            equilibrate(protocol, 'mastermix', 'aspirate')
             p300.dispense(vol, plate[well].bottom(4*j+5))
-            protocol.delay(seconds=1)
+            equilibrate(protocol, 'mastermix', 'dispense')
             p300.blow_out(plate[well].bottom(14))
             p300.touch_tip()
     p300.drop_tip()
@@ -261,7 +213,7 @@ def run(protocol: protocol_api.ProtocolContext):
         p300.flow_rate.dispense = 40
         p300.aspirate(samp_dna_XFR_to_wells, sample.bottom(2)) # sample vol may vary. Goto bottom.
         p300.move_to(sample.bottom(25)) # relieve pressure if tip at bottom
-        protocol.delay(seconds=2)
+        equilibrate(protocol, 'template', 'withdraw')
         p300.touch_tip()
         p300.dispense(samp_dna_XFR_to_wells, plate[well].bottom(3))
         p300.flow_rate.aspirate = 92.86 
@@ -271,27 +223,22 @@ def run(protocol: protocol_api.ProtocolContext):
         p300.flow_rate.dispense = 40
         p300.mix(1, 200, plate[well].bottom(3))
         p300.move_to(plate[well].bottom(14))
-        protocol.delay(seconds=2)
+        equilibrate(protocol, 'reaction', 'mix')
         p300.blow_out(plate[well].bottom(16))
         p300.touch_tip()
         for x in range(1,12): # need int 1, 2, and 12
-            # find digits in well, G1 and G10 and puts into list
-            findNums = [int(d) for d in well.split()[0] if d.isdigit()]
-            # joins nums from list [1, 0] -> 10 type = string
-            colNum = ''.join(map(str, findNums))
-            # this finds row
-            row = well.split()[0][0]
-            dest = row+str(int(colNum)+x) # row + neighbor well i.e. 1, 2
+            # same row, x columns over (G1 -> G2, G3)
+            dest = plate_index.neighbour(well, 0, x)
             p20.flow_rate.aspirate = 7.56
             p20.flow_rate.dispense = 7.56
             p20.aspirate(20, plate[well].bottom(2))
-            protocol.delay(seconds=2) #equilibrate
+            equilibrate(protocol, 'reaction', 'aspirate') #equilibrate
             p20.move_to(plate[well].bottom(16)) 
-            protocol.delay(seconds=2) #droplets coalescing
+            equilibrate(protocol, 'reaction', 'withdraw') #droplets coalescing
             p20.touch_tip()
-            p20.dispense(20, plate[dest].bottom(2))
-            protocol.delay(seconds=2)
-            # p20.move_to(plate[dest].bottom(4))
-            p20.blow_out(plate[dest].bottom(6))
+            p20.dispense(20, dest.bottom(2))
+            equilibrate(protocol, 'reaction', 'dispense')
+            # p20.move_to(dest.bottom(4))
+            p20.blow_out(dest.bottom(6))
         p20.drop_tip()
         p300.drop_tip()
\ No newline at end of file
@@ -1,5 +1,9 @@
 # imports
+from functools import partial
 from opentrons import protocol_api
+from ottools.multichannel import fill
+from ottools.registry import use_custom_labware
+from ottools import heights
 
 # metadata
 metadata = {
@@ -9,34 +13,15 @@ metadata = {
     'apiLevel': '2.11'
 }
 
+# True: mastermix is poured into a 12-well reservoir (slot 2, well A1) and a
+# p20 multi (left mount, tips in slot 6) fills the plate column by column
+MULTI_CHANNEL = False
+
 ##########################
-def tip_heightsEpp(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    p0=-0.272820744
-    p1=0.019767959
-    p2=2.00442E-06
-    p3=-8.99691E-09
-    p4=6.72776E-12
-    p5=-1.55428E-15
-    if init_vol > 2000:
-        offset = 12 # model out of range; see sheet
-    else:
-        offset = 11 #mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 3: # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 1      
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
+tip_heightsEpp = partial(heights.tip_heightsEpp, min_height=3)
 
 def run(protocol: protocol_api.ProtocolContext):
+    use_custom_labware(protocol)
 
     # LABWARE
     fuge_rack = protocol.load_labware('opentrons_24_tuberack_eppendorf_2ml_safelock_snapcap', '11')
@@ -47,11 +32,18 @@ def run(protocol: protocol_api.ProtocolContext):
     # stds_rack = sectempdeck.load_labware('opentrons_24_aluminumblock_generic_2ml_screwcap')
     ww_plate1 = protocol.load_labware('bioer_96_wellplate_2200ul', '1')
     ww_plate2 = protocol.load_labware('bioer_96_wellplate_2200ul', '5')
+    if MULTI_CHANNEL:
+        reservoir = protocol.load_labware('nest_12_reservoir_15ml', '2')
+        tiprack20_multi = protocol.load_labware('opentrons_96_filtertiprack_20ul', '6')
 
     # PIPETTES
     p20 = protocol.load_instrument(
         'p20_single_gen2', 'right', tip_racks=[tiprack20]
     )
+    if MULTI_CHANNEL:
+        p20_multi = protocol.load_instrument(
+            'p20_multi_gen2', 'left', tip_racks=[tiprack20_multi]
+        )
     
     # REAGENTS   
     LU_Mix = fuge_rack['A1'] # LU MasterMix
@@ -64,23 +56,27 @@ def run(protocol: protocol_api.ProtocolContext):
 
     # #### COMMANDS ######    
     # aspirate mmix to all wells in 96w plate; 15*96 = 1440ul*1.2=1728
-    h_list = tip_heightsEpp(1728, 96, 15)
-    well_num = 1
-    p20.pick_up_tip()
-    for row in rows: #8 rows
-        for col in range(1,13): #12 cols
-            dest = row+str(col)
-            print ("height is: ", h_list[well_num-1])
-            p20.aspirate(15, LU_Mix.bottom(h_list[well_num-1]), rate=0.75) #head vol for more accurate pipetting
-            protocol.delay(seconds=1) #equilibrate
-            p20.move_to(LU_Mix.bottom(38))
-            protocol.delay(seconds=1) #equilibrate
-            p20.touch_tip(v_offset=-3)
-            p20.dispense(15, pcr_plate[dest].bottom(1))
-            p20.blow_out(pcr_plate[dest].bottom(8))
-            p20.touch_tip()
-            well_num += 1
-    p20.drop_tip()
+    if MULTI_CHANNEL:
+        fill(15, reservoir['A1'], pcr_plate.wells(), multi=p20_multi, single=p20,
+             touch_tip=True, blow_out=True, blowout_location='destination well')
+    else:
+        h_list = tip_heightsEpp(1728, 96, 15)
+        well_num = 1
+        p20.pick_up_tip()
+        for row in rows: #8 rows
+            for col in range(1,13): #12 cols
+                dest = row+str(col)
+                print ("height is: ", h_list[well_num-1])
+                p20.aspirate(15, LU_Mix.bottom(h_list[well_num-1]), rate=0.75) #head vol for more accurate pipetting
+                protocol.delay(seconds=1) #equilibrate
+                p20.move_to(LU_Mix.bottom(38))
+                protocol.delay(seconds=1) #equilibrate
+                p20.touch_tip(v_offset=-3)
+                p20.dispense(15, pcr_plate[dest].bottom(1))
+                p20.blow_out(pcr_plate[dest].bottom(8))
+                p20.touch_tip()
+                well_num += 1
+        p20.drop_tip()
 
     tot_ww_plates = [ww_plate1]
     for x, ww_plate in enumerate(tot_ww_plates):
@@ -116,4 +112,3 @@ def run(protocol: protocol_api.ProtocolContext):
                 p20.drop_tip()
 
 
-
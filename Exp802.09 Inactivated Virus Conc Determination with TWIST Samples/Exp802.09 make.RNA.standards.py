@@ -1,5 +1,7 @@
 # imports
 from opentrons import protocol_api
+from ottools.dilution import serial_dilution
+from ottools.registry import use_custom_labware
 
 # metadata
 metadata = {
@@ -10,6 +12,7 @@ metadata = {
 }
 ##########################
 def run(protocol: protocol_api.ProtocolContext):
+    use_custom_labware(protocol)
 
     # LABWARE
     fuge_rack = protocol.load_labware('vwr_24_tuberack_1500ul', '1')
@@ -59,28 +62,5 @@ def run(protocol: protocol_api.ProtocolContext):
     # all_stds = [a_stds, b_stds, c_stds]
 
     #### COMMANDS ######
-    # Make std dilution series         
-    # for stds in all_stds:      
-    for i in range(len(stds)-1): 
-        p300.pick_up_tip()
-        p300.mix(2, 200, stds[i].bottom(4)) # mix low
-        p300.mix(2, 200, stds[i].bottom(8)) # mix mid
-        p300.mix(5, 200, stds[i].bottom(16)) #mix hi
-        p300.aspirate(125, stds[i].bottom(8))
-        p300.touch_tip()
-        p300.dispense(125, stds[i+1].bottom(8))
-        p300.blow_out(stds[i+1].bottom(16))# blow out just below the surface
-        p300.touch_tip()
-        p300.aspirate(125, stds[i].bottom(8))
-        p300.touch_tip()
-        p300.dispense(125, stds[i+1].bottom(8))
-        p300.blow_out(stds[i+1].bottom(16))# blow out just below the surface
-        p300.touch_tip()
-        p300.drop_tip()
-        if i==len(stds)-2: # last tube
-            p300.pick_up_tip()
-            p300.mix(2, 200, stds[i+1].bottom(4)) # mix low
-            p300.mix(2, 200, stds[i+1].bottom(8)) # mix mid
-            p300.mix(5, 200, stds[i+1].bottom(16)) #mix hi
-            p300.blow_out(stds[i+1].bottom(16))# blow out just below the surface
-            p300.drop_tip()
+    # Make std dilution series: 250ul (2x125ul) into 750ul water, each tube mixed 2 low, 2 mid, 5 high
+    serial_dilution(p300, stds, 250, 750, profile='low_mid_high')
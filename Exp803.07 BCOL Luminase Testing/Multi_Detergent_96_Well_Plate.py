@@ -1,6 +1,8 @@
 # imports
-from typing import Counter
 from opentrons import protocol_api
+from ottools.ledger import LiquidLedger
+from ottools.planner import plan_multi_dispense, execute
+from ottools.dilution import capacity
 
 # metadata
 metadata = {
@@ -10,82 +12,6 @@ metadata = {
     'apiLevel': '2.11'
 }
 ##########################
-# functions
-# calculates ideal tip height for entering liquid
-def tip_heights(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    p0=0.029502064
-    p1=0.084625954
-    p2=-0.000174864
-    p3=2.18373E-07
-    p4=-1.30599E-10
-    p5=2.97839E-14
-    if init_vol > 1500:
-        offset = 14 # model out of range; see sheet
-    else:
-        offset = 7 #mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 8: # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 1        
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
-# Calc heights for 2mL Eppendorf tubes
-def tip_heightsEpp(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    p0=-0.272820744
-    p1=0.019767959
-    p2=2.00442E-06
-    p3=-8.99691E-09
-    p4=6.72776E-12
-    p5=-1.55428E-15
-    if init_vol > 2000:
-        offset = 12 # model out of range; see sheet
-    else:
-        offset = 13 #mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 6: # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 1        
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
-# Calc heights for 50mL conical tubes
-def fifty_ml_heights(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    b = 0
-    m = 0.0024
-    if init_vol > 51000:
-        offset = 12  # model out of range; see sheet
-    else:
-        offset = 5  # mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = m*x+b
-        h = h-offset
-        if h < 12:  # If less than 5mL remain in 50mL tube, go to bottom for asp
-            h = 2
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
-
 def run(protocol: protocol_api.ProtocolContext):
 
     # LABWARE
@@ -126,50 +52,20 @@ def run(protocol: protocol_api.ProtocolContext):
 
 
     #### COMMANDS ######
-# Add lurb
-    count = 0
-    sample_count = 0
-    lurb_h = fifty_ml_heights(6500, 88, 80)
-    for col in cols[:3]:
-        p300.pick_up_tip()
-        for row in rows[:7]:
-            dest = row + str(col)
-            p300.aspirate(lurb_vol[count], lurb.bottom(lurb_h[sample_count]))
-            p300.touch_tip()
-            p300.dispense(lurb_vol[count], plate[dest].bottom())
-            sample_count += 1
-        p300.drop_tip()
-    count += 1
-    for col in cols[3:6]:
-        p300.pick_up_tip()
-        for row in rows[:7]:
-            dest = row + str(col)
-            p300.aspirate(lurb_vol[count], lurb.bottom(lurb_h[sample_count]))
-            p300.touch_tip()
-            p300.dispense(lurb_vol[count], plate[dest].bottom())
-            sample_count += 1
-        p300.drop_tip()
-    count += 1
-    for col in cols[6:9]:
-        p300.pick_up_tip()
-        for row in rows[:7]:
-            dest = row + str(col)
-            p300.aspirate(lurb_vol[count], lurb.bottom(lurb_h[sample_count]))
-            p300.touch_tip()
-            p300.dispense(lurb_vol[count], plate[dest].bottom())
-            sample_count += 1
-        p300.drop_tip()
-    count += 1
-    for col in cols[9:]:
-        p300.pick_up_tip()
-        for row in rows[:7]:
-            dest = row + str(col)
-            p300.aspirate(lurb_vol[count], lurb.bottom(lurb_h[sample_count]))
-            p300.touch_tip()
-            p300.dispense(lurb_vol[count], plate[dest].bottom())
-            sample_count += 1
-        p300.drop_tip()
-    count += 1
+# Add lurb: one tip per column, each trip fills as many wells as the tip holds
+# (capacity: the 200 ul filter tips, not the p300's 300 ul max_volume)
+    ledger = LiquidLedger()
+    ledger.fill(lurb, 6500, offset=5, full_offset=12, min_height=12)
+    ledger.track(p300)
+    lurb_bolus = 10 # returned to the lurb tube after every trip
+    lurb_blocks = [cols[:3], cols[3:6], cols[6:9], cols[9:]]
+    for vol, block in zip(lurb_vol, lurb_blocks):
+        for col in block:
+            dests = [plate[row + str(col)].bottom() for row in rows[:7]]
+            plan = plan_multi_dispense([vol] * len(dests), capacity(p300), disposal=lurb_bolus)
+            p300.pick_up_tip()
+            execute(p300, lurb, dests, plan, touch_tip=True)
+            p300.drop_tip()
 
     # # add UL7
     # detergent_count = 0 
@@ -254,7 +150,7 @@ def run(protocol: protocol_api.ProtocolContext):
     
     # #add ATP/e.coli 
     # p300.pick_up_tip()
-    # dATP_h=tip_heightsEpp(1584, 8, 180) # decrement by rows for multiasp and disp
+    # dATP_h=tip_heightsEpp(1584, 8, 180, offset=13) # decrement by rows for multiasp and disp
     # dATP_counter = 0
     # dATP_bolus = 5
     # for row in rows: # process 8 rows
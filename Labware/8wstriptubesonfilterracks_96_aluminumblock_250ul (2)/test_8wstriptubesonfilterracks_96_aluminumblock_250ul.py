@@ -1,5 +1,5 @@
-import json
 from opentrons import protocol_api, types
+from ottools.registry import definition
 
 CALIBRATION_CROSS_COORDS = {
     '1': {
@@ -30,8 +30,7 @@ PIPETTE_NAME = 'p20_single_gen2'
 TIPRACK_SLOT = '5'
 TIPRACK_LOADNAME = 'opentrons_96_tiprack_20ul'
 
-LABWARE_DEF_JSON = """{"ordering":[["A1","B1","C1","D1","E1","F1","G1","H1"],["A2","B2","C2","D2","E2","F2","G2","H2"],["A3","B3","C3","D3","E3","F3","G3","H3"],["A4","B4","C4","D4","E4","F4","G4","H4"],["A5","B5","C5","D5","E5","F5","G5","H5"],["A6","B6","C6","D6","E6","F6","G6","H6"],["A7","B7","C7","D7","E7","F7","G7","H7"],["A8","B8","C8","D8","E8","F8","G8","H8"],["A9","B9","C9","D9","E9","F9","G9","H9"],["A10","B10","C10","D10","E10","F10","G10","H10"],["A11","B11","C11","D11","E11","F11","G11","H11"],["A12","B12","C12","D12","E12","F12","G12","H12"]],"brand":{"brand":"8w_strip_tubes_on_filter_racks","brandId":["custom_HK"]},"metadata":{"displayName":"8w_strip_tubes_on_filter_racks 96 Aluminum Block 250 µL","displayCategory":"aluminumBlock","displayVolumeUnits":"µL","tags":[]},"dimensions":{"xDimension":127.75,"yDimension":85.5,"zDimension":62.49},"wells":{"A1":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":14.38,"y":74.25,"z":42.19},"B1":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":14.38,"y":65.25,"z":42.19},"C1":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":14.38,"y":56.25,"z":42.19},"D1":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":14.38,"y":47.25,"z":42.19},"E1":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":14.38,"y":38.25,"z":42.19},"F1":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":14.38,"y":29.25,"z":42.19},"G1":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":14.38,"y":20.25,"z":42.19},"H1":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":14.38,"y":11.25,"z":42.19},"A2":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":23.38,"y":74.25,"z":42.19},"B2":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":23.38,"y":65.25,"z":42.19},"C2":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":23.38,"y":56.25,"z":42.19},"D2":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":23.38,"y":47.25,"z":42.19},"E2":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":23.38,"y":38.25,"z":42.19},"F2":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":23.38,"y":29.25,"z":42.19},"G2":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":23.38,"y":20.25,"z":42.19},"H2":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":23.38,"y":11.25,"z":42.19},"A3":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":32.38,"y":74.25,"z":42.19},"B3":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":32.38,"y":65.25,"z":42.19},"C3":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":32.38,"y":56.25,"z":42.19},"D3":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":32.38,"y":47.25,"z":42.19},"E3":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":32.38,"y":38.25,"z":42.19},"F3":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":32.38,"y":29.25,"z":42.19},"G3":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":32.38,"y":20.25,"z":42.19},"H3":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":32.38,"y":11.25,"z":42.19},"A4":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":41.38,"y":74.25,"z":42.19},"B4":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":41.38,"y":65.25,"z":42.19},"C4":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":41.38,"y":56.25,"z":42.19},"D4":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":41.38,"y":47.25,"z":42.19},"E4":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":41.38,"y":38.25,"z":42.19},"F4":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":41.38,"y":29.25,"z":42.19},"G4":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":41.38,"y":20.25,"z":42.19},"H4":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":41.38,"y":11.25,"z":42.19},"A5":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":50.38,"y":74.25,"z":42.19},"B5":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":50.38,"y":65.25,"z":42.19},"C5":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":50.38,"y":56.25,"z":42.19},"D5":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":50.38,"y":47.25,"z":42.19},"E5":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":50.38,"y":38.25,"z":42.19},"F5":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":50.38,"y":29.25,"z":42.19},"G5":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":50.38,"y":20.25,"z":42.19},"H5":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":50.38,"y":11.25,"z":42.19},"A6":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":59.38,"y":74.25,"z":42.19},"B6":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":59.38,"y":65.25,"z":42.19},"C6":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":59.38,"y":56.25,"z":42.19},"D6":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":59.38,"y":47.25,"z":42.19},"E6":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":59.38,"y":38.25,"z":42.19},"F6":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":59.38,"y":29.25,"z":42.19},"G6":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":59.38,"y":20.25,"z":42.19},"H6":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":59.38,"y":11.25,"z":42.19},"A7":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":68.38,"y":74.25,"z":42.19},"B7":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":68.38,"y":65.25,"z":42.19},"C7":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":68.38,"y":56.25,"z":42.19},"D7":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":68.38,"y":47.25,"z":42.19},"E7":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":68.38,"y":38.25,"z":42.19},"F7":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":68.38,"y":29.25,"z":42.19},"G7":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":68.38,"y":20.25,"z":42.19},"H7":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":68.38,"y":11.25,"z":42.19},"A8":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":77.38,"y":74.25,"z":42.19},"B8":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":77.38,"y":65.25,"z":42.19},"C8":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":77.38,"y":56.25,"z":42.19},"D8":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":77.38,"y":47.25,"z":42.19},"E8":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":77.38,"y":38.25,"z":42.19},"F8":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":77.38,"y":29.25,"z":42.19},"G8":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":77.38,"y":20.25,"z":42.19},"H8":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":77.38,"y":11.25,"z":42.19},"A9":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":86.38,"y":74.25,"z":42.19},"B9":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":86.38,"y":65.25,"z":42.19},"C9":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":86.38,"y":56.25,"z":42.19},"D9":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":86.38,"y":47.25,"z":42.19},"E9":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":86.38,"y":38.25,"z":42.19},"F9":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":86.38,"y":29.25,"z":42.19},"G9":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":86.38,"y":20.25,"z":42.19},"H9":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":86.38,"y":11.25,"z":42.19},"A10":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":95.38,"y":74.25,"z":42.19},"B10":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":95.38,"y":65.25,"z":42.19},"C10":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":95.38,"y":56.25,"z":42.19},"D10":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":95.38,"y":47.25,"z":42.19},"E10":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":95.38,"y":38.25,"z":42.19},"F10":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":95.38,"y":29.25,"z":42.19},"G10":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":95.38,"y":20.25,"z":42.19},"H10":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":95.38,"y":11.25,"z":42.19},"A11":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":104.38,"y":74.25,"z":42.19},"B11":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":104.38,"y":65.25,"z":42.19},"C11":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":104.38,"y":56.25,"z":42.19},"D11":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":104.38,"y":47.25,"z":42.19},"E11":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":104.38,"y":38.25,"z":42.19},"F11":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":104.38,"y":29.25,"z":42.19},"G11":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":104.38,"y":20.25,"z":42.19},"H11":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":104.38,"y":11.25,"z":42.19},"A12":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":113.38,"y":74.25,"z":42.19},"B12":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":113.38,"y":65.25,"z":42.19},"C12":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":113.38,"y":56.25,"z":42.19},"D12":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":113.38,"y":47.25,"z":42.19},"E12":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":113.38,"y":38.25,"z":42.19},"F12":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":113.38,"y":29.25,"z":42.19},"G12":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":113.38,"y":20.25,"z":42.19},"H12":{"depth":20.3,"totalLiquidVolume":250,"shape":"circular","diameter":5.46,"x":113.38,"y":11.25,"z":42.19}},"groups":[{"metadata":{"wellBottomShape":"v","displayCategory":"tubeRack"},"wells":["A1","B1","C1","D1","E1","F1","G1","H1","A2","B2","C2","D2","E2","F2","G2","H2","A3","B3","C3","D3","E3","F3","G3","H3","A4","B4","C4","D4","E4","F4","G4","H4","A5","B5","C5","D5","E5","F5","G5","H5","A6","B6","C6","D6","E6","F6","G6","H6","A7","B7","C7","D7","E7","F7","G7","H7","A8","B8","C8","D8","E8","F8","G8","H8","A9","B9","C9","D9","E9","F9","G9","H9","A10","B10","C10","D10","E10","F10","G10","H10","A11","B11","C11","D11","E11","F11","G11","H11","A12","B12","C12","D12","E12","F12","G12","H12"]}],"parameters":{"format":"irregular","quirks":[],"isTiprack":false,"isMagneticModuleCompatible":false,"loadName":"8wstriptubesonfilterracks_96_aluminumblock_250ul"},"namespace":"custom_beta","version":1,"schemaVersion":2,"cornerOffsetFromSlot":{"x":0,"y":0,"z":0}}"""
-LABWARE_DEF = json.loads(LABWARE_DEF_JSON)
+LABWARE_DEF = definition('8wstriptubesonfilterracks_96_aluminumblock_250ul')
 LABWARE_LABEL = LABWARE_DEF.get('metadata', {}).get(
     'displayName', 'test labware')
 
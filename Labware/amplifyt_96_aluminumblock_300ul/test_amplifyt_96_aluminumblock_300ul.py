@@ -1,5 +1,5 @@
-import json
 from opentrons import protocol_api, types
+from ottools.registry import definition
 
 CALIBRATION_CROSS_COORDS = {
     '1': {
@@ -30,8 +30,7 @@ PIPETTE_NAME = 'p20_single_gen2'
 TIPRACK_SLOT = '5'
 TIPRACK_LOADNAME = 'opentrons_96_tiprack_20ul'
 
-LABWARE_DEF_JSON = """{"ordering":[["A1","B1","C1","D1","E1","F1","G1","H1"],["A2","B2","C2","D2","E2","F2","G2","H2"],["A3","B3","C3","D3","E3","F3","G3","H3"],["A4","B4","C4","D4","E4","F4","G4","H4"],["A5","B5","C5","D5","E5","F5","G5","H5"],["A6","B6","C6","D6","E6","F6","G6","H6"],["A7","B7","C7","D7","E7","F7","G7","H7"],["A8","B8","C8","D8","E8","F8","G8","H8"],["A9","B9","C9","D9","E9","F9","G9","H9"],["A10","B10","C10","D10","E10","F10","G10","H10"],["A11","B11","C11","D11","E11","F11","G11","H11"],["A12","B12","C12","D12","E12","F12","G12","H12"]],"brand":{"brand":"amplifyt","brandId":["1149K03"]},"metadata":{"displayName":"Amplifyt 96 Aluminum Block 300 µL","displayCategory":"aluminumBlock","displayVolumeUnits":"µL","tags":[]},"dimensions":{"xDimension":127.75,"yDimension":85.5,"zDimension":27.2},"wells":{"A1":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":14.38,"y":74.25,"z":6.4},"B1":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":14.38,"y":65.25,"z":6.4},"C1":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":14.38,"y":56.25,"z":6.4},"D1":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":14.38,"y":47.25,"z":6.4},"E1":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":14.38,"y":38.25,"z":6.4},"F1":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":14.38,"y":29.25,"z":6.4},"G1":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":14.38,"y":20.25,"z":6.4},"H1":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":14.38,"y":11.25,"z":6.4},"A2":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":23.38,"y":74.25,"z":6.4},"B2":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":23.38,"y":65.25,"z":6.4},"C2":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":23.38,"y":56.25,"z":6.4},"D2":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":23.38,"y":47.25,"z":6.4},"E2":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":23.38,"y":38.25,"z":6.4},"F2":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":23.38,"y":29.25,"z":6.4},"G2":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":23.38,"y":20.25,"z":6.4},"H2":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":23.38,"y":11.25,"z":6.4},"A3":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":32.38,"y":74.25,"z":6.4},"B3":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":32.38,"y":65.25,"z":6.4},"C3":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":32.38,"y":56.25,"z":6.4},"D3":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":32.38,"y":47.25,"z":6.4},"E3":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":32.38,"y":38.25,"z":6.4},"F3":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":32.38,"y":29.25,"z":6.4},"G3":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":32.38,"y":20.25,"z":6.4},"H3":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":32.38,"y":11.25,"z":6.4},"A4":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":41.38,"y":74.25,"z":6.4},"B4":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":41.38,"y":65.25,"z":6.4},"C4":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":41.38,"y":56.25,"z":6.4},"D4":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":41.38,"y":47.25,"z":6.4},"E4":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":41.38,"y":38.25,"z":6.4},"F4":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":41.38,"y":29.25,"z":6.4},"G4":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":41.38,"y":20.25,"z":6.4},"H4":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":41.38,"y":11.25,"z":6.4},"A5":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":50.38,"y":74.25,"z":6.4},"B5":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":50.38,"y":65.25,"z":6.4},"C5":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":50.38,"y":56.25,"z":6.4},"D5":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":50.38,"y":47.25,"z":6.4},"E5":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":50.38,"y":38.25,"z":6.4},"F5":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":50.38,"y":29.25,"z":6.4},"G5":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":50.38,"y":20.25,"z":6.4},"H5":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":50.38,"y":11.25,"z":6.4},"A6":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":59.38,"y":74.25,"z":6.4},"B6":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":59.38,"y":65.25,"z":6.4},"C6":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":59.38,"y":56.25,"z":6.4},"D6":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":59.38,"y":47.25,"z":6.4},"E6":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":59.38,"y":38.25,"z":6.4},"F6":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":59.38,"y":29.25,"z":6.4},"G6":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":59.38,"y":20.25,"z":6.4},"H6":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":59.38,"y":11.25,"z":6.4},"A7":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":68.38,"y":74.25,"z":6.4},"B7":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":68.38,"y":65.25,"z":6.4},"C7":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":68.38,"y":56.25,"z":6.4},"D7":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":68.38,"y":47.25,"z":6.4},"E7":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":68.38,"y":38.25,"z":6.4},"F7":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":68.38,"y":29.25,"z":6.4},"G7":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":68.38,"y":20.25,"z":6.4},"H7":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":68.38,"y":11.25,"z":6.4},"A8":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":77.38,"y":74.25,"z":6.4},"B8":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":77.38,"y":65.25,"z":6.4},"C8":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":77.38,"y":56.25,"z":6.4},"D8":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":77.38,"y":47.25,"z":6.4},"E8":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":77.38,"y":38.25,"z":6.4},"F8":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":77.38,"y":29.25,"z":6.4},"G8":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":77.38,"y":20.25,"z":6.4},"H8":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":77.38,"y":11.25,"z":6.4},"A9":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":86.38,"y":74.25,"z":6.4},"B9":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":86.38,"y":65.25,"z":6.4},"C9":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":86.38,"y":56.25,"z":6.4},"D9":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":86.38,"y":47.25,"z":6.4},"E9":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":86.38,"y":38.25,"z":6.4},"F9":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":86.38,"y":29.25,"z":6.4},"G9":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":86.38,"y":20.25,"z":6.4},"H9":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":86.38,"y":11.25,"z":6.4},"A10":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":95.38,"y":74.25,"z":6.4},"B10":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":95.38,"y":65.25,"z":6.4},"C10":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":95.38,"y":56.25,"z":6.4},"D10":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":95.38,"y":47.25,"z":6.4},"E10":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":95.38,"y":38.25,"z":6.4},"F10":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":95.38,"y":29.25,"z":6.4},"G10":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":95.38,"y":20.25,"z":6.4},"H10":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":95.38,"y":11.25,"z":6.4},"A11":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":104.38,"y":74.25,"z":6.4},"B11":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":104.38,"y":65.25,"z":6.4},"C11":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":104.38,"y":56.25,"z":6.4},"D11":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":104.38,"y":47.25,"z":6.4},"E11":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":104.38,"y":38.25,"z":6.4},"F11":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":104.38,"y":29.25,"z":6.4},"G11":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":104.38,"y":20.25,"z":6.4},"H11":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":104.38,"y":11.25,"z":6.4},"A12":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":113.38,"y":74.25,"z":6.4},"B12":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":113.38,"y":65.25,"z":6.4},"C12":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":113.38,"y":56.25,"z":6.4},"D12":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":113.38,"y":47.25,"z":6.4},"E12":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":113.38,"y":38.25,"z":6.4},"F12":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":113.38,"y":29.25,"z":6.4},"G12":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":113.38,"y":20.25,"z":6.4},"H12":{"depth":20.8,"totalLiquidVolume":300,"shape":"circular","diameter":5.5,"x":113.38,"y":11.25,"z":6.4}},"groups":[{"metadata":{"wellBottomShape":"v","displayCategory":"wellPlate"},"wells":["A1","B1","C1","D1","E1","F1","G1","H1","A2","B2","C2","D2","E2","F2","G2","H2","A3","B3","C3","D3","E3","F3","G3","H3","A4","B4","C4","D4","E4","F4","G4","H4","A5","B5","C5","D5","E5","F5","G5","H5","A6","B6","C6","D6","E6","F6","G6","H6","A7","B7","C7","D7","E7","F7","G7","H7","A8","B8","C8","D8","E8","F8","G8","H8","A9","B9","C9","D9","E9","F9","G9","H9","A10","B10","C10","D10","E10","F10","G10","H10","A11","B11","C11","D11","E11","F11","G11","H11","A12","B12","C12","D12","E12","F12","G12","H12"]}],"parameters":{"format":"irregular","quirks":[],"isTiprack":false,"isMagneticModuleCompatible":false,"loadName":"amplifyt_96_aluminumblock_300ul"},"namespace":"custom_beta","version":1,"schemaVersion":2,"cornerOffsetFromSlot":{"x":0,"y":0,"z":0}}"""
-LABWARE_DEF = json.loads(LABWARE_DEF_JSON)
+LABWARE_DEF = definition('amplifyt_96_aluminumblock_300ul')
 LABWARE_LABEL = LABWARE_DEF.get('metadata', {}).get(
     'displayName', 'test labware')
 
@@ -1,5 +1,5 @@
-import json
 from opentrons import protocol_api, types
+from ottools.registry import definition
 
 
 TEST_LABWARE_SLOT = '5'
@@ -11,8 +11,7 @@ PIPETTE_NAME = 'p20_single_gen2'
 
 TIPRACK_SLOT = '11'
 TIPRACK_LOADNAME = 'opentrons_96_tiprack_20ul'
-LABWARE_DEF_JSON = """{"ordering":[["A1","B1","C1","D1","E1","F1","G1","H1"],["A2","B2","C2","D2","E2","F2","G2","H2"],["A3","B3","C3","D3","E3","F3","G3","H3"],["A4","B4","C4","D4","E4","F4","G4","H4"],["A5","B5","C5","D5","E5","F5","G5","H5"],["A6","B6","C6","D6","E6","F6","G6","H6"],["A7","B7","C7","D7","E7","F7","G7","H7"],["A8","B8","C8","D8","E8","F8","G8","H8"],["A9","B9","C9","D9","E9","F9","G9","H9"],["A10","B10","C10","D10","E10","F10","G10","H10"],["A11","B11","C11","D11","E11","F11","G11","H11"],["A12","B12","C12","D12","E12","F12","G12","H12"]],"brand":{"brand":"bioer","brandId":["BSH06M1"]},"metadata":{"displayName":"Bioer 96 Well Plate 2200 µL","displayCategory":"wellPlate","displayVolumeUnits":"µL","tags":[]},"dimensions":{"xDimension":127.76,"yDimension":85.3,"zDimension":44.2},"wells":{"A1":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":13.8,"y":76.3,"z":1.9},"B1":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":13.8,"y":67.3,"z":1.9},"C1":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":13.8,"y":58.3,"z":1.9},"D1":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":13.8,"y":49.3,"z":1.9},"E1":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":13.8,"y":40.3,"z":1.9},"F1":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":13.8,"y":31.3,"z":1.9},"G1":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":13.8,"y":22.3,"z":1.9},"H1":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":13.8,"y":13.3,"z":1.9},"A2":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":22.8,"y":76.3,"z":1.9},"B2":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":22.8,"y":67.3,"z":1.9},"C2":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":22.8,"y":58.3,"z":1.9},"D2":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":22.8,"y":49.3,"z":1.9},"E2":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":22.8,"y":40.3,"z":1.9},"F2":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":22.8,"y":31.3,"z":1.9},"G2":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":22.8,"y":22.3,"z":1.9},"H2":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":22.8,"y":13.3,"z":1.9},"A3":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":31.8,"y":76.3,"z":1.9},"B3":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":31.8,"y":67.3,"z":1.9},"C3":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":31.8,"y":58.3,"z":1.9},"D3":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":31.8,"y":49.3,"z":1.9},"E3":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":31.8,"y":40.3,"z":1.9},"F3":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":31.8,"y":31.3,"z":1.9},"G3":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":31.8,"y":22.3,"z":1.9},"H3":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":31.8,"y":13.3,"z":1.9},"A4":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":40.8,"y":76.3,"z":1.9},"B4":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":40.8,"y":67.3,"z":1.9},"C4":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":40.8,"y":58.3,"z":1.9},"D4":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":40.8,"y":49.3,"z":1.9},"E4":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":40.8,"y":40.3,"z":1.9},"F4":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":40.8,"y":31.3,"z":1.9},"G4":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":40.8,"y":22.3,"z":1.9},"H4":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":40.8,"y":13.3,"z":1.9},"A5":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":49.8,"y":76.3,"z":1.9},"B5":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":49.8,"y":67.3,"z":1.9},"C5":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":49.8,"y":58.3,"z":1.9},"D5":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":49.8,"y":49.3,"z":1.9},"E5":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":49.8,"y":40.3,"z":1.9},"F5":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":49.8,"y":31.3,"z":1.9},"G5":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":49.8,"y":22.3,"z":1.9},"H5":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":49.8,"y":13.3,"z":1.9},"A6":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":58.8,"y":76.3,"z":1.9},"B6":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":58.8,"y":67.3,"z":1.9},"C6":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":58.8,"y":58.3,"z":1.9},"D6":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":58.8,"y":49.3,"z":1.9},"E6":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":58.8,"y":40.3,"z":1.9},"F6":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":58.8,"y":31.3,"z":1.9},"G6":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":58.8,"y":22.3,"z":1.9},"H6":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":58.8,"y":13.3,"z":1.9},"A7":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":67.8,"y":76.3,"z":1.9},"B7":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":67.8,"y":67.3,"z":1.9},"C7":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":67.8,"y":58.3,"z":1.9},"D7":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":67.8,"y":49.3,"z":1.9},"E7":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":67.8,"y":40.3,"z":1.9},"F7":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":67.8,"y":31.3,"z":1.9},"G7":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":67.8,"y":22.3,"z":1.9},"H7":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":67.8,"y":13.3,"z":1.9},"A8":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":76.8,"y":76.3,"z":1.9},"B8":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":76.8,"y":67.3,"z":1.9},"C8":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":76.8,"y":58.3,"z":1.9},"D8":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":76.8,"y":49.3,"z":1.9},"E8":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":76.8,"y":40.3,"z":1.9},"F8":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":76.8,"y":31.3,"z":1.9},"G8":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":76.8,"y":22.3,"z":1.9},"H8":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":76.8,"y":13.3,"z":1.9},"A9":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":85.8,"y":76.3,"z":1.9},"B9":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":85.8,"y":67.3,"z":1.9},"C9":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":85.8,"y":58.3,"z":1.9},"D9":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":85.8,"y":49.3,"z":1.9},"E9":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":85.8,"y":40.3,"z":1.9},"F9":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":85.8,"y":31.3,"z":1.9},"G9":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":85.8,"y":22.3,"z":1.9},"H9":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":85.8,"y":13.3,"z":1.9},"A10":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":94.8,"y":76.3,"z":1.9},"B10":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":94.8,"y":67.3,"z":1.9},"C10":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":94.8,"y":58.3,"z":1.9},"D10":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":94.8,"y":49.3,"z":1.9},"E10":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":94.8,"y":40.3,"z":1.9},"F10":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":94.8,"y":31.3,"z":1.9},"G10":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":94.8,"y":22.3,"z":1.9},"H10":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":94.8,"y":13.3,"z":1.9},"A11":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":103.8,"y":76.3,"z":1.9},"B11":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":103.8,"y":67.3,"z":1.9},"C11":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":103.8,"y":58.3,"z":1.9},"D11":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":103.8,"y":49.3,"z":1.9},"E11":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":103.8,"y":40.3,"z":1.9},"F11":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":103.8,"y":31.3,"z":1.9},"G11":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":103.8,"y":22.3,"z":1.9},"H11":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":103.8,"y":13.3,"z":1.9},"A12":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":112.8,"y":76.3,"z":1.9},"B12":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":112.8,"y":67.3,"z":1.9},"C12":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":112.8,"y":58.3,"z":1.9},"D12":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":112.8,"y":49.3,"z":1.9},"E12":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":112.8,"y":40.3,"z":1.9},"F12":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":112.8,"y":31.3,"z":1.9},"G12":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":112.8,"y":22.3,"z":1.9},"H12":{"depth":42.3,"totalLiquidVolume":2200,"shape":"rectangular","xDimension":8.2,"yDimension":8.2,"x":112.8,"y":13.3,"z":1.9}},"groups":[{"metadata":{"wellBottomShape":"v"},"wells":["A1","B1","C1","D1","E1","F1","G1","H1","A2","B2","C2","D2","E2","F2","G2","H2","A3","B3","C3","D3","E3","F3","G3","H3","A4","B4","C4","D4","E4","F4","G4","H4","A5","B5","C5","D5","E5","F5","G5","H5","A6","B6","C6","D6","E6","F6","G6","H6","A7","B7","C7","D7","E7","F7","G7","H7","A8","B8","C8","D8","E8","F8","G8","H8","A9","B9","C9","D9","E9","F9","G9","H9","A10","B10","C10","D10","E10","F10","G10","H10","A11","B11","C11","D11","E11","F11","G11","H11","A12","B12","C12","D12","E12","F12","G12","H12"]}],"parameters":{"format":"irregular","quirks":[],"isTiprack":false,"isMagneticModuleCompatible":false,"loadName":"bioer_96_wellplate_2200ul"},"namespace":"custom_beta","version":1,"schemaVersion":2,"cornerOffsetFromSlot":{"x":0,"y":0,"z":0}}"""
-LABWARE_DEF = json.loads(LABWARE_DEF_JSON)
+LABWARE_DEF = definition('bioer_96_wellplate_2200ul')
 LABWARE_LABEL = LABWARE_DEF.get('metadata', {}).get(
     'displayName', 'test labware')
 LABWARE_DIMENSIONS = LABWARE_DEF.get('wells', {}).get('A1', {}).get('yDimension')
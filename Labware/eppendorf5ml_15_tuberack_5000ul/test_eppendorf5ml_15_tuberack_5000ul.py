@@ -1,5 +1,5 @@
-import json
 from opentrons import protocol_api, types
+from ottools.registry import definition
 
 CALIBRATION_CROSS_COORDS = {
     '1': {
@@ -30,8 +30,7 @@ PIPETTE_NAME = 'p20_single_gen2'
 TIPRACK_SLOT = '5'
 TIPRACK_LOADNAME = 'opentrons_96_tiprack_20ul'
 
-LABWARE_DEF_JSON = """{"ordering":[["A1","B1","C1"],["A2","B2","C2"],["A3","B3","C3"],["A4","B4","C4"],["A5","B5","C5"]],"brand":{"brand":"Eppendorf_5mL_","brandId":["0030 122.321"]},"metadata":{"displayName":"Eppendorf_5mL_ 15 Tube Rack 5000 µL","displayCategory":"tubeRack","displayVolumeUnits":"µL","tags":[]},"dimensions":{"xDimension":127.76,"yDimension":85.48,"zDimension":90},"wells":{"A1":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":13.88,"y":67.74,"z":24.1},"B1":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":13.88,"y":42.74,"z":24.1},"C1":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":13.88,"y":17.74,"z":24.1},"A2":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":38.88,"y":67.74,"z":24.1},"B2":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":38.88,"y":42.74,"z":24.1},"C2":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":38.88,"y":17.74,"z":24.1},"A3":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":63.88,"y":67.74,"z":24.1},"B3":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":63.88,"y":42.74,"z":24.1},"C3":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":63.88,"y":17.74,"z":24.1},"A4":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":88.88,"y":67.74,"z":24.1},"B4":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":88.88,"y":42.74,"z":24.1},"C4":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":88.88,"y":17.74,"z":24.1},"A5":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":113.88,"y":67.74,"z":24.1},"B5":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":113.88,"y":42.74,"z":24.1},"C5":{"depth":65.9,"totalLiquidVolume":5000,"shape":"circular","diameter":15.2,"x":113.88,"y":17.74,"z":24.1}},"groups":[{"metadata":{"wellBottomShape":"v","displayCategory":"tubeRack"},"wells":["A1","B1","C1","A2","B2","C2","A3","B3","C3","A4","B4","C4","A5","B5","C5"]}],"parameters":{"format":"irregular","quirks":[],"isTiprack":false,"isMagneticModuleCompatible":false,"loadName":"eppendorf5ml_15_tuberack_5000ul"},"namespace":"custom_beta","version":1,"schemaVersion":2,"cornerOffsetFromSlot":{"x":0,"y":0,"z":0}}"""
-LABWARE_DEF = json.loads(LABWARE_DEF_JSON)
+LABWARE_DEF = definition('eppendorf5ml_15_tuberack_5000ul')
 LABWARE_LABEL = LABWARE_DEF.get('metadata', {}).get(
     'displayName', 'test labware')
 
@@ -1,5 +1,5 @@
-import json
 from opentrons import protocol_api, types
+from ottools.registry import definition
 
 CALIBRATION_CROSS_COORDS = {
     '1': {
@@ -30,8 +30,7 @@ PIPETTE_NAME = 'p20_single_gen2'
 TIPRACK_SLOT = '5'
 TIPRACK_LOADNAME = 'opentrons_96_tiprack_20ul'
 
-LABWARE_DEF_JSON = """{"ordering":[["A1","B1","C1","D1"],["A2","B2","C2","D2"],["A3","B3","C3","D3"],["A4","B4","C4","D4"],["A5","B5","C5","D5"],["A6","B6","C6","D6"]],"brand":{"brand":"Eppendorf","brandId":["1231A77"]},"metadata":{"displayName":"Eppendorf 24 Tube Rack 2000 µL","displayCategory":"tubeRack","displayVolumeUnits":"µL","tags":[]},"dimensions":{"xDimension":127.75,"yDimension":85.5,"zDimension":79.2},"wells":{"A1":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":18.21,"y":75.43,"z":41.2},"B1":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":18.21,"y":56.15,"z":41.2},"C1":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":18.21,"y":36.87,"z":41.2},"D1":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":18.21,"y":17.59,"z":41.2},"A2":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":38.1,"y":75.43,"z":41.2},"B2":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":38.1,"y":56.15,"z":41.2},"C2":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":38.1,"y":36.87,"z":41.2},"D2":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":38.1,"y":17.59,"z":41.2},"A3":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":57.99,"y":75.43,"z":41.2},"B3":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":57.99,"y":56.15,"z":41.2},"C3":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":57.99,"y":36.87,"z":41.2},"D3":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":57.99,"y":17.59,"z":41.2},"A4":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":77.88,"y":75.43,"z":41.2},"B4":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":77.88,"y":56.15,"z":41.2},"C4":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":77.88,"y":36.87,"z":41.2},"D4":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":77.88,"y":17.59,"z":41.2},"A5":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":97.77,"y":75.43,"z":41.2},"B5":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":97.77,"y":56.15,"z":41.2},"C5":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":97.77,"y":36.87,"z":41.2},"D5":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":97.77,"y":17.59,"z":41.2},"A6":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":117.66,"y":75.43,"z":41.2},"B6":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":117.66,"y":56.15,"z":41.2},"C6":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":117.66,"y":36.87,"z":41.2},"D6":{"depth":38,"totalLiquidVolume":2000,"shape":"circular","diameter":8.8,"x":117.66,"y":17.59,"z":41.2}},"groups":[{"metadata":{"wellBottomShape":"v","displayCategory":"tubeRack"},"wells":["A1","B1","C1","D1","A2","B2","C2","D2","A3","B3","C3","D3","A4","B4","C4","D4","A5","B5","C5","D5","A6","B6","C6","D6"]}],"parameters":{"format":"irregular","quirks":[],"isTiprack":false,"isMagneticModuleCompatible":false,"loadName":"eppendorf_24_tuberack_2000ul"},"namespace":"custom_beta","version":1,"schemaVersion":2,"cornerOffsetFromSlot":{"x":0,"y":0,"z":0}}"""
-LABWARE_DEF = json.loads(LABWARE_DEF_JSON)
+LABWARE_DEF = definition('eppendorf_24_tuberack_2000ul')
 LABWARE_LABEL = LABWARE_DEF.get('metadata', {}).get(
     'displayName', 'test labware')
 
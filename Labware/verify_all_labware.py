@@ -0,0 +1,24 @@
+from opentrons import protocol_api
+from ottools.verify import load_all, verify_all
+
+metadata = {
+    'protocolName': 'Verify all custom labware',
+    'description': 'Checks the calibration crosses once, then A1 and the last well of every definition in Labware/ in one pass.',
+    'apiLevel': '2.11'
+}
+
+PIPETTE_MOUNT = 'right'
+PIPETTE_NAME = 'p20_single_gen2'
+
+TIPRACK_SLOT = '11'
+TIPRACK_LOADNAME = 'opentrons_96_tiprack_20ul'
+
+
+def run(protocol: protocol_api.ProtocolContext):
+    tiprack = protocol.load_labware(TIPRACK_LOADNAME, TIPRACK_SLOT)
+    pipette = protocol.load_instrument(
+        PIPETTE_NAME, PIPETTE_MOUNT, tip_racks=[tiprack])
+
+    # every Labware/*/*.json, one per free slot
+    labwares = load_all(protocol)
+    verify_all(protocol, pipette, labwares)
@@ -1,188 +1,86 @@
 # imports
-from opentrons import labware, instruments
+import io
+
+from opentrons import protocol_api
+from ottools.platemap import distribute_reagents, read_plate_map
 
 # metadata
 metadata = {
     'protocolName': 'Setting up PCR Reaction for BSCI:414 students',
     'author': 'Harley King <harley@umd.edu>',
     'description': 'Students specify a sets of primers for a list of six, OpenTrons does the pipetting.',
+    'apiLevel': '2.11'
 }
 ##########################
 
-# Labware
-fuge_rack = labware.load('opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap', '1')
-pcr_plate = labware.load('biorad_96_wellplate_200ul_pcr', '2')
-# tips
-tiprack_300 = labware.load('opentrons_96_tiprack_300ul', '4')
-tiprack_10 = labware.load('opentrons_96_tiprack_10ul', '5') #has slot adapter
-##########################
-
-# initialize single channel, 1st gen pipetters 
-p300 = instruments.P300_Single(
-    mount='right',
-    tip_racks=[tiprack_300])
-
-p10 = instruments.P10_Single(
-    mount='left',
-    tip_racks=[tiprack_10])
-###########################
-
-# Setup Overview
-# 1) Pipette PCR MMix from fuge_rack A1 to PCR plate
-# 2) Distribute primers into wells 
-##########################
-
-F_primer = [
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_Bam-sfGFP',
-'F20_MA_sfGFP1',
-'F20_MA_sfGFP1',
-'F20_MA_sfGFP1',
-'F20_MA_sfGFP1',
-'F20_MA_sfGFP1',
-'F20_MA_sfGFP1',
-'F20_MA_sfGFP1',
-'F20_MA_sfGFP1',
-'F20_MA_sfGFP1',
-'F20_MA_sfGFP1',
-'F20_MA_sfGFP1',
-'F20_sfGFP.seq',
-'F20_sfGFP.seq',
-'F20_sfGFP.seq',
-'F20_sfGFP.seq',
-'F20_sfGFP.seq',
-'F20_sfGFP.seq',
-'F20_sfGFP.seq',
-'F20_sfGFP.seq',
-'F20_sfGFP.seq',
-'F20_Bam-sfGFP',
-'F20_sfGFP.seq'
-]
-
-
-R_primer = [
-'F20_HA_sfGFP2',
-'F20_HA_sfGFP2',
-'F20_M13AR',
-'F20_M13AR',
-'F20_TEV-sfGFP_ns',
-'F20_M13AR',
-'F20_TEV-sfGFP_ns',
-'F20_M13AR',
-'F20_M13AR',
-'F20_TEV-sfGFP_ns',
-'F20_TEV-sfGFP_ns',
-'F20_TEV-sfGFP_ns',
-'F20_TEV-sfGFP_ns',
-'F20_TEV-sfGFP_ns',
-'F20_TEV-sfGFP_ns',
-'F20_TEV-sfGFP_ns',
-'F20_HA_sfGFP2',
-'F20_M13AR',
-'F20_HA_sfGFP2',
-'F20_M13AR',
-'F20_M13AR',
-'F20_M13AR',
-'F20_TEV-sfGFP_ns',
-'F20_M13AR',
-'F20_HA_sfGFP2',
-'F20_TEV-sfGFP_ns',
-'F20_M13AR',
-'F20_HA_sfGFP2',
-'F20_M13AR',
-'F20_M13AR',
-'F20_M13AR',
-'F20_M13AR',
-'F20_HA_sfGFP2',
-'F20_HA_sfGFP2',
-'F20_HA_sfGFP2',
-'F20_M13AR',
-'F20_TEV-sfGFP_ns',
-'F20_M13AR',
-'F20_HA_sfGFP2',
-'F20_TEV-sfGFP_ns',
-'F20_TEV-sfGFP_ns',
-'F20_TEV-sfGFP_ns',
-'F20_HA_sfGFP2',
-'F20_M13AR',
-'F20_HA_sfGFP2'
-]
-
-position = [
-'A1',
-'B1',
-'C1',
-'D1',
-'E1',
-'F1',
-'G1',
-'H1',
-'A2',
-'B2',
-'C2',
-'D2',
-'E2',
-'F2',
-'G2',
-'H2',
-'A3',
-'B3',
-'C3',
-'D3',
-'E3',
-'F3',
-'G3',
-'H3',
-'A4',
-'B4',
-'C4',
-'D4',
-'E4',
-'F4',
-'G4',
-'H4',
-'A5',
-'B5',
-'C5',
-'D5',
-'E5',
-'F5',
-'G5',
-'H5',
-'A6',
-'B6',
-'C6',
-'D6',
-'E6'
-]
-
-print ("There are ", len(F_primer), " F primer and ", len(R_primer), " R primers.")
-
-unique_F_primers = set(F_primer)
-unique_R_primers = set(R_primer)
-print ("Unique F primers: ", unique_F_primers)
-print ("Unique R primers: ", unique_R_primers)
+# which F and R primer goes in each well: one CSV row per well (well,F_primer,R_primer).
+# Kept in the protocol: the app uploads only the protocol file, so a per-class layout cannot
+# be a separate file on the robot the way the installed ottools package is.
+PLATE_MAP_CSV = """
+well,F_primer,R_primer
+A1,F20_Bam-sfGFP,F20_HA_sfGFP2
+B1,F20_Bam-sfGFP,F20_HA_sfGFP2
+C1,F20_Bam-sfGFP,F20_M13AR
+D1,F20_Bam-sfGFP,F20_M13AR
+E1,F20_Bam-sfGFP,F20_TEV-sfGFP_ns
+F1,F20_Bam-sfGFP,F20_M13AR
+G1,F20_Bam-sfGFP,F20_TEV-sfGFP_ns
+H1,F20_Bam-sfGFP,F20_M13AR
+A2,F20_Bam-sfGFP,F20_M13AR
+B2,F20_Bam-sfGFP,F20_TEV-sfGFP_ns
+C2,F20_Bam-sfGFP,F20_TEV-sfGFP_ns
+D2,F20_Bam-sfGFP,F20_TEV-sfGFP_ns
+E2,F20_Bam-sfGFP,F20_TEV-sfGFP_ns
+F2,F20_Bam-sfGFP,F20_TEV-sfGFP_ns
+G2,F20_Bam-sfGFP,F20_TEV-sfGFP_ns
+H2,F20_Bam-sfGFP,F20_TEV-sfGFP_ns
+A3,F20_Bam-sfGFP,F20_HA_sfGFP2
+B3,F20_Bam-sfGFP,F20_M13AR
+C3,F20_Bam-sfGFP,F20_HA_sfGFP2
+D3,F20_Bam-sfGFP,F20_M13AR
+E3,F20_Bam-sfGFP,F20_M13AR
+F3,F20_Bam-sfGFP,F20_M13AR
+G3,F20_Bam-sfGFP,F20_TEV-sfGFP_ns
+H3,F20_MA_sfGFP1,F20_M13AR
+A4,F20_MA_sfGFP1,F20_HA_sfGFP2
+B4,F20_MA_sfGFP1,F20_TEV-sfGFP_ns
+C4,F20_MA_sfGFP1,F20_M13AR
+D4,F20_MA_sfGFP1,F20_HA_sfGFP2
+E4,F20_MA_sfGFP1,F20_M13AR
+F4,F20_MA_sfGFP1,F20_M13AR
+G4,F20_MA_sfGFP1,F20_M13AR
+H4,F20_MA_sfGFP1,F20_M13AR
+A5,F20_MA_sfGFP1,F20_HA_sfGFP2
+B5,F20_MA_sfGFP1,F20_HA_sfGFP2
+C5,F20_sfGFP.seq,F20_HA_sfGFP2
+D5,F20_sfGFP.seq,F20_M13AR
+E5,F20_sfGFP.seq,F20_TEV-sfGFP_ns
+F5,F20_sfGFP.seq,F20_M13AR
+G5,F20_sfGFP.seq,F20_HA_sfGFP2
+H5,F20_sfGFP.seq,F20_TEV-sfGFP_ns
+A6,F20_sfGFP.seq,F20_TEV-sfGFP_ns
+B6,F20_sfGFP.seq,F20_TEV-sfGFP_ns
+C6,F20_sfGFP.seq,F20_HA_sfGFP2
+D6,F20_Bam-sfGFP,F20_M13AR
+E6,F20_sfGFP.seq,F20_HA_sfGFP2
+"""
+# None: use PLATE_MAP_CSV. A CSV path overrides it, to try another layout in the simulator;
+# the file is not uploaded with the protocol
+PLATE_MAP = None
+
+# primer pipette and its tips: 'p20_single_gen2' on current robots, 'p10_single' on GEN1 ones
+PRIMER_PIPETTE = 'p20_single_gen2'
+PRIMER_TIPS = {
+    'p20_single_gen2': 'opentrons_96_filtertiprack_20ul',
+    'p10_single': 'opentrons_96_tiprack_10ul', #has slot adapter
+}
+MMIX_VOL = 18
+PRIMER_VOL = 1
+# extra primer drawn with each aspiration and blown out in the trash, so every well gets a full 1 ul
+PRIMER_DISPOSAL_VOL = 1
+# primers go in 4 mm below the rim, above the master mix: a primer's tip serves all of its
+# wells, so it must not touch their liquid (touch_tip knocks the drop off; spin the plate down)
+PRIMER_DEPTH = 4
 
 primer_locs = {
 'F20_Bam-sfGFP': 'A2',
@@ -192,42 +90,53 @@ primer_locs = {
 'F20_TEV-sfGFP_ns': 'A3',
 'F20_M13AR': 'B3'
 }
+##########################
 
-# Procedure
-# distribute MMix
-p300.distribute(18, fuge_rack('A1'), pcr_plate.cols('1', '2', '3', '4', '5', '6'),
-    disposal_vol=2, touch_tip=True, new_tip='always')
-
-# distribute primers
-# in which wells should we dispense 1ul F primer F20_Bam-sfGFP?
-# find wells filtered where search = F20_BamsfGFP
-
-for fwd in unique_F_primers: 
-    print ("Pipetting FWD primer, ", fwd)
-    # match this to array of positions e.g [A1, B2, B4]
-    myposarray = []
-    for pos, match in enumerate(F_primer):
-        if fwd == match:
-            myposarray.append(position[pos])
-    # myposarray = df[df['F_primer']==fwd].Position.tolist() 
-    # pipette 1ul at each of those positions
-    print ("Will distribute 1 ul from fuge_rack", primer_locs[fwd], "into wells:", myposarray)
-    # wellarray = tuple(myposarray)
-    p10.distribute(1, fuge_rack(primer_locs[fwd]), pcr_plate.wells(myposarray), new_tip='always', touch_tip=True, disposal_vol=1)
-    
-for rev in unique_R_primers: 
-    print ("Pipetting REV primer, ", rev)
-    # match this to array of positions e.g [A1, B2, B4]
-    myposarray = []
-    for pos, match in enumerate(R_primer):
-        if rev == match:
-            myposarray.append(position[pos])
-    # myposarray = df[df['F_primer']==fwd].Position.tolist() 
-    # pipette 1ul at each of those positions
-    print ("Will distribute 1 ul from fuge_rack", primer_locs[rev], "into wells:", myposarray)
-    # wellarray = tuple(myposarray)
-    p10.distribute(1, fuge_rack(primer_locs[rev]), pcr_plate.wells(myposarray), new_tip='always', touch_tip=True, disposal_vol=1)
-
-
-
-
+def run(protocol: protocol_api.ProtocolContext):
+
+    # LABWARE
+    fuge_rack = protocol.load_labware('opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap', '1')
+    pcr_plate = protocol.load_labware('biorad_96_wellplate_200ul_pcr', '2')
+    # tips
+    tiprack_300 = protocol.load_labware('opentrons_96_tiprack_300ul', '4')
+    tiprack_primer = protocol.load_labware(PRIMER_TIPS[PRIMER_PIPETTE], '5')
+
+    # PIPETTES
+    p300 = protocol.load_instrument(
+        'p300_single_gen2', 'right', tip_racks=[tiprack_300]
+    )
+    p_primer = protocol.load_instrument(
+        PRIMER_PIPETTE, 'left', tip_racks=[tiprack_primer]
+    )
+
+    # Setup Overview
+    # 1) Pipette PCR MMix from fuge_rack A1 to PCR plate
+    # 2) Distribute primers into wells, one tip per primer tube
+    ##########################
+
+    plate_map = read_plate_map(PLATE_MAP or io.StringIO(PLATE_MAP_CSV.strip()))
+    # reagent -> wells, built in the one pass over the CSV
+    F_primer = plate_map.index['F_primer']
+    R_primer = plate_map.index['R_primer']
+
+    protocol.comment("There are {} F primer and {} R primers.".format(
+        sum(map(len, F_primer.values())), sum(map(len, R_primer.values()))))
+    protocol.comment("Unique F primers: {}".format(', '.join(F_primer)))
+    protocol.comment("Unique R primers: {}".format(', '.join(R_primer)))
+
+    primer_tubes = {primer: fuge_rack[loc] for primer, loc in primer_locs.items()}
+
+    # distribute MMix; the wells are still empty, so one tip does them all
+    p300.distribute(MMIX_VOL, fuge_rack['A1'], pcr_plate.columns('1', '2', '3', '4', '5', '6'),
+        disposal_volume=2, touch_tip=True, new_tip='once')
+
+    # distribute primers
+    # one distribute (and one tip) per primer, into its wells in a short path from its tube
+    for primers in (F_primer, R_primer):
+        for primer, wells in distribute_reagents(
+                p_primer, PRIMER_VOL, pcr_plate, primers, primer_tubes,
+                location=lambda well: well.top(-PRIMER_DEPTH), new_tip='once',
+                touch_tip=True, disposal_volume=PRIMER_DISPOSAL_VOL, blow_out=True,
+                blowout_location='trash'):
+            protocol.comment("Distributed {} ul from fuge_rack {} into wells: {}".format(
+                PRIMER_VOL, primer_locs[primer], ', '.join(well.well_name for well in wells)))
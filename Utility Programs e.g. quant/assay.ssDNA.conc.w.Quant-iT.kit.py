@@ -1,5 +1,6 @@
 # imports
 from opentrons import protocol_api
+from ottools.dilution import serial_dilution
 
 # metadata
 metadata = {
@@ -94,14 +95,9 @@ def run(protocol: protocol_api.ProtocolContext):
         blow_out=True)
 
     # serially dilute; must start with well A3, hi conc
-    p300.pick_up_tip()
-    for i in range(len(all_stds)-1): # loop through stds: asp, disp and mix
-        p300.mix(3, 225, all_stds[i])
-        p300.aspirate(125, all_stds[i])
-        p300.dispense(125, all_stds[i+1])
-    p300.transfer(125, std_8, liquid_trash, mix_before=(4, 100), new_tip='never') # remove 125 from 250ul total vol
-    p300.drop_tip()
-        # p300.transfer(125, all_stds[i], all_stds[i+1], mix_before=(2, 100), mix_after=(2,100))
+    # one tip for the series; remove 125 from std_8 so every std holds 125ul
+    serial_dilution(p300, all_stds, 125, 125, profile='single', new_tip='once',
+                    discard=liquid_trash, touch_tip=False)
 
     # dilute unknown samples e.g. primers
     p20.transfer(
@@ -123,14 +119,8 @@ def run(protocol: protocol_api.ProtocolContext):
     # need to step by 2 so I don't have sample_1_dil_half mixing with sample_2_dil as in list
     # just want 0->1 and 2->3 not 1->2
     for i in range(0, len(all_samples)-1, 2): 
-        p300.pick_up_tip()
-        p300.mix(3, 225, all_samples[i])
-        p300.aspirate(125, all_samples[i])
-        p300.dispense(125, all_samples[i+1])
-        p300.mix(3, 225, all_samples[i+1])
-        p300.aspirate(125, all_samples[i+1]) # remove 125 from 250ul total vol
-        p300.dispense(125, liquid_trash)
-        p300.drop_tip()
+        serial_dilution(p300, all_samples[i:i+2], 125, 125, profile='single',
+                        discard=liquid_trash, touch_tip=False) # remove 125 from 250ul total vol
     # p300.transfer(125, sample_2_dil, sample_2_dil_half, mix_before=(4, 125), blow_out=True, mix_after=(4, 125))
 
     ## add OliGreen to stds and samples, mix
@@ -0,0 +1,7 @@
+# Shared tooling for the protocols in this repo: offline simulation,
+# runtime estimates and helpers the protocols can import.
+from .sim import (
+    ProtocolContext, InstrumentContext, Labware, Well, Location, Point,
+    SimulationError, OutOfTipsError,
+    load_protocol, simulate, summarize, format_report,
+)
@@ -0,0 +1,300 @@
+# Command line entry point: python -m ottools <command> ...
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+from . import (batch, calibrate, checkpoint, delays, dilution, estimate, geometry, ir, multichannel, overage,
+               planner, recipe, registry, sim, timing, tips, travel)
+
+
+def _context(args):
+    # a context with the robot's calibrated timings, or None for the defaults
+    if not args.robot:
+        return None
+    return sim.ProtocolContext(timings=calibrate.load_timings(args.robot))
+
+
+def cmd_simulate(args):
+    ctx = sim.simulate(args.protocol, _context(args), quiet=not args.verbose)
+    if args.trace:
+        for cmd in ctx.trace:
+            print(json.dumps(cmd.as_dict()))
+    print(sim.format_report(ctx))
+    return 0
+
+
+def cmd_estimate(args):
+    ctx, steps, phases = estimate.estimate(args.protocol, _context(args))
+    print(estimate.format_estimate(ctx, steps, phases, top=args.top))
+    return 0
+
+
+def cmd_delays(args):
+    paths = args.protocols or batch.discover()
+    status = 0
+    for path in paths:
+        try:
+            ctx, sites = delays.delay_budget(os.path.join(geometry.REPO_ROOT, path))
+        except Exception as exc:  # keep going, the protocol is user code
+            print('{}: not simulated ({}: {})'.format(path, type(exc).__name__, exc))
+            status = 1
+            continue
+        if sites or args.protocols:
+            print(delays.format_budget(path, ctx, sites))
+    return status
+
+
+def cmd_tips(args):
+    paths = args.protocols or batch.discover()
+    short = 0
+    for path in paths:
+        try:
+            ctx, budget = tips.tip_budget(os.path.join(geometry.REPO_ROOT, path))
+        except Exception as exc:  # keep going, the protocol is user code
+            print('{}: not simulated ({}: {})'.format(path, type(exc).__name__, exc))
+            continue
+        over = any(b['extra_racks'] for b in budget.values())
+        short += over
+        if over or args.protocols:
+            print(tips.format_budget(path, budget))
+    if not args.protocols:
+        print('{} protocols, {} short of tips'.format(len(paths), short))
+    return 1 if short else 0
+
+
+def cmd_multi(args):
+    ctx = sim.simulate(args.protocol)
+    found = multichannel.candidates(ctx.trace)
+    for c in found:
+        print('{} -> {} columns {} ({:g} ul/well){}'.format(
+            c['source'], c['labware'], ','.join(c['columns']), c['volume'],
+            '' if c['trough'] else '  [pour into a reservoir first]'))
+    if not found:
+        print('no whole-column fills')
+    return 0
+
+
+def cmd_batch(args):
+    results = batch.run_batch(args.protocols or None, jobs=args.jobs)
+    if args.json:
+        print(json.dumps(results, indent=1))
+    else:
+        print(batch.format_table(results))
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+def cmd_plan(args):
+    volumes = [v for v in args.volumes for _ in range(args.wells)]
+    plan = planner.plan_multi_dispense(volumes, args.max_volume, args.disposal)
+    for n, step in enumerate(plan.steps, 1):
+        print('trip {:>3}: aspirate {:g} ul -> {}'.format(
+            n, round(step.aspirate, 2),
+            ', '.join('#{} {:g}'.format(i, round(v, 2)) for i, v in step.dispenses)))
+    print(plan.summary())
+    return 0
+
+
+def cmd_travel(args):
+    ctx = sim.simulate(args.protocol)
+    total, pairs = travel.trace_travel(ctx.trace)
+    print('{:.0f} mm of XY travel'.format(total))
+    for (src, dst), mm in sorted(pairs.items(), key=lambda kv: -kv[1])[:args.top]:
+        print('  slot {:>2} -> {:>2} {:>10.0f} mm {:>5.1f}%'.format(src, dst, mm, 100 * mm / total))
+    return 0
+
+
+def cmd_recipe(args):
+    design = dict(tot_rxn_vol=args.rxn_vol, R_reps=args.R_reps, std_NTC_reps=args.std_reps)
+    if args.protocol:
+        _, sheet, built_in = overage.traced_sheet(args.protocol)
+        print(overage.format_sheet(sheet))
+        stale = [row.tube for row, own in zip(sheet, built_in)
+                 if abs(row.fill - own.fill) > 0.05]
+        for name in stale:
+            print('BUILT-IN SCHEDULE DIFFERS FROM THE TRACE: {}'.format(name))
+        return 1 if stale else 0
+    if args.sheet:
+        overages, sheet = overage.primer_matrix_overage(args.F, args.R, **design)
+        table = recipe.primer_matrix(args.F, args.R, overage=overages, **design)
+        print(overage.format_sheet(sheet))
+    else:
+        table = recipe.primer_matrix(args.F, args.R, percent_waste=args.waste, **design)
+        print(recipe.format_recipe(table))
+    failed = [name for name, bad in recipe.check_capacity(table).items() if bad.any()]
+    for name in failed:
+        print('OVER CAPACITY OR NEGATIVE: {}'.format(name))
+    return 1 if failed else 0
+
+
+def cmd_dilution(args):
+    total = args.diluent + args.transfer
+    for name in sorted(dilution.PROFILES):
+        seconds, tips_used, profile, mix_vol = dilution.estimate_series(
+            args.labware, args.tubes, args.transfer, args.diluent, name,
+            new_tip=args.new_tip, min_exchanges=args.min_exchanges)
+        print('{:<14} {:>8}  {:>3} tips  {:.1f} exchanges/tube  cycles {}'.format(
+            name, sim.format_duration(seconds), tips_used,
+            dilution.exchanges(profile, mix_vol, total),
+            '+'.join(str(c) for c, _ in profile.steps)))
+    return 0
+
+
+def cmd_labware(args):
+    failed = 0
+    for load_name, problems in registry.check_all().items():
+        print('{:<52} {}'.format(load_name, 'ok' if not problems else 'INVALID'))
+        for problem in problems:
+            print('    ' + problem)
+        failed += bool(problems)
+    return 1 if failed else 0
+
+
+def cmd_compile(args):
+    compiled, hit = ir.compile_protocol(args.protocol, args.inputs, fmt=args.format)
+    print('{}  {}  {} commands  {} bytes  {}'.format(
+        compiled['hash'][:12], 'cached' if hit else 'compiled', len(compiled['commands']),
+        len(ir.dumps(compiled, args.format)), sim.format_duration(compiled['runtime'])))
+    if args.replay:
+        ir.write_replay_protocol(compiled, args.replay)
+        print('wrote', args.replay)
+    return 0
+
+
+def cmd_resume(args):
+    with tempfile.TemporaryDirectory() as directory:
+        runs = checkpoint.simulate_stop(args.protocol, args.stop_at, directory)
+    print(checkpoint.format_stop(*runs))
+    return 0
+
+
+def cmd_timing(args):
+    header, rows, footer = timing.read_log(args.log)
+    path = args.protocol or header['source']
+    source = None
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+    report = timing.summarize(rows, footer, source)
+    print(timing.format_report(header, report, footer, top=args.top))
+    return 1 if report['errors'] else 0
+
+
+def cmd_calibrate(args):
+    runs = calibrate.load_runs(args.logs)
+    robot = calibrate.robot_of(runs, args.robot)
+    fitted = calibrate.fit(runs)
+    print(calibrate.format_fit(robot, fitted, runs))
+    if not args.dry_run:
+        print('wrote', calibrate.save(robot, fitted, runs))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ottools')
+    sub = parser.add_subparsers(dest='command')
+    sub.required = True
+
+    p = sub.add_parser('simulate', help='run one protocol offline and report')
+    p.add_argument('protocol')
+    p.add_argument('--trace', action='store_true', help='print the command trace as JSONL')
+    p.add_argument('-v', '--verbose', action='store_true', help="show the protocol's own output")
+    p.add_argument('--robot', help='use the timings calibrated for this robot')
+    p.set_defaults(func=cmd_simulate)
+
+    p = sub.add_parser('estimate', help='runtime per step and per phase')
+    p.add_argument('protocol')
+    p.add_argument('--top', type=int, default=None, help='only the N longest steps')
+    p.add_argument('--robot', help='use the timings calibrated for this robot')
+    p.set_defaults(func=cmd_estimate)
+
+    p = sub.add_parser('delays', help='sum every delay per protocol, flag the ones in loops')
+    p.add_argument('protocols', nargs='*', help='default: every protocol in the repo')
+    p.set_defaults(func=cmd_delays)
+
+    p = sub.add_parser('tips', help='tips each pipette needs vs. tips loaded')
+    p.add_argument('protocols', nargs='*', help='default: every protocol (only shortfalls shown)')
+    p.set_defaults(func=cmd_tips)
+
+    p = sub.add_parser('multi', help='find whole-column fills an 8-channel pipette could do')
+    p.add_argument('protocol')
+    p.set_defaults(func=cmd_multi)
+
+    p = sub.add_parser('batch', help='simulate every protocol in the repo in parallel')
+    p.add_argument('protocols', nargs='*', help='limit to these files (relative to the repo root)')
+    p.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: all cores)')
+    p.add_argument('--json', action='store_true', help='print results as JSON')
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser('plan', help='group per-well volumes into multi-dispense trips')
+    p.add_argument('volumes', nargs='+', type=float, help='ul per destination well')
+    p.add_argument('--wells', type=int, default=1, help='repeat each volume for this many wells')
+    p.add_argument('--max-volume', type=float, default=200, help='pipette/tip capacity in ul')
+    p.add_argument('--disposal', type=float, default=0, help='disposal bolus per trip in ul')
+    p.set_defaults(func=cmd_plan)
+
+    p = sub.add_parser('travel', help='XY travel of a protocol, by slot pair')
+    p.add_argument('protocol')
+    p.add_argument('--top', type=int, default=10, help='slot pairs to list')
+    p.set_defaults(func=cmd_travel)
+
+    p = sub.add_parser('recipe', help='primer matrix reagent volumes and tube capacity check')
+    p.add_argument('--F', nargs='+', type=float, default=[50, 100, 200, 400, 600, 800], help='F primer nM')
+    p.add_argument('--R', nargs='+', type=float, default=[50, 100, 200, 400, 600, 800], help='R primer nM')
+    p.add_argument('--rxn-vol', type=float, default=20, help='reaction volume in ul')
+    p.add_argument('--R-reps', type=int, default=12, help='wells per R concentration')
+    p.add_argument('--std-reps', type=int, default=3, help='standard and NTC replicates')
+    p.add_argument('--waste', type=float, default=0.20, help='percent_waste as a decimal')
+    p.add_argument('--sheet', action='store_true',
+                   help='size mixes by dead volume instead of --waste; print the fill sheet')
+    p.add_argument('--protocol', metavar='PATH',
+                   help="fill sheet from a primer matrix protocol's simulated draws; "
+                        'flags tubes the built-in schedule sizes differently')
+    p.set_defaults(func=cmd_recipe)
+
+    p = sub.add_parser('dilution', help='duration of a serial dilution per mixing profile')
+    p.add_argument('labware', help='tube rack load name')
+    p.add_argument('--tubes', type=int, default=15)
+    p.add_argument('--transfer', type=float, default=100, help='ul moved down the series')
+    p.add_argument('--diluent', type=float, default=900, help='ul of diluent per tube')
+    p.add_argument('--new-tip', default='always', choices=['always', 'once'])
+    p.add_argument('--min-exchanges', type=float, default=None,
+                   help='cut mix cycles to this many liquid volumes through the tip')
+    p.set_defaults(func=cmd_dilution)
+
+    p = sub.add_parser('labware', help='validate every custom labware definition in Labware/')
+    p.set_defaults(func=cmd_labware)
+
+    p = sub.add_parser('compile', help='compile a protocol to its cached command IR')
+    p.add_argument('protocol')
+    p.add_argument('--inputs', nargs='*', default=[],
+                   help='other files the protocol reads (part of the cache key)')
+    p.add_argument('--format', default='json', choices=['json', 'msgpack'])
+    p.add_argument('--replay', metavar='OUT', help='write a protocol that replays the IR')
+    p.set_defaults(func=cmd_compile)
+
+    p = sub.add_parser('resume', help='stop a protocol mid-run in the sim and resume it')
+    p.add_argument('protocol', help='must have a RESUME switch and a Checkpoint')
+    p.add_argument('--stop-at', type=int, required=True, help='trace command to stop at')
+    p.set_defaults(func=cmd_resume)
+
+    p = sub.add_parser('timing', help='where the time of a recorded run went')
+    p.add_argument('log', help='JSONL log written by ottools.timing.RunTimer')
+    p.add_argument('--protocol', help='protocol file, for the time by step '
+                                      '(default: the path in the log, if it exists here)')
+    p.add_argument('--top', type=int, default=None, help='only the N longest rows per table')
+    p.set_defaults(func=cmd_timing)
+
+    p = sub.add_parser('calibrate', help='fit the runtime model to recorded timing logs')
+    p.add_argument('logs', nargs='+', help='JSONL logs of real runs (ottools.timing), one robot')
+    p.add_argument('--robot', help='robot name to save under (default: the one in the logs)')
+    p.add_argument('--dry-run', action='store_true', help='show the fit without saving it')
+    p.set_defaults(func=cmd_calibrate)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
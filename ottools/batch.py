@@ -0,0 +1,92 @@
+# Simulate every protocol in the repo at once.
+# Files are found by looking for a top-level run(protocol) or the legacy v1
+# imports, then simulated in a process pool (one protocol per task) and
+# summarized in a single table.
+import concurrent.futures
+import os
+import re
+import time
+import traceback
+
+from . import geometry, sim
+
+RUN_RE = re.compile(r'^def run\s*\(', re.M)
+LEGACY_RE = re.compile(r'^from opentrons import .*\b(labware|instruments|robot)\b', re.M)
+SKIP_DIRS = {'ottools', 'tests', '.git', '__pycache__'}
+
+
+def discover(root=geometry.REPO_ROOT):
+    """Paths (relative to root) of every protocol file under root."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames
+                             if d not in SKIP_DIRS and not d.startswith('.'))
+        for fname in sorted(filenames):
+            if not fname.endswith('.py'):
+                continue
+            path = os.path.join(dirpath, fname)
+            try:
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    source = f.read()
+            except OSError:
+                continue
+            if RUN_RE.search(source) or LEGACY_RE.search(source):
+                found.append(os.path.relpath(path, root))
+    return found
+
+
+def simulate_one(path, root=geometry.REPO_ROOT):
+    """Simulate one protocol; always returns a result dict, never raises."""
+    started = time.perf_counter()
+    result = {'path': path, 'ok': False, 'error': None, 'commands': 0,
+              'tips': 0, 'runtime': 0.0}
+    try:
+        ctx = sim.simulate(os.path.join(root, path))
+        summary = sim.summarize(ctx)
+        result.update(ok=True, commands=summary['commands'],
+                      tips=sum(summary['tips'].values()),
+                      runtime=summary['runtime'])
+    except Exception as exc:  # report any failure, the protocol is user code
+        result['error'] = '{}: {}'.format(type(exc).__name__, exc)
+        line = _protocol_line(exc, os.path.join(root, path))
+        if line and not isinstance(exc, SyntaxError):
+            result['error'] += ' (line {})'.format(line)
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def _protocol_line(exc, path):
+    # innermost traceback line that is inside the protocol file itself
+    line = None
+    for frame in traceback.extract_tb(exc.__traceback__):
+        if os.path.abspath(frame.filename) == os.path.abspath(path):
+            line = frame.lineno
+    return line
+
+
+def run_batch(paths=None, root=geometry.REPO_ROOT, jobs=None):
+    """Simulate paths (default: everything discovered) across all cores."""
+    paths = discover(root) if paths is None else list(paths)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        return [simulate_one(p, root) for p in paths]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(simulate_one, paths, [root] * len(paths)))
+
+
+def format_table(results):
+    width = max([len(r['path']) for r in results] + [8])
+    width = min(width, 90)
+    lines = ['{:<{w}}  {:<4} {:>8} {:>5} {:>10}'.format(
+        'protocol', 'ok', 'commands', 'tips', 'runtime', w=width)]
+    for r in results:
+        path = r['path'] if len(r['path']) <= width else '...' + r['path'][-(width - 3):]
+        lines.append('{:<{w}}  {:<4} {:>8} {:>5} {:>10}'.format(
+            path, 'pass' if r['ok'] else 'FAIL', r['commands'], r['tips'],
+            sim.format_duration(r['runtime']) if r['ok'] else '-', w=width))
+    failed = [r for r in results if not r['ok']]
+    lines.append('{} protocols, {} passed, {} failed'.format(
+        len(results), len(results) - len(failed), len(failed)))
+    for r in failed:
+        lines.append('  {}: {}'.format(r['path'], r['error']))
+    return '\n'.join(lines)
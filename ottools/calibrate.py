@@ -0,0 +1,214 @@
+# Calibration of the runtime model against recorded runs.
+# ottools.runtime puts a duration on every simulated command from a handful
+# of constants (tip pickup and drop, touch_tip, homing, plunger and blow-out
+# overheads, gantry travel). Their defaults are guesses. Given timing logs of
+# real runs (ottools.timing) this simulates the same protocols, pairs each
+# logged command with its simulated one and fits the constants by least
+# squares, one set per robot:
+#
+#   python -m ottools calibrate ~/runs/create_primer_matrix-*.jsonl ~/runs/Exp803.10_*.jsonl
+#   python -m ottools estimate <protocol> --robot ot2-left
+#
+# Each command's time is modelled as
+#   travel_factor * travel + move_overhead (if it moved) + its overhead
+#   + plunger time (volume / flow rate, taken as exact)
+# where travel is the constant-speed move time of the default model. The
+# fitted constants go to ottools/calibration/<robot>.json; sim.ProtocolContext
+# takes them as timings=load_timings(robot).
+import datetime
+import difflib
+import json
+import os
+
+import numpy as np
+
+from . import batch, geometry, sim, timing
+from .runtime import TIMINGS
+
+CALIBRATION_DIR = os.environ.get('OTTOOLS_CALIBRATION', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'calibration'))
+
+# command -> the overhead constant it pays once
+OVERHEADS = {
+    'aspirate': 'plunger_overhead',
+    'dispense': 'plunger_overhead',
+    'air_gap': 'plunger_overhead',
+    'blow_out': 'blow_out_overhead',
+    'touch_tip': 'touch_tip',
+    'pick_up_tip': 'pick_up_tip',
+    'drop_tip': 'drop_tip',
+    'home': 'home',
+}
+MOVES = ('move_to',)
+FITTED = ('travel_factor', 'move_overhead', 'plunger_overhead', 'blow_out_overhead',
+          'touch_tip', 'pick_up_tip', 'drop_tip', 'home')
+# commands that only group the ones issued inside them (on the robot an
+# aspirate may log its own move_to; it is timed as one command)
+GROUPS = ('mix', 'transfer', 'distribute', 'consolidate', 'return_tip')
+
+
+class CalibrationError(Exception):
+    pass
+
+
+def _commands(items, name, parent, index):
+    """The items that are single commands: not a group and not inside
+    anything but groups."""
+    by_index = {index(item): item for item in items}
+    found = []
+    for item in items:
+        up = by_index.get(parent(item))
+        if name(item) in GROUPS or (up is not None and name(up) not in GROUPS):
+            continue
+        found.append(item)
+    return found
+
+
+def pair(rows, trace):
+    """[(logged row, simulated Command)] for the commands both runs issued,
+    matched in order by command and pipette."""
+    logged = _commands(rows, lambda r: r['name'], lambda r: r['parent'], lambda r: r['index'])
+    simulated = _commands(trace, lambda c: c.name, lambda c: c.parent, lambda c: c.index)
+    matcher = difflib.SequenceMatcher(
+        None, [(r['name'], r['instrument']) for r in logged],
+        [(c.name, c.instrument) for c in simulated], autojunk=False)
+    pairs = []
+    for a, b, size in matcher.get_matching_blocks():
+        pairs.extend(zip(logged[a:a + size], simulated[b:b + size]))
+    return pairs
+
+
+def features(cmd, timings=TIMINGS):
+    """({constant: multiplier}, seconds not fitted) of a simulated command,
+    or None when the model has no constant for it (delays, modules, ...)."""
+    if cmd.name in MOVES:
+        travel = cmd.duration
+    elif cmd.name in OVERHEADS:
+        travel = min(cmd.params.get('travel', 0.0), cmd.duration)
+    else:
+        return None
+    row = {'travel_factor': travel, 'move_overhead': 1.0 if travel else 0.0}
+    fixed = cmd.duration - travel
+    if cmd.name in OVERHEADS:
+        row[OVERHEADS[cmd.name]] = 1.0
+        fixed -= timings[OVERHEADS[cmd.name]]
+    return row, max(fixed, 0.0)
+
+
+def find_protocol(header):
+    """The protocol file a log was recorded from, in this checkout."""
+    source = header['source']
+    if os.path.exists(source):
+        return source
+    name = os.path.basename(source)
+    for path in batch.discover():
+        if os.path.basename(path) == name:
+            return os.path.join(geometry.REPO_ROOT, path)
+    raise CalibrationError('{} is not in this checkout (log of {})'.format(name, header['protocol']))
+
+
+def load_runs(logs):
+    """[(log path, header, pairs)] for timing logs, each paired with a
+    simulation of its protocol under the default timings."""
+    runs = []
+    simulated = {}
+    for log in logs:
+        header, rows, _ = timing.read_log(log)
+        path = find_protocol(header)
+        if path not in simulated:
+            simulated[path] = sim.simulate(path).trace
+        runs.append((log, header, pair([r for r in rows if 'error' not in r], simulated[path])))
+    return runs
+
+
+def fit(runs):
+    """{constant: fitted value} for the constants the runs exercise, by
+    least squares over every paired command."""
+    matrix, target = [], []
+    for _, _, pairs in runs:
+        for row, cmd in pairs:
+            found = features(cmd)
+            if found is None:
+                continue
+            multipliers, fixed = found
+            matrix.append([multipliers.get(name, 0.0) for name in FITTED])
+            target.append(row['end'] - row['start'] - fixed)
+    if not matrix:
+        raise CalibrationError('no logged command pairs with a simulated one')
+    a = np.array(matrix)
+    b = np.array(target)
+    used = [i for i, name in enumerate(FITTED) if a[:, i].any()]
+    solution, _, rank, _ = np.linalg.lstsq(a[:, used], b, rcond=None)
+    if rank < len(used):
+        raise CalibrationError('the logs cannot tell the constants apart; '
+                               'record runs with more varied commands')
+    return {FITTED[i]: max(float(value), 0.0) for i, value in zip(used, solution)}
+
+
+def predict(pairs, timings):
+    """(measured, predicted) seconds of the paired commands the model covers."""
+    measured = predicted = 0.0
+    for row, cmd in pairs:
+        found = features(cmd)
+        if found is None:
+            continue
+        multipliers, fixed = found
+        measured += row['end'] - row['start']
+        predicted += fixed + sum(timings[name] * m for name, m in multipliers.items())
+    return measured, predicted
+
+
+def robot_of(runs, robot=None):
+    robots = {header['robot'] for _, header, _ in runs}
+    if robot is None and len(robots) > 1:
+        raise CalibrationError('logs from several robots ({}); calibrate one at a time'.format(
+            ', '.join(sorted(robots))))
+    return robot or robots.pop()
+
+
+def save(robot, fitted, runs, directory=None):
+    directory = directory or CALIBRATION_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, robot + '.json')
+    state = {
+        'robot': robot,
+        'fitted': datetime.date.today().isoformat(),
+        'logs': sorted(os.path.basename(log) for log, _, _ in runs),
+        'commands': sum(len(pairs) for _, _, pairs in runs),
+        'timings': {name: round(value, 4) for name, value in sorted(fitted.items())},
+    }
+    tmp = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def load_timings(robot, directory=None):
+    """TIMINGS with the constants calibrated for robot."""
+    path = os.path.join(directory or CALIBRATION_DIR, robot + '.json')
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except OSError:
+        raise CalibrationError('{} has no calibration ({} not found)'.format(robot, path))
+    return dict(TIMINGS, **saved['timings'])
+
+
+def format_fit(robot, fitted, runs):
+    calibrated = dict(TIMINGS, **fitted)
+    lines = ['{}: {} commands from {} runs'.format(
+        robot, sum(len(pairs) for _, _, pairs in runs), len(runs)), '']
+    for name in FITTED:
+        if name in fitted:
+            lines.append('  {:<18} {:>8.3f} -> {:>8.3f}'.format(name, TIMINGS[name], fitted[name]))
+    lines += ['', '  {:<52} {:>9} {:>15} {:>15}'.format('run', 'measured', 'default model',
+                                                         'calibrated')]
+    for log, header, pairs in runs:
+        measured, before = predict(pairs, TIMINGS)
+        _, after = predict(pairs, calibrated)
+        error = [100 * (p - measured) / (measured or 1.0) for p in (before, after)]
+        lines.append('  {:<52} {:>9} {:>9} {:+5.1f}% {:>9} {:+5.1f}%'.format(
+            os.path.basename(log)[:52], sim.format_duration(measured),
+            sim.format_duration(before), error[0], sim.format_duration(after), error[1]))
+    return '\n'.join(lines)
@@ -0,0 +1,255 @@
+# Checkpoint and resume.
+# A 1-2 hour run stopped by a failed tip pickup or an empty tube had to be
+# started over (or the script hand-edited to skip what was done). With a
+# checkpoint the protocol can be re-run as it is and carry on:
+#
+#   checkpoint = Checkpoint(protocol, 'create_primer_matrix', resume=RESUME, ledger=ledger)
+#   checkpoint.track(p300, p20)
+#   ...                                  # the protocol, unchanged
+#   checkpoint.finish()
+#
+# Every top-level pipette command (aspirate, mix, transfer, ...) and every
+# delay/pause is a step. After each step that leaves no liquid in any tip,
+# the step number, the used tips of every rack, which pipettes hold a tip
+# and the ledger's volumes go to a JSON file on the robot's local storage.
+# With resume=True the protocol runs from the top but the steps up to the
+# checkpoint are not sent to the robot. At the checkpoint the tip racks and
+# the ledger are set back to what they were, the run pauses so the deck can
+# be checked and a tip left on cleared, and a pipette that held a tip picks
+# up a fresh one. A stop inside a transfer or distribute re-runs that whole
+# command. The file keeps a digest of the steps before it (pipette, command,
+# volumes, wells and heights); a protocol edited since is not resumed.
+#
+# Module commands (set_temperature, ...) are not steps: they always run, so
+# the block is back at temperature on a resume.
+#
+# In the app's upload simulation the checkpoint does nothing: that pass
+# would otherwise read the stopped run's file, run to the end and mark it
+# finished (or overwrite it) before the real run starts.
+import contextlib
+import functools
+import hashlib
+import io
+import json
+import os
+
+from .ledger import _well_of
+
+CHECKPOINT_DIR = os.environ.get('OTTOOLS_CHECKPOINTS', (
+    '/data/user_storage/ottools-checkpoints' if os.path.isdir('/data/user_storage')
+    else os.path.join(os.path.expanduser('~'), '.cache', 'ottools', 'checkpoints')))
+
+PIPETTE_STEPS = ('pick_up_tip', 'drop_tip', 'return_tip', 'aspirate', 'dispense', 'blow_out',
+                 'touch_tip', 'air_gap', 'mix', 'move_to', 'home', 'transfer', 'distribute',
+                 'consolidate')
+PROTOCOL_STEPS = ('delay', 'pause', 'home')
+
+
+class CheckpointError(Exception):
+    pass
+
+
+def _describe(value):
+    """Text of a command argument for the step digest. A location is its
+    well and offset from the well's bottom, which a recalibration between
+    the stop and the resume leaves alone."""
+    well = _well_of(value)
+    if well is not None and hasattr(value, 'point'):
+        base = well.bottom().point
+        return '{}{:+.2f}{:+.2f}{:+.2f}'.format(well, *(a - b for a, b in zip(value.point, base)))
+    if isinstance(value, float):
+        return repr(round(value, 3))
+    if isinstance(value, (list, tuple)):
+        return '[{}]'.format(','.join(_describe(v) for v in value))
+    return str(value)
+
+
+class Checkpoint:
+    def __init__(self, protocol, name, resume=False, ledger=None, directory=None, enabled=None):
+        self.protocol = protocol
+        self.enabled = not protocol.is_simulating() if enabled is None else enabled
+        self.ledger = ledger
+        directory = directory or getattr(protocol, 'checkpoint_dir', None) or CHECKPOINT_DIR
+        self.path = os.path.join(directory, name + '.json')
+        self.pipettes = []
+        self.step = 0
+        self.resume_at = 0
+        self.saved = None
+        self._digest = hashlib.sha1()
+        self._depth = 0
+        self._originals = {}
+        if not self.enabled:
+            return
+        if resume:
+            self.saved = self._read()
+            if self.saved is not None:
+                self.resume_at = self.saved['step']
+                protocol.comment('Resuming {} after step {}'.format(name, self.resume_at))
+        for command in PROTOCOL_STEPS:
+            self._wrap(protocol, command, None)
+
+    # -- state ---------------------------------------------------------------
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return None if saved.get('finished') else saved
+
+    def snapshot(self):
+        tips = {}
+        for slot, labware in self.protocol.loaded_labwares.items():
+            if getattr(labware, 'is_tiprack', False):
+                tips[str(slot)] = [w.well_name for w in labware.wells() if not w.has_tip]
+        return {
+            'step': self.step,
+            'digest': self._digest.hexdigest(),
+            'finished': False,
+            'tips': tips,
+            'has_tip': {p.mount: bool(p.has_tip) for p in self.pipettes},
+            'ledger': dict(self.ledger.volumes) if self.ledger is not None else {},
+        }
+
+    def _write(self, state):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+    def _clean(self):
+        return all(not getattr(p, 'current_volume', 0) for p in self.pipettes)
+
+    def _restore(self):
+        saved = self.saved
+        if saved['digest'] != self._digest.hexdigest():
+            raise CheckpointError('{} does not match this protocol: it issues different commands '
+                                  'before step {}'.format(self.path, saved['step']))
+        racks = {str(slot): lw for slot, lw in self.protocol.loaded_labwares.items()}
+        for slot, used in saved['tips'].items():
+            for name in used:
+                racks[slot][name].has_tip = False
+        if self.ledger is not None:
+            self.ledger.volumes.update(saved['ledger'])
+        # the stop often leaves a tip on: it comes off before a fresh one goes on
+        self._originals[(id(self.protocol), 'pause')](
+            'Resuming after step {}: clear any tip left on the pipettes, check the tubes '
+            'that ran low, then resume'.format(saved['step']))
+        for pipette in self.pipettes:
+            if saved['has_tip'].get(pipette.mount) and not pipette.has_tip:
+                self._originals[(id(pipette), 'pick_up_tip')]()
+
+    # -- wrapping ------------------------------------------------------------
+
+    def track(self, *pipettes):
+        """Count the commands of each pipette as steps."""
+        for pipette in pipettes:
+            if not self.enabled:
+                break
+            self.pipettes.append(pipette)
+            for name in PIPETTE_STEPS:
+                self._wrap(pipette, name, pipette)
+        return pipettes[0] if len(pipettes) == 1 else pipettes
+
+    def _wrap(self, target, name, result):
+        method = getattr(target, name)
+        self._originals[(id(target), name)] = method
+        checkpoint = self
+
+        @functools.wraps(method)
+        def wrapped(*args, **kwargs):
+            if checkpoint._depth:  # inside a mix/transfer: part of that step
+                return method(*args, **kwargs)
+            checkpoint.step += 1
+            if target is checkpoint.protocol:  # delay, pause: only the order counts
+                described = ''
+            else:
+                described = ','.join([_describe(a) for a in args] + [
+                    '{}={}'.format(k, _describe(v)) for k, v in sorted(kwargs.items())])
+            checkpoint._digest.update('{}:{}:{};'.format(
+                getattr(target, 'mount', ''), name, described).encode())
+            if checkpoint.step <= checkpoint.resume_at:
+                if checkpoint.step == checkpoint.resume_at:
+                    checkpoint._restore()
+                return result
+            checkpoint._depth += 1
+            try:
+                value = method(*args, **kwargs)
+            finally:
+                checkpoint._depth -= 1
+            if checkpoint._clean():
+                checkpoint._write(checkpoint.snapshot())
+            return value
+
+        setattr(target, name, wrapped)
+
+    def finish(self):
+        """Mark the run complete, so a later resume starts from the top."""
+        if not self.enabled:
+            return
+        if self.step < self.resume_at:
+            raise CheckpointError('The protocol ended at step {} before the checkpoint at '
+                                  'step {}'.format(self.step, self.resume_at))
+        state = self.snapshot()
+        state['finished'] = True
+        self._write(state)
+
+
+# -- offline check -------------------------------------------------------------
+
+def simulate_stop(path, stop_at, directory):
+    """Stop the protocol at path at trace command stop_at, then resume it.
+
+    The protocol must take its resume flag from a module-level RESUME.
+    Its checkpoint files go to directory. Returns (full run, stopped run,
+    resumed run) simulator contexts.
+    """
+    from . import sim
+
+    full = _run(sim, path, False, directory)
+    stopped = sim.ProtocolContext()
+    record = stopped._record
+
+    def stopping(*args, **kwargs):
+        if len(stopped.trace) >= stop_at:
+            raise sim.SimulationError('stopped at command {}'.format(stop_at))
+        return record(*args, **kwargs)
+
+    stopped._record = stopping
+    try:
+        _run(sim, path, False, directory, stopped)
+    except sim.SimulationError:
+        pass
+    resumed = _run(sim, path, True, directory)
+    return full, stopped, resumed
+
+
+def _run(sim, path, resume, directory, ctx=None):
+    ctx = ctx or sim.ProtocolContext()
+    ctx.is_simulating = lambda: False  # play the robot: the checkpoint only runs there
+    ctx.checkpoint_dir = directory  # where a Checkpoint without a directory keeps its file
+    with contextlib.redirect_stdout(io.StringIO()):
+        module = sim.load_protocol(path, ctx)
+        if not hasattr(module, 'RESUME'):
+            raise CheckpointError('{} has no RESUME switch'.format(path))
+        module.RESUME = resume
+        with sim.fake_opentrons(sim._fake_opentrons(ctx)):
+            module.run(ctx)
+    return ctx
+
+
+def format_stop(full, stopped, resumed):
+    from . import sim
+
+    duration = sim.format_duration
+    tips = [sum(c.name == 'pick_up_tip' for c in ctx.trace) for ctx in (full, stopped, resumed)]
+    last = stopped.trace[-1]
+    return '\n'.join([
+        'full run      {:>9}  {} tips'.format(duration(full.runtime), tips[0]),
+        'stopped after {:>9}  at {} (line {})'.format(duration(stopped.runtime), last.name, last.line),
+        'resumed run   {:>9}  {} tips'.format(duration(resumed.runtime), tips[2]),
+        'time lost     {:>9}  {} extra tips'.format(
+            duration(stopped.runtime + resumed.runtime - full.runtime), tips[1] + tips[2] - tips[0]),
+    ])
@@ -0,0 +1,261 @@
+# BioER deep-well plate prep for the E32 extraction.
+# "Prep ONE BioER DeepWell Plate" and "Prep TWO ... Plates" were copies of
+# one script with the plate list, the tube fills (20% over, worked out by
+# hand in comments) and one height schedule per reagent pass hardcoded.
+# Here the plate count is a parameter:
+#
+#   deck = load_deck(protocol, 3)           # plates, tubes and racks in free slots
+#   prep_plates(deck, p300)                 # 7 tips whatever the plate count
+#
+# Every reagent pass runs over all plates with one tip, so tips and trips
+# to the tube rack do not grow per plate. The tubes are sized from the draws
+# they serve (ottools.overage) and booked in one LiquidLedger, so each tube
+# has a single height schedule across all plates and passes (the NFW tube
+# serves the bead dilution and the elution). A reagent that does not fit in
+# one tube gets as many as it needs. With a p300 multi and the bulk
+# reagents in a 12-well reservoir, the passes run column by column with the
+# multi, at the same dispense and blow-out heights.
+import math
+from collections import namedtuple
+
+from . import dilution, geometry, heights, overage, tips
+from .ledger import LiquidLedger
+from .multichannel import ROWS, is_trough
+
+PLATE = 'bioer_96_wellplate_2200ul'
+BEAD_RACK = 'opentrons_24_tuberack_eppendorf_2ml_safelock_snapcap'
+BULK_RACK = 'opentrons_6_tuberack_nest_50ml_conical'
+RESERVOIR = 'nest_12_reservoir_15ml'
+
+# reagent: tube it is drawn from; columns: plate columns it goes to (two
+# sample sets of six); volume: ul per well; rate: aspiration flow rate
+# multiplier; dispense: mm above the well bottom, one per aspiration (the
+# last one repeats); blow_out: mm above the bottom; touch_source: touch the
+# tip off on the tube before leaving it
+Pass = namedtuple('Pass', ['reagent', 'columns', 'volume', 'rate', 'dispense', 'blow_out',
+                           'touch_source'])
+
+# in run order; the elution buffer goes last to limit evaporation
+E32_PASSES = (
+    Pass('mag_beads', (6, 12), 40, 0.5, (5,), 5, True),
+    Pass('nfw', (6, 12), 360, 1.0, (25,), 25, False),  # dilutes the beads 1:10
+    Pass('wash_one', (2, 8), 1000, 1.0, (25,), 25, False),
+    Pass('wash_two', (3, 9), 1000, 0.75, (25,), 25, False),  # slower: ethanol
+    Pass('wash_three_etoh', (4, 10), 1000, 0.65, (25,), 25, False),
+    Pass('lysis_buffer', (1, 7), 400, 0.75, (10, 15), 20, False),
+    Pass('nfw', (5, 11), 100, 1.0, (20,), 20, False),
+)
+# reagents not held in the bulk (50 mL) rack
+SMALL_TUBES = {'mag_beads': BEAD_RACK}
+
+# the beads settle: resuspend as (cycles, mm above the bottom) before the
+# first well and every RESUSPEND_EVERY wells, then mix low and at the tip
+# height before each aspiration
+BEAD_RESUSPEND = ((2, 4), (2, 8), (3, 12), (3, 16), (4, 20))
+RESUSPEND_EVERY = 16
+BEAD_MIX_HEIGHT = 4
+MIX_VOLUME = 200
+# share of a trough well kept back when its labware has no height model
+TROUGH_DEAD_SHARE = 0.1
+
+# plates: loaded plates; sources: {reagent: [tubes]}; ledger: LiquidLedger
+# with every tube filled; fills: [(reagent, tube, ul)]
+Deck = namedtuple('Deck', ['plates', 'sources', 'ledger', 'fills'])
+
+
+def rack_for(reagent, bulk=BULK_RACK):
+    return SMALL_TUBES.get(reagent, bulk)
+
+
+def _well_definition(load_name):
+    definition = geometry.labware_definition(load_name)
+    return definition['wells'][definition['ordering'][0][0]], len(definition['wells'])
+
+
+def dead_volume(load_name):
+    """ul a tube of load_name keeps that the tip cannot reach."""
+    if load_name in heights.MODELS:
+        return heights.min_volume(load_name)
+    well, _ = _well_definition(load_name)
+    return TROUGH_DEAD_SHARE * well['totalLiquidVolume']
+
+
+def is_trough_load_name(load_name):
+    """True for one-row labware (a reservoir all channels dip into)."""
+    definition = geometry.labware_definition(load_name)
+    return len(definition['ordering'][0]) == 1
+
+
+def parts(volume, max_volume):
+    """Aspirations per well for volume with a max_volume tip."""
+    return max(int(math.ceil(volume / float(max_volume) - 1e-9)), 1)
+
+
+def draws(passes, n_plates, max_volume=overage.P300_MAX, bulk=BULK_RACK, channels=1):
+    """{reagent: [ul per aspiration]} in run order for n_plates plates.
+
+    A reagent in a trough is drawn by channels tips at once.
+    """
+    found = {}
+    for p in passes:
+        n = parts(p.volume, max_volume)
+        wells = len(p.columns) * len(ROWS) * n_plates
+        per = channels if is_trough_load_name(rack_for(p.reagent, bulk)) else 1
+        found.setdefault(p.reagent, []).extend([per * p.volume / n] * (n * wells // per))
+    return found
+
+
+def tube_fills(passes, n_plates, max_volume=overage.P300_MAX, bulk=BULK_RACK, channels=1):
+    """{reagent: [ul per tube]}: the draws packed in order into as few tubes
+    as hold them, each with its retention and dead volume."""
+    fills = {}
+    for reagent, amounts in draws(passes, n_plates, max_volume, bulk, channels).items():
+        load_name = rack_for(reagent, bulk)
+        capacity = _well_definition(load_name)[0]['totalLiquidVolume']
+        dead = dead_volume(load_name)
+        tubes = [0.0]
+        for amount in amounts:
+            need = amount + overage.RETENTION
+            if tubes[-1] and dead + tubes[-1] + need > capacity:
+                tubes.append(0.0)
+            tubes[-1] += need
+        if dead + max(tubes) > capacity:
+            raise ValueError('{} ul draws of {} do not fit in a {}'.format(
+                max(amounts), reagent, load_name))
+        fills[reagent] = [round(t + dead, 1) for t in tubes]
+    return fills
+
+
+def _nearest_free(protocol, count, what):
+    slots = sorted(tips.free_slots(protocol), key=tips._distance_to(tips.work_centre(protocol)))
+    if len(slots) < count:
+        raise ValueError('{} {} need {} slots but only {} are free'.format(
+            count, what, count, len(slots)))
+    return slots[:count]
+
+
+def load_deck(protocol, n_plates, passes=E32_PASSES, bulk=BULK_RACK, channels=1,
+              max_volume=overage.P300_MAX, plate=PLATE):
+    """Load the tube racks and n_plates plates into the free slots and fill
+    a ledger with every tube; returns a Deck.
+
+    The racks take the slots nearest the deck centre and the plates the next
+    nearest, so the trips between them stay short. bulk is the labware for
+    everything but the beads (a 12-well reservoir for a multi, with
+    channels=8). The fill sheet goes to the run log as comments.
+    """
+    fills = tube_fills(passes, n_plates, max_volume, bulk, channels)
+    by_rack = {}
+    for reagent in fills:
+        by_rack.setdefault(rack_for(reagent, bulk), []).append(reagent)
+    tubes = {}
+    for load_name, reagents in by_rack.items():
+        per_rack = _well_definition(load_name)[1]
+        count = sum(len(fills[r]) for r in reagents)
+        racks = [protocol.load_labware(load_name, slot) for slot in
+                 _nearest_free(protocol, -(-count // per_rack), load_name)]
+        free = [well for rack in racks for well in rack.wells()]
+        for reagent in reagents:
+            tubes[reagent], free = free[:len(fills[reagent])], free[len(fills[reagent]):]
+    plates = [protocol.load_labware(plate, slot)
+              for slot in sorted(_nearest_free(protocol, n_plates, plate), key=int)]
+    ledger = LiquidLedger()
+    sheet = []
+    for reagent, volumes in fills.items():
+        for tube, volume in zip(tubes[reagent], volumes):
+            ledger.fill(tube, volume)
+            sheet.append((reagent, tube, volume))
+            protocol.comment('Fill {} of slot {} with {:.0f} ul {}'.format(
+                tube.well_name, tube.parent.parent, volume, reagent))
+    return Deck(plates, tubes, ledger, sheet)
+
+
+def _source(ledger, tubes, amount):
+    """First tube that still has amount above its dead volume."""
+    for tube in tubes:
+        if ledger.volume(tube) - amount >= dead_volume(tube.parent.load_name) - 1e-6:
+            return tube
+    return tubes[-1]
+
+
+def _mix_volume(pipette, ledger, tube):
+    return round(min(MIX_VOLUME, dilution.capacity(pipette),
+                     dilution.MAX_MIX_SHARE * ledger.volume(tube)), 1)
+
+
+def _resuspend(pipette, ledger, tube):
+    level = dilution.liquid_height(tube, ledger.volume(tube))
+    volume = _mix_volume(pipette, ledger, tube)
+    for cycles, height in BEAD_RESUSPEND:
+        pipette.mix(cycles, volume, tube.bottom(min(height, max(level, dilution.MIN_HEIGHT))))
+
+
+def _pass_wells(p, plates):
+    return [plate.columns()[col - 1][row] for plate in plates for col in p.columns
+            for row in range(len(ROWS))]
+
+
+def _single_pass(pipette, deck, p):
+    tubes = deck.sources[p.reagent]
+    n = parts(p.volume, dilution.capacity(pipette))
+    volume = p.volume / float(n)
+    beads = p.reagent in SMALL_TUBES
+    last = None
+    for i, well in enumerate(_pass_wells(p, deck.plates)):
+        for part in range(n):
+            tube = _source(deck.ledger, tubes, volume)
+            if beads:
+                if tube is not last or (i % RESUSPEND_EVERY == 0 and part == 0):
+                    _resuspend(pipette, deck.ledger, tube)
+                mix = _mix_volume(pipette, deck.ledger, tube)
+                pipette.mix(1, mix, tube.bottom(BEAD_MIX_HEIGHT))
+                pipette.mix(1, mix, deck.ledger.aspirate_location(tube))
+            last = tube
+            pipette.aspirate(volume, tube, rate=p.rate)
+            if p.touch_source:
+                pipette.touch_tip()
+            pipette.dispense(volume, well.bottom(p.dispense[min(part, len(p.dispense) - 1)]))
+            pipette.blow_out(well.bottom(p.blow_out))
+        pipette.touch_tip()
+
+
+def _multi_pass(multi, deck, p):
+    # one column per movement: the multi's A channel goes to the column's
+    # top well and the 8 channels draw from the trough together (a transfer
+    # would dispense and blow out at its default heights)
+    tubes = deck.sources[p.reagent]
+    n = parts(p.volume, dilution.capacity(multi))
+    volume = p.volume / float(n)
+    wells = _pass_wells(p, deck.plates)
+    for i in range(0, len(wells), len(ROWS)):
+        top = wells[i]
+        for part in range(n):
+            tube = _source(deck.ledger, tubes, volume * len(ROWS))
+            multi.aspirate(volume, tube, rate=p.rate)
+            if p.touch_source:
+                multi.touch_tip()
+            multi.dispense(volume, top.bottom(p.dispense[min(part, len(p.dispense) - 1)]))
+            multi.blow_out(top.bottom(p.blow_out))
+        multi.touch_tip()
+
+
+def prep_plates(deck, pipette, multi=None, passes=E32_PASSES):
+    """Run every pass over all deck.plates, one tip per pass.
+
+    pipette is a single channel; a pass whose tubes are a trough goes to
+    multi when one is given. Returns the number of tips picked up.
+    """
+    deck.ledger.track(*[p for p in (pipette, multi) if p is not None])
+    used = 0
+    for p in passes:
+        tubes = deck.sources[p.reagent]
+        by_multi = multi is not None and is_trough(tubes[0])
+        pipette_used = multi if by_multi else pipette
+        pipette_used.pick_up_tip()
+        used += 1
+        if by_multi:
+            _multi_pass(multi, deck, p)
+        else:
+            _single_pass(pipette, deck, p)
+        pipette_used.drop_tip()
+    return used
@@ -0,0 +1,70 @@
+# Delay budget: where a protocol spends its time waiting.
+# Sums every protocol.delay the simulated run actually executes, by the line
+# that issued it, and flags the ones inside loops (a 2 s wait in a 96-well
+# loop is over 3 minutes).
+import ast
+
+from . import sim
+
+
+class DelaySite:
+    def __init__(self, line, loop_depth):
+        self.line = line
+        self.loop_depth = loop_depth
+        self.calls = 0
+        self.seconds = 0.0
+
+    @property
+    def in_loop(self):
+        return self.loop_depth > 0
+
+    def __repr__(self):
+        return '<DelaySite line {} x{} {}s>'.format(self.line, self.calls, round(self.seconds, 1))
+
+
+def loop_depths(source):
+    """{line: number of enclosing for/while loops} for every line in a loop."""
+    depths = {}
+
+    def visit(node, depth):
+        for child in ast.iter_child_nodes(node):
+            inner = depth
+            if isinstance(child, (ast.For, ast.While, ast.AsyncFor)):
+                inner = depth + 1
+                for line in range(child.lineno, child.end_lineno + 1):
+                    depths[line] = max(depths.get(line, 0), inner)
+            visit(child, inner)
+
+    visit(ast.parse(source), 0)
+    return depths
+
+
+def delay_budget(path, context=None):
+    """(ctx, [DelaySite]) for one protocol, longest total wait first."""
+    ctx = sim.simulate(path, context)
+    with open(path, encoding='utf-8') as f:
+        depths = loop_depths(f.read())
+    sites = {}
+    for cmd in ctx.trace:
+        if cmd.name != 'delay':
+            continue
+        site = sites.get(cmd.line)
+        if site is None:
+            site = sites[cmd.line] = DelaySite(cmd.line, depths.get(cmd.line, 0))
+        site.calls += 1
+        site.seconds += cmd.duration
+    return ctx, sorted(sites.values(), key=lambda s: -s.seconds)
+
+
+def format_budget(path, ctx, sites):
+    total = sum(s.seconds for s in sites)
+    share = 100 * total / ctx.runtime if ctx.runtime else 0.0
+    lines = ['{}: {} waiting in {} delays ({:.1f}% of {})'.format(
+        path, sim.format_duration(total), sum(s.calls for s in sites), share,
+        sim.format_duration(ctx.runtime))]
+    for s in sites:
+        lines.append('  line {:>4}  {:>4} x {:>5.1f}s = {:>7}  {}'.format(
+            s.line if s.line is not None else '?', s.calls, s.seconds / s.calls,
+            sim.format_duration(s.seconds),
+            'in loop (depth {})'.format(s.loop_depth) if s.in_loop else ''))
+    return '\n'.join(lines)
@@ -0,0 +1,185 @@
+# Serial dilutions.
+# The standards scripts each write their own series loop: new tip, mix(2)
+# low, mix(2) mid, mix(5) high, move the transfer volume on, drop the tip,
+# then a special case to mix the last tube. serial_dilution() runs any
+# series from a tube list, a transfer volume and a mixing profile:
+#
+#   serial_dilution(p300, stds, 100, 900, profile='low_mid_high')
+#
+# Each tube is mixed right after it receives its transfer, with the tip
+# that carried it in, so the series needs one tip per step and no extra
+# pass over the last tube. Mixing heights follow the liquid level (height
+# model when the tube has one). estimate_series() runs the same sequence
+# in the simulator to put a duration on a profile before it goes on the
+# robot.
+from collections import namedtuple
+
+from . import heights, sim
+
+# steps: ((cycles, fraction of the liquid height), ...) run in order
+# volume: mix volume (ul); None = what the tip holds
+# rate: flow rate multiplier for the mix
+MixProfile = namedtuple('MixProfile', ['steps', 'volume', 'rate'])
+
+PROFILES = {
+    # the standards scripts' pattern: 2 low, 2 mid, 5 just under the surface
+    'low_mid_high': MixProfile(steps=((2, 0.3), (2, 0.5), (5, 0.75)), volume=None, rate=1.0),
+    # one height, as in the OliGreen standards
+    'single': MixProfile(steps=((3, 0.5),), volume=None, rate=1.0),
+}
+# keep the mix volume below this share of the liquid so the tip stays wet
+MAX_MIX_SHARE = 0.8
+MIN_HEIGHT = 1.0
+
+
+def get_profile(profile):
+    if isinstance(profile, MixProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise KeyError('Unknown mixing profile {!r}; known: {}'.format(
+            profile, ', '.join(sorted(PROFILES))))
+
+
+def liquid_height(well, volume):
+    """Meniscus height (mm) of volume ul in well.
+
+    Uses the tube's height model when there is one, otherwise treats the
+    well as a straight cylinder from its depth and max volume.
+    """
+    load_name = getattr(well.parent, 'load_name', None)
+    if load_name in heights.MODELS:
+        return float(heights.height_at(load_name, volume))
+    depth = getattr(well, 'depth', None)
+    max_volume = getattr(well, 'max_volume', None)
+    if depth and max_volume:
+        return depth * min(volume / float(max_volume), 1.0)
+    return 10.0
+
+
+def capacity(pipette):
+    """Largest volume the pipette can hold with the tips in its racks."""
+    tips = [r.wells()[0].max_volume for r in pipette.tip_racks
+            if r.wells() and getattr(r.wells()[0], 'max_volume', None)]
+    return min([pipette.max_volume] + tips)
+
+
+def mix_volume(profile, pipette, volume):
+    limit = profile.volume or capacity(pipette)
+    return round(min(limit, capacity(pipette), MAX_MIX_SHARE * volume), 1)
+
+
+def exchanges(profile, mix_vol, volume):
+    """How many times the profile cycles the whole liquid volume through the tip."""
+    return sum(cycles for cycles, _ in profile.steps) * mix_vol / float(volume)
+
+
+def fit_profile(profile, mix_vol, volume, min_exchanges):
+    """Fewest cycles of profile (same heights, same proportions) that still
+    cycle min_exchanges liquid volumes."""
+    have = exchanges(profile, mix_vol, volume)
+    if not have:
+        return profile
+    scale = min_exchanges / have
+    steps = tuple((max(int(round(cycles * scale)), 1), frac) for cycles, frac in profile.steps)
+    return profile._replace(steps=steps)
+
+
+def mix(pipette, well, volume, profile='low_mid_high', min_exchanges=None):
+    """Mix volume ul of liquid in well with profile; returns the mix volume used."""
+    profile = get_profile(profile)
+    mix_vol = mix_volume(profile, pipette, volume)
+    if min_exchanges is not None:
+        profile = fit_profile(profile, mix_vol, volume, min_exchanges)
+    level = liquid_height(well, volume)
+    for cycles, frac in profile.steps:
+        pipette.mix(cycles, mix_vol, well.bottom(max(level * frac, MIN_HEIGHT)), rate=profile.rate)
+    return mix_vol
+
+
+def _split(volume, max_volume):
+    n = max(int(-(-volume // max_volume)), 1)
+    return [volume / float(n)] * n
+
+
+def serial_dilution(pipette, tubes, transfer_volume, diluent_volume, profile='low_mid_high',
+                    new_tip='always', mix_first=True, discard=None, touch_tip=True,
+                    min_exchanges=None, aspirate_rate=1.0, v_offset=-1.0, delay=0,
+                    protocol=None):
+    """Move transfer_volume down tubes (each holding diluent_volume) and mix.
+
+    tubes[0] holds the starting material (diluent_volume + transfer_volume
+    when mix_first). new_tip: 'always' (one tip per step), 'once' (one tip
+    for the series) or 'never' (the caller holds a tip). discard: a
+    location to take transfer_volume from the last tube to, so every tube
+    ends with the same volume. min_exchanges: scale the profile's cycles
+    to cycle at least this many liquid volumes through the tip.
+    aspirate_rate: flow rate multiplier of the transfer aspirations;
+    v_offset: touch_tip height (mm from the top); delay: seconds to wait
+    after each transfer aspiration, which needs protocol.
+    Returns the number of tips picked up.
+    """
+    if delay and protocol is None:
+        raise ValueError('serial_dilution needs the protocol to delay after aspirating')
+    tips = 0
+    total = diluent_volume + transfer_volume
+    if new_tip == 'once':
+        pipette.pick_up_tip()
+        tips += 1
+    for i, (src, dest) in enumerate(zip(tubes, tubes[1:])):
+        if new_tip == 'always':
+            pipette.pick_up_tip()
+            tips += 1
+        if i == 0 and mix_first:
+            mix(pipette, src, total, profile, min_exchanges)
+        left = total
+        for vol in _split(transfer_volume, capacity(pipette)):
+            pipette.aspirate(vol, src.bottom(max(liquid_height(src, left) * 0.5, MIN_HEIGHT)),
+                             rate=aspirate_rate)
+            if delay:
+                protocol.delay(seconds=delay)
+            if touch_tip:
+                pipette.touch_tip(v_offset=v_offset)
+            left -= vol
+            pipette.dispense(vol, dest.bottom(max(liquid_height(dest, diluent_volume) * 0.5,
+                                                  MIN_HEIGHT)))
+            pipette.blow_out(dest.bottom(liquid_height(dest, total)))
+        mix(pipette, dest, total, profile, min_exchanges)
+        if new_tip == 'always' and (discard is None or dest is not tubes[-1]):
+            pipette.drop_tip()
+    if discard is not None and len(tubes) > 1:
+        for vol in _split(transfer_volume, capacity(pipette)):
+            pipette.aspirate(vol, tubes[-1])
+            pipette.dispense(vol, discard)
+        pipette.blow_out(discard)
+        if new_tip == 'always':
+            pipette.drop_tip()
+    if new_tip == 'once':
+        pipette.drop_tip()
+    return tips
+
+
+def estimate_series(load_name, n_tubes, transfer_volume, diluent_volume, profile='low_mid_high',
+                    pipette='p300_single_gen2', tiprack='opentrons_96_filtertiprack_200ul',
+                    **kwargs):
+    """(seconds, tips, profile, mix volume) for a serial_dilution of n_tubes
+    tubes of load_name; profile is the one actually run (after min_exchanges).
+
+    Runs the series in the simulator (rack in slot 2, tips in slots 8 and 9) so
+    the duration uses the same timing model as `python -m ottools estimate`.
+    """
+    ctx = sim.ProtocolContext()
+    rack = ctx.load_labware(load_name, '2')
+    tipracks = [ctx.load_labware(tiprack, slot) for slot in ('8', '9')]
+    instr = ctx.load_instrument(pipette, 'left', tip_racks=tipracks)
+    wells = rack.wells()
+    if n_tubes > len(wells):
+        raise ValueError('{} tubes do not fit in {} ({} wells)'.format(n_tubes, load_name, len(wells)))
+    tips = serial_dilution(instr, wells[:n_tubes], transfer_volume, diluent_volume, profile, **kwargs)
+    total = transfer_volume + diluent_volume
+    profile = get_profile(profile)
+    mix_vol = mix_volume(profile, instr, total)
+    if kwargs.get('min_exchanges') is not None:
+        profile = fit_profile(profile, mix_vol, total, kwargs['min_exchanges'])
+    return ctx.runtime, tips, profile, mix_vol
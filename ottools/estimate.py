@@ -0,0 +1,137 @@
+# Runtime estimate of a protocol, per step and per phase.
+# The simulated trace already carries a duration for every command (gantry
+# moves from slot and well positions, plunger time from the flow rates the
+# script sets, mix cycles, delays, module ramps). This groups it two ways:
+#
+#   steps   the sections of run() the script's own comments mark out
+#           (usually one loop per reagent)
+#   phases  what the time is spent on: travel, liquid handling, tips,
+#           delays, temperature, other
+import ast
+
+from . import sim
+
+PHASES = ('travel', 'liquid', 'tips', 'delay', 'temperature', 'other')
+_LIQUID = {'aspirate', 'dispense', 'blow_out', 'touch_tip', 'air_gap'}
+_TIPS = {'pick_up_tip', 'drop_tip'}
+_TEMPERATURE = {'set_temperature', 'await_temperature', 'start_set_temperature', 'deactivate'}
+
+
+class Step:
+    def __init__(self, label, first, last):
+        self.label = label
+        self.first = first
+        self.last = last
+        self.seconds = 0.0
+        self.commands = 0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+    def __repr__(self):
+        return '<Step {}-{} {!r} {}>'.format(self.first, self.last, self.label,
+                                            sim.format_duration(self.seconds))
+
+
+def _comment_above(lines, node):
+    comments = []
+    i = node.lineno - 2
+    while i >= 0 and lines[i].strip().startswith('#'):
+        comments.insert(0, lines[i].strip().lstrip('#').strip())
+        i -= 1
+    text = ' / '.join(c for c in comments if c.strip('#* '))
+    return text if len(text) <= 60 else text[:57] + '...'
+
+
+def steps_of(source):
+    """Steps of run() (or of the module for v1 files).
+
+    A top-level statement with a comment right above it starts a new step
+    labelled with that comment; statements without one belong to the step
+    before them.
+    """
+    tree = ast.parse(source)
+    lines = source.splitlines()
+    body = tree.body
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == 'run':
+            body = node.body
+            break
+    steps = []
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.ClassDef)):
+            continue
+        label = _comment_above(lines, node)
+        if label or not steps:
+            steps.append(Step(label or lines[node.lineno - 1].strip()[:60],
+                              node.lineno, node.end_lineno))
+        else:
+            steps[-1].last = node.end_lineno
+    return steps
+
+
+def phase_split(cmd):
+    """{phase: seconds} for one leaf command."""
+    if cmd.name in _LIQUID or cmd.name in _TIPS:
+        travel = min(cmd.params.get('travel', 0.0), cmd.duration)
+        rest = 'liquid' if cmd.name in _LIQUID else 'tips'
+        return {'travel': travel, rest: cmd.duration - travel}
+    if cmd.name == 'move_to':
+        return {'travel': cmd.duration}
+    if cmd.name == 'delay':
+        return {'delay': cmd.duration}
+    if cmd.name in _TEMPERATURE:
+        return {'temperature': cmd.duration}
+    return {'other': cmd.duration}
+
+
+def estimate(path, context=None):
+    """Simulate path and split its runtime by step and by phase.
+
+    Returns (ctx, steps, phases); steps with no commands are dropped and
+    commands outside any step (v1 module code) go to an '(outside run)' step.
+    """
+    ctx = sim.simulate(path, context)
+    with open(path, encoding='utf-8') as f:
+        steps = steps_of(f.read())
+    other = Step('(outside run)', 0, 0)
+    groups = {c.parent for c in ctx.trace if c.parent is not None}
+    phases = dict.fromkeys(PHASES, 0.0)
+    for cmd in ctx.trace:
+        step = _step_for(steps, cmd.line) or other
+        if cmd.parent is None:
+            step.seconds += cmd.duration
+            step.commands += 1
+        if cmd.index in groups:
+            continue  # time is counted on the commands inside the group
+        for phase, seconds in phase_split(cmd).items():
+            step.phases[phase] += seconds
+            phases[phase] += seconds
+    steps = [s for s in steps + [other] if s.commands]
+    return ctx, steps, phases
+
+
+def _step_for(steps, line):
+    if line is None:
+        return None
+    for step in steps:
+        if step.first <= line <= step.last:
+            return step
+    return None
+
+
+def format_estimate(ctx, steps, phases, top=None):
+    total = ctx.runtime or 1.0
+    lines = ['estimated runtime {} ({} commands)'.format(
+        sim.format_duration(ctx.runtime), len(ctx.trace)), '', 'by step:']
+    shown = sorted(steps, key=lambda s: -s.seconds)[:top] if top else steps
+    for s in shown:
+        main = max(s.phases, key=s.phases.get)
+        lines.append('  {:>5}  {:<60} {:>9} {:>5.1f}%  {}'.format(
+            'L{}'.format(s.first) if s.first else '', s.label,
+            sim.format_duration(s.seconds), 100 * s.seconds / total, main))
+    lines += ['', 'by phase:']
+    for phase in PHASES:
+        if phases[phase]:
+            share = phases[phase] / total
+            lines.append('  {:<12} {:>9} {:>5.1f}%  {}'.format(
+                phase, sim.format_duration(phases[phase]), 100 * share, '#' * int(round(share * 40))))
+    return '\n'.join(lines)
@@ -0,0 +1,138 @@
+# Deck and labware geometry for offline simulation.
+# Custom labware comes from the JSON definitions under Labware/, through
+# ottools.registry; the stock Opentrons labware used by the protocols in
+# this repo is approximated with the grid layouts in GENERIC_LAYOUTS
+# (numbers taken from the published Opentrons definitions, rounded).
+import functools
+import os
+import re
+
+from . import registry
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LABWARE_DIR = registry.LABWARE_DIR
+
+# front-left corner of each OT-2 deck slot (mm, robot coordinates)
+SLOT_ORIGINS = {
+    '1': (0.0, 0.0, 0.0),
+    '2': (132.5, 0.0, 0.0),
+    '3': (265.0, 0.0, 0.0),
+    '4': (0.0, 90.5, 0.0),
+    '5': (132.5, 90.5, 0.0),
+    '6': (265.0, 90.5, 0.0),
+    '7': (0.0, 181.0, 0.0),
+    '8': (132.5, 181.0, 0.0),
+    '9': (265.0, 181.0, 0.0),
+    '10': (0.0, 271.5, 0.0),
+    '11': (132.5, 271.5, 0.0),
+    '12': (265.0, 271.5, 0.0),
+}
+SLOT_SIZE = (127.76, 85.48)
+TRASH_SLOT = '12'
+TRASH_POINT = (265.0 + 82.84, 271.5 + 80.0, 82.0)  # fixed trash drop point
+HOME_POINT = (418.0, 353.0, 218.0)  # gantry home position
+
+# height the labware sits above the deck when placed on a module
+MODULE_OFFSETS = {
+    'tempdeck': (-0.15, -0.15, 80.09),
+    'temperature module': (-0.15, -0.15, 80.09),
+    'temperature module gen2': (-1.45, -0.15, 66.9),
+    'magdeck': (0.125, -0.125, 82.25),
+    'magnetic module': (0.125, -0.125, 82.25),
+}
+
+# load name -> (rows, cols, a1_x, a1_y, x_pitch, y_pitch,
+#               z_dimension, well_depth, well_diameter, well_volume)
+GENERIC_LAYOUTS = {
+    'opentrons_96_filtertiprack_200ul': (8, 12, 14.38, 74.24, 9, 9, 64.48, 59.3, 5.59, 200),
+    'opentrons_96_filtertiprack_20ul': (8, 12, 14.38, 74.24, 9, 9, 64.69, 39.2, 3.27, 20),
+    'opentrons_96_tiprack_300ul': (8, 12, 14.38, 74.24, 9, 9, 64.49, 59.3, 5.23, 300),
+    'opentrons_96_tiprack_20ul': (8, 12, 14.38, 74.24, 9, 9, 64.69, 39.2, 3.27, 20),
+    'opentrons_96_tiprack_10ul': (8, 12, 14.38, 74.24, 9, 9, 64.69, 39.2, 3.27, 10),
+    'corning_96_wellplate_360ul_flat': (8, 12, 14.38, 74.24, 9, 9, 14.22, 10.67, 6.86, 360),
+    'biorad_96_wellplate_200ul_pcr': (8, 12, 14.38, 74.24, 9, 9, 16.06, 14.81, 5.46, 200),
+    'nest_96_wellplate_2ml_deep': (8, 12, 14.4, 74.1, 9, 9, 41.0, 38.0, 8.2, 2000),
+    'opentrons_96_aluminumblock_generic_pcr_strip_200ul': (8, 12, 14.38, 74.24, 9, 9, 49.35, 20.2, 5.46, 200),
+    'opentrons_24_tuberack_eppendorf_2ml_safelock_snapcap': (4, 6, 18.21, 75.43, 19.89, 19.28, 79.45, 38.7, 8.7, 2000),
+    'opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap': (4, 6, 18.21, 75.43, 19.89, 19.28, 79.45, 37.8, 8.7, 1500),
+    'opentrons_24_tuberack_generic_2ml_screwcap': (4, 6, 18.21, 75.43, 19.89, 19.28, 79.45, 42.0, 8.5, 2000),
+    'opentrons_24_aluminumblock_generic_2ml_screwcap': (4, 6, 20.75, 68.63, 17.25, 17.25, 42.0, 42.0, 8.69, 2000),
+    'opentrons_6_tuberack_nest_50ml_conical': (2, 3, 35.0, 60.0, 35.0, 35.0, 124.35, 113.0, 27.81, 50000),
+    'opentrons_15_tuberack_falcon_15ml_conical': (3, 5, 13.88, 67.74, 25.0, 25.0, 124.35, 117.98, 14.9, 15000),
+    # troughs: one row, so all 8 channels of a multi dip into the same well
+    'nest_12_reservoir_15ml': (1, 12, 14.38, 42.78, 9, 9, 31.4, 26.85, 8.2, 15000),
+    'usascientific_12_reservoir_22ml': (1, 12, 13.94, 42.9, 9.03, 9, 44.04, 42.16, 8.33, 22000),
+    'nest_1_reservoir_195ml': (1, 1, 63.88, 42.74, 9, 9, 31.4, 25.0, 71.3, 195000),
+}
+
+
+def _grid_definition(load_name, rows, cols, a1_x, a1_y, x_pitch, y_pitch,
+                     z_dim, depth, diameter, volume):
+    row_names = [chr(ord('A') + r) for r in range(rows)]
+    wells = {}
+    ordering = []
+    for c in range(cols):
+        column = []
+        for r, row in enumerate(row_names):
+            name = row + str(c + 1)
+            wells[name] = {
+                'depth': depth,
+                'totalLiquidVolume': volume,
+                'shape': 'circular',
+                'diameter': diameter,
+                'x': round(a1_x + c * x_pitch, 2),
+                'y': round(a1_y - r * y_pitch, 2),
+                'z': round(z_dim - depth, 2),
+            }
+            column.append(name)
+        ordering.append(column)
+    return {
+        'ordering': ordering,
+        'metadata': {'displayName': load_name},
+        'dimensions': {'xDimension': 127.76, 'yDimension': 85.48, 'zDimension': z_dim},
+        'wells': wells,
+        'parameters': {
+            'loadName': load_name,
+            'isTiprack': 'tiprack' in load_name,
+        },
+        'cornerOffsetFromSlot': {'x': 0, 'y': 0, 'z': 0},
+    }
+
+
+def _guess_layout(load_name):
+    # e.g. 'something_96_wellplate_250ul' -> 96 wells of 250 ul
+    counts = {384: (16, 24), 96: (8, 12), 48: (6, 8), 24: (4, 6),
+              15: (3, 5), 12: (3, 4), 6: (2, 3), 1: (1, 1)}
+    match = re.search(r'_(\d+)_', load_name)
+    n = int(match.group(1)) if match else 96
+    rows, cols = counts.get(n, (8, 12))
+    vol = re.search(r'_(\d+(?:\.\d+)?)(ul|ml)$', load_name)
+    volume = 200.0
+    if vol:
+        volume = float(vol.group(1)) * (1000 if vol.group(2) == 'ml' else 1)
+    pitch_x = 127.76 / cols
+    pitch_y = 85.48 / rows
+    return (rows, cols, pitch_x / 2, 85.48 - pitch_y / 2, pitch_x, pitch_y,
+            40.0, 35.0, min(pitch_x, pitch_y) * 0.8, volume)
+
+
+# custom definitions are discovered, validated and cached by the registry
+find_custom_definitions = registry.find_definitions
+
+
+@functools.lru_cache(maxsize=None)
+def _generic_definition(load_name):
+    layout = GENERIC_LAYOUTS.get(load_name) or _guess_layout(load_name)
+    return _grid_definition(load_name, *layout)
+
+
+def labware_definition(load_name):
+    """Return a labware definition dict for a load name.
+
+    Custom definitions in Labware/ (from the registry) win; otherwise a
+    generic grid is built.
+    """
+    definition = registry.definition(load_name, None)
+    if definition is None:
+        definition = _generic_definition(load_name)
+    return definition
@@ -0,0 +1,217 @@
+# Liquid-height models for the tubes we aspirate from.
+# One place for the volume -> height fits that used to be pasted into every
+# protocol as tip_heights / tip_heightsEpp / fifty_ml_heights. The fits come
+# from the Excel sheet "Exp803..."; models are keyed by labware load name and
+# evaluated with NumPy in Horner form, so a whole aspiration schedule is one
+# call.
+import hashlib
+import os
+from collections import namedtuple
+
+import numpy as np
+
+# coeffs: polynomial p0..pn (height in mm from volume in ul)
+# offset: mm subtracted so the tip sits below the meniscus
+# full_volume / full_offset: above full_volume the fit is out of range; see sheet
+# min_height / floor: below min_height go to floor (mm) to avoid aspirating air
+TubeModel = namedtuple('TubeModel', [
+    'coeffs', 'offset', 'full_volume', 'full_offset', 'min_height', 'floor'])
+
+VWR_1500 = TubeModel(
+    coeffs=(0.029502064, 0.084625954, -0.000174864, 2.18373E-07, -1.30599E-10, 2.97839E-14),
+    offset=7, full_volume=1499, full_offset=14, min_height=8, floor=1)
+EPPENDORF_2000 = TubeModel(
+    coeffs=(-0.272820744, 0.019767959, 2.00442E-06, -8.99691E-09, 6.72776E-12, -1.55428E-15),
+    offset=11, full_volume=2000, full_offset=12, min_height=6, floor=1)
+CONICAL_50ML = TubeModel(
+    coeffs=(0, 0.0024),
+    offset=15, full_volume=51000, full_offset=14, min_height=17.5, floor=2)
+# no sheet for the 5mL tube yet: straight cylinder from the labware definition
+# (15.2 mm inner diameter -> 1 / (pi * 7.6**2) mm per ul); refit when measured
+EPPENDORF_5000 = TubeModel(
+    coeffs=(0, 0.00551),
+    offset=5, full_volume=5000, full_offset=5, min_height=6, floor=1)
+
+MODELS = {
+    'vwr_24_tuberack_1500ul': VWR_1500,
+    'opentrons_24_tuberack_eppendorf_2ml_safelock_snapcap': EPPENDORF_2000,
+    'eppendorf_24_tuberack_2000ul': EPPENDORF_2000,
+    'opentrons_6_tuberack_nest_50ml_conical': CONICAL_50ML,
+    'eppendorf5ml_15_tuberack_5000ul': EPPENDORF_5000,
+}
+
+# volume range covered by the lookup tables for each tube type
+TABLE_RANGES = {
+    'vwr_24_tuberack_1500ul': 1500,
+    'opentrons_24_tuberack_eppendorf_2ml_safelock_snapcap': 2000,
+    'eppendorf5ml_15_tuberack_5000ul': 5000,
+    'opentrons_6_tuberack_nest_50ml_conical': 50000,
+}
+TABLE_SIZE = 4097
+CACHE_DIR = os.environ.get(
+    'OTTOOLS_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'ottools'))
+
+
+def get_model(load_name, **overrides):
+    """Model for a labware load name, with any fields overridden.
+
+    e.g. get_model('opentrons_6_tuberack_nest_50ml_conical', offset=5, min_height=12)
+    """
+    try:
+        model = MODELS[load_name]
+    except KeyError:
+        raise KeyError('No liquid-height model for {!r}; known: {}'.format(
+            load_name, ', '.join(sorted(MODELS))))
+    return model._replace(**overrides) if overrides else model
+
+
+def horner(coeffs, x):
+    """Evaluate sum(coeffs[i] * x**i) for an array of x."""
+    x = np.asarray(x, dtype=float)
+    result = np.full(x.shape, float(coeffs[-1]))
+    for c in reversed(coeffs[:-1]):
+        result = result * x + c
+    return result
+
+
+def liquid_height(load_name, volumes):
+    """Meniscus height (mm above the tube bottom) for each volume."""
+    return horner(get_model(load_name).coeffs, volumes)
+
+
+def aspiration_heights(model, volumes, init_vol=None):
+    """Tip heights for an array of volumes using a TubeModel.
+
+    The offset is picked from init_vol (default: the largest volume), the
+    same way the old per-script functions picked it once per schedule.
+    """
+    volumes = np.asarray(volumes, dtype=float)
+    if init_vol is None:
+        init_vol = volumes.max() if volumes.size else 0
+    offset = model.full_offset if init_vol > model.full_volume else model.offset
+    h = horner(model.coeffs, volumes) - offset
+    return np.where(h < model.min_height, float(model.floor), np.round(h, 1))
+
+
+def schedule(load_name, init_vol, steps, vol_dec, **overrides):
+    """Heights for steps aspirations of vol_dec starting from init_vol.
+
+    Returns a plain list, same as the old tip_heights(init_vol, steps, vol_dec).
+    """
+    model = get_model(load_name, **overrides)
+    volumes = init_vol - vol_dec * np.arange(steps)
+    return aspiration_heights(model, volumes, init_vol).tolist()
+
+
+# drop-in replacements for the functions pasted into the protocols
+
+def tip_heights(init_vol, steps, vol_dec, **overrides):
+    # 1.5mL VWR tube
+    return schedule('vwr_24_tuberack_1500ul', init_vol, steps, vol_dec, **overrides)
+
+
+def tip_heightsEpp(init_vol, steps, vol_dec, **overrides):
+    # 2mL Eppendorf tube
+    return schedule('opentrons_24_tuberack_eppendorf_2ml_safelock_snapcap',
+                    init_vol, steps, vol_dec, **overrides)
+
+
+def fifty_ml_heights(init_vol, steps, vol_dec, **overrides):
+    # 50mL conical tube
+    return schedule('opentrons_6_tuberack_nest_50ml_conical',
+                    init_vol, steps, vol_dec, **overrides)
+
+
+# -- lookup tables -----------------------------------------------------------
+# Both directions on uniform grids, so a query is an index computation plus
+# one linear interpolation instead of a polynomial evaluation.
+
+class LookupTable:
+    def __init__(self, max_volume, heights, volumes, height_step):
+        self.max_volume = float(max_volume)
+        self.heights = heights  # meniscus height on a uniform volume grid
+        self.volumes = volumes  # volume on a uniform height grid
+        self.volume_step = self.max_volume / (len(heights) - 1)
+        self.height_step = height_step
+
+    @classmethod
+    def build(cls, model, max_volume, size=TABLE_SIZE):
+        vol_grid = np.linspace(0.0, max_volume, size)
+        # the fits are monotonic over their range; keep them so for the inverse
+        heights = np.maximum.accumulate(horner(model.coeffs, vol_grid))
+        height_grid = np.linspace(heights[0], heights[-1], size)
+        volumes = np.interp(height_grid, heights, vol_grid)
+        height_step = (heights[-1] - heights[0]) / (size - 1)
+        return cls(max_volume, heights, volumes, height_step)
+
+    @staticmethod
+    def _lookup(table, x, step):
+        pos = np.clip(np.asarray(x, dtype=float) / step, 0, len(table) - 1)
+        i = np.minimum(pos.astype(int), len(table) - 2)
+        frac = pos - i
+        out = table[i] + (table[i + 1] - table[i]) * frac
+        return float(out) if out.ndim == 0 else out
+
+    def height(self, volume):
+        """Meniscus height (mm) for volume (ul); scalar or array."""
+        return self._lookup(self.heights, volume, self.volume_step)
+
+    def volume(self, height):
+        """Volume (ul) remaining for a meniscus height (mm); scalar or array."""
+        return self._lookup(self.volumes, np.asarray(height, dtype=float) - self.heights[0],
+                            self.height_step)
+
+
+def _cache_path(model, max_volume, size):
+    key = repr((tuple(model.coeffs), float(max_volume), size)).encode()
+    return os.path.join(CACHE_DIR, 'heights-{}.npz'.format(hashlib.sha1(key).hexdigest()[:16]))
+
+
+def _load_table(model, max_volume, size=TABLE_SIZE):
+    path = _cache_path(model, max_volume, size)
+    try:
+        with np.load(path) as data:
+            return LookupTable(max_volume, data['heights'], data['volumes'],
+                               float(data['height_step']))
+    except (OSError, KeyError, ValueError):
+        pass
+    table = LookupTable.build(model, max_volume, size)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        np.savez(path, heights=table.heights, volumes=table.volumes,
+                 height_step=table.height_step)
+    except OSError:
+        pass  # read-only storage: keep the in-memory table
+    return table
+
+
+TABLES = {name: _load_table(MODELS[name], vmax) for name, vmax in TABLE_RANGES.items()}
+
+
+def get_table(load_name):
+    try:
+        return TABLES[load_name]
+    except KeyError:
+        if load_name in MODELS:
+            return TABLES.setdefault(load_name, _load_table(MODELS[load_name], MODELS[load_name].full_volume))
+        raise KeyError('No lookup table for {!r}'.format(load_name))
+
+
+def height_at(load_name, volume):
+    """Meniscus height (mm) for a volume (ul) in this tube type."""
+    return get_table(load_name).height(volume)
+
+
+def volume_at(load_name, height):
+    """Volume (ul) left when the meniscus is at height (mm)."""
+    return get_table(load_name).volume(height)
+
+
+def min_volume(load_name, submerge=0.5, **overrides):
+    """Smallest volume (ul) a tip can still draw from in this tube type.
+
+    Below min_height the tip goes to the floor; it keeps drawing liquid
+    until the meniscus is submerge mm above that.
+    """
+    model = get_model(load_name, **overrides)
+    return float(volume_at(load_name, model.floor + submerge))
@@ -0,0 +1,289 @@
+# Compiled protocols.
+# A protocol's run() recomputes its volumes, heights and well names every
+# time it runs, interleaved with the robot calls. compile_protocol() runs it
+# once against the simulator and keeps only what the robot has to do: the
+# deck (labware, modules, pipettes) and the flat list of resolved commands,
+# every location as a slot, a well and an offset:
+#
+#   ir, hit = compile_protocol('Exp800.06 .../create_probe_matrix.py')
+#   write_replay_protocol(ir, 'create_probe_matrix.replay.py')
+#
+# The IR is cached under .ir/ by a content hash of the protocol, the ottools
+# sources and the Labware/ definitions (plus any extra input files), so an
+# unchanged protocol is never re-simulated. replay() is the robot side: it
+# loads the deck and issues the commands with no protocol code in between.
+#
+# Command rows are [op, who, volume, where, args]:
+#   who    pipette mount, module slot, or None for protocol commands
+#   where  [slot, well, anchor, dx, dy, dz] with anchor 't' (offset from the
+#          well top) or 'b' (from the bottom), whichever is nearer;
+#          [x, y, z] for a bare deck point; None
+#   args   {} or the extras: rate, flow_rate, v_offset, height, seconds, msg, celsius;
+#          speed: the gantry speed (mm/s) when max_speeds / default_speed
+#          changed it; move_speed: a move_to(speed=...)
+import glob
+import hashlib
+import json
+import os
+
+from . import geometry, registry, sim
+
+IR_VERSION = 1
+CACHE_DIR = os.path.join(geometry.REPO_ROOT, '.ir')
+
+# trace names that only group the aspirate/dispense/... recorded under them
+GROUPS = ('mix', 'transfer', 'distribute', 'consolidate')
+MODULE_OPS = ('start_set_temperature', 'await_temperature', 'set_temperature', 'deactivate')
+
+
+class CompileError(Exception):
+    pass
+
+
+def source_hash(path, inputs=()):
+    """Content hash of everything a compiled protocol depends on."""
+    digest = hashlib.sha256('ir{}'.format(IR_VERSION).encode())
+    ottools = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py')))
+    labware = sorted(registry.find_definitions().values())
+    for name in [path] + list(inputs) + ottools + labware:
+        with open(name, 'rb') as f:
+            digest.update(os.path.basename(name).encode())
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _round(value):
+    return None if value is None else round(float(value), 3)
+
+
+def _wells(ctx):
+    """repr of every well on the deck -> (slot, well)."""
+    return {repr(well): (slot, well) for slot, lw in ctx.loaded_labwares.items()
+            for well in lw.wells()}
+
+
+def _where(cmd, wells):
+    if cmd.point is None:
+        return None
+    if cmd.location not in wells:
+        return [_round(c) for c in cmd.point]
+    slot, well = wells[cmd.location]
+    bottom = well.bottom().point
+    dx, dy, dz = (_round(p - b) for p, b in zip(cmd.point, bottom))
+    if abs(dz - well.depth) < abs(dz):
+        return [slot, well.well_name, 't', dx, dy, _round(dz - well.depth)]
+    return [slot, well.well_name, 'b', dx, dy, dz]
+
+
+def _deck(ctx):
+    modules = [{'slot': slot, 'name': module.name} for slot, module in sorted(ctx.loaded_modules.items())]
+    labware = []
+    for slot, lw in sorted(ctx.loaded_labwares.items(), key=lambda item: int(item[0])):
+        if lw is ctx.fixed_trash:
+            continue
+        entry = {'slot': slot, 'load_name': lw.load_name}
+        if lw.name != lw.load_name:
+            entry['label'] = lw.name
+        if slot in ctx.loaded_modules:
+            entry['module'] = True
+        labware.append(entry)
+    instruments = [{'mount': mount, 'name': instr.name,
+                    'tip_racks': [rack.slot for rack in instr.tip_racks]}
+                   for mount, instr in sorted(ctx.loaded_instruments.items())]
+    return modules, labware, instruments
+
+
+def build_ir(ctx, source=None, digest=None):
+    """IR dict of a simulated context."""
+    modules, labware, instruments = _deck(ctx)
+    mounts = {}
+    for entry in instruments:
+        if entry['name'] in mounts:
+            raise CompileError('Two {} pipettes; the trace cannot tell them apart'.format(entry['name']))
+        mounts[entry['name']] = entry['mount']
+    module_slots = {}
+    for entry in modules:
+        module_slots.setdefault(entry['name'], entry['slot'])
+    wells = _wells(ctx)
+    parents = {cmd.parent for cmd in ctx.trace if cmd.parent is not None}
+    commands = []
+    for cmd in ctx.trace:
+        if cmd.name in GROUPS and cmd.index in parents:
+            continue
+        params = cmd.params or {}
+        args = {}
+        if cmd.name in ('aspirate', 'dispense'):
+            args = {'rate': params['rate'], 'flow_rate': _round(params['flow_rate'])}
+        elif cmd.name == 'touch_tip':
+            args = {'v_offset': params['v_offset']}
+        elif cmd.name in ('delay', 'pause', 'comment'):
+            args = {key: params[key] for key in ('seconds', 'msg') if params.get(key) is not None}
+        elif cmd.name in MODULE_OPS and 'celsius' in params:
+            args = {'celsius': params['celsius']}
+        if cmd.name in MODULE_OPS:
+            who = module_slots[params['module']]
+        elif cmd.instrument is not None:
+            who = mounts[cmd.instrument]
+        else:
+            who = None
+        where = _where(cmd, wells)
+        if cmd.name == 'air_gap':
+            well = wells[cmd.location][1]
+            args = {'height': _round(cmd.point[2] - well.top().point.z)}
+        for key in ('speed', 'move_speed'):
+            if key in params:
+                args[key] = _round(params[key])
+        commands.append([cmd.name, who, _round(cmd.volume), where, args])
+    return {
+        'version': IR_VERSION,
+        'source': source,
+        'hash': digest,
+        'api_version': str(ctx.api_version),
+        'metadata': getattr(ctx, 'metadata', {}) or {},
+        'runtime': _round(ctx.runtime),
+        'modules': modules,
+        'labware': labware,
+        'instruments': instruments,
+        'commands': commands,
+    }
+
+
+def dumps(ir, fmt='json'):
+    """IR as bytes: compact JSON, or MessagePack when the msgpack package is installed."""
+    if fmt == 'msgpack':
+        import msgpack
+        return msgpack.packb(ir, use_bin_type=True)
+    return json.dumps(ir, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data, fmt='json'):
+    if fmt == 'msgpack':
+        import msgpack
+        return msgpack.unpackb(data, raw=False)
+    return json.loads(data)
+
+
+def compile_protocol(path, inputs=(), cache_dir=CACHE_DIR, fmt='json'):
+    """(IR, cache hit) for the protocol at path.
+
+    inputs: extra files the protocol reads (a plate map, ...) that belong
+    in the cache key.
+    """
+    digest = source_hash(path, inputs)
+    cached = os.path.join(cache_dir, '{}.{}'.format(digest, fmt))
+    if os.path.exists(cached):
+        with open(cached, 'rb') as f:
+            return loads(f.read(), fmt), True
+    ctx = sim.simulate(path)
+    ir = build_ir(ctx, os.path.relpath(path, geometry.REPO_ROOT), digest)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = '{}.{}.tmp'.format(cached, os.getpid())
+    with open(tmp, 'wb') as f:
+        f.write(dumps(ir, fmt))
+    os.replace(tmp, cached)
+    return ir, False
+
+
+# -- replay ------------------------------------------------------------------
+
+def _location(labware, where):
+    # opentrons is only importable on the robot or inside ottools.sim
+    from opentrons import types
+    if len(where) == 3:
+        return types.Location(types.Point(*where), None)
+    slot, well, anchor, dx, dy, dz = where
+    well = labware[slot][well]
+    location = well.top(dz) if anchor == 't' else well.bottom(dz)
+    return location.move(types.Point(dx, dy, 0)) if dx or dy else location
+
+
+def _is_trash(protocol, where):
+    return (where is not None and len(where) == 6 and where[0] == geometry.TRASH_SLOT
+            and where[2:] == ['t', 0, 0, 0])
+
+
+def replay(protocol, ir):
+    """Load the IR's deck into protocol and run its commands."""
+    registry.use_custom_labware(protocol)
+    modules = {entry['slot']: protocol.load_module(entry['name'], entry['slot'])
+               for entry in ir['modules']}
+    labware = {geometry.TRASH_SLOT: protocol.fixed_trash}
+    for entry in ir['labware']:
+        if entry.get('module'):
+            labware[entry['slot']] = modules[entry['slot']].load_labware(
+                entry['load_name'], entry.get('label'))
+        else:
+            labware[entry['slot']] = protocol.load_labware(
+                entry['load_name'], entry['slot'], entry.get('label'))
+    pipettes = {entry['mount']: protocol.load_instrument(
+        entry['name'], entry['mount'], tip_racks=[labware[s] for s in entry['tip_racks']])
+        for entry in ir['instruments']}
+    default_speeds = {mount: pipette.default_speed for mount, pipette in pipettes.items()}
+
+    for op, who, volume, where, args in ir['commands']:
+        if op in MODULE_OPS:
+            module = modules[who]
+            getattr(module, op)(*([args['celsius']] if 'celsius' in args else []))
+        elif who is None:
+            if op == 'delay':
+                protocol.delay(seconds=args.get('seconds', 0), msg=args.get('msg'))
+            elif op == 'pause':
+                protocol.pause(args.get('msg'))
+            elif op == 'comment':
+                protocol.comment(args.get('msg'))
+            elif op == 'home':
+                protocol.home()
+            else:
+                raise CompileError('Unknown protocol command {!r}'.format(op))
+        else:
+            pipette = pipettes[who]
+            pipette.default_speed = args.get('speed', default_speeds[who])
+            _pipette_op(protocol, pipette, labware, op, volume, where, args)
+
+
+def _pipette_op(protocol, pipette, labware, op, volume, where, args):
+    if op == 'pick_up_tip':
+        pipette.pick_up_tip(labware[where[0]][where[1]])
+    elif op == 'drop_tip':
+        if _is_trash(protocol, where):
+            pipette.drop_tip()
+        else:
+            pipette.drop_tip(_location(labware, where))
+    elif op in ('aspirate', 'dispense'):
+        setattr(pipette.flow_rate, op, args['flow_rate'])
+        getattr(pipette, op)(volume, _location(labware, where), rate=args['rate'])
+    elif op == 'touch_tip':
+        pipette.touch_tip(labware[where[0]][where[1]], v_offset=args['v_offset'])
+    elif op == 'air_gap':
+        pipette.air_gap(volume, args['height'])
+    elif op == 'blow_out':
+        pipette.blow_out(_location(labware, where))
+    elif op == 'move_to':
+        pipette.move_to(_location(labware, where), speed=args.get('move_speed'))
+    elif op == 'home':
+        pipette.home()
+    else:
+        raise CompileError('Unknown pipette command {!r}'.format(op))
+
+
+REPLAY_TEMPLATE = '''# Compiled from {source} (IR {hash}); regenerate with
+#   python -m ottools compile "{source}" --replay <this file>
+from opentrons import protocol_api
+from ottools.ir import loads, replay
+
+metadata = {metadata}
+
+IR = loads({ir!r})
+
+
+def run(protocol: protocol_api.ProtocolContext):
+    replay(protocol, IR)
+'''
+
+
+def write_replay_protocol(ir, path):
+    """Write a protocol file that replays ir (embedded as compact JSON)."""
+    metadata = dict(ir['metadata'], apiLevel=ir['metadata'].get('apiLevel', ir['api_version']))
+    with open(path, 'w') as f:
+        f.write(REPLAY_TEMPLATE.format(source=ir['source'], hash=(ir['hash'] or 'uncached')[:12],
+                                       metadata=repr(metadata), ir=dumps(ir).decode('utf-8')))
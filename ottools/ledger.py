@@ -0,0 +1,186 @@
+# Per-well liquid ledger.
+# Keeps the volume in every well up to date as pipettes aspirate and
+# dispense, and hands out the aspiration height for the volume that is
+# actually left, so protocols no longer precompute height schedules and
+# count steps into them by hand (buffer_counter, sample_counter, ...).
+#
+#   ledger = LiquidLedger()
+#   ledger.fill(reagent_rack['A1'], 41250)
+#   ledger.track(p300)
+#   p300.aspirate(200, reagent_rack['A1'])  # goes to the right depth itself
+#
+# Works with the real protocol API and with ottools.sim.
+import functools
+
+from . import heights
+
+
+class LedgerError(Exception):
+    pass
+
+
+def _well_of(location):
+    """Well behind a Well or Location (real API or sim), else None."""
+    if location is None:
+        return None
+    if hasattr(location, 'well_name'):
+        return location
+    labware = getattr(location, 'labware', None)
+    if labware is None:
+        return None
+    if hasattr(labware, 'as_well'):  # LabwareLike in the real API
+        try:
+            return labware.as_well()
+        except Exception:
+            return None
+    return labware if hasattr(labware, 'well_name') else None
+
+
+def _key(well):
+    return repr(well)
+
+
+def _channel_wells(well, channels):
+    """[(well, channels drawing from it)] for a pipette at well.
+
+    A multichannel pipette covers the wells below well in its column, or
+    dips every channel into the same trough (one-row reservoir).
+    """
+    if channels <= 1:
+        return [(well, 1)]
+    labware = well.parent
+    if len(labware.rows()) == 1:
+        return [(well, channels)]
+    for column in labware.columns():
+        if well in column:
+            i = column.index(well)
+            return [(w, 1) for w in column[i:i + channels]]
+    return [(well, channels)]
+
+
+class LiquidLedger:
+    def __init__(self, strict=False):
+        # strict: raise instead of warn when a well would go below empty
+        self.strict = strict
+        self.volumes = {}
+        self.initial = {}
+        self.wells = {}
+        self.warnings = []
+        self._last_well = {}
+        self.overrides = {}
+
+    # -- bookkeeping -------------------------------------------------------
+
+    def fill(self, well, volume, **overrides):
+        """Record that well starts with volume ul.
+
+        overrides replace fields of the tube's height model for this well
+        only, e.g. fill(lurb, 6500, offset=5, min_height=12).
+        """
+        key = _key(well)
+        self.volumes[key] = float(volume)
+        self.initial[key] = float(volume)
+        self.wells[key] = well
+        if overrides:
+            self.overrides[key] = overrides
+
+    def volume(self, well):
+        return self.volumes.get(_key(well), 0.0)
+
+    def remove(self, well, volume):
+        key = _key(well)
+        self.wells.setdefault(key, well)
+        left = self.volumes.get(key, 0.0) - volume
+        self.volumes[key] = left
+        if left < -1e-6:
+            msg = '{}: aspirating {} ul leaves {} ul'.format(well, round(volume, 2), round(left, 2))
+            if self.strict:
+                raise LedgerError(msg)
+            self.warnings.append(msg)
+
+    def add(self, well, volume):
+        key = _key(well)
+        self.wells.setdefault(key, well)
+        self.volumes[key] = self.volumes.get(key, 0.0) + volume
+        self.initial.setdefault(key, 0.0)
+
+    # -- heights -----------------------------------------------------------
+
+    def model(self, well):
+        load_name = getattr(well.parent, 'load_name', None)
+        model = heights.MODELS.get(load_name)
+        overrides = self.overrides.get(_key(well))
+        if model is not None and overrides:
+            model = model._replace(**overrides)
+        return model, load_name
+
+    def aspirate_height(self, well):
+        """Tip height (mm from the bottom) for the volume now in well.
+
+        None if there is no liquid-height model for the well's labware.
+        """
+        model, load_name = self.model(well)
+        if model is None:
+            return None
+        key = _key(well)
+        volume = max(self.volumes.get(key, 0.0), 0.0)
+        init_vol = self.initial.get(key, volume)
+        offset = model.full_offset if init_vol > model.full_volume else model.offset
+        h = heights.get_table(load_name).height(volume) - offset
+        if h < model.min_height:
+            return float(model.floor)
+        return round(h, 1)
+
+    def aspirate_location(self, well):
+        """well.bottom(height) for the current volume (or the well itself)."""
+        h = self.aspirate_height(well)
+        return well if h is None else well.bottom(h)
+
+    # -- pipette tracking --------------------------------------------------
+
+    def track(self, *pipettes):
+        """Wrap aspirate/dispense on each pipette so every call is booked.
+
+        Aspirating from a bare well goes to the ledger's height for it;
+        explicit Locations (well.bottom(3), well.top()) are left alone.
+        """
+        for pipette in pipettes:
+            self._wrap(pipette)
+        return pipettes[0] if len(pipettes) == 1 else pipettes
+
+    def _wrap(self, pipette):
+        aspirate = pipette.aspirate
+        dispense = pipette.dispense
+        ledger = self
+
+        @functools.wraps(aspirate)
+        def tracked_aspirate(volume=None, location=None, rate=1.0):
+            well = _well_of(location) if location is not None else ledger._last_well.get(id(pipette))
+            if well is not None and location is well:
+                location = ledger.aspirate_location(well)
+            before = pipette.current_volume
+            aspirate(volume, location, rate)
+            if well is not None:
+                for w, n in _channel_wells(well, getattr(pipette, 'channels', 1)):
+                    ledger.remove(w, n * (pipette.current_volume - before))
+                ledger._last_well[id(pipette)] = well
+            return pipette
+
+        @functools.wraps(dispense)
+        def tracked_dispense(volume=None, location=None, rate=1.0):
+            well = _well_of(location) if location is not None else ledger._last_well.get(id(pipette))
+            before = pipette.current_volume
+            dispense(volume, location, rate)
+            if well is not None:
+                for w, n in _channel_wells(well, getattr(pipette, 'channels', 1)):
+                    ledger.add(w, n * (before - pipette.current_volume))
+                ledger._last_well[id(pipette)] = well
+            return pipette
+
+        pipette.aspirate = tracked_aspirate
+        pipette.dispense = tracked_dispense
+
+    def report(self):
+        """(well, start volume, end volume) for every well the ledger saw."""
+        return [(self.wells[k], self.initial.get(k, 0.0), self.volumes[k])
+                for k in self.volumes]
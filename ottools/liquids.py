@@ -0,0 +1,41 @@
+# Liquid classes: how long to let each kind of liquid settle.
+# The qPCR scripts used to wait protocol.delay(seconds=1..3) after almost
+# every aspirate and dispense, each number typed in by hand. The waits now
+# come from here, per liquid and per step, so the total can be tuned in one
+# place:
+#
+#   equilibrate(protocol, 'mastermix', 'aspirate')
+#
+# Steps: aspirate (tip pressure settles), withdraw (after lifting the tip,
+# droplets slide down), dispense, mix (before the blow out).
+from collections import namedtuple
+
+LiquidClass = namedtuple('LiquidClass', ['aspirate', 'withdraw', 'dispense', 'mix'])
+
+LIQUID_CLASSES = {
+    # viscous (glycerol) mastermix stocks and bulk mixes
+    'mastermix': LiquidClass(aspirate=2, withdraw=3, dispense=1, mix=2),
+    # mastermix with template/primer added: intermediate tubes, plate wells
+    'reaction': LiquidClass(aspirate=1, withdraw=2, dispense=1, mix=2),
+    # DNA standards and samples
+    'template': LiquidClass(aspirate=2, withdraw=2, dispense=1, mix=0),
+    # primer/probe dilutions, water
+    'aqueous': LiquidClass(aspirate=2, withdraw=2, dispense=1, mix=0),
+}
+
+
+def wait_time(liquid, step):
+    """Seconds to wait after step for this liquid."""
+    try:
+        liquid_class = LIQUID_CLASSES[liquid]
+    except KeyError:
+        raise KeyError('Unknown liquid class {!r}; known: {}'.format(
+            liquid, ', '.join(sorted(LIQUID_CLASSES))))
+    return getattr(liquid_class, step)
+
+
+def equilibrate(protocol, liquid, step):
+    """protocol.delay for the liquid's equilibration time after step (if any)."""
+    seconds = wait_time(liquid, step)
+    if seconds:
+        protocol.delay(seconds=seconds)
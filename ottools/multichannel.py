@@ -0,0 +1,117 @@
+# Multichannel (8-channel) execution.
+# Plate fills are written well by well for a single-channel pipette. When a
+# step puts the same volume into every well of a column and the source is a
+# trough (a one-row reservoir all 8 channels can dip into), one p300/p20
+# multi movement does the work of 8. fill() splits a step that way and
+# leaves everything else (tube sources, partial columns) to the single
+# channel; candidates() finds such steps in a simulated single-channel run.
+ROWS = 'ABCDEFGH'
+
+
+def _labware_of(well):
+    return well.parent
+
+
+def _rows(labware):
+    return len(labware.rows())
+
+
+def is_trough(well):
+    """True if all 8 channels fit in well (one-row reservoir)."""
+    return _rows(_labware_of(well)) == 1
+
+
+def whole_columns(dests, volumes):
+    """Split dests into full 8-well columns and the rest.
+
+    Returns ([(top well, volume)], [(well, volume)]). A column counts when
+    all its wells A-H are in dests with the same volume; columns keep the
+    order of their first well, the rest keeps its own order.
+    """
+    by_column = {}
+    order = []
+    for well, vol in zip(dests, volumes):
+        labware = _labware_of(well)
+        if _rows(labware) != len(ROWS):
+            continue
+        col = well.well_name[1:]
+        key = (id(labware), col)
+        if key not in by_column:
+            by_column[key] = {}
+            order.append((key, labware, col))
+        by_column[key][well.well_name[0]] = vol
+    full = set()
+    columns = []
+    for key, labware, col in order:
+        vols = by_column[key]
+        if set(vols) == set(ROWS) and len(set(vols.values())) == 1:
+            full.add(key)
+            columns.append((labware[ROWS[0] + col], vols[ROWS[0]]))
+    rest = [(w, v) for w, v in zip(dests, volumes)
+            if (id(_labware_of(w)), w.well_name[1:]) not in full]
+    return columns, rest
+
+
+def fill(volume, source, dests, multi=None, single=None, **kwargs):
+    """Transfer volume (one number or one per dest) from source to dests.
+
+    Whole columns go through multi with one column-wise transfer when the
+    source is a trough; everything else goes through single. kwargs are
+    passed to both transfers (new_tip, blow_out, ...). Returns
+    (columns done by multi, wells done by single).
+    """
+    dests = list(dests)
+    volumes = list(volume) if isinstance(volume, (list, tuple)) else [volume] * len(dests)
+    columns, rest = [], list(zip(dests, volumes))
+    if multi is not None and is_trough(source):
+        columns, rest = whole_columns(dests, volumes)
+    if rest and single is None:
+        raise ValueError('{} wells are not whole columns from a trough and no '
+                         'single-channel pipette was given'.format(len(rest)))
+    if columns:
+        multi.transfer([v for _, v in columns], source, [w for w, _ in columns], **kwargs)
+    if rest:
+        single.transfer([v for _, v in rest], source, [w for w, _ in rest], **kwargs)
+    return len(columns), len(rest)
+
+
+# -- finding candidates in a single-channel trace ----------------------------
+
+def candidates(trace):
+    """Whole-column fills in a simulated run, as dicts.
+
+    Each has the source, destination labware, columns, volume and whether
+    the source is already a trough (otherwise the reagent has to be poured
+    into one first).
+    """
+    source = {}
+    fills = {}
+    for cmd in trace:
+        if cmd.location is None or ' of ' not in cmd.location:
+            continue
+        well, labware = cmd.location.split(' of ', 1)
+        if cmd.name == 'aspirate':
+            source[cmd.instrument] = cmd.location
+        elif cmd.name == 'dispense' and cmd.instrument in source:
+            key = (source[cmd.instrument], labware)
+            wells = fills.setdefault(key, {})
+            wells[well] = wells.get(well, 0.0) + (cmd.volume or 0.0)
+    found = []
+    for (src, labware), wells in fills.items():
+        columns = {}
+        for name, vol in wells.items():
+            columns.setdefault(name[1:], {})[name[0]] = round(vol, 2)
+        full = [c for c, rows in columns.items()
+                if set(rows) == set(ROWS) and len(set(rows.values())) == 1]
+        if full:
+            found.append({
+                'source': src, 'labware': labware,
+                'columns': sorted(full, key=int),
+                'volume': columns[full[0]]['A'],
+                'trough': _is_trough_name(src),
+            })
+    return found
+
+
+def _is_trough_name(location):
+    return 'reservoir' in location
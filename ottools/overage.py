@@ -0,0 +1,235 @@
+# Minimum overage (dead volume) per mix.
+# The primer matrix scripts made every mix percent_waste = 20% too big, less
+# a hand-tuned offset per mix (sN_mix_waste_offset, R_mix_waste_offset, ...).
+# Here each tube is filled with exactly what its aspiration schedule draws,
+# plus a film lost in the tip per aspiration, plus the volume the tip cannot
+# reach (heights.min_volume for the tube type). Mixes are sized from the
+# plate back to the stock tubes, so every parent covers its children's fills:
+#
+#   overage, sheet = primer_matrix_overage(F_concs, R_concs)
+#   recipe = primer_matrix(F_concs, R_concs, overage=overage)
+#   print(format_sheet(sheet))
+#
+# The aspiration schedule built in here is the create_primer_matrix scripts'
+# (the robot cannot simulate, so the protocol sizes its mixes with it).
+# traced_sheet() takes the schedule from a simulated run of the protocol
+# instead, so a changed protocol gets a sheet that matches what it draws.
+# The protocol passes its module-level SCHEDULE (None on the robot) on as
+# primer_matrix_overage(..., schedule=SCHEDULE):
+#
+#   overage, sheet, built_in = traced_sheet('Exp800.05 .../create_primer_matrix.py')
+import inspect
+import math
+from collections import namedtuple
+
+from . import heights, recipe, sim
+
+# ul left as a film inside the tip after each aspiration
+RETENTION = 0.5
+P300_MAX = 200
+P20_MAX = 20
+
+# primer_matrix defaults, for the counts the schedule needs
+DEFAULTS = {name: param.default for name, param in
+            inspect.signature(recipe.primer_matrix).parameters.items()}
+
+# one row of the fill sheet; nominal: the ul the recipe sizes the mix from (its
+# overage is fill / nominal - 1); dispensed: ul the tube's draws deliver to
+# other wells; components are (ingredient, ul) pairs
+Fill = namedtuple('Fill', ['tube', 'load_name', 'count', 'nominal', 'fill', 'dead', 'draws',
+                           'components', 'dispensed'])
+
+# where the create_primer_matrix scripts keep each tube: (slot, wells)
+PRIMER_MATRIX_TUBES = {
+    'BPW_mix': ('1', ('D1',)),
+    'sN_mix': ('2', ('D1',)),
+    'std_mix': ('2', ('C3', 'C4', 'C5', 'C6', 'D3', 'D4', 'D5', 'D6')),
+    'bpwd_mix': ('1', ('A1',)),
+    'R_mix': ('1', ('C4', 'C5', 'C6', 'D4', 'D5', 'D6')),
+    'F_int': ('1', ('A4', 'A5', 'A6', 'B4', 'B5', 'B6')),
+}
+
+
+class Schedule(dict):
+    """A traced schedule, {tube: (draws, dispensed)}, that keeps the
+    arguments of each primer_matrix_overage call it is passed to."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+
+def split(volume, max_volume):
+    """volume as equal aspirations of at most max_volume.
+
+    The primer matrix scripts' split_asp, less its extra draw for a volume
+    between one and two max_volume (three aspirations where two do).
+    """
+    n = max(int(math.ceil(volume / float(max_volume) - 1e-9)), 1)
+    return [volume / n] * n
+
+
+def min_fill(load_name, draws, retention=RETENTION, **overrides):
+    """Smallest starting volume (ul) that serves every aspiration in draws."""
+    return sum(draws) + retention * len(draws) + heights.min_volume(load_name, **overrides)
+
+
+def _schedule(schedule, tube, draws, dispensed=None):
+    # (draws, dispensed) of tube: the traced ones when given, else the built-in
+    if schedule and tube in schedule:
+        return schedule[tube]
+    return draws, sum(draws) if dispensed is None else dispensed
+
+
+def _fill(tube, count, nominal, schedule, parts, retention):
+    """Fill row for a tube holding nominal ul of reactions scaled to cover
+    its (draws, dispensed) schedule."""
+    draws, dispensed = schedule
+    load_name = recipe.TUBES[tube + '_tot']
+    fill = min_fill(load_name, draws, retention)
+    scale = fill / nominal
+    return Fill(tube, load_name, count, nominal, fill, heights.min_volume(load_name),
+                len(draws), [(name, vol * scale) for name, vol in parts], dispensed)
+
+
+def primer_matrix_overage(F_concs, R_concs, retention=RETENTION, p300_max=P300_MAX,
+                          p20_max=P20_MAX, schedule=None, **kwargs):
+    """({mix: overage fraction}, [Fill]) for one primer matrix design.
+
+    The F intermediates have no overage (their volume is F_int_vol); a
+    ValueError says so if F_int_vol is too small for their draws.
+
+    kwargs are primer_matrix arguments (reaction volume, replicates, ...);
+    the aspiration schedule is the one the create_primer_matrix scripts
+    run: plate wells filled 6 R mix doses per p300 trip, 3 standard
+    replicates per std mix with the p20, one p20 aspiration per F
+    intermediate, mixes moved in equal p300 aspirations. schedule
+    ({tube: (draws, dispensed)}, see traced_schedule) replaces it per tube.
+    """
+    if isinstance(schedule, Schedule):
+        schedule.calls.append((F_concs, R_concs, dict(
+            kwargs, retention=retention, p300_max=p300_max, p20_max=p20_max)))
+    kwargs.pop('overage', None)
+    r = {name: value.tolist() for name, value in
+         recipe.primer_matrix(F_concs, R_concs, **kwargs).items()}
+    arg = dict(DEFAULTS, **kwargs)
+    R_reps, reps, dna = arg['R_reps'], arg['std_NTC_reps'], arg['dna_per_rxn']
+    sds_NTC, samp = arg['tot_stds'] + arg['tot_NTCs'], arg['tot_samp']
+    n_R = len(r['R_rxn'])
+    n_std = int(math.ceil(sds_NTC / float(reps)))
+
+    # F intermediates: each F tube doses two wells per R row from a full p20
+    # tip; their volume is a design input (F_int_vol), so the row only shows
+    # how far above the draws and dead volume it is
+    F_load_name = recipe.TUBES['F_int_vol']
+    F_dose = 2 * r['max_vol_F_per_rxn'] * n_R
+    F_draws, F_dispensed = _schedule(schedule, 'F_int', [p20_max] * len(split(F_dose, p20_max)),
+                                     F_dose)
+    F_int = Fill('F_int', F_load_name, len(r['F_int_conc']), F_dispensed, r['F_int_vol'],
+                 heights.min_volume(F_load_name), len(F_draws),
+                 [('F primer (per tube)', r['F_int_primer']), ('water', r['F_int_water'])],
+                 F_dispensed)
+    if r['F_int_vol'] < min_fill(F_load_name, F_draws, retention):
+        raise ValueError('F_int_vol {} ul is below the {:.1f} ul the F tubes need'.format(
+            r['F_int_vol'], min_fill(F_load_name, F_draws, retention)))
+    # one R mix per row: R_reps wells, 6 doses per p300 trip
+    R_row = r['R_mix_rxn'] * R_reps
+    R_draws = _schedule(schedule, 'R_mix', split(R_row, min(6 * r['R_mix_rxn'], p300_max)))
+    R_mix = _fill('R_mix', n_R, R_row, R_draws,
+                  [('bpwd_mix', r['bpwd_rxn'] * R_reps),
+                   ('R primer + water', r['max_vol_R_per_rxn'] * R_reps)], retention)
+    # std mixes: reps wells each from the p20
+    std_nominal = (r['BPW_sN_rxn'] + dna) * reps
+    std_draws = _schedule(schedule, 'std_mix', split(arg['tot_rxn_vol'], p20_max) * reps)
+    std_mix = _fill('std_mix', n_std, std_nominal, std_draws,
+                    [('sN_mix', r['BPW_sN_rxn'] * reps), ('std DNA', dna * reps)], retention)
+    # bpwd_mix feeds every R mix, two aspirations each
+    bpwd_draws = _schedule(schedule, 'bpwd_mix', [
+        v for _ in range(n_R) for v in split(R_mix.components[0][1], p300_max)])
+    bpwd_nominal = r['bpwd_rxn'] * samp
+    bpwd_mix = _fill('bpwd_mix', 1, bpwd_nominal, bpwd_draws,
+                     [('BPW_mix', r['BPW_rxn'] * samp), ('std DNA + water', dna * samp)],
+                     retention)
+    # sN_mix feeds every std mix
+    sN_nominal = r['BPW_sN_rxn'] * sds_NTC
+    sN_draws = _schedule(schedule, 'sN_mix', [
+        v for _ in range(n_std) for v in split(std_mix.components[0][1], p300_max)])
+    sN_mix = _fill('sN_mix', 1, sN_nominal, sN_draws,
+                   [('BPW_mix', r['BPW_rxn'] * sds_NTC),
+                    ('water', r['std_woff_per_sN_rxn'] * sds_NTC),
+                    ('F primer', r['std_vol_F_per_rxn'] * sds_NTC),
+                    ('R primer', r['std_vol_R_per_rxn'] * sds_NTC)], retention)
+    # BPW_mix feeds sN_mix and bpwd_mix
+    BPW_draws = _schedule(schedule, 'BPW_mix', split(sN_mix.components[0][1], p300_max)
+                          + split(bpwd_mix.components[0][1], p300_max))
+    BPW_nominal = r['BPW_rxn'] * (sds_NTC + samp)
+    BPW_mix = _fill('BPW_mix', 1, BPW_nominal, BPW_draws, [('base + probe + water', BPW_nominal)],
+                    retention)
+    sheet = [BPW_mix, sN_mix, std_mix, bpwd_mix, R_mix, F_int]
+    overage = {row.tube.split('_')[0]: row.fill / row.nominal - 1 for row in sheet[:-1]}
+    return overage, sheet
+
+
+def format_sheet(sheet):
+    """The fill sheet; over % is the fill over what the tube dispenses."""
+    lines = ['{:<10} {:>3} x {:<34} {:>8} {:>8} {:>9} {:>7} {:>6}'.format(
+        'tube', 'n', 'type', 'fill ul', 'min ul', 'dispensed', 'over %', 'draws')]
+    for row in sheet:
+        lines.append('{:<10} {:>3} x {:<34} {:>8.1f} {:>8.1f} {:>9.1f} {:>7.1f} {:>6}'.format(
+            row.tube, row.count, row.load_name, row.fill, row.dead, row.dispensed,
+            100 * (row.fill / row.dispensed - 1), row.draws))
+        for name, vol in row.components:
+            vols = vol if isinstance(vol, list) else [vol]
+            lines.append('{:>14} {:<28} {}'.format('', name, '  '.join('{:.1f}'.format(v) for v in vols)))
+    return '\n'.join(lines)
+
+
+# -- schedule from a simulated run ------------------------------------------------
+
+def traced_schedule(ctx, tubes=PRIMER_MATRIX_TUBES):
+    """{tube: (draws, dispensed)} from a simulated run: the aspirations
+    from each tube (mixing in place left out) and the ul they delivered to
+    other wells. For a tube kind with several tubes, the one drawn most."""
+    names = {}
+    for tube, (slot, wells) in tubes.items():
+        for well in wells:
+            names[repr(ctx.loaded_labwares[slot][well])] = tube, well
+    by_index = {cmd.index: cmd for cmd in ctx.trace}
+    draws, dispensed, source = {}, {}, {}
+    for cmd in ctx.trace:
+        if cmd.parent is not None and by_index[cmd.parent].name == 'mix':
+            continue
+        if cmd.name == 'aspirate':
+            source[cmd.instrument] = names.get(cmd.location)
+            if source[cmd.instrument] is not None:
+                draws.setdefault(source[cmd.instrument], []).append(round(cmd.volume, 3))
+        elif cmd.name == 'dispense' and source.get(cmd.instrument) is not None:
+            if names.get(cmd.location) != source[cmd.instrument]:
+                key = source[cmd.instrument]
+                dispensed[key] = dispensed.get(key, 0.0) + cmd.volume
+    found = {}
+    for (tube, _), amounts in draws.items():
+        if tube not in found or sum(amounts) > sum(found[tube][0]):
+            found[tube] = amounts, round(dispensed.get((tube, _), 0.0), 3)
+    return found
+
+
+def traced_sheet(path, tubes=PRIMER_MATRIX_TUBES, rounds=6):
+    """(overage, sheet, built-in sheet) of the primer matrix protocol at path,
+    with the aspiration schedule taken from its simulated trace.
+
+    A mix's draws depend on the fills of the tubes it feeds, so the protocol
+    is re-simulated with the traced schedule (its SCHEDULE switch) until the
+    trace repeats.
+    """
+    schedule = Schedule()
+    for _ in range(rounds):
+        found = traced_schedule(sim.simulate(path, switches={'SCHEDULE': schedule}), tubes)
+        if not schedule.calls:
+            raise ValueError('{} does not call primer_matrix_overage'.format(path))
+        if found == schedule:
+            F_concs, R_concs, kwargs = schedule.calls[-1]
+            overage, sheet = primer_matrix_overage(F_concs, R_concs, schedule=found, **kwargs)
+            return overage, sheet, primer_matrix_overage(F_concs, R_concs, **kwargs)[1]
+        schedule = Schedule(found)
+    raise ValueError('the traced schedule of {} did not settle in {} runs'.format(path, rounds))
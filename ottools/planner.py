@@ -0,0 +1,107 @@
+# Multi-dispense planner.
+# Turns "one aspirate + one dispense per well" into as few aspirations as the
+# pipette can hold: each trip aspirates the sum of several wells plus a
+# disposal bolus, dispenses well by well, then returns the bolus. The plan is
+# plain data (destination indices and volumes) so it can be printed, costed
+# or executed.
+import math
+from collections import namedtuple
+
+# aspirate: ul drawn from the source; dispenses: [(dest index, ul)]
+Step = namedtuple('Step', ['aspirate', 'dispenses', 'disposal'])
+
+
+class MultiDispensePlan:
+    def __init__(self, steps, volumes, max_volume, disposal):
+        self.steps = steps
+        self.volumes = list(volumes)
+        self.max_volume = max_volume
+        self.disposal = disposal
+
+    @property
+    def trips(self):
+        """Aspirations (source -> destinations round trips) in this plan."""
+        return len(self.steps)
+
+    @property
+    def baseline_trips(self):
+        """Trips for the one-aspirate-per-well pattern the protocols use now."""
+        return sum(int(math.ceil(v / self.max_volume - 1e-9)) for v in self.volumes if v > 0)
+
+    @property
+    def trips_saved(self):
+        return self.baseline_trips - self.trips
+
+    def summary(self):
+        return '{} wells: {} trips instead of {} ({} saved), {:g} ul disposal per trip'.format(
+            len(self.volumes), self.trips, self.baseline_trips, self.trips_saved,
+            self.disposal)
+
+    def __repr__(self):
+        return '<MultiDispensePlan {}>'.format(self.summary())
+
+
+def plan_multi_dispense(volumes, max_volume, disposal=0.0):
+    """Group destination volumes into the fewest aspirations.
+
+    Destinations keep their order (reorder them first if travel matters).
+    A volume that does not fit in one trip with the disposal is split into
+    equal parts, each its own trip.
+    """
+    capacity = max_volume - disposal
+    if capacity <= 0:
+        raise ValueError('disposal volume {} leaves no room in a {} ul tip'.format(
+            disposal, max_volume))
+    steps = []
+    batch = []
+    for i, vol in enumerate(volumes):
+        if vol <= 0:
+            continue
+        if vol > capacity:
+            if batch:
+                steps.append(_step(batch, disposal))
+                batch = []
+            parts = int(math.ceil(vol / capacity - 1e-9))
+            for _ in range(parts):
+                steps.append(_step([(i, vol / parts)], disposal))
+            continue
+        if batch and sum(v for _, v in batch) + vol > capacity + 1e-9:
+            steps.append(_step(batch, disposal))
+            batch = []
+        batch.append((i, vol))
+    if batch:
+        steps.append(_step(batch, disposal))
+    return MultiDispensePlan(steps, volumes, max_volume, disposal)
+
+
+def _step(batch, disposal):
+    return Step(sum(v for _, v in batch) + disposal, list(batch), disposal)
+
+
+def execute(pipette, source, destinations, plan, disposal_location=None,
+            touch_tip=False, rate=1.0):
+    """Run a plan with a pipette that already holds a tip.
+
+    The disposal bolus is dispensed back into the source (or
+    disposal_location) and blown out after every trip.
+    """
+    for step in plan.steps:
+        pipette.aspirate(step.aspirate, source, rate=rate)
+        if touch_tip:
+            pipette.touch_tip()
+        for index, vol in step.dispenses:
+            pipette.dispense(vol, destinations[index], rate=rate)
+        if step.disposal:
+            where = disposal_location if disposal_location is not None else _top_of(source)
+            pipette.dispense(step.disposal, where)
+            pipette.blow_out()
+    return plan
+
+
+def _top_of(location):
+    if hasattr(location, 'top'):
+        return location.top()
+    well = getattr(location, 'labware', None)
+    if hasattr(well, 'as_well'):
+        well = well.as_well()
+    return well.top()
@@ -0,0 +1,195 @@
+# Plate geometry index.
+# The std-curve and probe-matrix scripts find the replicate wells next to a
+# start well by pulling the digits out of its name, joining them, adding an
+# offset and building a new name for plate[...], inside their inner loops.
+# well_index() does that work once per layout: a grid of integer well
+# indices (row x column) built from the labware definition's own ordering,
+# so a neighbour or replicate block is an array lookup:
+#
+#   index = well_index(plate)
+#   for dest in index.block('G1', 3):   # G1, G2, G3
+#       p20.dispense(20, dest.bottom(2))
+#
+# read_plate_map() reads a CSV plate map (one row per well, one column per
+# reagent slot) and indexes reagent -> wells in the same pass, so handing
+# every reagent to its wells is one distribute per reagent with no rescans
+# of the well list, whatever the plate size:
+#
+#   plate_map = read_plate_map('plate.map.csv')
+#   distribute_reagents(p20, 1, plate, plate_map.index['F_primer'], sources)
+import csv
+import weakref
+from collections import namedtuple
+
+import numpy as np
+
+from . import travel
+
+# integer layouts, shared by every labware with the same well ordering
+_layouts = {}
+# WellIndex per labware object
+_indexes = weakref.WeakKeyDictionary()
+
+
+class Layout:
+    """Integer geometry of one well ordering.
+
+    grid[row, col] is the position of that well in labware.wells() (-1 if
+    the grid has a hole); row_of/col_of go the other way.
+    """
+
+    def __init__(self, names, columns):
+        self.names = names
+        position = {name: i for i, name in enumerate(names)}
+        n_rows = max(len(col) for col in columns)
+        self.grid = np.full((n_rows, len(columns)), -1, dtype=int)
+        for c, column in enumerate(columns):
+            for r, name in enumerate(column):
+                self.grid[r, c] = position[name]
+        self.row_of = np.empty(len(names), dtype=int)
+        self.col_of = np.empty(len(names), dtype=int)
+        rows, cols = np.nonzero(self.grid >= 0)
+        self.row_of[self.grid[rows, cols]] = rows
+        self.col_of[self.grid[rows, cols]] = cols
+        self.position = position
+
+    @property
+    def shape(self):
+        return self.grid.shape
+
+    def offset(self, i, rows=0, cols=0):
+        """Position of the well rows down and cols right of position i, or -1."""
+        r, c = self.row_of[i] + rows, self.col_of[i] + cols
+        if 0 <= r < self.grid.shape[0] and 0 <= c < self.grid.shape[1]:
+            return int(self.grid[r, c])
+        return -1
+
+
+def _layout(labware):
+    names = tuple(w.well_name for w in labware.wells())
+    layout = _layouts.get(names)
+    if layout is None:
+        columns = [[w.well_name for w in col] for col in labware.columns()]
+        layout = _layouts[names] = Layout(names, columns)
+    return layout
+
+
+class WellIndex:
+    """Wells of one labware addressed by (row, col) and by neighbour."""
+
+    def __init__(self, labware):
+        self.labware = labware
+        self.wells = labware.wells()
+        self.layout = _layout(labware)
+
+    def _pos(self, well):
+        if isinstance(well, str):
+            return self.layout.position[well]
+        return self.layout.position[well.well_name]
+
+    def at(self, row, col):
+        """Well at 0-based (row, col)."""
+        i = self.layout.grid[row, col]
+        if i < 0:
+            raise KeyError('No well at row {} col {}'.format(row, col))
+        return self.wells[i]
+
+    def row_col(self, well):
+        """0-based (row, col) of a well or well name."""
+        i = self._pos(well)
+        return int(self.layout.row_of[i]), int(self.layout.col_of[i])
+
+    def neighbour(self, well, rows=0, cols=1):
+        """The well rows down and cols right of well (default: the next column)."""
+        i = self.layout.offset(self._pos(well), rows, cols)
+        if i < 0:
+            raise KeyError('{} has no well {} rows down, {} cols right'.format(
+                getattr(well, 'well_name', well), rows, cols))
+        return self.wells[i]
+
+    def wells_of(self, names):
+        """Wells for a list of well names (or Wells), in that order."""
+        return [self.wells[self._pos(name)] for name in names]
+
+    def block(self, well, n, step=1, axis='row'):
+        """n wells from well along its row (or column with axis='col'),
+        every step-th one: the replicate wells of a start well."""
+        r, c = self.row_col(well)
+        if axis == 'row':
+            idx = self.layout.grid[r, c:c + n * step:step]
+        else:
+            idx = self.layout.grid[r:r + n * step:step, c]
+        if len(idx) < n or (idx < 0).any():
+            raise KeyError('{} has no {} wells along its {}'.format(
+                getattr(well, 'well_name', well), n, axis))
+        return [self.wells[i] for i in idx]
+
+
+def well_index(labware):
+    """The (cached) WellIndex of labware."""
+    index = _indexes.get(labware)
+    if index is None:
+        index = _indexes[labware] = WellIndex(labware)
+    return index
+
+
+# wells: well names in file order; index: {column: {reagent: [well names]}}
+PlateMap = namedtuple('PlateMap', ['wells', 'index'])
+
+
+def read_plate_map(source, well_column='well'):
+    """PlateMap of a CSV (path or open file) with one row per well.
+
+    Every column but well_column is a reagent slot (F_primer, R_primer, ...);
+    a blank cell means the well gets nothing from that slot. Reagents and
+    their wells keep the order they first appear in the file.
+    """
+    if isinstance(source, str):
+        with open(source, newline='') as handle:
+            return read_plate_map(handle, well_column)
+    reader = csv.DictReader(source)
+    fields = [name.strip() for name in reader.fieldnames or []]
+    if well_column not in fields:
+        raise ValueError('Plate map has no {!r} column (columns: {})'.format(
+            well_column, ', '.join(fields)))
+    reader.fieldnames = fields
+    columns = [name for name in fields if name != well_column]
+    index = {name: {} for name in columns}
+    wells = []
+    seen = set()
+    for row in reader:
+        well = (row[well_column] or '').strip()
+        if not well:
+            continue
+        if well in seen:
+            raise ValueError('Well {} is listed twice in the plate map'.format(well))
+        seen.add(well)
+        wells.append(well)
+        for name in columns:
+            reagent = (row[name] or '').strip()
+            if reagent:
+                index[name].setdefault(reagent, []).append(well)
+    return PlateMap(wells, index)
+
+
+def distribute_reagents(pipette, volume, plate, groups, sources, location=None, **kwargs):
+    """One pipette.distribute of volume per reagent of groups, from its source.
+
+    groups is {reagent: [well names]} (a PlateMap.index column), sources
+    {reagent: source well}. Each reagent's wells are visited in a short path
+    from its source (ottools.travel); location(well), if given, is where in
+    each well to dispense. kwargs go to distribute. Returns
+    [(reagent, [wells])] in the order run.
+    """
+    missing = [reagent for reagent in groups if reagent not in sources]
+    if missing:
+        raise KeyError('No source tube for {}'.format(', '.join(missing)))
+    index = well_index(plate)
+    done = []
+    for reagent, names in groups.items():
+        source = sources[reagent]
+        wells = travel.order_wells(index.wells_of(names), start=source)
+        dests = [location(well) for well in wells] if location else wells
+        pipette.distribute(volume, source, dests, **kwargs)
+        done.append((reagent, wells))
+    return done
@@ -0,0 +1,197 @@
+# Reagent recipe for the F/R primer concentration matrix (Exp800.05).
+# The create_primer_matrix scripts used to spell the recipe out as ~100
+# scalar assignments, one per concentration (R_50_rxn, R_100_mix,
+# F_800_int_water, ...). primer_matrix() does the same arithmetic on NumPy
+# arrays in one pass:
+#
+#   r = primer_matrix([50, 100, 200, 400, 600, 800], [50, 100, 200, 400, 600, 800])
+#   r['R_mix_tot']   # ul in each R mix tube, one per R concentration
+#
+# Every scalar argument may also be an array of designs, e.g.
+# tot_rxn_vol=np.array([20, 25, 50]) or percent_waste=np.linspace(.1, .3, 100),
+# and the concentration lists may be 2-D (one row per design), so a sweep of
+# hundreds of matrix layouts is one call; check_capacity() then flags every
+# design that overfills a tube.
+import numpy as np
+
+from . import geometry
+
+# tube type holding each mix in the scripts' deck layout
+TUBES = {
+    'BPW_mix_tot': 'eppendorf_24_tuberack_2000ul',  # 2 mL tube in the fuge rack
+    'sN_mix_tot': 'vwr_24_tuberack_1500ul',
+    'bpwd_mix_tot': 'vwr_24_tuberack_1500ul',
+    'std_mix_tot': 'vwr_24_tuberack_1500ul',
+    'R_mix_tot': 'vwr_24_tuberack_1500ul',
+    'F_int_vol': 'vwr_24_tuberack_1500ul',
+}
+
+
+def _design(x):
+    """Per-design scalar as (..., 1) so it broadcasts against concentrations."""
+    return np.asarray(x, dtype=float)[..., np.newaxis]
+
+
+def _factor(overage, mix, default):
+    return 1 + (_design(overage[mix]) if mix in overage else default)
+
+
+def primer_matrix(F_concs, R_concs, orig_F_conc=10, orig_R_conc=10, orig_P_conc=10,
+                  std_F_conc=300, std_R_conc=300, P_conc=300, tot_stds=21, tot_NTCs=3,
+                  tot_samp=72, rxn_base=11.2, tot_rxn_vol=20, dna_per_rxn=2,
+                  dna_per_rxn_10x=0.2, std_NTC_reps=3, R_reps=12, F_int_vol=100,
+                  percent_waste=0.20, sN_mix_waste_offset=0.025, R_mix_waste_offset=0.11,
+                  std_NTC_waste_offset=0.028, bpw_waste_offset=0.032, overage=None):
+    """Every volume (ul) of the primer matrix recipe, as a dict of arrays.
+
+    Concentrations in nM (primer/probe stocks in uM), names and defaults as
+    in create_primer_matrix.py. Per-design values have the broadcast shape
+    of the scalar arguments; per-concentration values (R_*, F_int_*) have
+    one more axis, along the concentration list.
+
+    overage ({mix: fraction}, see ottools.overage) replaces percent_waste
+    and the hand-tuned offsets for the mixes it names: BPW, sN, std, bpwd
+    and R.
+    """
+    F_concs = np.asarray(F_concs, dtype=float)
+    R_concs = np.asarray(R_concs, dtype=float)
+    rxn_vol = _design(tot_rxn_vol)
+    dna = _design(dna_per_rxn)
+    waste = _design(percent_waste)
+    sds_NTC = _design(tot_stds) + _design(tot_NTCs)
+    samp = _design(tot_samp)
+    reps = _design(std_NTC_reps)
+    R_reps = _design(R_reps)
+    F_int_vol = _design(F_int_vol)
+    overage = overage or {}
+    # waste factor of each mix: percent_waste less its hand-tuned offset
+    BPW_waste = _factor(overage, 'BPW', waste)
+    sN_waste = _factor(overage, 'sN', waste - _design(sN_mix_waste_offset))
+    std_waste = _factor(overage, 'std', waste - _design(std_NTC_waste_offset))
+    bpw_waste = _factor(overage, 'bpwd', waste - _design(bpw_waste_offset))
+    R_waste = _factor(overage, 'R', waste - _design(R_mix_waste_offset))
+
+    P_per_rxn = _design(P_conc) / 1000 * rxn_vol / _design(orig_P_conc)
+    # the largest primer addition sets the fixed primer volume of every well
+    max_F = F_concs.max(axis=-1, keepdims=True) / 1000 * rxn_vol / _design(orig_F_conc)
+    max_R = R_concs.max(axis=-1, keepdims=True) / 1000 * rxn_vol / _design(orig_R_conc)
+    water_per_rxn = rxn_vol - dna - _design(rxn_base) - P_per_rxn - max_F - max_R
+    std_F = _design(std_F_conc) / 1000 * rxn_vol / _design(orig_F_conc)
+    std_R = _design(std_R_conc) / 1000 * rxn_vol / _design(orig_R_conc)
+    BPW_rxn = _design(rxn_base) + P_per_rxn + water_per_rxn
+    std_woff_per_sN_rxn = max_F - std_F + max_R - std_R
+    BPW_sN_rxn = BPW_rxn + std_F + std_R + std_woff_per_sN_rxn
+    bpwd_rxn = BPW_rxn + dna
+
+    # standards and NTCs
+    BPW_mix_xfer_sN_mix = sds_NTC * sN_waste * BPW_rxn
+    std_woff_add_to_sN_mix = std_woff_per_sN_rxn * sds_NTC * sN_waste
+    F_add_to_sN_mix = sds_NTC * sN_waste * std_F
+    R_add_to_sN_mix = sds_NTC * sN_waste * std_R
+    sN_mix_xfer_to_stds_mix = BPW_sN_rxn * reps * std_waste
+    std_DNA_xfer_to_stds_mix = dna * reps * std_waste
+
+    # samples: 10x concentrated DNA topped up with water
+    bpw_mix_xfer_bpwd_mix = samp * BPW_rxn * bpw_waste
+    std_DNA_xfer_to_bpwd_mix = dna * samp * bpw_waste
+    dna_XFR_bpwd_mix = samp * _design(dna_per_rxn_10x) * bpw_waste
+    water_XFR_bpwd_mix = samp * (dna - _design(dna_per_rxn_10x)) * bpw_waste
+    bpwd_mix_xfer_R_mix = bpwd_rxn * R_reps * R_waste
+
+    # one R mix per R concentration
+    R_rxn = R_concs / 1000 * rxn_vol / _design(orig_R_conc)
+    R_primer_mix = R_rxn * R_reps * R_waste
+    R_woff_rxn = max_R - R_rxn
+    R_woff_mix = R_woff_rxn * R_reps * R_waste
+
+    # one F intermediate per F concentration, dosed at max_F ul per well
+    F_int_conc = F_concs / 1000 * rxn_vol / max_F
+    F_int_primer = F_int_conc * F_int_vol / _design(orig_F_conc)
+    F_int_water = F_int_vol - F_int_primer
+
+    sN_mix_tot = BPW_mix_xfer_sN_mix + std_woff_add_to_sN_mix + F_add_to_sN_mix + R_add_to_sN_mix
+    table = {
+        'P_per_rxn': P_per_rxn,
+        'max_vol_F_per_rxn': max_F,
+        'max_vol_R_per_rxn': max_R,
+        'water_per_rxn': water_per_rxn,
+        'std_vol_F_per_rxn': std_F,
+        'std_vol_R_per_rxn': std_R,
+        'BPW_rxn': BPW_rxn,
+        'std_woff_per_sN_rxn': std_woff_per_sN_rxn,
+        'BPW_sN_rxn': BPW_sN_rxn,
+        'bpwd_rxn': bpwd_rxn,
+        'R_mix_rxn': bpwd_rxn + max_R,
+        'BPW_mix_xfer_sN_mix': BPW_mix_xfer_sN_mix,
+        'std_woff_add_to_sN_mix': std_woff_add_to_sN_mix,
+        'F_add_to_sN_mix': F_add_to_sN_mix,
+        'R_add_to_sN_mix': R_add_to_sN_mix,
+        'sN_mix_xfer_to_stds_mix': sN_mix_xfer_to_stds_mix,
+        'std_DNA_xfer_to_stds_mix': std_DNA_xfer_to_stds_mix,
+        'bpw_mix_xfer_bpwd_mix': bpw_mix_xfer_bpwd_mix,
+        'std_DNA_xfer_to_bpwd_mix': std_DNA_xfer_to_bpwd_mix,
+        'dna_XFR_bpwd_mix': dna_XFR_bpwd_mix,
+        'water_XFR_bpwd_mix': water_XFR_bpwd_mix,
+        'bpwd_mix_xfer_R_mix': bpwd_mix_xfer_R_mix,
+        'BPW_mix_tot': BPW_rxn * BPW_waste * (sds_NTC + samp),
+        'sN_mix_tot': sN_mix_tot,
+        'bpwd_mix_tot': bpw_mix_xfer_bpwd_mix + std_DNA_xfer_to_bpwd_mix,
+        'std_mix_tot': sN_mix_xfer_to_stds_mix + std_DNA_xfer_to_stds_mix,
+        'F_int_vol': F_int_vol,
+    }
+    # per-design values lose the broadcasting axis and all get the full
+    # design shape; per-concentration values get it plus their own axis
+    values = np.broadcast_arrays(*(value[..., 0] for value in table.values()))
+    table = {name: np.array(value) for name, value in zip(table, values)}
+    shape = values[0].shape
+    per_conc = {
+        'R_rxn': R_rxn,
+        'R_primer_mix': R_primer_mix,
+        'R_woff_rxn': R_woff_rxn,
+        'R_woff_mix': R_woff_mix,
+        'R_mix_tot': bpwd_mix_xfer_R_mix + R_primer_mix + R_woff_mix,
+        'F_int_conc': F_int_conc,
+        'F_int_primer': F_int_primer,
+        'F_int_water': F_int_water,
+    }
+    for name, value in per_conc.items():
+        table[name] = np.array(np.broadcast_to(value, shape + value.shape[-1:]))
+    return table
+
+
+def tube_capacity(load_name):
+    """Total liquid volume (ul) of one well of a tube rack."""
+    wells = geometry.labware_definition(load_name)['wells']
+    return float(next(iter(wells.values()))['totalLiquidVolume'])
+
+
+def check_capacity(table, tubes=None):
+    """{mix: bool array} of designs where some tube of that mix overflows.
+
+    tubes maps mix names to tube load names (default TUBES). Negative
+    volumes (a concentration above the stock, an offset larger than the
+    waste) count as failures too.
+    """
+    tubes = dict(TUBES, **(tubes or {}))
+    ndim = table['BPW_rxn'].ndim
+
+    def per_design(value):
+        return value if value.ndim == ndim else value.max(axis=-1)
+
+    failed = {}
+    for name, load_name in tubes.items():
+        failed[name] = per_design(table[name]) > tube_capacity(load_name)
+    for name, value in table.items():
+        negative = per_design(value < 0)
+        if negative.any():
+            failed[name] = failed.get(name, False) | negative
+    return failed
+
+
+def format_recipe(table):
+    """One line per volume of a single design."""
+    lines = []
+    for name, value in table.items():
+        value = np.atleast_1d(value)
+        lines.append('  {:<26} {}'.format(name, '  '.join('{:8.2f}'.format(v) for v in value)))
+    return '\n'.join(lines)
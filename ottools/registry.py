@@ -0,0 +1,190 @@
+# Custom labware registry.
+# The definitions under Labware/ used to be read three ways: each test_*.py
+# carried a copy as a LABWARE_DEF_JSON string, geometry.py parsed the .json
+# files for the simulator, and the protocols assumed the robot had them
+# installed. The registry is the one source for all of them:
+#
+#   LABWARE_DEF = definition('vwr_24_tuberack_1500ul')
+#   use_custom_labware(protocol)   # protocol.load_labware resolves Labware/ names
+#
+# Each .json is validated once per content: the parsed definition is
+# pickled under Labware/.cache/ keyed by the SHA-256 of the file, so a later
+# run (or another process) with the same file skips both the JSON parse and
+# the checks, and an edited file is picked up by its new hash.
+import functools
+import hashlib
+import json
+import os
+import pickle
+
+LABWARE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Labware')
+CACHE_DIR = os.path.join(LABWARE_DIR, '.cache')
+
+TOP_LEVEL = ('ordering', 'brand', 'metadata', 'dimensions', 'wells', 'groups', 'parameters',
+             'namespace', 'version', 'schemaVersion', 'cornerOffsetFromSlot')
+WELL_KEYS = ('depth', 'totalLiquidVolume', 'shape', 'x', 'y', 'z')
+SHAPE_KEYS = {'circular': ('diameter',), 'rectangular': ('xDimension', 'yDimension')}
+
+# load name -> definition, for this process
+_definitions = {}
+
+
+class LabwareError(ValueError):
+    pass
+
+
+def find_definitions(labware_dir=LABWARE_DIR):
+    """Map load name -> JSON path for every definition under labware_dir."""
+    found = {}
+    if not os.path.isdir(labware_dir):
+        return found
+    for entry in sorted(os.listdir(labware_dir)):
+        folder = os.path.join(labware_dir, entry)
+        if not os.path.isdir(folder):
+            continue
+        for fname in sorted(os.listdir(folder)):
+            if fname.endswith('.json'):
+                found[fname[:-len('.json')]] = os.path.join(folder, fname)
+    return found
+
+
+def validate(definition, load_name=None):
+    """Problems with a schema 2 labware definition (empty if none)."""
+    problems = ['missing {!r}'.format(key) for key in TOP_LEVEL if key not in definition]
+    if problems:
+        return problems
+    if definition['schemaVersion'] != 2:
+        problems.append('schemaVersion is {}, not 2'.format(definition['schemaVersion']))
+    name = definition['parameters'].get('loadName')
+    if not name:
+        problems.append('parameters has no loadName')
+    elif load_name is not None and name != load_name:
+        problems.append('loadName {!r} does not match the file name {!r}'.format(name, load_name))
+    for axis in ('xDimension', 'yDimension', 'zDimension'):
+        if not definition['dimensions'].get(axis, 0) > 0:
+            problems.append('dimensions.{} must be positive'.format(axis))
+    wells = definition['wells']
+    ordered = [well for column in definition['ordering'] for well in column]
+    if len(set(ordered)) != len(ordered):
+        problems.append('ordering lists a well twice')
+    for well in sorted(set(ordered) ^ set(wells)):
+        problems.append('well {} is in {} but not in {}'.format(
+            well, *(('ordering', 'wells') if well in ordered else ('wells', 'ordering'))))
+    for well, geometry in sorted(wells.items()):
+        keys = WELL_KEYS + SHAPE_KEYS.get(geometry.get('shape'), ())
+        missing = [key for key in keys if key not in geometry]
+        if missing:
+            problems.append('well {} has no {}'.format(well, ', '.join(missing)))
+        elif geometry['shape'] not in SHAPE_KEYS:
+            problems.append('well {} has unknown shape {!r}'.format(well, geometry['shape']))
+        elif geometry['depth'] < 0 or geometry['totalLiquidVolume'] < 0:
+            problems.append('well {} has a negative depth or volume'.format(well))
+    for group in definition['groups']:
+        stray = [well for well in group.get('wells', []) if well not in wells]
+        if stray:
+            problems.append('group lists unknown wells {}'.format(', '.join(stray)))
+    return problems
+
+
+def _cache_path(digest, cache_dir):
+    return os.path.join(cache_dir, digest + '.pickle')
+
+
+def read_definition(path, cache_dir=CACHE_DIR):
+    """The validated definition in path, from the content-hash cache when it
+    has this file's bytes; raises LabwareError if the file is invalid."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    cached = _cache_path(digest, cache_dir)
+    try:
+        with open(cached, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+    definition = json.loads(raw.decode('utf-8'))
+    load_name = os.path.splitext(os.path.basename(path))[0]
+    problems = validate(definition, load_name)
+    if problems:
+        raise LabwareError('{}: {}'.format(path, '; '.join(problems)))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = '{}.{}.tmp'.format(cached, os.getpid())
+        with open(tmp, 'wb') as f:
+            pickle.dump(definition, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cached)
+    except OSError:
+        pass  # read-only checkout: still valid, just not cached
+    return definition
+
+
+@functools.lru_cache(maxsize=None)
+def _paths():
+    return find_definitions()
+
+
+def names():
+    """Load names of every definition under Labware/."""
+    return sorted(_paths())
+
+
+_MISSING = object()
+
+
+def definition(load_name, default=_MISSING):
+    """The definition of a Labware/ load name (parsed once per process).
+
+    Raises KeyError for a name that is not under Labware/ unless default is
+    given.
+    """
+    if load_name in _definitions:
+        return _definitions[load_name]
+    path = _paths().get(load_name)
+    if path is None:
+        if default is _MISSING:
+            raise KeyError('No custom labware {!r} under {}'.format(load_name, LABWARE_DIR))
+        return default
+    _definitions[load_name] = read_definition(path)
+    return _definitions[load_name]
+
+
+def check_all():
+    """{load name: [problems]} for every definition under Labware/, bypassing the cache."""
+    report = {}
+    for load_name, path in sorted(_paths().items()):
+        with open(path) as f:
+            try:
+                report[load_name] = validate(json.load(f), load_name)
+            except ValueError as e:
+                report[load_name] = ['not JSON: {}'.format(e)]
+    return report
+
+
+def _wrap_load(target):
+    load = target.load_labware
+
+    @functools.wraps(load)
+    def load_labware(load_name, *args, **kwargs):
+        found = definition(load_name, None)
+        if found is None:
+            return load(load_name, *args, **kwargs)
+        kwargs.pop('namespace', None)
+        kwargs.pop('version', None)
+        return target.load_labware_from_definition(found, *args, **kwargs)
+
+    target.load_labware = load_labware
+
+
+def use_custom_labware(protocol):
+    """Resolve Labware/ load names from the registry in protocol.load_labware
+    and in the load_labware of every module loaded afterwards."""
+    _wrap_load(protocol)
+    load_module = protocol.load_module
+
+    @functools.wraps(load_module)
+    def wrapped(*args, **kwargs):
+        module = load_module(*args, **kwargs)
+        _wrap_load(module)
+        return module
+
+    protocol.load_module = wrapped
@@ -0,0 +1,48 @@
+# Rough OT-2 timing model used to put a duration on every simulated command.
+# Gantry moves are straight lines at constant speed; the plunger moves at the
+# pipette flow rate. Good enough to compare two versions of a protocol.
+import math
+
+TIMINGS = {
+    'gantry_speed': 400.0,  # mm/s, X/Y default speed
+    'z_speed': 125.0,  # mm/s
+    'arc_clearance': 10.0,  # mm above the tallest labware on an arc move
+    'pick_up_tip': 4.0,  # s, press + retract
+    'drop_tip': 3.5,  # s, eject + plunger home
+    'touch_tip': 2.0,  # s, 4 sides of the well
+    'home': 12.0,  # s
+    'plunger_overhead': 0.3,  # s per aspirate/dispense start/stop
+    'blow_out_overhead': 0.8,  # s
+    'air_gap_overhead': 0.5,  # s
+    # fitted per robot by ottools.calibrate; these defaults leave the model as it is
+    'travel_factor': 1.0,  # measured / modelled time of a constant-speed move
+    'move_overhead': 0.0,  # s per move: acceleration, deceleration, settling
+}
+
+
+def distance(a, b):
+    return math.sqrt(sum((p - q) ** 2 for p, q in zip(a, b)))
+
+
+def move_time(start, end, safe_z=None, speed=None, timings=TIMINGS):
+    """Seconds to move from start to end, arcing up to safe_z if given."""
+    xy_speed = speed or timings['gantry_speed']
+    z_speed = min(timings['z_speed'], xy_speed)
+    xy = math.hypot(end[0] - start[0], end[1] - start[1])
+    if safe_z is None or xy == 0:
+        dz = abs(end[2] - start[2])
+        seconds = xy / xy_speed + dz / z_speed
+    else:
+        up = max(safe_z - start[2], 0)
+        down = max(safe_z - end[2], 0)
+        seconds = up / z_speed + xy / xy_speed + down / z_speed
+    if not seconds:
+        return 0.0
+    return seconds * timings['travel_factor'] + timings['move_overhead']
+
+
+def plunger_time(volume, flow_rate, rate=1.0, timings=TIMINGS):
+    """Seconds to aspirate/dispense volume (ul) at flow_rate (ul/s) * rate."""
+    if not volume:
+        return timings['plunger_overhead']
+    return volume / (flow_rate * rate) + timings['plunger_overhead']
@@ -0,0 +1,1063 @@
+# Offline recording stand-in for the Opentrons protocol API (v2).
+# It runs a protocol's run(protocol) against fake ProtocolContext,
+# InstrumentContext and Labware objects, keeps track of tips and pipette
+# volume, and writes every command into a trace with an estimated duration.
+# Nothing here talks to a robot; it exists so we can check a script and its
+# run time in milliseconds instead of uploading it or starting
+# opentrons_simulate.
+import contextlib
+import importlib.util
+import io
+import math
+import os
+import sys
+import types
+from collections import namedtuple
+from dataclasses import dataclass, field
+from typing import Optional
+
+from . import geometry
+from .runtime import TIMINGS, move_time, plunger_time
+
+
+class SimulationError(Exception):
+    """Raised when a protocol does something the robot would refuse to do."""
+
+
+class OutOfTipsError(SimulationError):
+    pass
+
+
+class Point(namedtuple('Point', ['x', 'y', 'z'])):
+    __slots__ = ()
+
+    def __add__(self, other):
+        return Point(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return Point(self.x - other.x, self.y - other.y, self.z - other.z)
+
+
+class Location:
+    def __init__(self, point, labware):
+        self.point = Point(*point)
+        self.labware = labware
+
+    def move(self, point):
+        return Location(self.point + Point(*point), self.labware)
+
+    @property
+    def well(self):
+        return self.labware if isinstance(self.labware, Well) else None
+
+    def __repr__(self):
+        return 'Location(point={}, labware={})'.format(tuple(self.point), self.labware)
+
+
+class Mount:
+    LEFT = 'left'
+    RIGHT = 'right'
+
+
+@dataclass
+class Command:
+    index: int
+    name: str
+    instrument: Optional[str]
+    start: float
+    duration: float = 0.0
+    volume: Optional[float] = None
+    location: Optional[str] = None
+    point: Optional[tuple] = None
+    parent: Optional[int] = None
+    params: dict = field(default_factory=dict)
+    line: Optional[int] = None  # protocol line (outermost frame) that issued it
+
+    def as_dict(self):
+        return {
+            'index': self.index, 'name': self.name,
+            'instrument': self.instrument, 'start': round(self.start, 3),
+            'duration': round(self.duration, 3), 'volume': self.volume,
+            'location': self.location,
+            'point': list(self.point) if self.point else None,
+            'parent': self.parent, 'params': self.params, 'line': self.line,
+        }
+
+
+# name -> (max_volume, min_volume, channels, aspirate, dispense, blow_out)
+PIPETTE_SPECS = {
+    'p20_single_gen2': (20, 1, 1, 7.56, 7.56, 7.56),
+    'p300_single_gen2': (300, 20, 1, 92.86, 92.86, 92.86),
+    'p1000_single_gen2': (1000, 100, 1, 274.7, 274.7, 274.7),
+    'p20_multi_gen2': (20, 1, 8, 7.6, 7.6, 7.6),
+    'p300_multi_gen2': (300, 20, 8, 94, 94, 94),
+    'p10_single': (10, 1, 1, 5, 10, 10),
+    'p50_single': (50, 5, 1, 25, 50, 50),
+    'p300_single': (300, 30, 1, 150, 300, 300),
+    'p1000_single': (1000, 100, 1, 500, 1000, 1000),
+}
+
+
+class Well:
+    def __init__(self, labware, name, geometry_):
+        self.parent = labware
+        self.well_name = name
+        self.geometry = geometry_
+        self.depth = geometry_['depth']
+        self.diameter = geometry_.get('diameter')
+        self.max_volume = geometry_.get('totalLiquidVolume')
+        self.has_tip = labware.is_tiprack
+        origin = labware.origin
+        self._bottom = Point(origin.x + geometry_['x'],
+                             origin.y + geometry_['y'],
+                             origin.z + geometry_['z'])
+
+    @property
+    def display_name(self):
+        return repr(self)
+
+    def top(self, z=0.0):
+        return Location(self._bottom + Point(0, 0, self.depth + z), self)
+
+    def bottom(self, z=0.0):
+        return Location(self._bottom + Point(0, 0, z), self)
+
+    def center(self):
+        return Location(self._bottom + Point(0, 0, self.depth / 2.0), self)
+
+    def _from_center_cartesian(self, x, y, z):
+        half_x = (self.diameter or self.geometry.get('xDimension', 0)) / 2.0
+        half_y = (self.diameter or self.geometry.get('yDimension', 0)) / 2.0
+        center = self.center().point
+        return center + Point(x * half_x, y * half_y, z * self.depth / 2.0)
+
+    def __repr__(self):
+        return '{} of {}'.format(self.well_name, self.parent)
+
+
+class Labware:
+    def __init__(self, definition, slot, label=None, offset=(0, 0, 0)):
+        self.definition = definition
+        self.load_name = definition['parameters']['loadName']
+        self.name = label or self.load_name
+        self.slot = str(slot)
+        self.is_tiprack = bool(definition['parameters'].get('isTiprack'))
+        corner = definition.get('cornerOffsetFromSlot', {})
+        base = geometry.SLOT_ORIGINS.get(self.slot, (0.0, 0.0, 0.0))
+        self.origin = Point(base[0] + offset[0] + corner.get('x', 0),
+                            base[1] + offset[1] + corner.get('y', 0),
+                            base[2] + offset[2] + corner.get('z', 0))
+        self.highest_z = self.origin.z + definition['dimensions']['zDimension']
+        self._ordering = definition['ordering']
+        self._wells = {}
+        for column in self._ordering:
+            for name in column:
+                self._wells[name] = Well(self, name, definition['wells'][name])
+
+    @property
+    def parent(self):
+        return self.slot
+
+    @property
+    def tip_length(self):
+        return self.definition['parameters'].get('tipLength', 0)
+
+    def well(self, idx):
+        if isinstance(idx, int):
+            return self.wells()[idx]
+        return self._wells[idx]
+
+    def wells(self, *names):
+        if not names:
+            return [self._wells[n] for column in self._ordering for n in column]
+        # v1 style: wells('A1', 'B1') or wells(['A1', 'B1'])
+        if len(names) == 1 and isinstance(names[0], (list, tuple)):
+            names = names[0]
+        return [self.well(n) for n in names]
+
+    def wells_by_name(self):
+        return dict(self._wells)
+
+    wells_by_index = wells_by_name
+
+    def columns(self, *names):
+        cols = [[self._wells[n] for n in column] for column in self._ordering]
+        if names:
+            return [cols[int(n) - 1] for n in names]
+        return cols
+
+    def rows(self, *names):
+        rows = [list(r) for r in zip(*self.columns())]
+        if names:
+            return [rows[ord(n) - ord('A')] for n in names]
+        return rows
+
+    def columns_by_name(self):
+        return {str(i + 1): col for i, col in enumerate(self.columns())}
+
+    def rows_by_name(self):
+        return {chr(ord('A') + i): row for i, row in enumerate(self.rows())}
+
+    # legacy (v1) spellings
+    cols = columns
+
+    def __getitem__(self, name):
+        return self.well(name)
+
+    def __call__(self, name):
+        return self.well(name)
+
+    def next_tip(self, start=None, num_tips=1):
+        wells = self.wells()
+        if start is not None and start in wells:
+            wells = wells[wells.index(start):]
+        for well in wells:
+            block = self._tip_block(well, num_tips)
+            if block and all(w.has_tip for w in block):
+                return well
+        return None
+
+    def use_tips(self, well, num_tips=1):
+        for w in self._tip_block(well, num_tips) or [well]:
+            w.has_tip = False
+
+    def _tip_block(self, well, num_tips):
+        # well and the num_tips - 1 below it in its column (a multichannel pick-up)
+        column = next(c for c in self._ordering if well.well_name in c)
+        i = column.index(well.well_name)
+        names = column[i:i + num_tips]
+        if len(names) < num_tips:
+            return None
+        return [self._wells[n] for n in names]
+
+    def reset(self):
+        for well in self.wells():
+            well.has_tip = self.is_tiprack
+
+    def __repr__(self):
+        return '{} on {}'.format(self.name, self.slot)
+
+
+class TemperatureModule:
+    # degrees per second; the Gen1 module cools much slower than it heats
+    HEAT_RATE = 0.2
+    COOL_RATE = 0.05
+
+    def __init__(self, ctx, name, slot):
+        self._ctx = ctx
+        self.name = name
+        self.slot = str(slot)
+        self.labware = None
+        self.temperature = 25.0
+        self.target = None
+        self._ramp_start = None
+        self._ramp_from = 25.0
+        self._offset = geometry.MODULE_OFFSETS.get(name.lower(), (0, 0, 80.0))
+
+    @property
+    def status(self):
+        if self.target is None:
+            return 'idle'
+        if self._reached_at() <= self._ctx.clock:
+            return 'holding at target'
+        return 'cooling' if self.target < self._ramp_from else 'heating'
+
+    def load_labware(self, load_name, label=None, namespace=None, version=None):
+        definition = geometry.labware_definition(load_name)
+        return self.load_labware_from_definition(definition, label)
+
+    def load_labware_from_definition(self, definition, label=None):
+        self.labware = Labware(definition, self.slot, label, self._offset)
+        self._ctx.loaded_labwares[self.slot] = self.labware
+        return self.labware
+
+    def _ramp_seconds(self, start, end):
+        rate = self.HEAT_RATE if end > start else self.COOL_RATE
+        return abs(end - start) / rate
+
+    def _reached_at(self):
+        return self._ramp_start + self._ramp_seconds(self._ramp_from, self.target)
+
+    def start_set_temperature(self, celsius):
+        self._ramp_from = self._current()
+        self.target = celsius
+        self._ramp_start = self._ctx.clock
+        self._ctx._record('start_set_temperature', None, 0.0,
+                          params={'module': self.name, 'celsius': celsius})
+
+    def await_temperature(self, celsius):
+        wait = max(self._reached_at() - self._ctx.clock, 0.0) if self.target is not None else 0.0
+        self._ctx._record('await_temperature', None, wait,
+                          params={'module': self.name, 'celsius': celsius})
+        self.temperature = celsius
+
+    def set_temperature(self, celsius):
+        self._ramp_from = self._current()
+        self.target = celsius
+        self._ramp_start = self._ctx.clock
+        wait = self._ramp_seconds(self._ramp_from, celsius)
+        self._ctx._record('set_temperature', None, wait,
+                          params={'module': self.name, 'celsius': celsius})
+        self.temperature = celsius
+
+    def _current(self):
+        if self.target is None:
+            return self.temperature
+        if self._reached_at() <= self._ctx.clock:
+            return self.target
+        elapsed = self._ctx.clock - self._ramp_start
+        span = self._ramp_seconds(self._ramp_from, self.target) or 1.0
+        return self._ramp_from + (self.target - self._ramp_from) * elapsed / span
+
+    def deactivate(self):
+        self.target = None
+        self._ctx._record('deactivate', None, 0.0, params={'module': self.name})
+
+
+class _Settings:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+    def __repr__(self):
+        return repr(self.__dict__)
+
+
+class InstrumentContext:
+    def __init__(self, ctx, name, mount, tip_racks=None):
+        if name.lower() not in PIPETTE_SPECS:
+            raise SimulationError('Unknown pipette {}'.format(name))
+        spec = PIPETTE_SPECS[name.lower()]
+        self._ctx = ctx
+        self.name = name
+        self.mount = mount
+        self.channels = spec[2]
+        self.min_volume = spec[1]
+        self.tip_racks = list(tip_racks or [])
+        # the pipette's volume, as on the robot; what a tip holds is _working_volume()
+        self.max_volume = spec[0]
+        self.flow_rate = _Settings(aspirate=spec[3], dispense=spec[4], blow_out=spec[5])
+        self.well_bottom_clearance = _Settings(aspirate=1.0, dispense=1.0)
+        self.default_speed = TIMINGS['gantry_speed']
+        self.starting_tip = None
+        self.current_volume = 0.0
+        self.has_tip = False
+        self._tip_origin = None
+        self._position = Point(*geometry.HOME_POINT)
+        self._location = None  # last Location visited
+
+    def __repr__(self):
+        return '{} on {} mount'.format(self.name, self.mount)
+
+    # -- bookkeeping -------------------------------------------------------
+
+    def _record(self, name, duration, volume=None, location=None, params=None):
+        speed = self._speed()
+        if speed != TIMINGS['gantry_speed']:
+            # slowed by default_speed / max_speeds: kept so a replay can match it
+            params = dict(params or {}, speed=speed)
+        return self._ctx._record(
+            name, self.name, duration, volume=volume,
+            location=location, params=params)
+
+    def _working_volume(self):
+        # what the attached tip (or, before a pickup, the smallest rack tip) holds
+        if self._tip_origin is not None and self.has_tip:
+            tips = [self._tip_origin.max_volume]
+        else:
+            tips = [r.wells()[0].max_volume for r in self.tip_racks if r.wells()]
+        return min([self.max_volume] + [v for v in tips if v])
+
+    def _resolve(self, location, default):
+        if location is None:
+            if self._location is None:
+                raise SimulationError(
+                    '{}: no location given and pipette has not moved yet'.format(self.name))
+            return self._location
+        if isinstance(location, Well):
+            return default(location)
+        if isinstance(location, Labware):
+            return default(location.wells()[0])
+        if isinstance(location, Location):
+            return location
+        raise SimulationError('Unsupported location {!r}'.format(location))
+
+    def _safe_z(self, target):
+        current = self._location.labware if self._location else None
+        dest = target.labware
+        if isinstance(current, Well) and current is dest:
+            return None
+        cur_lw = current.parent if isinstance(current, Well) else current
+        dest_lw = dest.parent if isinstance(dest, Well) else dest
+        if cur_lw is not None and cur_lw is dest_lw and isinstance(cur_lw, Labware):
+            return cur_lw.highest_z + TIMINGS['arc_clearance']
+        return self._ctx.deck_height() + TIMINGS['arc_clearance']
+
+    def _speed(self):
+        speeds = [self.default_speed]
+        caps = self._ctx.max_speeds
+        for axis in ('X', 'Y'):
+            if caps.get(axis):
+                speeds.append(caps[axis])
+        return min(speeds)
+
+    def _travel(self, target):
+        # seconds to get from the current position to target
+        seconds = move_time(self._position, target.point, self._safe_z(target),
+                            self._speed(), self._ctx.timings)
+        self._position = target.point
+        self._location = target
+        return seconds
+
+    def _require_tip(self, action):
+        if not self.has_tip:
+            raise SimulationError('{}: cannot {} without a tip'.format(self.name, action))
+
+    # -- atomic commands -----------------------------------------------------
+
+    def move_to(self, location, force_direct=False, minimum_z_height=None,
+                speed=None, publish=True):
+        target = self._resolve(location, lambda w: w.top())
+        seconds = self._travel(target)
+        if speed:
+            seconds *= self._speed() / speed
+        self._record('move_to', seconds, location=target,
+                     params={'move_speed': speed} if speed else None)
+        return self
+
+    def aspirate(self, volume=None, location=None, rate=1.0):
+        self._require_tip('aspirate')
+        if volume is None:
+            volume = self._working_volume() - self.current_volume
+        if self.current_volume + volume > self._working_volume() + 1e-6:
+            raise SimulationError(
+                '{}: aspirating {} ul would exceed the {} ul the tip holds (holding {} ul)'.format(
+                    self.name, round(volume, 2), self._working_volume(),
+                    round(self.current_volume, 2)))
+        target = self._resolve(
+            location, lambda w: w.bottom(self.well_bottom_clearance.aspirate))
+        travel = self._travel(target)
+        seconds = travel + plunger_time(volume, self.flow_rate.aspirate, rate, self._ctx.timings)
+        self.current_volume += volume
+        self._record('aspirate', seconds, volume, target,
+                     {'rate': rate, 'flow_rate': self.flow_rate.aspirate, 'travel': travel})
+        return self
+
+    def dispense(self, volume=None, location=None, rate=1.0):
+        self._require_tip('dispense')
+        if volume is None or volume > self.current_volume:
+            volume = self.current_volume
+        target = self._resolve(
+            location, lambda w: w.bottom(self.well_bottom_clearance.dispense))
+        travel = self._travel(target)
+        seconds = travel + plunger_time(volume, self.flow_rate.dispense, rate, self._ctx.timings)
+        self.current_volume -= volume
+        self._record('dispense', seconds, volume, target,
+                     {'rate': rate, 'flow_rate': self.flow_rate.dispense, 'travel': travel})
+        return self
+
+    def blow_out(self, location=None):
+        self._require_tip('blow out')
+        target = self._resolve(location, lambda w: w.top())
+        travel = self._travel(target)
+        seconds = travel + self._ctx.timings['blow_out_overhead']
+        self.current_volume = 0.0
+        self._record('blow_out', seconds, location=target, params={'travel': travel})
+        return self
+
+    def touch_tip(self, location=None, radius=1.0, v_offset=-1.0, speed=60.0):
+        self._require_tip('touch tip')
+        if location is None:
+            well = self._location.well if self._location else None
+        else:
+            well = location if isinstance(location, Well) else getattr(location, 'well', None)
+        if well is None:
+            raise SimulationError('{}: touch_tip needs a well'.format(self.name))
+        target = well.top(v_offset)
+        travel = self._travel(target)
+        seconds = travel + self._ctx.timings['touch_tip']
+        self._record('touch_tip', seconds, location=target,
+                     params={'v_offset': v_offset, 'travel': travel})
+        return self
+
+    def air_gap(self, volume=None, height=None):
+        self._require_tip('air gap')
+        well = self._location.well if self._location else None
+        if well is None:
+            raise SimulationError('{}: air_gap needs a previous well'.format(self.name))
+        target = well.top(5 if height is None else height)
+        volume = self._working_volume() - self.current_volume if volume is None else volume
+        travel = self._travel(target)
+        seconds = travel + plunger_time(volume, self.flow_rate.aspirate, 1.0, self._ctx.timings)
+        self.current_volume += volume
+        self._record('air_gap', seconds, volume, target, {'travel': travel})
+        return self
+
+    def mix(self, repetitions=1, volume=None, location=None, rate=1.0):
+        self._require_tip('mix')
+        volume = self._working_volume() if volume is None else volume
+        with self._ctx._group('mix', self.name, volume=volume,
+                              params={'repetitions': repetitions, 'rate': rate}):
+            self.aspirate(volume, location, rate)
+            self.dispense(volume, rate=rate)
+            for _ in range(repetitions - 1):
+                self.aspirate(volume, rate=rate)
+                self.dispense(volume, rate=rate)
+        return self
+
+    def pick_up_tip(self, location=None, presses=None, increment=None):
+        if self.has_tip:
+            raise SimulationError('{}: already has a tip attached'.format(self.name))
+        if location is None:
+            well = self._next_tip()
+        elif isinstance(location, Labware):
+            well = location.next_tip(num_tips=self.channels)
+        else:
+            well = location if isinstance(location, Well) else location.labware
+        if well is None and location is None and self._ctx.unlimited_tips and self.tip_racks:
+            for rack in self.tip_racks:
+                rack.reset()
+            self._ctx.tip_refills[self.name] = self._ctx.tip_refills.get(self.name, 0) + 1
+            well = self._next_tip()
+        if well is None:
+            raise OutOfTipsError('{}: out of tips'.format(self.name))
+        well.parent.use_tips(well, self.channels)
+        target = well.top()
+        travel = self._travel(target)
+        self.has_tip = True
+        self._tip_origin = well
+        self._record('pick_up_tip', travel + self._ctx.timings['pick_up_tip'],
+                     location=target, params={'travel': travel})
+        return self
+
+    def _next_tip(self):
+        for rack in self.tip_racks:
+            start = self.starting_tip if self.starting_tip in rack.wells() else None
+            well = rack.next_tip(start, self.channels)
+            if well is not None:
+                return well
+        return None
+
+    def drop_tip(self, location=None, home_after=True):
+        self._require_tip('drop tip')
+        if location is None:
+            target = self._ctx.fixed_trash['A1'].top()
+        else:
+            target = self._resolve(location, lambda w: w.top())
+        travel = self._travel(target)
+        self.has_tip = False
+        self.current_volume = 0.0
+        self._record('drop_tip', travel + self._ctx.timings['drop_tip'],
+                     location=target, params={'travel': travel})
+        return self
+
+    def return_tip(self, home_after=True):
+        self._require_tip('return tip')
+        origin = self._tip_origin
+        self.drop_tip(origin.top(-10))
+        for well in origin.parent._tip_block(origin, self.channels) or [origin]:
+            well.has_tip = True
+        return self
+
+    def home(self):
+        self._position = Point(*geometry.HOME_POINT)
+        self._location = None
+        self._record('home', self._ctx.timings['home'])
+        return self
+
+    # -- complex commands ---------------------------------------------------
+
+    def transfer(self, volume, source, dest, **kwargs):
+        return self._complex('transfer', volume, source, dest, kwargs)
+
+    def distribute(self, volume, source, dest, **kwargs):
+        return self._complex('distribute', volume, source, dest, kwargs)
+
+    def consolidate(self, volume, source, dest, **kwargs):
+        return self._complex('consolidate', volume, source, dest, kwargs)
+
+    def _complex(self, mode, volume, source, dest, kw):
+        sources = _flatten(source)
+        dests = _flatten(dest)
+        count = max(len(sources), len(dests))
+        if len(sources) == 1:
+            sources = sources * count
+        if len(dests) == 1:
+            dests = dests * count
+        if len(sources) != len(dests):
+            raise SimulationError('{}: source and destination lists differ in length'.format(mode))
+        if isinstance(volume, (list, tuple)):
+            volumes = list(volume)
+            if len(volumes) != count:
+                raise SimulationError('{}: volume list does not match wells'.format(mode))
+        else:
+            volumes = [volume] * count
+        opts = {
+            'new_tip': kw.get('new_tip', 'once'),
+            'trash': kw.get('trash', True),
+            'touch_tip': kw.get('touch_tip', False),
+            'blow_out': kw.get('blow_out', False),
+            'blowout_location': kw.get('blowout_location', 'trash'),
+            'mix_before': kw.get('mix_before'),
+            'mix_after': kw.get('mix_after'),
+            'air_gap': kw.get('air_gap', 0) or 0,
+            'disposal': kw.get('disposal_volume', kw.get('disposal_vol')),
+        }
+        if opts['new_tip'] == 'never':
+            self._require_tip(mode)
+        params = {k: kw[k] for k in sorted(kw) if isinstance(kw[k], (int, float, str, bool, tuple))}
+        with self._ctx._group(mode, self.name, volume=sum(volumes), params=params):
+            if opts['new_tip'] == 'once' and not self.has_tip:
+                self.pick_up_tip()
+            if mode == 'distribute':
+                self._run_distribute(volumes, sources, dests, opts)
+            elif mode == 'consolidate':
+                self._run_consolidate(volumes, sources, dests, opts)
+            else:
+                self._run_transfer(volumes, sources, dests, opts)
+            if opts['new_tip'] in ('once', 'always') and self.has_tip:
+                self._finish_tip(opts)
+        return self
+
+    def _finish_tip(self, opts):
+        if opts['trash']:
+            self.drop_tip()
+        else:
+            self.return_tip()
+
+    def _fresh_tip(self, opts):
+        if opts['new_tip'] == 'always':
+            if self.has_tip:
+                self._finish_tip(opts)
+            self.pick_up_tip()
+
+    def _blow_out_after(self, src, dst, opts):
+        where = opts['blowout_location']
+        if where == 'source well':
+            self.blow_out(_well_of(src))
+        elif where == 'destination well':
+            self.blow_out(_well_of(dst))
+        else:
+            self.blow_out(self._ctx.fixed_trash['A1'])
+
+    def _run_transfer(self, volumes, sources, dests, opts):
+        max_xfer = self._working_volume() - opts['air_gap']
+        for vol, src, dst in zip(volumes, sources, dests):
+            if vol <= 0:
+                continue
+            chunks = int(math.ceil(vol / max_xfer - 1e-9))
+            for _ in range(chunks):
+                self._fresh_tip(opts)
+                part = vol / chunks
+                if opts['mix_before']:
+                    self.mix(opts['mix_before'][0], opts['mix_before'][1], src)
+                self.aspirate(part, src)
+                if opts['touch_tip']:
+                    self.touch_tip()
+                if opts['air_gap']:
+                    self.air_gap(opts['air_gap'])
+                self.dispense(part + opts['air_gap'], dst)
+                if opts['mix_after']:
+                    self.mix(opts['mix_after'][0], opts['mix_after'][1])
+                if opts['blow_out']:
+                    self._blow_out_after(src, dst, opts)
+                if opts['touch_tip']:
+                    self.touch_tip()
+
+    def _run_distribute(self, volumes, sources, dests, opts):
+        disposal = self.min_volume if opts['disposal'] is None else opts['disposal']
+        capacity = self._working_volume() - disposal
+        batch = []
+        for vol, src, dst in zip(volumes, sources, dests):
+            if batch and (sum(b[0] for b in batch) + vol > capacity or src is not batch[0][2]):
+                self._distribute_batch(batch, disposal, opts)
+                batch = []
+            batch.append((vol, dst, src))
+        if batch:
+            self._distribute_batch(batch, disposal, opts)
+
+    def _distribute_batch(self, batch, disposal, opts):
+        src = batch[0][2]
+        self._fresh_tip(opts)
+        if opts['mix_before']:
+            self.mix(opts['mix_before'][0], opts['mix_before'][1], src)
+        self.aspirate(sum(v for v, _, _ in batch) + disposal, src)
+        if opts['touch_tip']:
+            self.touch_tip()
+        for vol, dst, _ in batch:
+            self.dispense(vol, dst)
+            if opts['touch_tip']:
+                self.touch_tip()
+        if disposal or opts['blow_out']:
+            if opts['blowout_location'] == 'trash' or not opts['blow_out']:
+                self.blow_out(self._ctx.fixed_trash['A1'])
+            else:
+                self._blow_out_after(src, batch[-1][1], opts)
+
+    def _run_consolidate(self, volumes, sources, dests, opts):
+        dst = dests[0]
+        batch = []
+        for vol, src in zip(volumes, sources):
+            if batch and sum(v for v, _ in batch) + vol > self._working_volume():
+                self._consolidate_batch(batch, dst, opts)
+                batch = []
+            batch.append((vol, src))
+        if batch:
+            self._consolidate_batch(batch, dst, opts)
+
+    def _consolidate_batch(self, batch, dst, opts):
+        self._fresh_tip(opts)
+        for vol, src in batch:
+            self.aspirate(vol, src)
+            if opts['touch_tip']:
+                self.touch_tip()
+        self.dispense(sum(v for v, _ in batch), dst)
+        if opts['mix_after']:
+            self.mix(opts['mix_after'][0], opts['mix_after'][1])
+        if opts['blow_out']:
+            self._blow_out_after(batch[-1][1], dst, opts)
+
+
+def _flatten(obj):
+    if isinstance(obj, (list, tuple)):
+        out = []
+        for item in obj:
+            out.extend(_flatten(item))
+        return out
+    return [obj]
+
+
+def _well_of(location):
+    if isinstance(location, Well):
+        return location
+    if isinstance(location, Location):
+        return location.well
+    return None
+
+
+class ProtocolContext:
+    """Recording replacement for opentrons.protocol_api.ProtocolContext."""
+
+    def __init__(self, api_version='2.11', timings=None, unlimited_tips=False):
+        self.api_version = api_version
+        self.timings = dict(TIMINGS, **(timings or {}))
+        # refill empty tip racks instead of raising OutOfTipsError, so a run
+        # can be simulated to the end to see how many tips it really needs
+        self.unlimited_tips = unlimited_tips
+        self.tip_refills = {}
+        self.trace = []
+        self.clock = 0.0
+        self.max_speeds = {}
+        self.loaded_labwares = {}
+        self.loaded_modules = {}
+        self.loaded_instruments = {}
+        self.rail_lights_on = False
+        self.source_file = None  # set by load_protocol; commands get its line numbers
+        self._groups = []
+        trash_def = {
+            'ordering': [['A1']],
+            'parameters': {'loadName': 'opentrons_1_trash_1100ml_fixed', 'isTiprack': False},
+            'dimensions': {'xDimension': 172.86, 'yDimension': 165.86, 'zDimension': 82},
+            'wells': {'A1': {'x': 82.84, 'y': 80.0, 'z': 0, 'depth': 82,
+                             'totalLiquidVolume': 1100000, 'shape': 'rectangular'}},
+        }
+        self.fixed_trash = Labware(trash_def, geometry.TRASH_SLOT, 'Opentrons Fixed Trash')
+        self.loaded_labwares[geometry.TRASH_SLOT] = self.fixed_trash
+
+    # -- recording ---------------------------------------------------------
+
+    def _record(self, name, instrument, duration, volume=None, location=None, params=None):
+        point = None
+        where = None
+        if location is not None:
+            point = tuple(round(c, 2) for c in location.point)
+            where = repr(location.labware) if location.labware is not None else str(point)
+        cmd = Command(index=len(self.trace), name=name, instrument=instrument,
+                      start=self.clock, duration=duration, volume=volume,
+                      location=where, point=point,
+                      parent=self._groups[-1].index if self._groups else None,
+                      params=params or {}, line=self._protocol_line())
+        self.trace.append(cmd)
+        self.clock += duration
+        return cmd
+
+    def _protocol_line(self):
+        # line in the protocol file that (ultimately) issued this command
+        if self.source_file is None:
+            return None
+        line = None
+        frame = sys._getframe(2)
+        while frame is not None:
+            if frame.f_code.co_filename == self.source_file:
+                line = frame.f_lineno
+            frame = frame.f_back
+        return line
+
+    @contextlib.contextmanager
+    def _group(self, name, instrument, volume=None, params=None):
+        cmd = self._record(name, instrument, 0.0, volume=volume, params=params)
+        self._groups.append(cmd)
+        try:
+            yield cmd
+        finally:
+            self._groups.pop()
+            cmd.duration = self.clock - cmd.start
+
+    @property
+    def runtime(self):
+        """Estimated wall-clock seconds for everything recorded so far."""
+        return sum(c.duration for c in self.trace if c.parent is None)
+
+    def deck_height(self):
+        heights = [lw.highest_z for lw in self.loaded_labwares.values()
+                   if lw is not self.fixed_trash]
+        return max(heights) if heights else 0.0
+
+    # -- protocol API ------------------------------------------------------
+
+    def _check_slot(self, location):
+        slot = str(location)
+        if slot not in geometry.SLOT_ORIGINS:
+            raise SimulationError('Invalid deck slot {}'.format(location))
+        if slot in self.loaded_labwares or slot in self.loaded_modules:
+            raise SimulationError('Deck slot {} is already occupied'.format(slot))
+        return slot
+
+    def load_labware(self, load_name, location, label=None, namespace=None, version=None):
+        definition = geometry.labware_definition(load_name)
+        return self.load_labware_from_definition(definition, location, label)
+
+    def load_labware_from_definition(self, labware_def, location, label=None):
+        slot = self._check_slot(location)
+        labware = Labware(labware_def, slot, label)
+        self.loaded_labwares[slot] = labware
+        return labware
+
+    def load_module(self, module_name, location=None, configuration=None):
+        slot = self._check_slot(location)
+        module = TemperatureModule(self, module_name, slot)
+        self.loaded_modules[slot] = module
+        return module
+
+    def load_instrument(self, instrument_name, mount, tip_racks=None, replace=False):
+        mount = getattr(mount, 'value', mount)
+        if mount in self.loaded_instruments and not replace:
+            raise SimulationError('Mount {} already has a pipette'.format(mount))
+        instr = InstrumentContext(self, instrument_name, mount, tip_racks)
+        self.loaded_instruments[mount] = instr
+        return instr
+
+    @property
+    def deck(self):
+        deck = {slot: None for slot in geometry.SLOT_ORIGINS}
+        deck.update(self.loaded_modules)
+        deck.update(self.loaded_labwares)
+        return deck
+
+    def delay(self, seconds=0, minutes=0, msg=None):
+        total = seconds + minutes * 60
+        self._record('delay', None, total, params={'seconds': total, 'msg': msg})
+
+    def pause(self, msg=None):
+        self._record('pause', None, 0.0, params={'msg': msg})
+
+    def comment(self, msg):
+        self._record('comment', None, 0.0, params={'msg': msg})
+
+    def home(self):
+        for instr in self.loaded_instruments.values():
+            instr._position = Point(*geometry.HOME_POINT)
+            instr._location = None
+        self._record('home', None, self.timings['home'])
+
+    def set_rail_lights(self, on):
+        self.rail_lights_on = bool(on)
+
+    def is_simulating(self):
+        return True
+
+
+# -- loading protocols ------------------------------------------------------
+
+# v1 API constructor names -> pipette model
+LEGACY_PIPETTES = {
+    'P10_Single': 'p10_single',
+    'P50_Single': 'p50_single',
+    'P300_Single': 'p300_single',
+    'P1000_Single': 'p1000_single',
+    'P20_Single_GEN2': 'p20_single_gen2',
+    'P300_Single_GEN2': 'p300_single_gen2',
+    'P1000_Single_GEN2': 'p1000_single_gen2',
+}
+
+
+def _legacy_modules(ctx):
+    """v1 API modules (labware, instruments, robot) that record into ctx.
+
+    v1 protocols do their work at import time, so these must be bound to a
+    context before the file is executed.
+    """
+    labware = types.ModuleType('opentrons.labware')
+    labware.load = lambda name, slot, label=None, share=False: ctx.load_labware(name, slot, label)
+
+    def make(model):
+        def constructor(mount, tip_racks=None, **kwargs):
+            instr = ctx.load_instrument(model, mount, tip_racks)
+            for key, attr in (('aspirate_flow_rate', 'aspirate'),
+                              ('dispense_flow_rate', 'dispense')):
+                if kwargs.get(key):
+                    setattr(instr.flow_rate, attr, kwargs[key])
+            return instr
+        return constructor
+
+    instruments = types.ModuleType('opentrons.instruments')
+    for attr, model in LEGACY_PIPETTES.items():
+        setattr(instruments, attr, make(model))
+
+    robot = types.ModuleType('opentrons.robot')
+    robot.home = ctx.home
+    robot.pause = ctx.pause
+    robot.comment = ctx.comment
+    robot.reset = lambda: None
+    robot.commands = lambda: [c.name for c in ctx.trace]
+    return {'labware': labware, 'instruments': instruments, 'robot': robot}
+
+
+def _fake_opentrons(ctx=None):
+    """Module objects standing in for the opentrons package.
+
+    With ctx given, the legacy v1 names are bound to it as well.
+    """
+    root = types.ModuleType('opentrons')
+    api = types.ModuleType('opentrons.protocol_api')
+    api.ProtocolContext = ProtocolContext
+    api.InstrumentContext = InstrumentContext
+    api.Labware = Labware
+    api.Well = Well
+    api.TemperatureModuleContext = TemperatureModule
+    api.OutOfTipsError = OutOfTipsError
+    types_mod = types.ModuleType('opentrons.types')
+    types_mod.Point = Point
+    types_mod.Location = Location
+    types_mod.Mount = Mount
+    commands_pkg = types.ModuleType('opentrons.commands')
+    commands = types.ModuleType('opentrons.commands.commands')
+    for name in ('aspirate', 'dispense', 'blow_out', 'move_to', 'mix',
+                 'pick_up_tip', 'drop_tip', 'touch_tip'):
+        setattr(commands, name, lambda *args, **kwargs: None)
+    commands_pkg.commands = commands
+    root.protocol_api = api
+    root.types = types_mod
+    root.commands = commands_pkg
+    modules = {
+        'opentrons': root,
+        'opentrons.protocol_api': api,
+        'opentrons.types': types_mod,
+        'opentrons.commands': commands_pkg,
+        'opentrons.commands.commands': commands,
+    }
+    if ctx is not None:
+        for name, mod in _legacy_modules(ctx).items():
+            setattr(root, name, mod)
+            modules['opentrons.' + name] = mod
+    return modules
+
+
+@contextlib.contextmanager
+def fake_opentrons(modules=None):
+    """Temporarily install the fake opentrons modules in sys.modules."""
+    modules = modules or _fake_opentrons()
+    saved = {name: sys.modules.get(name) for name in modules}
+    sys.modules.update(modules)
+    if geometry.REPO_ROOT not in sys.path:
+        sys.path.insert(0, geometry.REPO_ROOT)
+    try:
+        yield modules
+    finally:
+        for name, mod in saved.items():
+            if mod is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = mod
+
+
+def load_protocol(path, context=None):
+    """Import a protocol file (spaces in the path are fine) as a module.
+
+    A v1 protocol runs while it is imported; pass the context it should
+    record into.
+    """
+    name = '_protocol_' + os.path.splitext(os.path.basename(path))[0].replace(' ', '_').replace('.', '_')
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    if context is not None:
+        context.source_file = module.__file__
+    with fake_opentrons(_fake_opentrons(context)):
+        spec.loader.exec_module(module)
+    return module
+
+
+def simulate(path, context=None, quiet=True, switches=None):
+    """Run the protocol at path against a recording context and return it.
+
+    Handles both run(protocol) files and legacy v1 files that drive the
+    module-level labware/instruments API. The protocol's printed output is
+    kept on context.output. switches ({name: value}) are set on the
+    protocol module before run(), for module-level settings like RESUME.
+    """
+    ctx = context or ProtocolContext()
+    buf = io.StringIO()
+    redirect = contextlib.redirect_stdout(buf) if quiet else contextlib.nullcontext()
+    with redirect:
+        module = load_protocol(path, ctx)
+        meta = getattr(module, 'metadata', {}) or {}
+        ctx.metadata = meta
+        if hasattr(module, 'run'):
+            ctx.api_version = meta.get('apiLevel', ctx.api_version)
+            for name, value in (switches or {}).items():
+                if not hasattr(module, name):
+                    raise SimulationError('{} has no {} switch'.format(path, name))
+                setattr(module, name, value)
+            with fake_opentrons(_fake_opentrons(ctx)):
+                module.run(ctx)
+        elif ctx.loaded_instruments:
+            ctx.api_version = '1'
+        else:
+            raise SimulationError('{} has no run(protocol) function'.format(path))
+    ctx.output = buf.getvalue()
+    return ctx
+
+
+def summarize(ctx):
+    """Counts of each command, tips used and the runtime estimate."""
+    counts = {}
+    for cmd in ctx.trace:
+        counts[cmd.name] = counts.get(cmd.name, 0) + 1
+    tips = {}
+    for cmd in ctx.trace:
+        if cmd.name == 'pick_up_tip':
+            tips[cmd.instrument] = tips.get(cmd.instrument, 0) + 1
+    return {
+        'commands': len(ctx.trace),
+        'counts': counts,
+        'tips': tips,
+        'runtime': ctx.runtime,
+    }
+
+
+def format_duration(seconds):
+    minutes, sec = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return '{}h{:02d}m{:02d}s'.format(hours, minutes, sec)
+    return '{}m{:02d}s'.format(minutes, sec)
+
+
+def format_report(ctx):
+    summary = summarize(ctx)
+    lines = ['{} commands, estimated runtime {}'.format(
+        summary['commands'], format_duration(summary['runtime']))]
+    for name in sorted(summary['counts']):
+        lines.append('  {:<22}{:>6}'.format(name, summary['counts'][name]))
+    for instr, n in sorted(summary['tips'].items()):
+        lines.append('  {:<22}{:>6}'.format('tips ' + instr, n))
+    return '\n'.join(lines)
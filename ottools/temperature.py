@@ -0,0 +1,51 @@
+# Temperature module pre-conditioning that overlaps with pipetting.
+# A blocking set_temperature at the top of a protocol leaves the robot idle
+# for the whole ramp (several minutes to cool a Gen1 block to 4 C). Instead:
+#
+#   precondition(tempdeck, 4, [p300, p20])
+#
+# starts the ramp right away, lets the reagent prep run, and waits for the
+# target only when a pipette first aspirates from or dispenses into the
+# labware on the module (usually the plate).
+import functools
+
+from .ledger import _well_of
+
+
+def _on(location, labware):
+    well = _well_of(location)
+    return well is not None and well.parent is labware
+
+
+def precondition(module, celsius, pipettes, labware=None):
+    """Start module toward celsius; block on it at first use of labware.
+
+    labware defaults to the labware loaded on the module. Returns a callable
+    that waits for the target straight away (for steps the wrappers cannot
+    see, e.g. a move_to).
+    """
+    target = labware if labware is not None else module.labware
+    state = {'waiting': True}
+
+    def ready():
+        if state['waiting']:
+            state['waiting'] = False
+            module.await_temperature(celsius)
+
+    module.start_set_temperature(celsius)
+    for pipette in pipettes:
+        for name in ('aspirate', 'dispense'):
+            _wrap(pipette, name, target, state, ready)
+    return ready
+
+
+def _wrap(pipette, name, target, state, ready):
+    method = getattr(pipette, name)
+
+    @functools.wraps(method)
+    def wrapped(volume=None, location=None, rate=1.0):
+        if state['waiting'] and location is not None and _on(location, target):
+            ready()
+        return method(volume, location, rate)
+
+    setattr(pipette, name, wrapped)
@@ -0,0 +1,290 @@
+# Per-command timing of real runs.
+# The run log shows a gantry move, a slow aspirate, a touch_tip and a delay
+# the same way, so there is no telling where a run's time goes. RunTimer
+# wraps the commands of the protocol, of every pipette and of every module
+# and writes one JSON line per call to the robot's local storage:
+#
+#   timer = RunTimer(protocol, 'create_primer_matrix')   # first line of run()
+#   ...                                                   # the protocol, unchanged
+#   timer.close()
+#
+# Pipettes and modules loaded after the timer are wrapped as they load. A row
+# has the command, the pipette, monotonic start/end seconds from the start
+# of the run, the arguments (wells and locations as text), the protocol line
+# that issued it and the row of the mix/transfer it ran inside. Each row is
+# flushed as it is written, so a run that stops still leaves its log.
+# In the app's upload simulation the timer does nothing.
+#
+#   python -m ottools timing <log.jsonl>
+#
+# reports the time by command, by pipette, by phase (ottools.estimate's
+# travel/liquid/tips/...) and by step of the protocol when its file is found.
+import datetime
+import functools
+import json
+import os
+import socket
+import sys
+import time
+
+from . import estimate, sim
+
+TIMING_DIR = os.environ.get('OTTOOLS_TIMINGS', (
+    '/data/user_storage/ottools-timings' if os.path.isdir('/data/user_storage')
+    else os.path.join(os.path.expanduser('~'), '.cache', 'ottools', 'timings')))
+# the robot a log came from
+ROBOT = os.environ.get('OTTOOLS_ROBOT', socket.gethostname())
+
+PIPETTE_COMMANDS = ('pick_up_tip', 'drop_tip', 'return_tip', 'aspirate', 'dispense',
+                    'blow_out', 'touch_tip', 'air_gap', 'mix', 'move_to', 'home',
+                    'transfer', 'distribute', 'consolidate')
+PROTOCOL_COMMANDS = ('delay', 'pause', 'comment', 'home')
+MODULE_COMMANDS = ('start_set_temperature', 'await_temperature', 'set_temperature',
+                   'deactivate', 'engage', 'disengage', 'set_block_temperature',
+                   'set_lid_temperature', 'open_lid', 'close_lid', 'execute_profile')
+# the argument holding the volume, by position
+VOLUME_ARG = {'aspirate': 0, 'dispense': 0, 'air_gap': 0, 'mix': 1, 'transfer': 0,
+              'distribute': 0, 'consolidate': 0}
+
+
+class TimingError(Exception):
+    pass
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    return str(value)
+
+
+class RunTimer:
+    def __init__(self, protocol, name, directory=None, enabled=None):
+        self.protocol = protocol
+        self.enabled = not protocol.is_simulating() if enabled is None else enabled
+        self.path = None
+        self.rows = 0
+        self._stack = []
+        self._file = None
+        self._source = sys._getframe(1).f_code.co_filename
+        self._t0 = time.monotonic()
+        if not self.enabled:
+            return
+        directory = directory or TIMING_DIR
+        os.makedirs(directory, exist_ok=True)
+        started = datetime.datetime.now()
+        self.path = os.path.join(directory, '{}-{:%Y%m%d-%H%M%S}.jsonl'.format(name, started))
+        self._file = open(self.path, 'w', buffering=1)
+        self._write({'protocol': name, 'source': self._source, 'robot': ROBOT,
+                     'started': started.isoformat(timespec='seconds')})
+        for command in PROTOCOL_COMMANDS:
+            self._wrap(protocol, command, None)
+        self.track(*protocol.loaded_instruments.values())
+        self.track(*protocol.loaded_modules.values())
+        self._wrap_loader(protocol, 'load_instrument')
+        self._wrap_loader(protocol, 'load_module')
+
+    def _write(self, row):
+        self._file.write(json.dumps(row) + '\n')
+
+    def _now(self):
+        return round(time.monotonic() - self._t0, 4)
+
+    def _line(self):
+        # line in the protocol file that (ultimately) issued this command
+        line = None
+        frame = sys._getframe(2)
+        while frame is not None:
+            if frame.f_code.co_filename == self._source:
+                line = frame.f_lineno
+            frame = frame.f_back
+        return line
+
+    # -- wrapping ------------------------------------------------------------
+
+    def track(self, *targets):
+        """Time the commands of pipettes or modules loaded before the timer."""
+        if not self.enabled:
+            return
+        for target in targets:
+            if hasattr(target, 'mount'):
+                for name in PIPETTE_COMMANDS:
+                    self._wrap(target, name, target.name)
+            else:
+                for name in MODULE_COMMANDS:
+                    if hasattr(target, name):
+                        self._wrap(target, name, None, module=str(target))
+
+    def _wrap_loader(self, protocol, name):
+        load = getattr(protocol, name)
+        timer = self
+
+        @functools.wraps(load)
+        def wrapped(*args, **kwargs):
+            loaded = load(*args, **kwargs)
+            timer.track(loaded)
+            return loaded
+
+        setattr(protocol, name, wrapped)
+
+    def _wrap(self, target, name, instrument, module=None):
+        method = getattr(target, name)
+        if getattr(method, '_timed', False):
+            return
+        timer = self
+
+        @functools.wraps(method)
+        def wrapped(*args, **kwargs):
+            index = timer.rows
+            timer.rows += 1
+            row = {'index': index, 'name': name, 'instrument': instrument,
+                   'parent': timer._stack[-1] if timer._stack else None,
+                   'line': timer._line()}
+            if module is not None:
+                row['module'] = module
+            position = VOLUME_ARG.get(name)
+            if position is not None:
+                volume = kwargs.get('volume', args[position] if len(args) > position else None)
+                row['volume'] = volume if isinstance(volume, (int, float)) else None
+            row['args'] = _jsonable(list(args))
+            if kwargs:
+                row['kwargs'] = _jsonable(kwargs)
+            timer._stack.append(index)
+            row['start'] = timer._now()
+            try:
+                return method(*args, **kwargs)
+            except Exception as exc:
+                row['error'] = '{}: {}'.format(type(exc).__name__, exc)
+                raise
+            finally:
+                row['end'] = timer._now()
+                timer._stack.pop()
+                timer._write(row)
+
+        wrapped._timed = True
+        setattr(target, name, wrapped)
+
+    def close(self):
+        """Write the end-of-run row and close the log."""
+        if self._file is None:
+            return
+        self._write({'finished': True, 'runtime': self._now(), 'rows': self.rows})
+        self._file.close()
+        self._file = None
+
+
+# -- report --------------------------------------------------------------------
+
+def read_log(path):
+    """(header, rows in index order, footer or None) of a timing log.
+
+    A log cut short by a crash can end in a partial line; it is dropped.
+    """
+    header, rows, footer = None, [], None
+    with open(path) as f:
+        for text in f:
+            try:
+                row = json.loads(text)
+            except ValueError:
+                continue
+            if 'protocol' in row and header is None:
+                header = row
+            elif row.get('finished'):
+                footer = row
+            else:
+                rows.append(row)
+    if header is None:
+        raise TimingError('{} is not a timing log'.format(path))
+    rows.sort(key=lambda r: r['index'])
+    return header, rows, footer
+
+
+def phase_of(name):
+    """estimate's phase of a command, or 'paused' for the wait at a pause.
+
+    travel is only move_to here: the moves inside an aspirate or a
+    pick_up_tip are not split out of it.
+    """
+    if name in estimate._LIQUID or name in ('mix', 'transfer', 'distribute', 'consolidate'):
+        return 'liquid'
+    if name in estimate._TIPS or name == 'return_tip':
+        return 'tips'
+    if name == 'move_to':
+        return 'travel'
+    if name == 'delay':
+        return 'delay'
+    if name == 'pause':
+        return 'paused'
+    if name in estimate._TEMPERATURE:
+        return 'temperature'
+    return 'other'
+
+
+def self_times(rows):
+    """{index: seconds} of each row less the rows run inside it."""
+    seconds = {r['index']: r['end'] - r['start'] for r in rows}
+    for r in rows:
+        if r['parent'] is not None and r['parent'] in seconds:
+            seconds[r['parent']] -= r['end'] - r['start']
+    return {index: max(s, 0.0) for index, s in seconds.items()}
+
+
+def summarize(rows, footer=None, source=None):
+    """Time of a run by command, pipette, phase and (with the protocol
+    source) step; each is {key: [rows, seconds]}."""
+    own = self_times(rows)
+    top = [r for r in rows if r['parent'] is None]
+    wall = footer['runtime'] if footer else max([r['end'] for r in rows] or [0.0])
+    report = {'wall': wall, 'commands': {}, 'pipettes': {}, 'phases': {}, 'steps': {},
+              'between': wall - sum(r['end'] - r['start'] for r in top),
+              'errors': [r for r in rows if 'error' in r]}
+
+    def add(group, key, seconds):
+        entry = report[group].setdefault(key, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    for r in rows:
+        add('commands', r['name'], own[r['index']])
+        add('pipettes', r['instrument'] or r.get('module') or 'protocol', own[r['index']])
+        add('phases', phase_of(r['name']), own[r['index']])
+    if source is not None:
+        steps = estimate.steps_of(source)
+        for r in top:
+            step = estimate._step_for(steps, r['line'])
+            add('steps', (step.first, step.label) if step else (0, '(outside run)'),
+                r['end'] - r['start'])
+    return report
+
+
+def format_report(header, report, footer=None, top=None):
+    duration = sim.format_duration
+    wall = report['wall'] or 1.0
+    lines = ['{} on {}, {}: {} measured{}'.format(
+        header['protocol'], header['robot'], header['started'], duration(report['wall']),
+        '' if footer else ' (log ends early: the run did not finish)')]
+
+    def table(title, entries, label=str):
+        lines.extend(['', title])
+        shown = sorted(entries.items(), key=lambda item: -item[1][1])
+        for key, (count, seconds) in shown[:top] if top else shown:
+            lines.append('  {:<44} {:>6} {:>9} {:>5.1f}%'.format(
+                label(key), count, duration(seconds), 100 * seconds / wall))
+
+    table('by command:', report['commands'])
+    table('by pipette:', report['pipettes'])
+    table('by phase:', report['phases'])
+    if report['steps']:
+        table('by step:', report['steps'], lambda key: '{:>5}  {}'.format(
+            'L{}'.format(key[0]) if key[0] else '', key[1])[:44])
+    lines.append('')
+    lines.append('  {:<44} {:>6} {:>9} {:>5.1f}%'.format(
+        'between commands (protocol code, loading)', '', duration(report['between']),
+        100 * report['between'] / wall))
+    for r in report['errors']:
+        lines.append('error at row {} ({}, line {}): {}'.format(
+            r['index'], r['name'], r['line'], r['error']))
+    return '\n'.join(lines)
@@ -0,0 +1,116 @@
+# Tip budgeting.
+# Every protocol loads one rack per tip size, and new_tip='always' over a
+# plate can empty it mid-run. tip_budget() simulates a protocol with
+# bottomless racks to count the tips each pipette really uses;
+# allocate_tipracks() is the protocol-side half: it loads the extra racks
+# into free slots before the run starts, nearest the work first.
+#
+#   allocate_tipracks(protocol, p20, 130)  # 1 rack loaded -> 1 more added
+import math
+
+from . import geometry, sim
+
+TIPS_PER_RACK = 96
+
+
+class TipBudgetError(Exception):
+    pass
+
+
+def tip_budget(path):
+    """Per pipette: tips used, tips loaded and racks short.
+
+    Racks shared by several pipettes are counted once for all of them.
+    """
+    ctx = sim.ProtocolContext(unlimited_tips=True)
+    sim.simulate(path, ctx)
+    used = {}
+    for cmd in ctx.trace:
+        if cmd.name == 'pick_up_tip':
+            used[cmd.instrument] = used.get(cmd.instrument, 0) + 1
+    budget = {}
+    for pipette in ctx.loaded_instruments.values():
+        if pipette.name not in used:
+            continue
+        racks = pipette.tip_racks
+        sharing = [p.name for p in ctx.loaded_instruments.values()
+                   if any(r in p.tip_racks for r in racks)]
+        need = sum(used.get(n, 0) for n in sharing)
+        loaded = sum(len(r.wells()) for r in racks)
+        short = max(need - loaded, 0)
+        budget[pipette.name] = {
+            'tips': used[pipette.name],
+            'loaded': loaded,
+            'rack': racks[0].load_name if racks else None,
+            'extra_racks': int(math.ceil(short / float(TIPS_PER_RACK))),
+        }
+    return ctx, budget
+
+
+def _slot_centre(slot):
+    x, y, _ = geometry.SLOT_ORIGINS[str(slot)]
+    return x + geometry.SLOT_SIZE[0] / 2, y + geometry.SLOT_SIZE[1] / 2
+
+
+def free_slots(protocol):
+    taken = {str(s) for s in protocol.loaded_labwares}
+    taken |= {str(s) for s in protocol.loaded_modules}
+    return [s for s in geometry.SLOT_ORIGINS if s not in taken and s != geometry.TRASH_SLOT]
+
+
+def work_centre(protocol):
+    """Mean slot centre of everything loaded that is not a tip rack or trash."""
+    slots = [str(s) for s, lw in protocol.loaded_labwares.items()
+             if not lw.is_tiprack and str(s) != geometry.TRASH_SLOT]
+    slots += [str(s) for s in protocol.loaded_modules]
+    if not slots:
+        return _slot_centre('5')
+    centres = [_slot_centre(s) for s in slots]
+    return (sum(c[0] for c in centres) / len(centres),
+            sum(c[1] for c in centres) / len(centres))
+
+
+def _distance_to(centre):
+    def key(slot):
+        x, y = _slot_centre(slot)
+        return (x - centre[0]) ** 2 + (y - centre[1]) ** 2
+    return key
+
+
+def allocate_tipracks(protocol, pipette, tips, load_name=None):
+    """Make sure pipette has racks for tips pick-ups; returns racks added.
+
+    Extra racks (same type as its first rack unless load_name is given) go
+    to the free slots closest to the labware being worked on, and the
+    pipette's racks are ordered nearest-first so pick-ups stay close to the
+    work.
+    """
+    racks = list(pipette.tip_racks)
+    loaded = sum(len(r.wells()) for r in racks)
+    short = max(tips - loaded, 0)
+    needed = int(math.ceil(short / float(TIPS_PER_RACK)))
+    load_name = load_name or (racks[0].load_name if racks else None)
+    if needed and load_name is None:
+        raise TipBudgetError('{} has no tip rack to copy; pass load_name'.format(pipette))
+    centre = work_centre(protocol)
+    slots = sorted(free_slots(protocol), key=_distance_to(centre))
+    if len(slots) < needed:
+        raise TipBudgetError('{} needs {} more tip racks but only {} slots are free'.format(
+            pipette, needed, len(slots)))
+    added = [protocol.load_labware(load_name, slot) for slot in slots[:needed]]
+    racks += added
+    if getattr(pipette, 'starting_tip', None) is None:
+        racks.sort(key=lambda r: _distance_to(centre)(str(r.parent)))
+    pipette.tip_racks = racks
+    return added
+
+
+def format_budget(path, budget):
+    lines = [path]
+    if not budget:
+        lines.append('  no tips used')
+    for name, b in sorted(budget.items()):
+        lines.append('  {:<20} {:>4} tips used, {:>4} loaded ({}){}'.format(
+            name, b['tips'], b['loaded'], b['rack'],
+            ', SHORT: {} more rack(s)'.format(b['extra_racks']) if b['extra_racks'] else ''))
+    return '\n'.join(lines)
@@ -0,0 +1,164 @@
+# Gantry travel-path ordering.
+# Reorders independent destinations so the head covers less XY distance:
+# nearest neighbour for a first tour, then 2-opt until no reversal helps.
+# Positions come from live wells (real API or ottools.sim) or straight from
+# the labware definitions and deck slot origins in geometry.py.
+#
+# Ordering the chemistry depends on is kept through groups: consecutive
+# items with the same group key may be shuffled among themselves, but never
+# past an item of another group.
+import numpy as np
+
+from . import geometry
+
+
+def well_position(load_name, slot, well_name, module=None):
+    """(x, y, z) of the top of a well, from its labware definition."""
+    definition = geometry.labware_definition(load_name)
+    corner = definition.get('cornerOffsetFromSlot', {})
+    base = geometry.SLOT_ORIGINS[str(slot)]
+    offset = geometry.MODULE_OFFSETS[module.lower()] if module else (0, 0, 0)
+    well = definition['wells'][well_name]
+    return (base[0] + offset[0] + corner.get('x', 0) + well['x'],
+            base[1] + offset[1] + corner.get('y', 0) + well['y'],
+            base[2] + offset[2] + corner.get('z', 0) + well['z'] + well['depth'])
+
+
+def position(target):
+    """(x, y, z) of a Well, a Location or a plain point."""
+    if hasattr(target, 'top'):
+        target = target.top()
+    point = getattr(target, 'point', target)
+    return tuple(float(c) for c in point)[:3]
+
+
+def path_length(points, start=None, end=None):
+    """Total XY distance visiting points in order (from start, to end)."""
+    xy = [p[:2] for p in points]
+    if start is not None:
+        xy.insert(0, start[:2])
+    if end is not None:
+        xy.append(end[:2])
+    if len(xy) < 2:
+        return 0.0
+    xy = np.asarray(xy, dtype=float)
+    return float(np.hypot(*np.diff(xy, axis=0).T).sum())
+
+
+def _distances(points, start, end):
+    # node 0 is the start, node n + 1 the end; a missing start or end is a
+    # free node (zero distance to everything), which makes the path open
+    xy = np.asarray([p[:2] for p in points], dtype=float).reshape(-1, 2)
+    n = len(xy)
+    full = np.zeros((n + 2, 2))
+    full[1:n + 1] = xy
+    if start is not None:
+        full[0] = start[:2]
+    if end is not None:
+        full[n + 1] = end[:2]
+    diff = full[:, None, :] - full[None, :, :]
+    dist = np.hypot(diff[..., 0], diff[..., 1])
+    if start is None:
+        dist[0, :] = dist[:, 0] = 0.0
+    if end is None:
+        dist[n + 1, :] = dist[:, n + 1] = 0.0
+    return dist
+
+
+def nearest_neighbour(dist):
+    n = len(dist) - 2
+    path = [0]
+    left = set(range(1, n + 1))
+    while left:
+        row = dist[path[-1]]
+        nxt = min(left, key=lambda j: (row[j], j))
+        path.append(nxt)
+        left.remove(nxt)
+    path.append(n + 1)
+    return path
+
+
+def two_opt(dist, path, max_rounds=50):
+    """Reverse segments of path while that shortens it; ends stay fixed."""
+    path = np.asarray(path)
+    last = len(path) - 2
+    for _ in range(max_rounds):
+        improved = False
+        for i in range(1, last):
+            a, b = path[i - 1], path[i]
+            c, d = path[i + 1:last + 1], path[i + 2:last + 2]
+            gain = dist[a, b] + dist[c, d] - dist[a, c] - dist[b, d]
+            k = int(np.argmax(gain))
+            if gain[k] > 1e-9:
+                j = i + 1 + k
+                path[i:j + 1] = path[i:j + 1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+    return path.tolist()
+
+
+def optimize_order(points, start=None, end=None):
+    """Indices into points giving a short XY path from start (to end)."""
+    if len(points) < 3 and start is None and end is None:
+        return list(range(len(points)))
+    dist = _distances(points, start, end)
+    path = two_opt(dist, nearest_neighbour(dist))
+    return [i - 1 for i in path[1:-1]]
+
+
+def order_items(items, key=position, start=None, end=None, groups=None):
+    """items reordered for short travel, keeping the order of group runs.
+
+    key maps an item to its (x, y[, z]) position; groups is one key per item
+    (default: everything in one group).
+    """
+    items = list(items)
+    if groups is None:
+        groups = [None] * len(items)
+    runs = []
+    for item, group in zip(items, groups):
+        if runs and runs[-1][0] == group:
+            runs[-1][1].append(item)
+        else:
+            runs.append((group, [item]))
+    ordered = []
+    here = position(start) if start is not None else None
+    for i, (_, run) in enumerate(runs):
+        points = [key(item) for item in run]
+        last_run = i == len(runs) - 1
+        stop = position(end) if end is not None and last_run else None
+        order = optimize_order(points, here, stop)
+        ordered.extend(run[j] for j in order)
+        here = points[order[-1]]
+    return ordered
+
+
+def order_wells(wells, start=None, end=None, groups=None):
+    """Wells (or Locations) in a short visiting order; see order_items."""
+    return order_items(wells, position, start, end, groups)
+
+
+def trace_travel(trace):
+    """XY mm the head travels in a sim trace, total and per slot pair."""
+    total = 0.0
+    pairs = {}
+    prev = None
+    for cmd in trace:
+        if cmd.point is None:
+            continue
+        slot = _slot_of(cmd.point)
+        if prev is not None:
+            d = float(np.hypot(cmd.point[0] - prev[0][0], cmd.point[1] - prev[0][1]))
+            total += d
+            pair = (prev[1], slot)
+            pairs[pair] = pairs.get(pair, 0.0) + d
+        prev = (cmd.point, slot)
+    return total, pairs
+
+
+def _slot_of(point):
+    for slot, (x, y, _) in geometry.SLOT_ORIGINS.items():
+        if x <= point[0] < x + geometry.SLOT_SIZE[0] and y <= point[1] < y + geometry.SLOT_SIZE[1]:
+            return slot
+    return '-'
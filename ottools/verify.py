@@ -0,0 +1,121 @@
+# Calibration check of every custom labware in one run.
+# Each Labware/*/test_*.py checks one definition per robot run: home, the
+# three calibration crosses, then A1 and the last well of that labware, the
+# whole run at RATE = 0.25. verify_all() does the crosses once, loads every
+# definition under Labware/ into a free slot and walks them all in one pass:
+#
+#   labwares = load_all(protocol)
+#   verify_all(protocol, p20, labwares)
+#
+# The labware is visited in a short path (ottools.travel) and the gantry
+# only slows to RATE / SLOWER_RATE for the final approach to each well, so
+# the time between checks is spent at full speed.
+from . import registry, tips, travel
+
+CALIBRATION_CROSS_COORDS = {
+    '1': {'x': 12.13, 'y': 9.0, 'z': 0.0},
+    '3': {'x': 380.87, 'y': 9.0, 'z': 0.0},
+    '7': {'x': 12.13, 'y': 258.0, 'z': 0.0},
+}
+CALIBRATION_CROSS_SLOTS = ['1', '3', '7']
+
+RATE = 0.25  # % of default speeds
+SLOWER_RATE = 0.1
+# mm above a well top where the full-speed move ends and the slow approach starts
+APPROACH_Z = 10
+
+EDGES = [((-1, 0), 'left'), ((1, 0), 'right'), ((0, -1), 'front'), ((0, 1), 'back')]
+
+
+def _location(point):
+    # opentrons is only importable on the robot or inside ottools.sim
+    from opentrons import types
+    return types.Location(point=types.Point(*point), labware=None)
+
+
+def set_speeds(protocol, rate):
+    protocol.max_speeds.update({
+        'X': (600 * rate),
+        'Y': (400 * rate),
+        'Z': (125 * rate),
+        'A': (125 * rate),
+    })
+    speed_max = max(protocol.max_speeds.values())
+    for instr in protocol.loaded_instruments.values():
+        instr.default_speed = speed_max
+
+
+def load_all(protocol, load_names=None, reserved=()):
+    """Load every custom definition under Labware/ (or just load_names) into
+    the free slots, in slot order; returns the labware loaded."""
+    names = registry.names() if load_names is None else list(load_names)
+    slots = [s for s in tips.free_slots(protocol) if s not in set(map(str, reserved))]
+    if len(names) > len(slots):
+        raise ValueError('{} labware definitions but only {} free slots'.format(
+            len(names), len(slots)))
+    loaded = []
+    for name, slot in zip(names, sorted(slots, key=int)):
+        definition = registry.definition(name)
+        label = definition.get('metadata', {}).get('displayName', name)
+        loaded.append(protocol.load_labware_from_definition(definition, slot, label))
+    return loaded
+
+
+def check_wells(labware):
+    """The wells the single-labware tests check: A1 and the last well."""
+    wells = labware.wells()
+    return [wells[0]] if len(wells) == 1 else [wells[0], wells[-1]]
+
+
+def walk(labwares):
+    """Every (labware, well) to check, in a short path over the deck.
+
+    The labware order comes from the path over their first wells; within a
+    labware the checked wells are ordered from wherever the head arrives.
+    """
+    labwares = travel.order_items(labwares, key=lambda lw: travel.position(lw.wells()[0]))
+    stops = [(lw, well) for lw in labwares for well in check_wells(lw)]
+    return travel.order_items(stops, key=lambda stop: travel.position(stop[1]),
+                              groups=[id(lw) for lw, _ in stops])
+
+
+def check_crosses(protocol, pipette, slots=CALIBRATION_CROSS_SLOTS):
+    set_speeds(protocol, RATE)
+    for slot in slots:
+        coordinate = CALIBRATION_CROSS_COORDS[slot]
+        pipette.move_to(_location((coordinate['x'], coordinate['y'], coordinate['z'])))
+        protocol.pause(
+            "Confirm {} pipette is at slot {} calibration cross".format(pipette.mount, slot))
+
+
+def check_well(protocol, pipette, labware, well):
+    name = '{} of {} (slot {})'.format(well.well_name, labware.load_name, labware.parent)
+    set_speeds(protocol, 1.0)
+    pipette.move_to(well.top(APPROACH_Z))
+    set_speeds(protocol, RATE)
+    pipette.move_to(well.top())
+    protocol.pause("Moved to the top of {}".format(name))
+    set_speeds(protocol, SLOWER_RATE)
+    for (x, y), edge_name in EDGES:
+        pipette.move_to(_location(well._from_center_cartesian(x=x, y=y, z=1)))
+        protocol.pause("Moved to {} edge of {}".format(edge_name, name))
+    set_speeds(protocol, RATE)
+    pipette.move_to(well.bottom())
+    protocol.pause("Moved to the bottom of {}".format(name))
+    pipette.blow_out(well)
+
+
+def verify_all(protocol, pipette, labwares):
+    """Crosses once, then the top, edges and bottom of the first and last
+    well of every labware; returns the (labware, well) stops in run order."""
+    pipette.pick_up_tip()
+    check_crosses(protocol, pipette)
+    pipette.home()
+    protocol.pause("Place your labware: {}".format(', '.join(
+        '{} in slot {}'.format(lw.load_name, lw.parent) for lw in labwares)))
+    stops = walk(labwares)
+    for labware, well in stops:
+        check_well(protocol, pipette, labware, well)
+    set_speeds(protocol, 1.0)
+    pipette.return_tip()
+    return stops
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+from ottools import geometry, sim
+
+PRIMER_MATRIX = os.path.join(geometry.REPO_ROOT, 'Exp800.05 create qPCR primer matrix',
+                             'create_primer_matrix.py')
+MAG_BEADS = os.path.join(geometry.REPO_ROOT, 'Exp803.10 Make Reagent in 48 5mL Tubes with Mag Beads',
+                         'Exp803.10 Make Reagent in 48 5mL Tubes with Mag Beads.py')
+
+
+@pytest.fixture
+def ctx():
+    return sim.ProtocolContext()
+
+
+@pytest.fixture
+def p300(ctx):
+    tips = ctx.load_labware('opentrons_96_filtertiprack_200ul', '8')
+    return ctx.load_instrument('p300_single_gen2', 'left', tip_racks=[tips])
+
+
+def net_volumes(*contexts):
+    """{well: ul dispensed less ul aspirated} over the traces of contexts."""
+    net = {}
+    for context in contexts:
+        for cmd in context.trace:
+            if cmd.name in ('aspirate', 'dispense'):
+                sign = 1 if cmd.name == 'dispense' else -1
+                net[cmd.location] = net.get(cmd.location, 0.0) + sign * cmd.volume
+    return net
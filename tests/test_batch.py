@@ -0,0 +1,46 @@
+import os
+
+from conftest import PRIMER_MATRIX
+from ottools import batch, geometry
+
+
+def test_discover():
+    found = batch.discover()
+    assert os.path.relpath(PRIMER_MATRIX, geometry.REPO_ROOT) in found
+    assert not any(p.startswith('ottools') or p.startswith('tests') for p in found)
+
+
+def test_discover_legacy_and_v2(tmp_path):
+    (tmp_path / 'v2.py').write_text('def run(protocol):\n    pass\n')
+    (tmp_path / 'v1.py').write_text('from opentrons import labware, instruments\n')
+    (tmp_path / 'helper.py').write_text('def helper():\n    pass\n')
+    for skipped in ('ottools', 'tests'):
+        (tmp_path / skipped).mkdir()
+        (tmp_path / skipped / 'x.py').write_text('def run(protocol):\n    pass\n')
+    assert batch.discover(str(tmp_path)) == ['v1.py', 'v2.py']
+
+
+def test_simulate_one(tmp_path):
+    (tmp_path / 'good.py').write_text(
+        'metadata = {"apiLevel": "2.13"}\n'
+        'def run(protocol):\n'
+        '    protocol.delay(seconds=5)\n')
+    (tmp_path / 'bad.py').write_text(
+        'metadata = {"apiLevel": "2.13"}\n'
+        'def run(protocol):\n'
+        '    protocol.load_labware("biorad_96_wellplate_200ul_pcr", "1")\n'
+        '    protocol.load_labware("biorad_96_wellplate_200ul_pcr", "1")\n')
+    good = batch.simulate_one('good.py', str(tmp_path))
+    assert good['ok'] and good['commands'] == 1 and good['runtime'] == 5.0
+    bad = batch.simulate_one('bad.py', str(tmp_path))
+    assert not bad['ok']
+    assert bad['error'].startswith('SimulationError') and bad['error'].endswith('(line 4)')
+    (tmp_path / 'broken.py').write_text('def run(protocol):\n    (\n')
+    assert batch.simulate_one('broken.py', str(tmp_path))['error'].startswith('SyntaxError')
+
+
+def test_run_batch_in_process(tmp_path):
+    (tmp_path / 'a.py').write_text('def run(protocol):\n    protocol.comment("a")\n')
+    results = batch.run_batch(root=str(tmp_path), jobs=1)
+    assert [(r['path'], r['ok']) for r in results] == [('a.py', True)]
+    assert 'a.py' in batch.format_table(results)
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from conftest import PRIMER_MATRIX
+from ottools import calibrate, runtime, sim
+
+# what a robot "measured": the model under known constants
+TRUE = {'travel_factor': 1.3, 'move_overhead': 0.25, 'plunger_overhead': 0.5,
+        'blow_out_overhead': 1.1, 'touch_tip': 2.5, 'pick_up_tip': 5.0, 'drop_tip': 3.0}
+
+
+def rows_of(trace):
+    return [{'index': c.index, 'name': c.name, 'instrument': c.instrument, 'parent': c.parent,
+             'line': c.line, 'start': c.start, 'end': c.start + c.duration} for c in trace]
+
+
+@pytest.fixture
+def log(tmp_path):
+    ctx = sim.simulate(PRIMER_MATRIX, sim.ProtocolContext(timings=dict(runtime.TIMINGS, **TRUE)))
+    path = tmp_path / 'create_primer_matrix-20260101-090000.jsonl'
+    with open(str(path), 'w') as f:
+        f.write(json.dumps({'protocol': 'create_primer_matrix', 'source': PRIMER_MATRIX,
+                            'robot': 'ot2-left', 'started': '2026-01-01T09:00:00'}) + '\n')
+        for row in rows_of(ctx.trace):
+            f.write(json.dumps(row) + '\n')
+    return str(path)
+
+
+def test_pair_skips_group_children_and_extra_rows():
+    trace = sim.simulate(PRIMER_MATRIX).trace
+    rows = rows_of(trace)
+    extra = dict(rows[5], index=len(rows), name='move_to', parent=None)
+    pairs = calibrate.pair(rows[:5] + [extra] + rows[5:], trace)
+    assert all(row['index'] == cmd.index for row, cmd in pairs)
+    assert len(pairs) == len(calibrate._commands(trace, lambda c: c.name,
+                                                 lambda c: c.parent, lambda c: c.index))
+
+
+def test_features(ctx, p300):
+    rack = ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+    p300.pick_up_tip()
+    p300.aspirate(100, rack['A1'])
+    ctx.delay(seconds=1)
+    pick, aspirate, delay = ctx.trace
+    row, fixed = calibrate.features(aspirate)
+    assert row == {'travel_factor': aspirate.params['travel'], 'move_overhead': 1.0,
+                   'plunger_overhead': 1.0}
+    assert fixed == pytest.approx(100 / p300.flow_rate.aspirate, abs=1e-3)
+    assert calibrate.features(delay) is None
+
+
+def test_fit_recovers_the_constants(log):
+    runs = calibrate.load_runs([log])
+    fitted = calibrate.fit(runs)
+    assert fitted == pytest.approx(TRUE, abs=1e-3)
+    measured, predicted = calibrate.predict(runs[0][2], dict(runtime.TIMINGS, **fitted))
+    assert predicted == pytest.approx(measured, rel=1e-4)
+
+
+def test_save_and_load(log, tmp_path):
+    runs = calibrate.load_runs([log])
+    robot = calibrate.robot_of(runs)
+    assert robot == 'ot2-left'
+    path = calibrate.save(robot, calibrate.fit(runs), runs, directory=str(tmp_path / 'cal'))
+    with open(path) as f:
+        saved = json.load(f)
+    assert saved['logs'] == ['create_primer_matrix-20260101-090000.jsonl']
+    timings = calibrate.load_timings('ot2-left', directory=str(tmp_path / 'cal'))
+    assert timings['pick_up_tip'] == pytest.approx(5.0, abs=1e-3)
+    assert timings['home'] == runtime.TIMINGS['home']
+    with pytest.raises(calibrate.CalibrationError, match='has no calibration'):
+        calibrate.load_timings('ot2-right', directory=str(tmp_path / 'cal'))
+
+
+def test_robot_of():
+    runs = [('a', {'robot': 'left'}, []), ('b', {'robot': 'right'}, [])]
+    with pytest.raises(calibrate.CalibrationError, match='several robots'):
+        calibrate.robot_of(runs)
+    assert calibrate.robot_of(runs, 'left') == 'left'
+
+
+def test_nothing_to_fit():
+    with pytest.raises(calibrate.CalibrationError, match='no logged command'):
+        calibrate.fit([('a', {'robot': 'left'}, [])])
+
+
+def test_missing_protocol():
+    with pytest.raises(calibrate.CalibrationError, match='not in this checkout'):
+        calibrate.find_protocol({'source': '/robot/nowhere.py', 'protocol': 'nowhere'})
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from ottools import checkpoint, sim
+
+from conftest import MAG_BEADS, PRIMER_MATRIX, net_volumes
+
+
+def stop_and_resume(path, stop_at, directory):
+    full, stopped, resumed = checkpoint.simulate_stop(path, stop_at, str(directory))
+    expected = net_volumes(full)
+    got = net_volumes(stopped, resumed)
+    diff = {well: got.get(well, 0.0) - expected.get(well, 0.0) for well in set(expected) | set(got)}
+    return stopped, {well: round(ul, 3) for well, ul in diff.items() if abs(ul) > 1e-6}
+
+
+@pytest.mark.parametrize('path, stop_at', [(PRIMER_MATRIX, 400), (PRIMER_MATRIX, 1000),
+                                           (MAG_BEADS, 100)])
+def test_stop_and_resume_move_the_same_liquid(path, stop_at, tmp_path):
+    _, diff = stop_and_resume(path, stop_at, tmp_path)
+    assert diff == {}
+
+
+def test_only_the_liquid_in_the_tip_is_lost(tmp_path):
+    stopped, diff = stop_and_resume(MAG_BEADS, 700, tmp_path)
+    last = stopped.trace[-1]
+    assert last.name == 'aspirate' and last.parent is None
+    assert diff == {last.location: -last.volume}
+
+
+def test_resume_restores_the_tips(tmp_path):
+    full, stopped, resumed = checkpoint.simulate_stop(PRIMER_MATRIX, 1000, str(tmp_path))
+    picked = [[c.location for c in run.trace if c.name == 'pick_up_tip']
+              for run in (full, stopped, resumed)]
+    # the resumed run starts past every tip the stopped one took
+    assert not set(picked[1]) & set(picked[2])
+    assert len(picked[1]) + len(picked[2]) >= len(picked[0])
+    assert any(c.name == 'pause' and 'Resuming after step' in c.params.get('msg', '')
+               for c in resumed.trace)
+    saved = json.loads((tmp_path / 'create_primer_matrix.json').read_text())
+    assert saved['finished']
+
+
+def test_a_changed_protocol_is_not_resumed(tmp_path):
+    checkpoint.simulate_stop(PRIMER_MATRIX, 400, str(tmp_path))
+    path = tmp_path / 'create_primer_matrix.json'
+    saved = json.loads(path.read_text())
+    saved.update(finished=False, digest='0' * 40)
+    path.write_text(json.dumps(saved))
+    with pytest.raises(checkpoint.CheckpointError, match='does not match'):
+        checkpoint._run(sim, PRIMER_MATRIX, True, str(tmp_path))
+
+
+def test_nothing_is_written_while_simulating(ctx, p300, tmp_path):
+    cp = checkpoint.Checkpoint(ctx, 'test', resume=True, directory=str(tmp_path))
+    cp.track(p300)
+    tube = ctx.load_labware('vwr_24_tuberack_1500ul', '2')['A1']
+    p300.pick_up_tip()
+    p300.aspirate(100, tube)
+    p300.dispense(100, tube)
+    p300.drop_tip()
+    cp.finish()
+    assert not cp.enabled and cp.step == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_checkpoint_after_each_clean_step(ctx, p300, tmp_path):
+    cp = checkpoint.Checkpoint(ctx, 'test', directory=str(tmp_path), enabled=True)
+    cp.track(p300)
+    tube = ctx.load_labware('vwr_24_tuberack_1500ul', '2')['A1']
+    p300.pick_up_tip()
+    p300.aspirate(100, tube)
+    saved = json.loads((tmp_path / 'test.json').read_text())
+    assert saved['step'] == 1 and saved['has_tip'] == {'left': True}
+    p300.dispense(100, tube)
+    p300.transfer(50, tube, tube, new_tip='never')
+    saved = json.loads((tmp_path / 'test.json').read_text())
+    assert saved['step'] == 4 and saved['tips'] == {'8': ['A1']}
+
+
+def steps(tmp_path, resume, source='A1', height=2):
+    ctx = sim.ProtocolContext()
+    tips = ctx.load_labware('opentrons_96_filtertiprack_200ul', '8')
+    p300 = ctx.load_instrument('p300_single_gen2', 'left', tip_racks=[tips])
+    rack = ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+    cp = checkpoint.Checkpoint(ctx, 'test', resume=resume, directory=str(tmp_path), enabled=True)
+    cp.track(p300)
+    p300.pick_up_tip()
+    p300.aspirate(100, rack[source])
+    p300.dispense(100, rack['B1'].bottom(height))
+    return ctx, p300
+
+
+def test_resume_pauses_before_the_fresh_tip(tmp_path):
+    steps(tmp_path, False)
+    ctx, p300 = steps(tmp_path, True)
+    # the tip the stop left on comes off before the next one goes on
+    assert [c.name for c in ctx.trace] == ['comment', 'pause', 'pick_up_tip']
+    assert ctx.trace[-1].location == repr(p300.tip_racks[0]['B1'])
+
+
+@pytest.mark.parametrize('edit', [{'source': 'A2'}, {'height': 5}])
+def test_a_changed_well_or_height_is_not_resumed(tmp_path, edit):
+    steps(tmp_path, False)
+    with pytest.raises(checkpoint.CheckpointError, match='does not match'):
+        steps(tmp_path, True, **edit)
@@ -0,0 +1,100 @@
+import pytest
+
+from ottools import deepwell, registry, sim
+from ottools.multichannel import ROWS
+
+
+def prep(n_plates, multi=False):
+    ctx = sim.ProtocolContext()
+    registry.use_custom_labware(ctx)
+    tips = ctx.load_labware('opentrons_96_filtertiprack_200ul', '8')
+    p300 = ctx.load_instrument('p300_single_gen2', 'left', tip_racks=[tips])
+    p300_multi = None
+    if multi:
+        multi_tips = ctx.load_labware('opentrons_96_filtertiprack_200ul', '9')
+        p300_multi = ctx.load_instrument('p300_multi_gen2', 'right', tip_racks=[multi_tips])
+        deck = deepwell.load_deck(ctx, n_plates, bulk=deepwell.RESERVOIR, channels=8)
+    else:
+        deck = deepwell.load_deck(ctx, n_plates)
+    return ctx, deck, deepwell.prep_plates(deck, p300, p300_multi)
+
+
+def received(deck, plate):
+    return {name: deck.ledger.volume(plate[name]) for name in plate.wells_by_name()}
+
+
+@pytest.mark.parametrize('n_plates', [1, 2, 3])
+def test_every_well_gets_its_passes(n_plates):
+    _, deck, tips = prep(n_plates)
+    assert tips == len(deepwell.E32_PASSES)
+    assert len(deck.plates) == n_plates
+    expected = {}
+    for p in deepwell.E32_PASSES:
+        for col in p.columns:
+            for row in ROWS:
+                name = '{}{}'.format(row, col)
+                expected[name] = expected.get(name, 0) + p.volume
+    for plate in deck.plates:
+        got = received(deck, plate)
+        assert {name: ul for name, ul in got.items() if ul} == pytest.approx(expected)
+    # no tube is drawn below empty
+    assert deck.ledger.warnings == []
+
+
+@pytest.mark.parametrize('n_plates', [1, 2, 3])
+def test_tubes_keep_their_dead_volume(n_plates):
+    _, deck, _ = prep(n_plates)
+    for reagent, tubes in deck.sources.items():
+        for tube in tubes:
+            assert deck.ledger.volume(tube) >= deepwell.dead_volume(tube.parent.load_name) - 1e-6
+
+
+def test_fills_grow_with_the_plates():
+    one = deepwell.tube_fills(deepwell.E32_PASSES, 1)
+    three = deepwell.tube_fills(deepwell.E32_PASSES, 3)
+    four = deepwell.tube_fills(deepwell.E32_PASSES, 4)
+    assert three['wash_one'][0] > one['wash_one'][0]
+    # 64 mL of wash does not fit one 50 mL conical
+    assert len(four['wash_one']) == 2 and sum(four['wash_one']) > 64000
+    assert max(v for fills in four.values() for v in fills) <= 50000
+
+
+def test_draws():
+    found = deepwell.draws(deepwell.E32_PASSES, 2)
+    # 1000 ul in a 200 ul tip: 5 draws per well, 16 wells per plate
+    assert found['wash_one'] == [200.0] * (5 * 16 * 2)
+    assert len(found['nfw']) == (2 + 1) * 16 * 2
+
+
+def test_multichannel_fills_columns_from_the_reservoir():
+    ctx, deck, _ = prep(2, multi=True)
+    by_multi = [c for c in ctx.trace if c.name == 'aspirate' and c.instrument == 'p300_multi_gen2']
+    assert by_multi and all('reservoir' in c.location for c in by_multi)
+    beads = [c for c in ctx.trace if c.name == 'aspirate' and c.instrument == 'p300_single_gen2'
+             and c.parent is None]
+    assert all('eppendorf' in c.location for c in beads)
+    assert deck.ledger.warnings == []
+
+
+def test_multichannel_keeps_the_pass_heights():
+    ctx, deck, _ = prep(2, multi=True)
+    bottom = deck.plates[0]['A1'].bottom().point.z
+    by_multi = [c for c in ctx.trace if c.instrument == 'p300_multi_gen2' and c.parent is None]
+    for p in deepwell.E32_PASSES:
+        if p.reagent in deepwell.SMALL_TUBES:
+            continue
+        columns = {str(col) for col in p.columns}
+        into = [c for c in by_multi if c.location and ' of bioer' in c.location
+                and c.location.split(' of ')[0][1:] in columns]
+        n = deepwell.parts(p.volume, 200)
+        heights = {round(c.point[2] - bottom, 1) for c in into if c.name == 'dispense'}
+        assert heights == {float(p.dispense[min(part, len(p.dispense) - 1)]) for part in range(n)}
+        assert {round(c.point[2] - bottom, 1) for c in into if c.name == 'blow_out'} == {p.blow_out}
+    # the NFW pass over the beads dispenses 25 mm up, not into the beads
+    assert not [c for c in by_multi if c.name == 'dispense' and c.point[2] - bottom < 10]
+
+
+def test_plates_that_do_not_fit():
+    ctx = sim.ProtocolContext()
+    with pytest.raises(ValueError, match='slots but only'):
+        deepwell.load_deck(ctx, 8)
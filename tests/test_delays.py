@@ -0,0 +1,34 @@
+from ottools import delays
+
+SOURCE = '''\
+def run(protocol):
+    protocol.delay(seconds=10)
+    for well in wells:
+        protocol.delay(seconds=2)
+        while True:
+            protocol.delay(seconds=1)
+            break
+'''
+
+
+def test_loop_depths():
+    depths = delays.loop_depths(SOURCE)
+    assert 2 not in depths
+    assert depths[3] == depths[4] == 1
+    assert depths[5] == depths[6] == depths[7] == 2
+
+
+def test_delay_budget(tmp_path):
+    path = tmp_path / 'waits.py'
+    path.write_text('metadata = {"apiLevel": "2.13"}\n\n'
+                    'def run(protocol):\n'
+                    '    protocol.delay(seconds=10)\n'
+                    '    for _ in range(12):\n'
+                    '        protocol.delay(seconds=2)\n')
+    ctx, sites = delays.delay_budget(str(path))
+    assert [(s.line, s.calls, s.seconds, s.in_loop) for s in sites] == [
+        (6, 12, 24.0, True), (4, 1, 10.0, False)]
+    assert ctx.runtime == 34.0
+    report = delays.format_budget(str(path), ctx, sites)
+    assert '34s waiting in 13 delays (100.0%' in report
+    assert 'in loop (depth 1)' in report
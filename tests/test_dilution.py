@@ -0,0 +1,94 @@
+import pytest
+
+from ottools import dilution
+
+
+@pytest.fixture
+def rack(ctx):
+    return ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+
+
+def test_capacity_is_what_the_tips_hold(ctx, p300):
+    assert dilution.capacity(p300) == 200
+    bare = ctx.load_instrument('p20_single_gen2', 'right')
+    assert dilution.capacity(bare) == 20
+
+
+def test_one_tip_per_step(ctx, p300, rack):
+    tubes = rack.wells()[:5]
+    assert dilution.serial_dilution(p300, tubes, 100, 900) == 4
+    aspirates = [c for c in ctx.trace if c.name == 'aspirate' and c.parent is None]
+    assert [c.volume for c in aspirates] == [100] * 4
+    mixes = [c for c in ctx.trace if c.name == 'mix']
+    # 3 heights per tube, the first tube too (mix_first)
+    assert len(mixes) == 3 * 5
+    assert [c.params['rate'] for c in aspirates] == [1.0] * 4
+
+
+def test_transfer_above_the_tip_is_split(ctx, p300, rack):
+    dilution.serial_dilution(p300, rack.wells()[:2], 300, 900, mix_first=False)
+    aspirates = [c.volume for c in ctx.trace if c.name == 'aspirate' and c.parent is None]
+    assert aspirates == [150, 150]
+
+
+def test_slow_draws_settle_and_touch_tip(ctx, p300, rack):
+    # the LOD series: rate 0.8, 2 s after each draw, touch_tip 3 mm below the top
+    dilution.serial_dilution(p300, rack.wells()[:3], 300, 300, mix_first=False,
+                             aspirate_rate=0.8, v_offset=-3, delay=2, protocol=ctx)
+    top = [c for c in ctx.trace if c.parent is None]
+    names = [c.name for c in top]
+    for i, c in enumerate(top):
+        if c.name == 'aspirate':
+            assert c.params['rate'] == 0.8
+            assert names[i + 1:i + 3] == ['delay', 'touch_tip']
+            assert top[i + 1].duration == 2
+            assert top[i + 2].params['v_offset'] == -3
+    assert names.count('delay') == 4
+
+
+def test_delay_needs_the_protocol(p300, rack):
+    with pytest.raises(ValueError, match='needs the protocol'):
+        dilution.serial_dilution(p300, rack.wells()[:2], 100, 900, delay=2)
+
+
+def test_discard_evens_the_last_tube(ctx, p300, rack):
+    trash = rack['D6']
+    dilution.serial_dilution(p300, rack.wells()[:3], 100, 900, discard=trash)
+    into_trash = [c.volume for c in ctx.trace if c.name == 'dispense'
+                  and c.location == repr(trash)]
+    assert into_trash == [100]
+    assert sum(c.name == 'pick_up_tip' for c in ctx.trace) == sum(
+        c.name == 'drop_tip' for c in ctx.trace) == 2
+
+
+def test_min_exchanges_scales_the_cycles():
+    profile = dilution.get_profile('low_mid_high')
+    fitted = dilution.fit_profile(profile, 200, 1000, 4)
+    assert dilution.exchanges(fitted, 200, 1000) == pytest.approx(4, abs=0.5)
+    assert [h for _, h in fitted.steps] == [h for _, h in profile.steps]
+
+
+def test_estimate_series():
+    seconds, tips, profile, mix_vol = dilution.estimate_series('vwr_24_tuberack_1500ul', 6, 100, 900)
+    assert tips == 5 and mix_vol == 200 and seconds > 0
+    assert profile is dilution.PROFILES['low_mid_high']
+    with pytest.raises(ValueError, match='do not fit'):
+        dilution.estimate_series('vwr_24_tuberack_1500ul', 30, 100, 900)
+
+
+def test_unknown_profile():
+    with pytest.raises(KeyError, match='Unknown mixing profile'):
+        dilution.get_profile('vortex')
+
+
+def test_mixing_follows_the_liquid(ctx, p300, rack):
+    p300.pick_up_tip()
+    dilution.mix(p300, rack['A1'], 1000)
+    mixes = {c.index for c in ctx.trace if c.name == 'mix'}
+    heights = []
+    for c in ctx.trace:
+        if c.name == 'aspirate' and c.parent in mixes and c.point[2] not in heights:
+            heights.append(c.point[2])
+    # low, mid, just under the surface
+    assert heights == sorted(heights) and len(heights) == 3
+    assert heights[-1] < rack['A1'].top().point.z
@@ -0,0 +1,56 @@
+import pytest
+
+from conftest import PRIMER_MATRIX
+from ottools import estimate, sim
+
+SOURCE = '''\
+import math
+
+
+def run(protocol):
+    rack = protocol.load_labware('x', '1')
+    p = protocol.load_instrument('p', 'left')
+
+    # mastermix
+    # into every well
+    for well in wells:
+        p.transfer(10, a, well)
+    p.drop_tip()
+
+    # template
+    p.transfer(5, b, c)
+'''
+
+
+def test_steps_of():
+    steps = estimate.steps_of(SOURCE)
+    assert [(s.first, s.last, s.label) for s in steps] == [
+        (5, 6, "rack = protocol.load_labware('x', '1')"),
+        (10, 12, 'mastermix / into every well'),
+        (15, 15, 'template')]
+
+
+def test_phase_split(ctx, p300):
+    rack = ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+    p300.pick_up_tip()
+    p300.aspirate(100, rack['A1'])
+    ctx.delay(seconds=3)
+    pick, aspirate, delay = ctx.trace
+    assert estimate.phase_split(pick) == {'travel': pick.params['travel'],
+                                          'tips': pick.duration - pick.params['travel']}
+    split = estimate.phase_split(aspirate)
+    assert sum(split.values()) == pytest.approx(aspirate.duration)
+    assert split['liquid'] == pytest.approx(100 / p300.flow_rate.aspirate + 0.3, abs=1e-3)
+    assert estimate.phase_split(delay) == {'delay': 3.0}
+
+
+def test_estimate_adds_up():
+    ctx, steps, phases = estimate.estimate(PRIMER_MATRIX)
+    assert set(phases) == set(estimate.PHASES)
+    assert sum(phases.values()) == pytest.approx(ctx.runtime, abs=0.01)
+    assert sum(s.seconds for s in steps) == pytest.approx(ctx.runtime, abs=0.01)
+    assert sum(s.commands for s in steps) == sum(1 for c in ctx.trace if c.parent is None)
+    for s in steps:
+        assert sum(s.phases.values()) == pytest.approx(s.seconds, abs=0.01)
+    report = estimate.format_estimate(ctx, steps, phases)
+    assert report.startswith('estimated runtime {}'.format(sim.format_duration(ctx.runtime)))
@@ -0,0 +1,44 @@
+import pytest
+
+from ottools import geometry, registry
+
+
+def test_custom_definition_wins():
+    name = registry.names()[0]
+    assert geometry.labware_definition(name) == registry.definition(name)
+
+
+@pytest.mark.parametrize('load_name', sorted(geometry.GENERIC_LAYOUTS))
+def test_generic_grids(load_name):
+    rows, cols, a1_x, a1_y, x_pitch, y_pitch, _, depth, _, volume = \
+        geometry.GENERIC_LAYOUTS[load_name]
+    definition = geometry.labware_definition(load_name)
+    if definition['parameters']['loadName'] != load_name:
+        pytest.skip('a custom definition overrides it')
+    wells = definition['wells']
+    assert len(wells) == rows * cols
+    assert len(definition['ordering']) == cols
+    a1 = wells['A1']
+    assert (a1['x'], a1['y'], a1['depth'], a1['totalLiquidVolume']) == (a1_x, a1_y, depth, volume)
+    last = wells[definition['ordering'][-1][-1]]
+    assert last['x'] == pytest.approx(a1_x + (cols - 1) * x_pitch, abs=0.01)
+    assert last['y'] == pytest.approx(a1_y - (rows - 1) * y_pitch, abs=0.01)
+    assert definition['parameters']['isTiprack'] == ('tiprack' in load_name)
+
+
+def test_guess_layout():
+    rows, cols, *_, volume = geometry._guess_layout('acme_384_wellplate_50ul')
+    assert (rows, cols, volume) == (16, 24, 50.0)
+    rows, cols, *_, volume = geometry._guess_layout('acme_15_tuberack_15ml')
+    assert (rows, cols, volume) == (3, 5, 15000.0)
+    rows, cols, *_, volume = geometry._guess_layout('mystery_plate')
+    assert (rows, cols, volume) == (8, 12, 200.0)
+
+
+def test_guessed_wells_fit_the_footprint():
+    definition = geometry.labware_definition('acme_48_wellplate_1.5ml')
+    xs = [w['x'] for w in definition['wells'].values()]
+    ys = [w['y'] for w in definition['wells'].values()]
+    assert len(xs) == 48
+    assert 0 < min(xs) and max(xs) < geometry.SLOT_SIZE[0]
+    assert 0 < min(ys) and max(ys) < geometry.SLOT_SIZE[1]
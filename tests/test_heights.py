@@ -0,0 +1,102 @@
+import glob
+import os
+import re
+
+import numpy as np
+import pytest
+
+from ottools import geometry, heights
+
+SCHEDULES = [(1400, 6, 200), (1600, 8, 190.5), (900, 12, 75), (300, 3, 20)]
+
+
+def pasted_heights(coeffs, init_vol, steps, vol_dec, offset, full_volume, full_offset,
+                   min_height, floor):
+    # the tip_heights the protocols carried, with its constants as arguments
+    result = []
+    offset = full_offset if init_vol > full_volume else offset
+    for i in range(steps):
+        x = init_vol - vol_dec * i
+        h = sum(c * x ** n for n, c in enumerate(coeffs)) - offset
+        result.append(floor if h < min_height else round(h, 1))
+    return result
+
+
+@pytest.mark.parametrize('init_vol, steps, vol_dec', SCHEDULES)
+def test_tip_heights_match_the_pasted_copy(init_vol, steps, vol_dec):
+    expected = pasted_heights(heights.VWR_1500.coeffs, init_vol, steps, vol_dec, 7, 1500, 14, 8, 1)
+    assert heights.tip_heights(init_vol, steps, vol_dec) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('init_vol, steps, vol_dec', [(1900, 9, 200), (2050, 4, 150)])
+def test_tip_heights_epp_match_the_pasted_copy(init_vol, steps, vol_dec):
+    expected = pasted_heights(heights.EPPENDORF_2000.coeffs, init_vol, steps, vol_dec,
+                              11, 2000, 12, 6, 1)
+    assert heights.tip_heightsEpp(init_vol, steps, vol_dec) == pytest.approx(expected)
+
+
+def test_full_tube_offset_starts_above_1499_ul():
+    # the copies disagreed (> 1499 or > 1500 ul); the model keeps > 1499
+    expected = pasted_heights(heights.VWR_1500.coeffs, 1500, 3, 100, 7, 1499, 14, 8, 1)
+    assert heights.tip_heights(1500, 3, 100) == pytest.approx(expected)
+
+
+def test_no_protocol_keeps_a_pasted_copy():
+    pasted = re.compile(r'^def (tip_heights|tip_heightsEpp|fifty_ml_heights)\(', re.M)
+    found = []
+    for path in glob.glob(os.path.join(geometry.REPO_ROOT, '**', '*.py'), recursive=True):
+        with open(path) as f:
+            if pasted.search(f.read()):
+                found.append(os.path.relpath(path, geometry.REPO_ROOT))
+    assert found == [os.path.join('ottools', 'heights.py')]
+
+
+def test_fifty_ml_overrides():
+    # the BCOL scripts' copy: offset 5 (10 over 51 mL), to the bottom under 12 mm
+    expected = pasted_heights((0, 0.0024), 41250, 20, 1800, 5, 51000, 10, 12, 2)
+    got = heights.fifty_ml_heights(41250, 20, 1800, offset=5, full_offset=10, min_height=12)
+    assert got == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('load_name', sorted(heights.TABLE_RANGES))
+def test_lookup_round_trips(load_name):
+    vmax = heights.TABLE_RANGES[load_name]
+    volumes = np.linspace(0.05 * vmax, vmax, 50)
+    h = heights.height_at(load_name, volumes)
+    np.testing.assert_allclose(heights.volume_at(load_name, h), volumes, rtol=1e-3)
+
+
+@pytest.mark.parametrize('load_name', sorted(heights.TABLE_RANGES))
+def test_lookup_matches_the_fit(load_name):
+    volumes = np.linspace(0, heights.TABLE_RANGES[load_name], 37)
+    fit = heights.liquid_height(load_name, volumes)
+    # the tables keep the fit monotonic; compare where it already is
+    rising = np.concatenate([[True], np.diff(fit) > 0])
+    np.testing.assert_allclose(heights.height_at(load_name, volumes)[rising], fit[rising],
+                               atol=0.01)
+
+
+def test_scalar_lookup():
+    assert isinstance(heights.height_at('vwr_24_tuberack_1500ul', 500), float)
+    assert heights.volume_at('vwr_24_tuberack_1500ul', 1e6) == pytest.approx(1500)
+
+
+def test_table_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(heights, 'CACHE_DIR', str(tmp_path))
+    built = heights._load_table(heights.VWR_1500, 1500, size=257)
+    assert len(list(tmp_path.iterdir())) == 1
+    cached = heights._load_table(heights.VWR_1500, 1500, size=257)
+    np.testing.assert_array_equal(cached.heights, built.heights)
+    assert cached.height(700) == pytest.approx(built.height(700))
+
+
+def test_min_volume_is_where_the_tip_stops():
+    model = heights.get_model('vwr_24_tuberack_1500ul')
+    dead = heights.min_volume('vwr_24_tuberack_1500ul')
+    assert heights.height_at('vwr_24_tuberack_1500ul', dead) == pytest.approx(model.floor + 0.5,
+                                                                              abs=0.01)
+
+
+def test_unknown_tube():
+    with pytest.raises(KeyError, match='No liquid-height model'):
+        heights.get_model('nest_96_wellplate_2ml_deep')
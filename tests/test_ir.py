@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from ottools import geometry, ir, sim
+
+from conftest import MAG_BEADS, PRIMER_MATRIX
+
+PROTOCOLS = [
+    PRIMER_MATRIX,
+    MAG_BEADS,
+    os.path.join(geometry.REPO_ROOT, 'Exp800.06 create qPCR probe matrix', 'create_probe_matrix.py'),
+    os.path.join(geometry.REPO_ROOT, 'Exp802.09 Inactivated Virus Conc Determination with TWIST Samples',
+                 'Exp802.09 Prep TWO BioER DeepWell Plates with E32 Reagents.py'),
+    # slowed gantry: the replay has to carry the speeds
+    os.path.join(geometry.REPO_ROOT, 'Labware', 'verify_all_labware.py'),
+]
+
+
+@pytest.mark.parametrize('path', PROTOCOLS, ids=os.path.basename)
+def test_replay_round_trips(path, tmp_path):
+    compiled, hit = ir.compile_protocol(path, cache_dir=str(tmp_path))
+    assert not hit
+    replay = tmp_path / 'replay.py'
+    ir.write_replay_protocol(compiled, str(replay))
+    again = ir.build_ir(sim.simulate(str(replay)))
+    assert again['commands'] == compiled['commands']
+    assert again['runtime'] == pytest.approx(compiled['runtime'], rel=1e-4)  # 3-decimal rounding
+    assert (again['modules'], again['labware'], again['instruments']) == (
+        compiled['modules'], compiled['labware'], compiled['instruments'])
+
+
+def test_cache_hit(tmp_path):
+    first, hit = ir.compile_protocol(PRIMER_MATRIX, cache_dir=str(tmp_path))
+    second, hit_again = ir.compile_protocol(PRIMER_MATRIX, cache_dir=str(tmp_path))
+    assert (hit, hit_again) == (False, True)
+    assert second == first
+
+
+def test_inputs_change_the_hash(tmp_path):
+    plate_map = tmp_path / 'plate.csv'
+    plate_map.write_text('well,F_primer\nA1,F1\n')
+    before = ir.source_hash(PRIMER_MATRIX, [str(plate_map)])
+    plate_map.write_text('well,F_primer\nA1,F2\n')
+    assert ir.source_hash(PRIMER_MATRIX, [str(plate_map)]) != before
+    assert ir.source_hash(PRIMER_MATRIX) != before
+
+
+def test_dumps_round_trips():
+    compiled = ir.build_ir(sim.simulate(PRIMER_MATRIX))
+    assert ir.loads(ir.dumps(compiled)) == compiled
+
+
+def test_msgpack_round_trips():
+    pytest.importorskip('msgpack')
+    compiled = ir.build_ir(sim.simulate(PRIMER_MATRIX))
+    assert ir.loads(ir.dumps(compiled, 'msgpack'), 'msgpack') == compiled
+
+
+def test_same_pipette_twice(ctx):
+    ctx.load_instrument('p20_single_gen2', 'left')
+    ctx.load_instrument('p20_single_gen2', 'right')
+    with pytest.raises(ir.CompileError, match='Two p20_single_gen2'):
+        ir.build_ir(ctx)
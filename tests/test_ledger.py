@@ -0,0 +1,84 @@
+import pytest
+
+from ottools import heights, ledger
+
+
+@pytest.fixture
+def conical(ctx):
+    return ctx.load_labware('opentrons_6_tuberack_nest_50ml_conical', '3')['A1']
+
+
+def test_books_every_aspirate_and_dispense(ctx, p300, conical):
+    plate = ctx.load_labware('nest_96_wellplate_2ml_deep', '2')
+    book = ledger.LiquidLedger()
+    book.fill(conical, 40000)
+    book.track(p300)
+    p300.pick_up_tip()
+    for well in plate.wells()[:5]:
+        p300.aspirate(200, conical)
+        p300.dispense(150, well)
+        p300.dispense()  # no location: the rest goes where the pipette is
+    assert book.volume(conical) == pytest.approx(40000 - 1000)
+    assert [book.volume(w) for w in plate.wells()[:6]] == pytest.approx([200] * 5 + [0])
+    report = {repr(w): (start, end) for w, start, end in book.report()}
+    assert report[repr(conical)] == (40000, pytest.approx(39000))
+
+
+def test_bare_wells_get_the_ledger_height(ctx, p300, conical):
+    book = ledger.LiquidLedger()
+    book.fill(conical, 40000)
+    book.track(p300)
+    p300.pick_up_tip()
+    p300.aspirate(200, conical)
+    expected = book.aspirate_height(conical)  # for the 39800 ul left
+    p300.dispense(200, ctx.fixed_trash['A1'])
+    p300.aspirate(200, conical)
+    z = [c.point[2] - conical.bottom().point.z for c in ctx.trace if c.name == 'aspirate']
+    assert z[1] == pytest.approx(expected)
+    assert z[0] > z[1]
+
+
+def test_heights_match_the_schedule(conical):
+    # the ledger's height after each draw is the old precomputed schedule
+    book = ledger.LiquidLedger()
+    book.fill(conical, 41250, offset=5, min_height=12)
+    schedule = heights.fifty_ml_heights(41250, 20, 2000, offset=5, min_height=12)
+    for expected in schedule:
+        assert book.aspirate_height(conical) == pytest.approx(expected, abs=0.15)
+        book.remove(conical, 2000)
+
+
+def test_explicit_locations_are_left_alone(ctx, p300, conical):
+    book = ledger.LiquidLedger()
+    book.fill(conical, 40000)
+    book.track(p300)
+    p300.pick_up_tip()
+    p300.aspirate(100, conical.bottom(3))
+    assert ctx.trace[-1].point[2] == pytest.approx(conical.bottom(3).point.z)
+    assert book.volume(conical) == pytest.approx(39900)
+
+
+def test_overdraw(conical):
+    book = ledger.LiquidLedger()
+    book.fill(conical, 100)
+    book.remove(conical, 150)
+    assert book.warnings and 'leaves -50' in book.warnings[0]
+    with pytest.raises(ledger.LedgerError):
+        strict = ledger.LiquidLedger(strict=True)
+        strict.fill(conical, 100)
+        strict.remove(conical, 150)
+
+
+def test_multichannel_draws_a_column(ctx):
+    tips = ctx.load_labware('opentrons_96_tiprack_300ul', '8')
+    multi = ctx.load_instrument('p300_multi_gen2', 'left', tip_racks=[tips])
+    plate = ctx.load_labware('nest_96_wellplate_2ml_deep', '2')
+    trough = ctx.load_labware('nest_12_reservoir_15ml', '3')['A1']
+    book = ledger.LiquidLedger()
+    book.fill(trough, 10000)
+    book.track(multi)
+    multi.pick_up_tip()
+    multi.aspirate(100, trough)
+    multi.dispense(100, plate['A1'])
+    assert book.volume(trough) == pytest.approx(10000 - 800)
+    assert [book.volume(w) for w in plate.columns()[0]] == pytest.approx([100] * 8)
@@ -0,0 +1,25 @@
+import pytest
+
+from ottools import liquids
+
+
+def test_wait_time():
+    assert liquids.wait_time('mastermix', 'withdraw') == 3
+    assert liquids.wait_time('template', 'mix') == 0
+
+
+def test_every_class_has_every_step():
+    for liquid in liquids.LIQUID_CLASSES.values():
+        assert all(isinstance(getattr(liquid, step), (int, float))
+                   for step in liquids.LiquidClass._fields)
+
+
+def test_unknown_class():
+    with pytest.raises(KeyError, match='known: aqueous, mastermix'):
+        liquids.wait_time('glycerol', 'aspirate')
+
+
+def test_equilibrate(ctx):
+    liquids.equilibrate(ctx, 'mastermix', 'aspirate')
+    liquids.equilibrate(ctx, 'template', 'mix')
+    assert [(c.name, c.duration) for c in ctx.trace] == [('delay', 2.0)]
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from conftest import MAG_BEADS, PRIMER_MATRIX
+from ottools import sim
+from ottools.__main__ import main
+
+
+def test_simulate(capsys):
+    assert main(['simulate', PRIMER_MATRIX, '--trace']) == 0
+    out = capsys.readouterr().out.splitlines()
+    trace = sim.simulate(PRIMER_MATRIX).trace
+    assert [json.loads(line)['name'] for line in out[:len(trace)]] == [c.name for c in trace]
+
+
+def test_estimate(capsys):
+    assert main(['estimate', PRIMER_MATRIX, '--top', '3']) == 0
+    assert capsys.readouterr().out.startswith('estimated runtime')
+
+
+def test_plan(capsys):
+    assert main(['plan', '20', '--wells', '12', '--max-volume', '200']) == 0
+    out = capsys.readouterr().out
+    assert out.startswith('trip   1: aspirate 200 ul -> #0 20,')
+
+
+def test_recipe(capsys):
+    assert main(['recipe']) == 0
+    assert 'OVER CAPACITY' not in capsys.readouterr().out
+
+
+def test_recipe_over_capacity(capsys):
+    assert main(['recipe', '--R', '20000']) == 1
+    assert 'OVER CAPACITY OR NEGATIVE' in capsys.readouterr().out
+
+
+def test_recipe_sheet(capsys):
+    assert main(['recipe', '--sheet']) == 0
+    assert 'dispensed' in capsys.readouterr().out
+
+
+def test_recipe_protocol_matches_its_built_in_schedule(capsys):
+    assert main(['recipe', '--protocol', PRIMER_MATRIX]) == 0
+    assert 'DIFFERS' not in capsys.readouterr().out
+
+
+def test_labware(capsys):
+    assert main(['labware']) == 0
+    assert 'INVALID' not in capsys.readouterr().out
+
+
+def test_resume(capsys):
+    assert main(['resume', MAG_BEADS, '--stop-at', '400']) == 0
+    assert capsys.readouterr().out
+
+
+def test_usage():
+    with pytest.raises(SystemExit):
+        main([])
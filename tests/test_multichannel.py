@@ -0,0 +1,52 @@
+import pytest
+
+from ottools import multichannel
+
+
+@pytest.fixture
+def deck(ctx):
+    plate = ctx.load_labware('biorad_96_wellplate_200ul_pcr', '1')
+    trough = ctx.load_labware('nest_12_reservoir_15ml', '2')
+    tubes = ctx.load_labware('vwr_24_tuberack_1500ul', '3')
+    single = ctx.load_instrument('p300_single_gen2', 'left', tip_racks=[
+        ctx.load_labware('opentrons_96_filtertiprack_200ul', '8')])
+    multi = ctx.load_instrument('p300_multi_gen2', 'right', tip_racks=[
+        ctx.load_labware('opentrons_96_filtertiprack_200ul', '9')])
+    return plate, trough['A1'], tubes['A1'], single, multi
+
+
+def test_whole_columns(deck):
+    plate = deck[0]
+    dests = plate.columns()[0] + plate.columns()[1][:5] + plate.columns()[2]
+    volumes = [20] * 8 + [20] * 5 + [20] * 7 + [25]
+    columns, rest = multichannel.whole_columns(dests, volumes)
+    assert columns == [(plate['A1'], 20)]
+    assert [w.well_name for w, _ in rest] == ['A2', 'B2', 'C2', 'D2', 'E2'] + [
+        w.well_name for w in plate.columns()[2]]
+
+
+def test_fill_from_a_trough(ctx, deck):
+    plate, trough, _, single, multi = deck
+    dests = plate.wells()[:20]
+    assert multichannel.fill(50, trough, dests, multi=multi, single=single) == (2, 4)
+    by = {}
+    for c in ctx.trace:
+        if c.name == 'dispense':
+            by[c.instrument] = by.get(c.instrument, 0) + 1
+    assert by == {'p300_multi_gen2': 2, 'p300_single_gen2': 4}
+
+
+def test_fill_from_a_tube_is_single_channel(ctx, deck):
+    plate, _, tube, single, multi = deck
+    assert multichannel.fill(50, tube, plate.wells()[:16], multi=multi, single=single) == (0, 16)
+    with pytest.raises(ValueError, match='no single-channel pipette'):
+        multichannel.fill(50, tube, plate.wells()[:8], multi=multi)
+
+
+def test_candidates(ctx, deck):
+    plate, trough, tube, single, _ = deck
+    single.transfer(30, trough, plate.columns()[3])
+    single.transfer(10, tube, plate.columns()[4][:6])
+    found = multichannel.candidates(ctx.trace)
+    assert len(found) == 1
+    assert found[0]['columns'] == ['4'] and found[0]['volume'] == 30 and found[0]['trough']
@@ -0,0 +1,93 @@
+import glob
+import os
+
+import pytest
+
+from ottools import geometry, heights, overage, recipe, sim
+
+from conftest import MAG_BEADS
+
+CONCS = [50, 100, 200, 400, 600, 800]
+PRIMER_MATRICES = sorted(glob.glob(os.path.join(
+    geometry.REPO_ROOT, 'Exp800.05 create qPCR primer matrix', 'create_primer_matrix*.py')))
+
+
+@pytest.fixture(scope='module')
+def design():
+    return overage.primer_matrix_overage(CONCS, CONCS)
+
+
+def test_mix_totals_are_the_fills(design):
+    factors, sheet = design
+    table = recipe.primer_matrix(CONCS, CONCS, overage=factors)
+    for row in sheet[:-1]:
+        total = table[row.tube + '_tot']
+        assert total.max() == pytest.approx(row.fill), row.tube
+
+
+def test_fills_cover_the_draws_and_the_dead_volume(design):
+    _, sheet = design
+    for row in sheet[:-1]:
+        dead = heights.min_volume(row.load_name)
+        assert row.dead == pytest.approx(dead)
+        assert row.fill - dead - overage.RETENTION * row.draws == pytest.approx(
+            row.dispensed), row.tube
+
+
+def test_f_int_overage_is_against_what_it_dispenses(design):
+    _, sheet = design
+    F_int = sheet[-1]
+    # two wells per R row at 1.6 ul each, from a 100 ul tube
+    assert F_int.dispensed == pytest.approx(2 * 1.6 * 6)
+    assert F_int.fill == 100
+    line = overage.format_sheet(sheet).splitlines()[-3]
+    assert line.startswith('F_int') and '420.8' in line
+
+
+def test_schedule_replaces_the_built_in_draws(design):
+    _, sheet = design
+    R_mix = sheet[4]
+    draws = [R_mix.dispensed / 2] * 2 + [50.0]
+    _, changed = overage.primer_matrix_overage(
+        CONCS, CONCS, schedule={'R_mix': (draws, R_mix.dispensed + 50)})
+    assert changed[4].fill == pytest.approx(R_mix.fill + 50 + overage.RETENTION)
+    assert changed[4].draws == 3
+    # bpwd_mix feeds the (now larger) R mixes
+    assert changed[3].fill > sheet[3].fill
+
+
+def test_f_int_vol_too_small():
+    with pytest.raises(ValueError, match='F_int_vol'):
+        overage.primer_matrix_overage(CONCS, CONCS, F_int_vol=30)
+
+
+def test_split():
+    assert overage.split(400, 200) == [200, 200]
+    assert overage.split(401, 200) == pytest.approx([401 / 3] * 3)
+
+
+def test_traced_schedule_is_the_protocols_draws():
+    ctx = sim.simulate(PRIMER_MATRICES[0])
+    found = overage.traced_schedule(ctx)
+    assert set(found) == set(overage.PRIMER_MATRIX_TUBES)
+    draws, dispensed = found['F_int']
+    assert draws == [20.0] and dispensed == pytest.approx(19.2)
+
+
+@pytest.mark.parametrize('path', PRIMER_MATRICES, ids=os.path.basename)
+def test_built_in_schedule_matches_the_trace(path):
+    _, sheet, built_in = overage.traced_sheet(path)
+    for traced, own in zip(sheet, built_in):
+        assert traced.fill == pytest.approx(own.fill, abs=0.05), traced.tube
+        assert traced.draws == own.draws, traced.tube
+        assert traced.dispensed == pytest.approx(own.dispensed, abs=0.05), traced.tube
+
+
+def test_the_schedule_is_the_protocols_switch():
+    schedule = overage.Schedule()
+    sim.simulate(PRIMER_MATRICES[0], switches={'SCHEDULE': schedule})
+    assert len(schedule.calls) == 1
+    F_concs, _, kwargs = schedule.calls[0]
+    assert len(F_concs) == 6 and kwargs['p300_max'] == 200
+    with pytest.raises(sim.SimulationError, match='no SCHEDULE switch'):
+        sim.simulate(MAG_BEADS, switches={'SCHEDULE': schedule})
@@ -0,0 +1,56 @@
+import pytest
+
+from ottools import dilution, planner, sim
+
+
+def test_wells_share_trips():
+    plan = planner.plan_multi_dispense([50] * 7, 200, disposal=20)
+    assert [len(s.dispenses) for s in plan.steps] == [3, 3, 1]
+    assert [s.aspirate for s in plan.steps] == [170, 170, 70]
+    assert (plan.trips, plan.baseline_trips, plan.trips_saved) == (3, 7, 4)
+
+
+def test_large_volumes_are_split():
+    plan = planner.plan_multi_dispense([30, 400, 30], 200, disposal=20)
+    # 400 ul in a 200 ul tip less 20 disposal: three equal trips
+    assert [s.dispenses for s in plan.steps] == [[(0, 30)]] + [[(1, 400 / 3)]] * 3 + [[(2, 30)]]
+    # zero-volume wells get no dispense
+    assert planner.plan_multi_dispense([0, 10], 20).steps[0].dispenses == [(1, 10)]
+
+
+def test_disposal_must_leave_room():
+    with pytest.raises(ValueError, match='leaves no room'):
+        planner.plan_multi_dispense([10], 20, disposal=20)
+
+
+def test_every_trip_fits_the_tip():
+    volumes = [73.8] * 12 + [150, 10, 199]
+    plan = planner.plan_multi_dispense(volumes, 200, disposal=15)
+    assert max(s.aspirate for s in plan.steps) <= 200 + 1e-9
+    delivered = {}
+    for s in plan.steps:
+        for i, v in s.dispenses:
+            delivered[i] = delivered.get(i, 0) + v
+    assert [delivered[i] for i in range(len(volumes))] == pytest.approx(volumes)
+
+
+def test_execute_sized_by_the_tips(ctx, p300):
+    rack = ctx.load_labware('opentrons_6_tuberack_nest_50ml_conical', '3')
+    plate = ctx.load_labware('nest_96_wellplate_2ml_deep', '2')
+    dests = plate.wells()[:12]
+    p300.pick_up_tip()
+    plan = planner.plan_multi_dispense([73.8] * 12, dilution.capacity(p300), disposal=30)
+    planner.execute(p300, rack['A1'], dests, plan)
+    received = [c.volume for c in ctx.trace if c.name == 'dispense' and c.location != repr(rack['A1'])]
+    assert received == pytest.approx([73.8] * 12)
+    assert p300.current_volume == 0
+
+
+def test_execute_sized_by_the_pipette_overfills_the_tip(ctx, p300):
+    # p300.max_volume is 300 ul; the filter tips hold 200
+    rack = ctx.load_labware('opentrons_6_tuberack_nest_50ml_conical', '3')
+    plate = ctx.load_labware('nest_96_wellplate_2ml_deep', '2')
+    p300.pick_up_tip()
+    plan = planner.plan_multi_dispense([73.8] * 12, p300.max_volume, disposal=30)
+    with pytest.raises(sim.SimulationError, match='the tip holds'):
+        planner.execute(p300, rack['A1'], plate.wells()[:12], plan)
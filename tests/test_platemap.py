@@ -0,0 +1,105 @@
+import io
+import os
+
+import pytest
+
+from ottools import geometry, platemap, sim
+
+PCR_SETUP = os.path.join(geometry.REPO_ROOT, 'Utility Programs e.g. quant',
+                         'PCR.setup.using.6.student.specified.primers.py')
+
+
+@pytest.fixture
+def plate(ctx):
+    return ctx.load_labware('biorad_96_wellplate_200ul_pcr', '1')
+
+
+def test_neighbours_match_the_well_names(plate):
+    # what the scripts did with the digits of a well name
+    index = platemap.well_index(plate)
+    for well in plate.wells():
+        row, col = well.well_name[0], int(well.well_name[1:])
+        if col < 12:
+            assert index.neighbour(well).well_name == '{}{}'.format(row, col + 1)
+        if row < 'H':
+            assert index.neighbour(well, rows=1, cols=0).well_name == '{}{}'.format(
+                chr(ord(row) + 1), col)
+
+
+def test_blocks(plate):
+    index = platemap.well_index(plate)
+    assert [w.well_name for w in index.block('G1', 3)] == ['G1', 'G2', 'G3']
+    assert [w.well_name for w in index.block('A4', 3, step=2)] == ['A4', 'A6', 'A8']
+    assert [w.well_name for w in index.block('B5', 3, axis='col')] == ['B5', 'C5', 'D5']
+    assert index.row_col('H12') == (7, 11)
+    with pytest.raises(KeyError):
+        index.block('G11', 3)
+    with pytest.raises(KeyError):
+        index.neighbour('A12')
+
+
+def test_index_is_cached_per_labware(ctx, plate):
+    other = ctx.load_labware('biorad_96_wellplate_200ul_pcr', '2')
+    assert platemap.well_index(plate) is platemap.well_index(plate)
+    assert platemap.well_index(other).layout is platemap.well_index(plate).layout
+    assert platemap.well_index(other).at(0, 0) is other['A1']
+
+
+def test_read_plate_map():
+    plate_map = platemap.read_plate_map(io.StringIO(
+        'well, F_primer ,R_primer\nA1,F1,R1\nB1,F1,\nC1,F2,R1\n\n'))
+    assert plate_map.wells == ['A1', 'B1', 'C1']
+    assert plate_map.index == {'F_primer': {'F1': ['A1', 'B1'], 'F2': ['C1']},
+                               'R_primer': {'R1': ['A1', 'C1']}}
+
+
+@pytest.mark.parametrize('text, error', [('well,F\nA1,x\nA1,y\n', 'listed twice'),
+                                         ('pos,F\nA1,x\n', "no 'well' column")])
+def test_bad_plate_maps(text, error):
+    with pytest.raises(ValueError, match=error):
+        platemap.read_plate_map(io.StringIO(text))
+
+
+def test_embedded_plate_map_has_a_tube_for_every_primer():
+    module = sim.load_protocol(PCR_SETUP, sim.ProtocolContext())
+    plate_map = platemap.read_plate_map(io.StringIO(module.PLATE_MAP_CSV.strip()))
+    assert len(plate_map.wells) == 45
+    for column in ('F_primer', 'R_primer'):
+        assert set(plate_map.index[column]) <= set(module.primer_locs)
+
+
+def test_a_plate_map_file_overrides_the_embedded_one(tmp_path):
+    module = sim.load_protocol(PCR_SETUP, sim.ProtocolContext())
+    path = tmp_path / 'plate.map.csv'
+    path.write_text(module.PLATE_MAP_CSV.strip() + '\n')
+    embedded = sim.simulate(PCR_SETUP)
+    from_file = sim.simulate(PCR_SETUP, switches={'PLATE_MAP': str(path)})
+    assert [(c.name, c.location) for c in from_file.trace] == [
+        (c.name, c.location) for c in embedded.trace]
+    with pytest.raises(OSError):
+        sim.simulate(PCR_SETUP, switches={'PLATE_MAP': str(tmp_path / 'missing.csv')})
+
+
+def test_distribute_reagents(ctx, plate):
+    tips = ctx.load_labware('opentrons_96_filtertiprack_20ul', '9')
+    p20 = ctx.load_instrument('p20_single_gen2', 'right', tip_racks=[tips])
+    rack = ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+    groups = {'F1': ['A1', 'H12', 'B1'], 'F2': ['C1']}
+    done = platemap.distribute_reagents(p20, 2, plate, groups, {'F1': rack['A1'], 'F2': rack['A2']})
+    assert [(reagent, sorted(w.well_name for w in wells)) for reagent, wells in done] == [
+        ('F1', ['A1', 'B1', 'H12']), ('F2', ['C1'])]
+    received = sorted(c.location.split(' ')[0] for c in ctx.trace
+                      if c.name == 'dispense' and c.parent is not None and c.volume == 2)
+    assert received == ['A1', 'B1', 'C1', 'H12']
+    with pytest.raises(KeyError, match='No source tube for F3'):
+        platemap.distribute_reagents(p20, 2, plate, {'F3': ['A2']}, {})
+
+
+def test_distribute_reagents_at_a_location(ctx, plate):
+    tips = ctx.load_labware('opentrons_96_filtertiprack_20ul', '9')
+    p20 = ctx.load_instrument('p20_single_gen2', 'right', tip_racks=[tips])
+    rack = ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+    platemap.distribute_reagents(p20, 2, plate, {'F1': ['A1', 'B2']}, {'F1': rack['A1']},
+                                 location=lambda well: well.bottom(1))
+    heights = {c.point[2] for c in ctx.trace if c.name == 'dispense' and c.volume == 2}
+    assert heights == {plate['A1'].bottom(1).point.z}
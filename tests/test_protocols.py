@@ -0,0 +1,66 @@
+# Sim-trace regression over the protocols the ottools work rewrote.
+# Each protocol's trace is reduced to a fingerprint (commands, tips per
+# pipette, runtime, total and largest aspirate per pipette) and compared
+# with tests/data/protocol_traces.json. After an intended change, refresh
+# the golden file and review its diff:
+#
+#   python tests/test_protocols.py              # the protocols already listed
+#   python tests/test_protocols.py <path> ...   # add or refresh these
+import json
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from ottools import geometry, sim  # noqa: E402
+
+GOLDEN = os.path.join(HERE, 'data', 'protocol_traces.json')
+
+
+def fingerprint(path):
+    ctx = sim.simulate(os.path.join(geometry.REPO_ROOT, path))
+    summary = sim.summarize(ctx)
+    aspirated, largest = 0.0, {}
+    for cmd in ctx.trace:
+        if cmd.name == 'aspirate' and cmd.volume:
+            aspirated += cmd.volume
+            largest[cmd.instrument] = max(largest.get(cmd.instrument, 0.0), round(cmd.volume, 2))
+    return {
+        'commands': summary['commands'],
+        'tips': summary['tips'],
+        'runtime': round(summary['runtime'], 1),
+        'aspirated': round(aspirated, 2),
+        'largest_aspirate': largest,
+    }
+
+
+def _golden():
+    with open(GOLDEN) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('path', sorted(_golden()))
+def test_trace_matches_golden(path):
+    expected = _golden()[path]
+    found = fingerprint(path)
+    assert found['runtime'] == pytest.approx(expected['runtime'], abs=0.11)
+    assert found['aspirated'] == pytest.approx(expected['aspirated'], abs=0.02)
+    assert found['largest_aspirate'] == pytest.approx(expected['largest_aspirate'], abs=0.01)
+    assert {k: found[k] for k in ('commands', 'tips')} == \
+        {k: expected[k] for k in ('commands', 'tips')}
+
+
+if __name__ == '__main__':
+    golden = _golden() if os.path.exists(GOLDEN) else {}
+    for path in sys.argv[1:] or sorted(golden):
+        path = os.path.relpath(os.path.abspath(path), geometry.REPO_ROOT)
+        golden[path] = fingerprint(path)
+    tmp = '{}.{}.tmp'.format(GOLDEN, os.getpid())
+    with open(tmp, 'w') as f:
+        json.dump(golden, f, indent=1, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp, GOLDEN)
+    print('wrote {} fingerprints to {}'.format(len(golden), GOLDEN))
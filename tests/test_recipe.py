@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from ottools import recipe
+
+CONCS = [50, 100, 200, 400, 600, 800]
+
+
+def scalar_recipe(R, F, tot_rxn_vol=20, percent_waste=0.20, R_reps=12, std_NTC_reps=3):
+    # the arithmetic create_primer_matrix.py spelled out before ottools.recipe
+    orig_F_conc = orig_R_conc = orig_P_conc = 10
+    std_F_conc = std_R_cond = P_conc = 300
+    tot_stds, tot_NTCs, tot_samp = 21, 3, 72
+    rxn_base, dna_per_rxn, dna_per_rxn_10x = 11.2, 2, 0.2
+    sN_mix_waste_offset, R_mix_waste_offset = 0.025, 0.11
+    std_NTC_waste_offset, bpw_waste_offset = 0.028, 0.032
+    tot_rxns = tot_stds + tot_NTCs + tot_samp
+    tot_sds_NTC = tot_stds + tot_NTCs
+    rxn_vol_no_dna = tot_rxn_vol - dna_per_rxn
+    P_per_rxn = P_conc / 1000 * tot_rxn_vol / orig_P_conc
+    max_vol_F_per_rxn = 800 / 1000 * tot_rxn_vol / orig_F_conc
+    max_vol_R_per_rxn = 800 / 1000 * tot_rxn_vol / orig_R_conc
+    water_per_rxn = rxn_vol_no_dna - rxn_base - P_per_rxn - max_vol_F_per_rxn - max_vol_R_per_rxn
+    std_vol_F_per_rxn = std_F_conc / 1000 * tot_rxn_vol / orig_F_conc
+    std_vol_R_per_rxn = std_R_cond / 1000 * tot_rxn_vol / orig_R_conc
+    BPW_rxn = rxn_base + P_per_rxn + water_per_rxn
+    std_woff_per_sN_rxn = (max_vol_F_per_rxn - std_vol_F_per_rxn + max_vol_R_per_rxn
+                           - std_vol_R_per_rxn)
+    BPW_sN_rxn = BPW_rxn + std_vol_F_per_rxn + std_vol_R_per_rxn + std_woff_per_sN_rxn
+    sN_waste = 1 + percent_waste - sN_mix_waste_offset
+    BWP_mix_xfer_sN_mix = tot_sds_NTC * sN_waste * BPW_rxn
+    std_woff_add_to_sN_mix = std_woff_per_sN_rxn * tot_sds_NTC * sN_waste
+    F_add_to_sN_mix = tot_sds_NTC * sN_waste * std_vol_F_per_rxn
+    R_add_to_sN_mix = tot_sds_NTC * sN_waste * std_vol_R_per_rxn
+    std_waste = 1 + percent_waste - std_NTC_waste_offset
+    sN_mix_xfer_to_stds_mix = BPW_sN_rxn * std_NTC_reps * std_waste
+    std_DNA_xfer_to_stds_mix = dna_per_rxn * std_NTC_reps * std_waste
+    bpw_waste = 1 + percent_waste - bpw_waste_offset
+    bpw_mix_xfer_bpwd_mix = tot_samp * BPW_rxn * bpw_waste
+    std_DNA_xfer_to_bpwd_mix = dna_per_rxn * tot_samp * bpw_waste
+    dna_XFR_bpwd_mix = tot_samp * dna_per_rxn_10x * bpw_waste
+    bpwd_rxn = BPW_rxn + dna_per_rxn
+    R_waste = 1 + percent_waste - R_mix_waste_offset
+    bpwd_mix_xfer_R_mix = bpwd_rxn * R_reps * R_waste
+    R_rxn = R / 1000 * tot_rxn_vol / orig_R_conc
+    R_mix = R_rxn * R_reps * R_waste
+    R_woff_mix = (max_vol_R_per_rxn - R_rxn) * R_reps * R_waste
+    F_int_conc = F / 1000 * tot_rxn_vol / max_vol_F_per_rxn
+    F_int_primer = F_int_conc * 100 / orig_F_conc
+    return {
+        'BPW_rxn': BPW_rxn,
+        'R_mix_rxn': bpwd_rxn + R_rxn + (max_vol_R_per_rxn - R_rxn),
+        'BPW_mix_tot': BPW_rxn * (1 + percent_waste) * tot_rxns,
+        'sN_mix_tot': (BWP_mix_xfer_sN_mix + std_woff_add_to_sN_mix + F_add_to_sN_mix
+                       + R_add_to_sN_mix),
+        'std_mix_tot': sN_mix_xfer_to_stds_mix + std_DNA_xfer_to_stds_mix,
+        'bpwd_mix_tot': bpw_mix_xfer_bpwd_mix + std_DNA_xfer_to_bpwd_mix,
+        'dna_XFR_bpwd_mix': dna_XFR_bpwd_mix,
+        'R_mix_tot': bpwd_mix_xfer_R_mix + R_mix + R_woff_mix,
+        'F_int_primer': F_int_primer,
+        'F_int_water': 100 - F_int_primer,
+    }
+
+
+@pytest.mark.parametrize('design', [{}, {'tot_rxn_vol': 25}, {'tot_rxn_vol': 50},
+                                    {'percent_waste': 0.1, 'R_reps': 8, 'std_NTC_reps': 2}])
+def test_matches_the_scalar_recipe(design):
+    table = recipe.primer_matrix(CONCS, CONCS, **design)
+    for i, conc in enumerate(CONCS):
+        expected = scalar_recipe(conc, conc, **design)
+        for name, value in expected.items():
+            got = table[name][i] if table[name].ndim else table[name]
+            assert got == pytest.approx(value), name
+
+
+def test_a_sweep_is_the_designs_one_by_one():
+    volumes = np.array([20, 25, 50])
+    sweep = recipe.primer_matrix(CONCS, CONCS, tot_rxn_vol=volumes)
+    assert sweep['R_mix_tot'].shape == (3, len(CONCS))
+    for i, volume in enumerate(volumes):
+        one = recipe.primer_matrix(CONCS, CONCS, tot_rxn_vol=volume)
+        for name in one:
+            np.testing.assert_allclose(sweep[name][i], one[name], err_msg=name)
+
+
+def test_overage_replaces_the_waste_offsets():
+    offsets = {'BPW': 0.20, 'sN': 0.20 - 0.025, 'std': 0.20 - 0.028, 'bpwd': 0.20 - 0.032,
+               'R': 0.20 - 0.11}
+    default = recipe.primer_matrix(CONCS, CONCS)
+    overage = recipe.primer_matrix(CONCS, CONCS, overage=offsets)
+    for name in default:
+        np.testing.assert_allclose(overage[name], default[name], err_msg=name)
+
+
+def test_check_capacity():
+    failed = recipe.check_capacity(recipe.primer_matrix(CONCS, CONCS, tot_rxn_vol=[20, 50]))
+    assert not any(bad[0] for bad in failed.values())
+    assert failed['BPW_mix_tot'][1]
+    assert recipe.tube_capacity('vwr_24_tuberack_1500ul') == 1500
+
+
+def test_check_capacity_flags_negative_volumes():
+    # a primer above the stock concentration needs negative water
+    failed = recipe.check_capacity(recipe.primer_matrix(CONCS, [50, 100, 20000]))
+    assert failed['water_per_rxn'] and failed['BPW_rxn']
@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from ottools import registry
+
+VWR = registry.find_definitions()['vwr_24_tuberack_1500ul']
+
+
+def test_every_definition_is_valid():
+    assert registry.names()
+    assert {name: problems for name, problems in registry.check_all().items() if problems} == {}
+
+
+def test_validate_reports_problems():
+    with open(VWR) as f:
+        definition = json.load(f)
+    definition['ordering'][0].append('A1')
+    definition['wells']['Z9'] = dict(definition['wells']['A1'])
+    del definition['wells']['B1']['depth']
+    problems = registry.validate(definition, 'other_name')
+    assert "loadName 'vwr_24_tuberack_1500ul' does not match the file name 'other_name'" in problems
+    assert 'ordering lists a well twice' in problems
+    assert 'well Z9 is in wells but not in ordering' in problems
+    assert 'well B1 has no depth' in problems
+    assert registry.validate({}) and registry.validate({})[0] == "missing 'ordering'"
+
+
+def test_read_definition_caches_by_content(tmp_path):
+    folder = tmp_path / 'vwr_24_tuberack_1500ul'
+    folder.mkdir()
+    path = folder / 'vwr_24_tuberack_1500ul.json'
+    shutil.copy(VWR, str(path))
+    cache = tmp_path / 'cache'
+    first = registry.read_definition(str(path), str(cache))
+    assert len(os.listdir(str(cache))) == 1
+    assert registry.read_definition(str(path), str(cache)) == first
+    definition = json.loads(path.read_text())
+    definition['metadata']['displayName'] = 'edited'
+    path.write_text(json.dumps(definition))
+    assert registry.read_definition(str(path), str(cache))['metadata']['displayName'] == 'edited'
+    assert len(os.listdir(str(cache))) == 2
+
+
+def test_invalid_definition_is_refused(tmp_path):
+    path = tmp_path / 'broken_1_tube.json'
+    path.write_text(json.dumps({'schemaVersion': 2}))
+    with pytest.raises(registry.LabwareError, match='missing'):
+        registry.read_definition(str(path), str(tmp_path / 'cache'))
+
+
+def test_definition_lookup():
+    assert registry.definition('vwr_24_tuberack_1500ul') is registry.definition('vwr_24_tuberack_1500ul')
+    assert registry.definition('opentrons_96_filtertiprack_20ul', None) is None
+    with pytest.raises(KeyError, match='No custom labware'):
+        registry.definition('opentrons_96_filtertiprack_20ul')
+
+
+class Deck:
+    # records which loader a load_labware call ends up in
+    def load_labware(self, load_name, *args, **kwargs):
+        return 'stock', load_name, args, kwargs
+
+    def load_labware_from_definition(self, definition, *args, **kwargs):
+        return 'custom', definition['parameters']['loadName'], args, kwargs
+
+    def load_module(self, name, slot):
+        return Deck()
+
+
+def test_use_custom_labware():
+    deck = Deck()
+    registry.use_custom_labware(deck)
+    assert deck.load_labware('vwr_24_tuberack_1500ul', '1', namespace='custom_beta', version=1) == (
+        'custom', 'vwr_24_tuberack_1500ul', ('1',), {})
+    assert deck.load_labware('opentrons_96_filtertiprack_20ul', '9')[0] == 'stock'
+    tempdeck = deck.load_module('tempdeck', '10')
+    assert tempdeck.load_labware('abi_96_wellplate_250ul')[:2] == ('custom', 'abi_96_wellplate_250ul')
@@ -0,0 +1,38 @@
+import pytest
+
+from ottools import runtime
+
+
+def test_straight_move():
+    seconds = runtime.move_time((0, 0, 100), (300, 400, 100))
+    assert seconds == pytest.approx(500 / runtime.TIMINGS['gantry_speed'])
+
+
+def test_arc_move():
+    seconds = runtime.move_time((0, 0, 50), (400, 0, 20), safe_z=100)
+    z = runtime.TIMINGS['z_speed']
+    assert seconds == pytest.approx(50 / z + 1.0 + 80 / z)
+
+
+def test_no_move():
+    assert runtime.move_time((1, 2, 3), (1, 2, 3), safe_z=100) == 0.0
+
+
+def test_slow_speed_caps_z():
+    seconds = runtime.move_time((0, 0, 0), (0, 0, 10), speed=10)
+    assert seconds == pytest.approx(1.0)
+
+
+def test_calibrated_constants():
+    timings = dict(runtime.TIMINGS, travel_factor=1.5, move_overhead=0.2)
+    plain = runtime.move_time((0, 0, 0), (400, 0, 0))
+    assert runtime.move_time((0, 0, 0), (400, 0, 0), timings=timings) == pytest.approx(
+        1.5 * plain + 0.2)
+    assert runtime.move_time((0, 0, 0), (0, 0, 0), timings=timings) == 0.0
+
+
+def test_plunger_time():
+    overhead = runtime.TIMINGS['plunger_overhead']
+    assert runtime.plunger_time(100, 50) == pytest.approx(2 + overhead)
+    assert runtime.plunger_time(100, 50, rate=0.5) == pytest.approx(4 + overhead)
+    assert runtime.plunger_time(0, 50) == overhead
@@ -0,0 +1,100 @@
+import pytest
+
+from ottools import sim
+
+from conftest import PRIMER_MATRIX
+
+
+@pytest.mark.parametrize('name', sorted(sim.PIPETTE_SPECS))
+def test_max_volume_is_the_pipette_spec(ctx, name):
+    # not what the tips hold: protocols size their trips from it (see dilution.capacity)
+    assert ctx.load_instrument(name, 'left').max_volume == sim.PIPETTE_SPECS[name][0]
+
+
+def test_aspirate_is_limited_by_the_tip(ctx, p300):
+    tube = ctx.load_labware('vwr_24_tuberack_1500ul', '2')['A1']
+    p300.pick_up_tip()
+    p300.aspirate(200, tube)
+    with pytest.raises(sim.SimulationError, match='200 ul the tip holds'):
+        p300.aspirate(1, tube)
+
+
+def test_default_aspirate_fills_the_tip(ctx, p300):
+    tube = ctx.load_labware('vwr_24_tuberack_1500ul', '2')['A1']
+    p300.pick_up_tip()
+    p300.aspirate(location=tube)
+    assert p300.current_volume == 200
+
+
+def test_transfer_splits_by_the_tip(ctx, p300):
+    rack = ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+    p300.transfer(500, rack['A1'], rack['A2'])
+    aspirates = [c.volume for c in ctx.trace if c.name == 'aspirate']
+    assert len(aspirates) == 3 and max(aspirates) <= 200
+    assert sum(aspirates) == pytest.approx(500)
+
+
+def test_needs_a_tip(ctx, p300):
+    tube = ctx.load_labware('vwr_24_tuberack_1500ul', '2')['A1']
+    with pytest.raises(sim.SimulationError, match='without a tip'):
+        p300.aspirate(10, tube)
+
+
+def test_out_of_tips(ctx, p300):
+    for _ in range(96):
+        p300.pick_up_tip()
+        p300.drop_tip()
+    with pytest.raises(sim.OutOfTipsError):
+        p300.pick_up_tip()
+
+
+def test_unlimited_tips_refill_the_racks():
+    ctx = sim.ProtocolContext(unlimited_tips=True)
+    tips = ctx.load_labware('opentrons_96_filtertiprack_20ul', '9')
+    p20 = ctx.load_instrument('p20_single_gen2', 'right', tip_racks=[tips])
+    for _ in range(100):
+        p20.pick_up_tip()
+        p20.drop_tip()
+    assert ctx.tip_refills == {'p20_single_gen2': 1}
+
+
+def test_slot_taken(ctx):
+    ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+    with pytest.raises(sim.SimulationError):
+        ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+
+
+def test_mix_groups_its_commands(ctx, p300):
+    tube = ctx.load_labware('vwr_24_tuberack_1500ul', '2')['A1']
+    p300.pick_up_tip()
+    p300.mix(3, 100, tube)
+    mix = next(c for c in ctx.trace if c.name == 'mix')
+    inside = [c.name for c in ctx.trace if c.parent == mix.index]
+    assert inside == ['aspirate', 'dispense'] * 3
+    assert mix.duration == pytest.approx(sum(c.duration for c in ctx.trace
+                                             if c.parent == mix.index))
+
+
+def test_runtime_is_the_sum_of_top_level_commands(ctx, p300):
+    tube = ctx.load_labware('vwr_24_tuberack_1500ul', '2')['A1']
+    p300.pick_up_tip()
+    p300.aspirate(100, tube)
+    ctx.delay(seconds=30)
+    p300.dispense(100, tube)
+    p300.drop_tip()
+    top = [c for c in ctx.trace if c.parent is None]
+    assert ctx.runtime == pytest.approx(sum(c.duration for c in top))
+    assert [c.duration for c in ctx.trace if c.name == 'delay'] == [30]
+
+
+def test_simulate_records_protocol_lines():
+    ctx = sim.simulate(PRIMER_MATRIX)
+    assert ctx.trace and all(c.line for c in ctx.trace if c.parent is None)
+    summary = sim.summarize(ctx)
+    assert summary['commands'] == len(ctx.trace)
+    assert sum(summary['tips'].values()) == summary['counts']['pick_up_tip']
+
+
+def test_format_duration():
+    assert sim.format_duration(59) == '0m59s'
+    assert sim.format_duration(3723) == '1h02m03s'
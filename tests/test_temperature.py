@@ -0,0 +1,42 @@
+import pytest
+
+from ottools import temperature
+
+
+def test_waits_at_first_use_of_the_plate(ctx, p300):
+    module = ctx.load_module('temperature module gen2', '3')
+    plate = module.load_labware('biorad_96_wellplate_200ul_pcr')
+    tubes = ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+    temperature.precondition(module, 4, [p300])
+    p300.pick_up_tip()
+    p300.aspirate(100, tubes['A1'])
+    p300.dispense(50, tubes['A2'])
+    p300.dispense(50, plate['A1'])
+    p300.aspirate(50, plate['A1'])
+    names = [c.name for c in ctx.trace if c.parent is None]
+    assert names[0] == 'start_set_temperature'
+    assert names.count('await_temperature') == 1
+    assert names.index('await_temperature') == len(names) - 3
+    wait = next(c for c in ctx.trace if c.name == 'await_temperature')
+    before = sum(c.duration for c in ctx.trace if c.index < wait.index)
+    # 21 degrees at the module's cooling rate, less the pipetting done meanwhile
+    assert wait.duration == pytest.approx(21 / module.COOL_RATE - before, abs=1e-3)
+
+
+def test_ready_waits_straight_away(ctx, p300):
+    module = ctx.load_module('temperature module gen2', '3')
+    module.load_labware('biorad_96_wellplate_200ul_pcr')
+    ready = temperature.precondition(module, 4, [p300])
+    ready()
+    ready()
+    assert [c.name for c in ctx.trace] == ['start_set_temperature', 'await_temperature']
+
+
+def test_other_labware(ctx, p300):
+    module = ctx.load_module('temperature module gen2', '3')
+    module.load_labware('biorad_96_wellplate_200ul_pcr')
+    tubes = ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+    temperature.precondition(module, 4, [p300], labware=tubes)
+    p300.pick_up_tip()
+    p300.aspirate(20, tubes['A1'])
+    assert 'await_temperature' in [c.name for c in ctx.trace]
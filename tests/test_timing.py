@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from ottools import sim, timing
+
+
+def timed_run(ctx, tmp_path, p300):
+    timer = timing.RunTimer(ctx, 'bench', directory=str(tmp_path), enabled=True)
+    rack = ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+    p20 = ctx.load_instrument('p20_single_gen2', 'right', tip_racks=[
+        ctx.load_labware('opentrons_96_filtertiprack_20ul', '9')])
+    p300.pick_up_tip()
+    p300.mix(2, 50, rack['A1'])
+    p20.pick_up_tip()
+    p20.aspirate(10, rack['A1'])
+    ctx.delay(seconds=1)
+    timer.close()
+    return timer
+
+
+def test_rows(ctx, tmp_path, p300):
+    timer = timed_run(ctx, tmp_path, p300)
+    header, rows, footer = timing.read_log(timer.path)
+    assert header['protocol'] == 'bench' and header['source'] == __file__
+    assert footer['rows'] == timer.rows == len(rows)
+    names = [(r['name'], r['instrument']) for r in rows if r['parent'] is None]
+    assert names == [('pick_up_tip', 'p300_single_gen2'), ('mix', 'p300_single_gen2'),
+                     ('pick_up_tip', 'p20_single_gen2'), ('aspirate', 'p20_single_gen2'),
+                     ('delay', None)]
+    mix = next(r for r in rows if r['name'] == 'mix')
+    inside = [r['name'] for r in rows if r['parent'] == mix['index']]
+    assert inside == ['aspirate', 'dispense'] * 2
+    assert mix['volume'] == 50 and mix['args'][2].startswith('A1 of')
+    assert all(r['line'] is not None for r in rows)
+
+
+def test_partial_last_line_is_dropped(ctx, tmp_path, p300):
+    timer = timed_run(ctx, tmp_path, p300)
+    with open(timer.path) as f:
+        lines = f.read().splitlines()
+    with open(timer.path, 'w') as f:
+        f.write('\n'.join(lines[:-1]) + '\n' + lines[-1][:7])
+    _, rows, footer = timing.read_log(timer.path)
+    assert footer is None and len(rows) == timer.rows
+
+
+def test_not_a_log(tmp_path):
+    path = tmp_path / 'x.jsonl'
+    path.write_text(json.dumps({'index': 0}) + '\n')
+    with pytest.raises(timing.TimingError):
+        timing.read_log(str(path))
+
+
+def test_errors_are_logged(ctx, tmp_path, p300):
+    timer = timing.RunTimer(ctx, 'bench', directory=str(tmp_path), enabled=True)
+    with pytest.raises(sim.SimulationError):
+        p300.aspirate(10, ctx.load_labware('vwr_24_tuberack_1500ul', '2')['A1'])
+    timer.close()
+    _, rows, _ = timing.read_log(timer.path)
+    assert rows[0]['error'] == 'SimulationError: p300_single_gen2: cannot aspirate without a tip'
+
+
+def test_disabled_while_simulating(ctx, tmp_path):
+    timer = timing.RunTimer(ctx, 'bench', directory=str(tmp_path))
+    assert not timer.enabled and timer.path is None
+    timer.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+ROWS = [
+    {'index': 0, 'name': 'mix', 'instrument': 'p300', 'parent': None, 'line': 10,
+     'start': 0.0, 'end': 10.0},
+    {'index': 1, 'name': 'aspirate', 'instrument': 'p300', 'parent': 0, 'line': 10,
+     'start': 0.0, 'end': 4.0},
+    {'index': 2, 'name': 'dispense', 'instrument': 'p300', 'parent': 0, 'line': 10,
+     'start': 4.0, 'end': 7.0},
+    {'index': 3, 'name': 'delay', 'instrument': None, 'parent': None, 'line': 12,
+     'start': 11.0, 'end': 16.0},
+]
+
+
+def test_self_times():
+    assert timing.self_times(ROWS) == {0: 3.0, 1: 4.0, 2: 3.0, 3: 5.0}
+
+
+def test_summarize():
+    report = timing.summarize(ROWS, {'runtime': 20.0})
+    assert report['wall'] == 20.0 and report['between'] == 5.0
+    assert report['commands']['mix'] == [1, 3.0]
+    assert report['pipettes'] == {'p300': [3, 10.0], 'protocol': [1, 5.0]}
+    assert report['phases'] == {'liquid': [3, 10.0], 'delay': [1, 5.0]}
+    text = timing.format_report({'protocol': 'x', 'robot': 'r', 'started': 's'}, report, None)
+    assert 'log ends early' in text
+
+
+def test_phase_of():
+    assert [timing.phase_of(n) for n in ('transfer', 'return_tip', 'move_to', 'pause',
+                                         'await_temperature', 'comment')] == [
+        'liquid', 'tips', 'travel', 'paused', 'temperature', 'other']
@@ -0,0 +1,55 @@
+import pytest
+
+from conftest import PRIMER_MATRIX
+from ottools import geometry, sim, tips
+
+
+def test_tip_budget_counts_every_pick_up():
+    ctx, budget = tips.tip_budget(PRIMER_MATRIX)
+    picked = {}
+    for cmd in sim.simulate(PRIMER_MATRIX, sim.ProtocolContext(unlimited_tips=True)).trace:
+        if cmd.name == 'pick_up_tip':
+            picked[cmd.instrument] = picked.get(cmd.instrument, 0) + 1
+    assert {name: b['tips'] for name, b in budget.items()} == picked
+    for b in budget.values():
+        short = max(b['tips'] - b['loaded'], 0)
+        assert b['extra_racks'] * tips.TIPS_PER_RACK >= short
+        assert (b['extra_racks'] - 1) * tips.TIPS_PER_RACK < short or not b['extra_racks']
+
+
+def test_free_slots(ctx, p300):
+    ctx.load_labware('biorad_96_wellplate_200ul_pcr', '1')
+    ctx.load_module('temperature module gen2', '3')
+    free = tips.free_slots(ctx)
+    assert '1' not in free and '3' not in free and '8' not in free
+    assert geometry.TRASH_SLOT not in free
+    assert len(free) == 8
+
+
+def test_allocate_tipracks_adds_racks_nearest_the_work(ctx):
+    ctx.load_labware('biorad_96_wellplate_200ul_pcr', '1')
+    rack = ctx.load_labware('opentrons_96_filtertiprack_20ul', '11')
+    p20 = ctx.load_instrument('p20_single_gen2', 'right', tip_racks=[rack])
+    added = tips.allocate_tipracks(ctx, p20, 130)
+    assert len(added) == 1 and added[0].load_name == 'opentrons_96_filtertiprack_20ul'
+    assert str(added[0].parent) in ('2', '4')
+    assert p20.tip_racks[0] is added[0]
+    for _ in range(130):
+        p20.pick_up_tip()
+        p20.drop_tip()
+
+
+def test_allocate_tipracks_enough_already(ctx, p300):
+    assert tips.allocate_tipracks(ctx, p300, 96) == []
+
+
+def test_allocate_tipracks_errors(ctx):
+    bare = ctx.load_instrument('p300_single_gen2', 'left')
+    with pytest.raises(tips.TipBudgetError, match='no tip rack to copy'):
+        tips.allocate_tipracks(ctx, bare, 10)
+    for slot in ('1', '2', '3', '4', '5', '6', '7', '8', '9', '10'):
+        ctx.load_labware('biorad_96_wellplate_200ul_pcr', slot)
+    rack = ctx.load_labware('opentrons_96_filtertiprack_20ul', '11')
+    p20 = ctx.load_instrument('p20_single_gen2', 'right', tip_racks=[rack])
+    with pytest.raises(tips.TipBudgetError, match='only 0 slots are free'):
+        tips.allocate_tipracks(ctx, p20, 200)
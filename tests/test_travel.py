@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from ottools import travel
+
+
+def two_opt_optimal(points, order, start):
+    path = [points[i] for i in order]
+    best = travel.path_length(path, start)
+    return all(travel.path_length(path[:i] + path[i:j][::-1] + path[j:], start) >= best - 1e-9
+               for i in range(len(path)) for j in range(i + 2, len(path) + 1))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_orders_are_shorter_and_two_opt_optimal(seed):
+    rng = random.Random(seed)
+    points = [(rng.uniform(0, 380), rng.uniform(0, 350)) for _ in range(12)]
+    start = (0.0, 0.0)
+    order = travel.optimize_order(points, start)
+    assert sorted(order) == list(range(len(points)))
+    assert travel.path_length([points[i] for i in order], start) <= travel.path_length(points, start)
+    assert two_opt_optimal(points, order, start)
+
+
+def test_groups_keep_their_order():
+    items = list(range(10))
+    groups = [0] * 5 + [1] * 5
+    points = {i: (float((i * 37) % 11) * 9, 0.0) for i in items}
+    ordered = travel.order_items(items, key=points.get, groups=groups)
+    assert sorted(ordered[:5]) == [0, 1, 2, 3, 4] and sorted(ordered[5:]) == [5, 6, 7, 8, 9]
+
+
+def test_a_plate_in_snake_order(ctx):
+    plate = ctx.load_labware('biorad_96_wellplate_200ul_pcr', '1')
+    shuffled = plate.wells()[:]
+    random.Random(1).shuffle(shuffled)
+    ordered = travel.order_wells(shuffled, start=plate['A1'])
+    assert sorted(w.well_name for w in ordered) == sorted(w.well_name for w in shuffled)
+    # every step to a neighbouring well: 95 hops of one pitch
+    steps = travel.path_length([travel.position(w) for w in ordered])
+    assert steps == pytest.approx(95 * 9, rel=0.05)
+
+
+def test_well_position_matches_the_sim(ctx):
+    plate = ctx.load_labware('biorad_96_wellplate_200ul_pcr', '5')
+    assert travel.well_position('biorad_96_wellplate_200ul_pcr', '5', 'C7') == pytest.approx(
+        travel.position(plate['C7']))
+
+
+def test_trace_travel(ctx, p300):
+    rack = ctx.load_labware('vwr_24_tuberack_1500ul', '2')
+    p300.pick_up_tip()
+    p300.aspirate(10, rack['A1'])
+    p300.dispense(10, rack['A2'])
+    total, pairs = travel.trace_travel(ctx.trace)
+    assert pairs[('8', '2')] > 0 and pairs[('2', '2')] == pytest.approx(19.89, abs=0.5)
+    assert total == pytest.approx(sum(pairs.values()))
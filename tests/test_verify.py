@@ -0,0 +1,44 @@
+import pytest
+
+from ottools import registry, sim, verify
+
+
+@pytest.fixture
+def p20(ctx):
+    rack = ctx.load_labware('opentrons_96_tiprack_20ul', '11')
+    return ctx.load_instrument('p20_single_gen2', 'right', tip_racks=[rack])
+
+
+def test_load_all(ctx, p20):
+    loaded = verify.load_all(ctx, reserved=['1'])
+    assert sorted(lw.load_name for lw in loaded) == sorted(registry.names())
+    assert '1' not in [str(lw.parent) for lw in loaded]
+
+
+def test_load_all_too_many(ctx, p20):
+    with pytest.raises(ValueError, match='free slots'):
+        verify.load_all(ctx, registry.names() * 10)
+
+
+def test_walk_visits_each_labware_once(ctx, p20):
+    loaded = verify.load_all(ctx)
+    stops = verify.walk(loaded)
+    assert len(stops) == sum(len(verify.check_wells(lw)) for lw in loaded)
+    order = [lw for lw, _ in stops]
+    runs = [lw for i, lw in enumerate(order) if i == 0 or order[i - 1] is not lw]
+    assert len(runs) == len(loaded)
+
+
+def test_verify_all(ctx, p20):
+    loaded = verify.load_all(ctx)
+    with sim.fake_opentrons(sim._fake_opentrons(ctx)):
+        stops = verify.verify_all(ctx, p20, loaded)
+    pauses = [c for c in ctx.trace if c.name == 'pause']
+    # 3 crosses, the placement prompt, then top, 4 edges and bottom per well
+    assert len(pauses) == 3 + 1 + 6 * len(stops)
+    assert [c.name for c in ctx.trace].count('pick_up_tip') == 1
+    # the tip goes back where it came from
+    assert ctx.trace[-1].name == 'drop_tip'
+    assert ctx.trace[-1].location == repr(p20.tip_racks[0]['A1'])
+    assert p20.tip_racks[0]['A1'].has_tip
+    assert p20.default_speed == max(ctx.max_speeds.values())